@@ -0,0 +1,167 @@
+"""
+Batched AI assistant requests
+A batch of prompts (free text, or modules expanded with the module test case
+template) is sent to Superwise concurrently, bounded per batch by
+AI_BATCH_MAX_CONCURRENCY, per project by a token bucket and per process by the
+Superwise client's own limit. Answers are parsed into test cases, merged in
+prompt order with duplicate names dropped, and can be saved in one bulk
+insert.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Tuple
+
+from ai_parsing import parse_test_cases
+from config import (
+    AI_BATCH_MAX_CONCURRENCY,
+    AI_PROJECT_RATE_BURST,
+    AI_PROJECT_RATE_PER_SECOND,
+)
+from logging_config import get_logger
+from models import Project
+from prompts import MODULE_TEST_CASES_PROMPT
+from rate_limit import RateLimiter
+from schemas import (
+    AIAssistantRequest,
+    AIBatchItemResult,
+    AIBatchResponse,
+    TestCaseCreate,
+)
+
+# Logger
+logger = get_logger(__name__)
+
+project_rate_limiter = RateLimiter(AI_PROJECT_RATE_PER_SECOND, AI_PROJECT_RATE_BURST)
+
+
+@dataclass
+class BatchPrompt:
+    prompt: str
+    module: Optional[str] = None
+
+
+@dataclass
+class BatchItem:
+    """Outcome of one prompt of a batch"""
+
+    prompt: BatchPrompt
+    output: Any = None
+    error: Optional[str] = None
+    duration_ms: int = 0
+    test_cases: List[TestCaseCreate] = field(default_factory=list)
+
+    def result(self) -> AIBatchItemResult:
+        return AIBatchItemResult(
+            prompt=self.prompt.prompt,
+            module=self.prompt.module,
+            ok=self.error is None,
+            output=self.output,
+            test_cases=len(self.test_cases),
+            error=self.error,
+            duration_ms=self.duration_ms,
+        )
+
+
+def merge_test_cases(
+    items: List[BatchItem], existing_names: Iterable[str] = ()
+) -> Tuple[List[TestCaseCreate], int]:
+    """Test cases of all items in prompt order, dropping repeated names
+
+    Names in `existing_names` (the project's test cases) count as repeated.
+    """
+    seen = {name.casefold() for name in existing_names}
+    merged = []
+    duplicates = 0
+    for item in items:
+        for test_case in item.test_cases:
+            key = test_case.name.casefold()
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            merged.append(test_case)
+    return merged, duplicates
+
+
+async def run_batch(
+    prompts: List[BatchPrompt],
+    ask: Callable[[str], Awaitable[Any]],
+    project_id: int,
+    max_concurrency: int = AI_BATCH_MAX_CONCURRENCY,
+    rate_limiter: RateLimiter = project_rate_limiter,
+    on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+) -> List[BatchItem]:
+    """Send every prompt concurrently and return their outcomes in order
+
+    A failing prompt is recorded on its item and does not affect the others.
+    `on_progress(done, total)` is awaited as each prompt completes.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    done = 0
+
+    async def run_one(item: BatchItem) -> None:
+        async with semaphore:
+            await rate_limiter.acquire(project_id)
+            started = time.monotonic()
+            try:
+                item.output = await ask(item.prompt.prompt)
+            except Exception as e:
+                item.error = getattr(e, "detail", None) or str(e)
+                logger.warning(
+                    "AI batch prompt failed for project %s: %s", project_id, item.error
+                )
+            finally:
+                item.duration_ms = int((time.monotonic() - started) * 1000)
+        if item.error is None:
+            item.test_cases = parse_test_cases(item.output)
+        nonlocal done
+        done += 1
+        if on_progress is not None:
+            await on_progress(done, len(items))
+
+    items = [BatchItem(prompt) for prompt in prompts]
+    await asyncio.gather(*(run_one(item) for item in items))
+    return items
+
+
+def batch_prompts(project: Project, request: AIAssistantRequest) -> List[BatchPrompt]:
+    """Free-form prompts followed by the expanded module prompts"""
+    return [BatchPrompt(prompt) for prompt in request.prompts] + [
+        BatchPrompt(MODULE_TEST_CASES_PROMPT.render(project, module=module), module)
+        for module in request.modules
+    ]
+
+
+async def run_ai_batch(
+    project: Project,
+    request: AIAssistantRequest,
+    ask: Callable[[str], Awaitable[Any]],
+    save: Callable[[List[TestCaseCreate]], Awaitable[List[int]]],
+    on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+    existing_names: Iterable[str] = (),
+) -> AIBatchResponse:
+    """Run a batch request end to end, saving the test cases if asked to"""
+    started = time.monotonic()
+    prompts = batch_prompts(project, request)
+    items = await run_batch(prompts, ask, project.id, on_progress=on_progress)
+    test_cases, duplicates = merge_test_cases(items, existing_names)
+    created_ids = await save(test_cases) if request.persist and test_cases else []
+    elapsed_ms = int((time.monotonic() - started) * 1000)
+    logger.info(
+        "AI batch for project %s: %s prompts, %s failed, %s test cases, "
+        "%s saved in %sms",
+        project.id,
+        len(items),
+        sum(item.error is not None for item in items),
+        len(test_cases),
+        len(created_ids),
+        elapsed_ms,
+    )
+    return AIBatchResponse(
+        results=[item.result() for item in items],
+        test_cases=test_cases,
+        duplicates=duplicates,
+        created_ids=created_ids,
+        elapsed_ms=elapsed_ms,
+    )
@@ -0,0 +1,267 @@
+"""
+Response cache for AI generation endpoints
+Superwise answers are cached per (project, prompt template, template version,
+project updated_at), so a repeat request for an unchanged project is served
+without another LLM round-trip.
+
+The memory tier is an LRU with a TTL. When AI_CACHE_DB_PATH is set, answers
+are also written to a small SQLite file so they survive restarts and are
+shared by workers on the same host. Concurrent misses for the same key wait
+for the first caller's upstream call instead of starting their own.
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+from config import AI_CACHE_DB_PATH, AI_CACHE_MAX_ENTRIES, AI_CACHE_TTL_SECONDS
+from fastapi.concurrency import run_in_threadpool
+from logging_config import get_logger
+from models import Project
+from prompts import PromptTemplate
+
+# Logger
+logger = get_logger(__name__)
+
+
+class CacheKey(NamedTuple):
+    project_id: int
+    prompt: str
+    version: int
+    updated_at: str
+
+
+def cache_key(project: Project, template: PromptTemplate) -> CacheKey:
+    """Key for a project's answer to a prompt template"""
+    updated_at = project.updated_at or project.created_at
+    return CacheKey(
+        project.id,
+        template.name,
+        template.version,
+        updated_at.isoformat() if updated_at else "",
+    )
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+class SQLiteCacheTier:
+    """Persistent second tier; each call opens its own short-lived connection"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ai_cache ("
+                "key TEXT PRIMARY KEY, project_id INTEGER NOT NULL, "
+                "value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_ai_cache_project_id "
+                "ON ai_cache (project_id)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    @staticmethod
+    def _key(key: CacheKey) -> str:
+        return json.dumps(list(key))
+
+    def get(self, key: CacheKey) -> Optional[Tuple[Any, float]]:
+        """Stored value and its remaining lifetime, or None"""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM ai_cache "
+                "WHERE key = ? AND expires_at > ?",
+                (self._key(key), now),
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1] - now
+
+    def set(self, key: CacheKey, value: Any, ttl: float) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "DELETE FROM ai_cache WHERE expires_at <= ?", (time.time(),)
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO ai_cache "
+                "(key, project_id, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self._key(key), key.project_id, json.dumps(value), time.time() + ttl),
+            )
+
+    def invalidate_project(self, project_id: int) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM ai_cache WHERE project_id = ?", (project_id,))
+
+
+class AICache:
+    """Two-tier TTL/LRU cache of AI responses with single-flight misses
+
+    The memory tier is guarded by a lock because project updates invalidate it
+    from the threadpool, keeping the disk tier's sqlite I/O off the event loop.
+    """
+
+    def __init__(
+        self,
+        ttl: float = AI_CACHE_TTL_SECONDS,
+        max_entries: int = AI_CACHE_MAX_ENTRIES,
+        db_path: str = AI_CACHE_DB_PATH,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.disk = SQLiteCacheTier(db_path) if db_path else None
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+
+    def get(self, key: CacheKey) -> Optional[Any]:
+        """Value from the memory tier, refreshing its LRU position"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.stats.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: CacheKey, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value in the memory tier, evicting the least recently used"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def invalidate_project(self, project_id: int) -> None:
+        """Drop every cached answer for a project from both tiers"""
+        with self._lock:
+            stale = [key for key in self._entries if key.project_id == project_id]
+            for key in stale:
+                del self._entries[key]
+            self.stats.invalidations += 1
+        if self.disk is not None:
+            self.disk.invalidate_project(project_id)
+        logger.debug(
+            "Invalidated %s cached AI responses for project %s", len(stale), project_id
+        )
+
+    async def get_or_create(
+        self,
+        key: CacheKey,
+        create: Callable[[], Awaitable[Any]],
+        refresh: bool = False,
+    ) -> Tuple[Any, bool]:
+        """Return (value, cache_hit), calling `create` at most once per key
+
+        With refresh the cached value is ignored and replaced. Failures are
+        not cached.
+        """
+        if not refresh:
+            value = await self.lookup(key)
+            if value is not None:
+                return value, True
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                try:
+                    value = await asyncio.shield(inflight)
+                except asyncio.CancelledError:
+                    # The caller that owned the upstream call went away;
+                    # make our own unless we were cancelled ourselves
+                    if not inflight.cancelled():
+                        raise
+                else:
+                    self.stats.coalesced += 1
+                    return value, True
+
+        self.stats.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await create()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved in case nobody was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            await self.store(key, value)
+            return value, False
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def lookup(self, key: CacheKey) -> Optional[Any]:
+        """Cached value from memory or disk, counting the hit"""
+        value = self.get(key)
+        if value is not None:
+            self.stats.hits += 1
+            return value
+        if self.disk is not None:
+            stored = await run_in_threadpool(self.disk.get, key)
+            if stored is not None:
+                value, remaining = stored
+                self.put(key, value, remaining)
+                self.stats.hits += 1
+                self.stats.disk_hits += 1
+                return value
+        return None
+
+    async def store(self, key: CacheKey, value: Any) -> None:
+        """Write a value to both tiers"""
+        self.put(key, value)
+        if self.disk is not None:
+            await run_in_threadpool(self.disk.set, key, value, self.ttl)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters and sizes for the stats endpoint"""
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.stats.hits + self.stats.misses + self.stats.coalesced
+        return {
+            **asdict(self.stats),
+            "hit_ratio": (
+                (self.stats.hits + self.stats.coalesced) / lookups if lookups else 0.0
+            ),
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "persistent": self.disk is not None,
+        }
+
+
+_cache: Optional[AICache] = None
+
+
+def get_ai_cache() -> AICache:
+    """Return the process-wide AI response cache, creating it on first use"""
+    global _cache
+    if _cache is None:
+        _cache = AICache()
+    return _cache
@@ -0,0 +1,257 @@
+"""
+Parsing of AI generated test cases
+Agent answers carry test cases as JSON records with the UI's field names
+("Test Case Name", "Description", "Priority", "Browsers", "Environment",
+"Test Steps"), usually wrapped in prose or a code fence. The extractor scans
+the answer as it arrives and yields each record as soon as its closing brace
+is seen, so streamed and truncated answers give every complete record.
+Records are validated into TestCaseCreate, and names already in the project
+or earlier in the answer are dropped.
+"""
+import json
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from logging_config import get_logger
+from models import TestCasePriority
+from pydantic import ValidationError
+from schemas import AITestCaseRejection, TestCaseCreate, TestStepCreate
+
+# Logger
+logger = get_logger(__name__)
+
+# Words the agent uses for priority, mapped onto TestCasePriority
+PRIORITY_ALIASES = {
+    "critical": TestCasePriority.CRITICAL,
+    "highest": TestCasePriority.CRITICAL,
+    "high": TestCasePriority.MAJOR,
+    "major": TestCasePriority.MAJOR,
+    "medium": TestCasePriority.MEDIUM,
+    "normal": TestCasePriority.MEDIUM,
+    "low": TestCasePriority.MINOR,
+    "minor": TestCasePriority.MINOR,
+}
+
+# Keys an agent may wrap the record list in, e.g. {"test_cases": [...]}
+RECORD_LIST_KEYS = ("test_cases", "Test Cases", "testCases", "items")
+
+
+class JSONRecordExtractor:
+    """Incremental scanner for the JSON objects embedded in free text
+
+    feed() takes the answer in pieces of any size and returns the top-level
+    objects completed by that piece. Text outside objects (prose, code fences,
+    array brackets and commas) is skipped, as are objects that fail to decode.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._position = 0
+        self._start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        self._buffer += text
+        records = []
+        buffer = self._buffer
+        for index in range(self._position, len(buffer)):
+            char = buffer[index]
+            if self._start is None:
+                if char == "{":
+                    self._start, self._depth = index, 1
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    records.extend(self._decode(buffer[self._start : index + 1]))
+                    self._start = None
+        # Keep only the unfinished object, if any
+        keep_from = len(buffer) if self._start is None else self._start
+        self._buffer = buffer[keep_from:]
+        self._position = len(self._buffer)
+        if self._start is not None:
+            self._start = 0
+        return records
+
+    def _decode(self, text: str) -> List[Dict[str, Any]]:
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return []
+        for key in RECORD_LIST_KEYS:
+            if isinstance(value.get(key), list):
+                return [record for record in value[key] if isinstance(record, dict)]
+        return [value]
+
+
+def _as_list(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        # One item per line; commas are common inside a single step
+        return [line.strip() for line in value.splitlines() if line.strip()]
+    return list(value)
+
+
+def ai_case_to_create(record: Dict[str, Any]) -> TestCaseCreate:
+    """Map one agent record (UI field names) onto TestCaseCreate"""
+    priority = str(record.get("Priority") or "medium").strip().lower()
+    steps = []
+    for number, step in enumerate(_as_list(record.get("Test Steps")), 1):
+        if isinstance(step, dict):
+            action = step.get("action") or step.get("Action") or step.get("step")
+            steps.append(
+                TestStepCreate(
+                    step_number=number,
+                    action=str(action or ""),
+                    element=step.get("element"),
+                    value=step.get("value"),
+                    description=step.get("description"),
+                )
+            )
+        else:
+            steps.append(TestStepCreate(step_number=number, action=str(step)))
+    environments = _as_list(record.get("Environment"))
+    return TestCaseCreate(
+        name=str(record.get("Test Case Name") or record.get("name") or "").strip(),
+        description=record.get("Description"),
+        priority=PRIORITY_ALIASES.get(priority, TestCasePriority.MEDIUM),
+        browsers=[str(b).strip().lower() for b in _as_list(record.get("Browsers"))]
+        or ["chrome"],
+        environment=", ".join(str(e) for e in environments) or None,
+        steps=steps,
+    )
+
+
+@dataclass
+class TestCaseParser:
+    """Turns an answer, whole or in pieces, into new test cases
+
+    Names in `existing_names` (the project's test cases) and names seen
+    earlier in the answer are counted as duplicates; records that do not
+    validate are listed in `rejected` with their position in the answer.
+    """
+
+    existing_names: Iterable[str] = ()
+    test_cases: List[TestCaseCreate] = field(default_factory=list)
+    rejected: List[AITestCaseRejection] = field(default_factory=list)
+    duplicates: int = 0
+
+    def __post_init__(self):
+        self._seen = {name.casefold() for name in self.existing_names}
+        self._extractor = JSONRecordExtractor()
+        self._records = 0
+
+    def feed(self, text: str) -> List[TestCaseCreate]:
+        """Test cases completed by this piece of the answer"""
+        return self.add(self._extractor.feed(text))
+
+    def add(self, records: Iterable[Any]) -> List[TestCaseCreate]:
+        """Test cases from already decoded records"""
+        accepted = []
+        for record in records:
+            index = self._records
+            self._records += 1
+            if not isinstance(record, dict):
+                continue
+            try:
+                test_case = ai_case_to_create(record)
+            except (ValidationError, TypeError, ValueError) as e:
+                logger.debug("Rejected AI test case record %s: %s", index, e)
+                self.rejected.append(
+                    AITestCaseRejection(
+                        index=index,
+                        name=str(record.get("Test Case Name") or "") or None,
+                        error=str(e),
+                    )
+                )
+                continue
+            if not test_case.name:
+                self.rejected.append(
+                    AITestCaseRejection(index=index, error="Missing test case name")
+                )
+                continue
+            key = test_case.name.casefold()
+            if key in self._seen:
+                self.duplicates += 1
+                continue
+            self._seen.add(key)
+            self.test_cases.append(test_case)
+            accepted.append(test_case)
+        return accepted
+
+
+def answer_text(answer: Any) -> Any:
+    """The agent output of an answer: text, or records it already decoded"""
+    return answer.get("output", answer) if isinstance(answer, dict) else answer
+
+
+def parse_answer(answer: Any, existing_names: Iterable[str] = ()) -> TestCaseParser:
+    """Parse a complete Superwise answer"""
+    parser = TestCaseParser(existing_names)
+    output = answer_text(answer)
+    if isinstance(output, str):
+        parser.feed(output)
+    elif isinstance(output, list):
+        parser.add(output)
+    elif isinstance(output, dict):
+        parser.add([output])
+    return parser
+
+
+def parse_test_cases(answer: Any) -> List[TestCaseCreate]:
+    """Test cases found in a Superwise answer; invalid records are skipped"""
+    return parse_answer(answer).test_cases
+
+
+def _event_data(line: bytes) -> Optional[bytes]:
+    """Value of a server-sent `data:` line, without the one space after the colon"""
+    if not line.startswith(b"data:"):
+        return None
+    data = line[5:].rstrip(b"\r")
+    return data[1:] if data.startswith(b" ") else data
+
+
+async def stream_answer_text(
+    chunks: AsyncIterator[bytes], media_type: str
+) -> AsyncIterator[str]:
+    """Agent output text of a streamed Superwise answer, as it arrives
+
+    Server-sent events give one piece of output per `data:` line; any other
+    body is a JSON answer, decoded once complete.
+    """
+    if "event-stream" not in media_type:
+        body = b"".join([chunk async for chunk in chunks])
+        try:
+            output = answer_text(json.loads(body))
+        except ValueError:
+            output = body.decode("utf-8", errors="replace")
+        yield output if isinstance(output, str) else json.dumps(output)
+        return
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            data = _event_data(line)
+            if data is None or data == b"[DONE]":
+                continue
+            try:
+                output = answer_text(json.loads(data))
+            except ValueError:
+                output = data.decode("utf-8", errors="replace")
+            if output:
+                yield output if isinstance(output, str) else json.dumps(output)
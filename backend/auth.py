@@ -1,31 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
-from config import ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM, SECRET_KEY
-from jose import JWTError, jwt
+import bcrypt
+from anyio import CapacityLimiter, to_thread
+from config import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    ALGORITHM,
+    BCRYPT_ROUNDS,
+    PASSWORD_HASH_THREADS,
+    SECRET_KEY,
+    TOKEN_CACHE_MAX_ENTRIES,
+)
 from logging_config import get_logger
-from passlib.context import CryptContext
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # Logger
 logger = get_logger(__name__)
 
+# bcrypt only uses the first 72 bytes of a password
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+
+def _password_bytes(password: str) -> bytes:
+    return password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return bcrypt.checkpw(
+            _password_bytes(plain_password), hashed_password.encode("ascii")
+        )
+    except ValueError:
+        logger.warning("Stored password hash is not a valid bcrypt hash")
+        return False
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    return bcrypt.hashpw(_password_bytes(password), salt).decode("ascii")
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a hash was made with other parameters than BCRYPT_ROUNDS"""
+    try:
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+# Hashing is CPU bound and slow by design: it gets its own small share of
+# worker threads so a burst of logins cannot take the ones CRUD routes use
+_hash_limiter: Optional[CapacityLimiter] = None
+
+
+def _get_hash_limiter() -> CapacityLimiter:
+    # Created on first use, as anyio needs a running event loop
+    global _hash_limiter
+    if _hash_limiter is None:
+        _hash_limiter = CapacityLimiter(PASSWORD_HASH_THREADS)
+    return _hash_limiter
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password in the bounded hashing pool"""
+    return await to_thread.run_sync(
+        verify_password, plain_password, hashed_password, limiter=_get_hash_limiter()
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash in the bounded hashing pool"""
+    return await to_thread.run_sync(
+        get_password_hash, password, limiter=_get_hash_limiter()
+    )
+
+
+_unknown_user_hash: Optional[str] = None
+
+
+async def check_password(plain_password: str, hashed_password: Optional[str]) -> bool:
+    """Verify a login password; without a hash (unknown account) a dummy hash
+    is checked instead, so the response time does not reveal which emails exist
+    """
+    global _unknown_user_hash
+    if hashed_password is None:
+        if _unknown_user_hash is None:
+            _unknown_user_hash = await get_password_hash_async("unknown user")
+        await verify_password_async(plain_password, _unknown_user_hash)
+        return False
+    return await verify_password_async(plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
-    logger.debug(f"Creating access token for: {data.get('sub', 'unknown')}")
+    logger.debug("Creating access token for: %s", data.get('sub', 'unknown'))
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -33,20 +105,74 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
     to_encode.update({"exp": expire})
+    # python-jose pulls in cryptography; imported on first use to keep startup fast
+    from jose import jwt
+
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     logger.debug("Access token created successfully")
     return encoded_jwt
 
 
+class TokenCache:
+    """LRU of verified token claims
+
+    A token is served from here until its `exp` passes, so repeat requests
+    skip the signature check. Only tokens that verified are stored.
+    """
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            claims, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+        return dict(claims)
+
+    def put(self, token: str, claims: dict) -> None:
+        expires_at = claims.get("exp")
+        if self.max_entries <= 0 or not isinstance(expires_at, (int, float)):
+            return
+        with self._lock:
+            self._entries[token] = (dict(claims), float(expires_at))
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+token_cache = TokenCache()
+
+
 def verify_token(token: str) -> Optional[dict]:
     """Verify and decode a JWT token"""
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        logger.debug(f"Token verified successfully for: {payload.get('sub', 'unknown')}")
+        logger.debug("Token verified successfully for: %s", payload.get('sub'))
+        token_cache.put(token, payload)
         return payload
     except JWTError as e:
-        logger.warning(f"Token verification failed: {str(e)}")
+        logger.warning("Token verification failed: %s", e)
         return None
     except Exception as e:
-        logger.error(f"Unexpected error verifying token: {str(e)}", exc_info=True)
+        logger.error("Unexpected error verifying token: %s", e, exc_info=True)
         return None
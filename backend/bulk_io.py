@@ -0,0 +1,227 @@
+"""
+Bulk import and export of test cases
+Imports read NDJSON or CSV from a streamed request body and insert valid rows in
+chunks, one transaction per chunk; rows that fail are reported by row number
+without aborting the rest. Exports stream NDJSON one page at a time.
+"""
+import codecs
+import csv
+import json
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from config import BULK_IMPORT_CHUNK_SIZE, BULK_IMPORT_MAX_ERRORS
+from logging_config import get_logger
+from pagination import PageRequest
+from pydantic import ValidationError
+from schemas import (
+    BulkImportResponse,
+    BulkImportRowError,
+    TestCaseCreate,
+    TestCaseResponse,
+)
+
+# Logger
+logger = get_logger(__name__)
+
+NDJSON = "ndjson"
+CSV = "csv"
+
+CONTENT_TYPES = {
+    "application/x-ndjson": NDJSON,
+    "application/ndjson": NDJSON,
+    "application/jsonl": NDJSON,
+    "text/csv": CSV,
+}
+
+# CSV cells holding lists: browsers are separated by ";", steps are a JSON array
+CSV_BROWSER_SEPARATOR = ";"
+
+# (row number, parsed row, error message); exactly one of the last two is set
+ParsedRow = Tuple[int, Optional[dict], Optional[str]]
+InsertChunk = Callable[[List[TestCaseCreate]], Awaitable[List[int]]]
+
+
+def detect_import_format(content_type: Optional[str]) -> Optional[str]:
+    """Map a request Content-Type to an import format, None if unsupported"""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return CONTENT_TYPES.get(media_type)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream as UTF-8 and yield it line by line"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_ndjson_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """Yield one parsed object per non-blank NDJSON line"""
+    row_number = 0
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield row_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield row_number, None, "Expected a JSON object"
+            continue
+        yield row_number, row, None
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Group lines into CSV records, keeping quoted newlines inside a field
+
+    A record is complete once it holds an even number of quote characters;
+    escaped quotes are doubled, so they never change the parity.
+    """
+    record: List[str] = []
+    quotes = 0
+    async for line in iter_lines(chunks):
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2 == 0:
+            yield "\n".join(record)
+            record, quotes = [], 0
+    if record:
+        yield "\n".join(record)
+
+
+def csv_row_to_case(row: Dict[str, str]) -> dict:
+    """Convert a CSV row into TestCaseCreate fields; empty cells are omitted"""
+    data = {
+        field.strip(): value
+        for field, value in row.items()
+        if field and value is not None and value.strip()
+    }
+    if "browsers" in data:
+        data["browsers"] = [
+            browser.strip()
+            for browser in data["browsers"].split(CSV_BROWSER_SEPARATOR)
+            if browser.strip()
+        ]
+    if "steps" in data:
+        data["steps"] = json.loads(data["steps"])
+    return data
+
+
+async def iter_csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRow]:
+    """Yield one parsed row per CSV record after the header"""
+    header = None
+    row_number = 0
+    async for record in iter_csv_records(chunks):
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = values
+            continue
+        row_number += 1
+        if len(values) > len(header):
+            yield row_number, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        try:
+            yield row_number, csv_row_to_case(dict(zip(header, values))), None
+        except ValueError as e:
+            yield row_number, None, f"Invalid steps JSON: {e}"
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """Flatten a pydantic error into a single line"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+async def import_test_cases(
+    chunks: AsyncIterator[bytes],
+    import_format: str,
+    insert_chunk: InsertChunk,
+    chunk_size: int = BULK_IMPORT_CHUNK_SIZE,
+) -> BulkImportResponse:
+    """Validate streamed rows and insert them in chunks
+
+    `insert_chunk` stores one chunk in a single transaction. If a chunk fails,
+    its rows are retried one at a time so only the offending rows are reported.
+    """
+    result = BulkImportResponse()
+    batch: List[Tuple[int, TestCaseCreate]] = []
+
+    def record_error(row_number: int, message: str) -> None:
+        result.failed += 1
+        if len(result.errors) < BULK_IMPORT_MAX_ERRORS:
+            result.errors.append(BulkImportRowError(row=row_number, error=message))
+        else:
+            result.errors_truncated = True
+
+    async def flush(items: List[Tuple[int, TestCaseCreate]]) -> None:
+        try:
+            await insert_chunk([case for _, case in items])
+            result.created += len(items)
+        except Exception as e:
+            if len(items) == 1:
+                record_error(items[0][0], f"Insert failed: {e}")
+                return
+            logger.warning(
+                "Insert of %s rows failed, retrying one by one: %s", len(items), e
+            )
+            for item in items:
+                await flush([item])
+
+    rows = iter_csv_rows(chunks) if import_format == CSV else iter_ndjson_rows(chunks)
+    async for row_number, row, error in rows:
+        if error is not None:
+            record_error(row_number, error)
+            continue
+        try:
+            batch.append((row_number, TestCaseCreate(**row)))
+        except ValidationError as e:
+            record_error(row_number, format_validation_error(e))
+            continue
+        if len(batch) >= chunk_size:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+    return result
+
+
+def export_test_cases(
+    load_page: Callable[[PageRequest], Tuple[list, Optional[str]]],
+    chunk_size: int = BULK_IMPORT_CHUNK_SIZE,
+) -> Iterator[str]:
+    """Yield test cases as NDJSON, one page of rows per chunk, oldest first
+
+    The output uses the TestCaseResponse shape, which the importer accepts
+    (ids and timestamps are ignored), so an export can be re-imported as is.
+    """
+    page = PageRequest(limit=chunk_size, descending=False)
+    while True:
+        rows, next_cursor = load_page(page)
+        yield "".join(
+            TestCaseResponse.model_validate(row).model_dump_json() + "\n"
+            for row in rows
+        )
+        if next_cursor is None:
+            return
+        page = PageRequest(limit=chunk_size, cursor=next_cursor, descending=False)
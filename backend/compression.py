@@ -0,0 +1,141 @@
+"""
+Response compression for TestGenie Backend
+Compresses response bodies of at least COMPRESSION_MIN_SIZE bytes with brotli,
+when the optional `brotli` package is installed and the client accepts it, or
+gzip. Event streams are left alone so events are not held back in the
+compressor, and streamed bodies are flushed chunk by chunk.
+"""
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli  # type: ignore[import-not-found]
+except ImportError:  # optional
+    brotli = None
+
+# Fast levels: list bodies are generated per request, never stored compressed
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """The best encoding this server supports among those a client accepts"""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Incremental compressor for one response body"""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits 31: gzip header and trailer
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self._brotli is not None:
+            out = self._brotli.process(data)
+            return out + (self._brotli.finish() if final else self._brotli.flush())
+        assert self._zlib is not None
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """Compress responses the client accepts compressed"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Holds back the response start until the first body shows whether to
+    compress"""
+
+    def __init__(self, send: Send, encoding: str, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.compressor: Optional[_Compressor] = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            if "content-encoding" in headers or content_type.startswith(
+                "text/event-stream"
+            ):
+                self.passthrough = True
+                await self._send(message)
+            else:
+                self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            start, self.start = self.start, None
+            # A body always follows the start message held back above
+            assert start is not None
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._send(start)
+                await self._send(message)
+                return
+            self.compressor = _Compressor(self.encoding)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            # The compressed bytes are another representation of the resource
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            body = self.compressor.compress(body, final=not more_body)
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(body))
+            await self._send(start)
+        else:
+            body = self.compressor.compress(body, final=not more_body)
+        await self._send(
+            {"type": "http.response.body", "body": body, "more_body": more_body}
+        )
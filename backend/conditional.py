@@ -0,0 +1,106 @@
+"""
+Conditional GET support for project resources
+A project collection is fingerprinted by the project's change log version, and
+for tables outside the change log (runs, jobs) by the row count and newest
+updated_at. One aggregate query, which also checks project ownership, is enough
+to answer If-None-Match with 304 Not Modified before any row is loaded or
+serialized.
+"""
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+
+from crud import CHANGE_ENTITIES
+from models import Project, TestResult, TestRun
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+
+class NotModifiedError(Exception):
+    """Raised when the client's cached copy of a resource is still current"""
+
+    def __init__(self, headers: dict):
+        super().__init__("Not Modified")
+        self.headers = headers
+
+
+@dataclass
+class CollectionState:
+    """Fingerprint of a project's rows in the tables a response is built from
+
+    `settled` is False while a row changed within the current timestamp tick:
+    updated_at has one-second resolution on SQLite, so another change in the
+    same second would leave the fingerprint unchanged and must not be hidden
+    behind a 304.
+    """
+
+    values: tuple
+    settled: bool
+
+
+def collection_state(
+    db: Session, project_id: int, user_id: int, models: Sequence[Any]
+) -> Optional[CollectionState]:
+    """Project updated_at and change version, and for models outside the change
+    log the count and newest updated_at of their rows
+
+    Returns None if the project does not exist or belongs to another user.
+    """
+    columns = [Project.updated_at, Project.change_version]
+    for model in models:
+        if model in CHANGE_ENTITIES:
+            continue
+        scope = _project_rows(model, project_id)
+        columns.append(select(func.count(model.id)).where(scope).scalar_subquery())
+        if hasattr(model, "updated_at"):
+            newest = func.max(model.updated_at)
+            columns.append(select(newest).where(scope).scalar_subquery())
+    row = db.execute(
+        select(func.now(), *columns).where(
+            Project.id == project_id, Project.owner_id == user_id
+        )
+    ).first()
+    if row is None:
+        return None
+    now, *values = row
+    timestamps = [value for value in values if hasattr(value, "isoformat")]
+    return CollectionState(
+        values=tuple(values),
+        settled=not any(_same_tick(timestamp, now) for timestamp in timestamps),
+    )
+
+
+def _project_rows(model: Any, project_id: int):
+    """Filter for a model's rows that belong to a project"""
+    if model is TestResult:
+        # Results are only ever inserted, under one of the project's runs
+        runs = select(TestRun.id).where(TestRun.project_id == project_id)
+        return TestResult.test_run_id.in_(runs)
+    return model.project_id == project_id
+
+
+def _same_tick(timestamp, now) -> bool:
+    """Whether a row written now could still get the same timestamp"""
+    if (timestamp.tzinfo is None) != (now.tzinfo is None):
+        timestamp, now = timestamp.replace(tzinfo=None), now.replace(tzinfo=None)
+    return timestamp >= now
+
+
+def make_etag(state: CollectionState, variant: str = "") -> str:
+    """Strong ETag for a collection state and the request's query string"""
+    digest = hashlib.sha1(f"{state.values!r}|{variant}".encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names the current ETag
+
+    Uses the weak comparison If-None-Match calls for, so W/ prefixes added by
+    proxies that recompress the body still match.
+    """
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(
+        tag.removeprefix("W/") == etag for tag in candidates
+    )
@@ -1,3 +1,4 @@
+import logging
 import os
 from pathlib import Path
 from dotenv import load_dotenv  # type: ignore
@@ -5,16 +6,57 @@ from dotenv import load_dotenv  # type: ignore
 # Load environment variables from .env file in root folder
 root_dir = Path(__file__).parent.parent
 env_path = root_dir / ".env"
-print(env_path)
 load_dotenv(dotenv_path=env_path)
 
 # Database Configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./backend/testgenie.db")
+# Apply pending Alembic migrations when the API starts; disable when running
+# `alembic upgrade head` as a separate deploy step
+RUN_MIGRATIONS_ON_STARTUP = (
+    os.getenv("RUN_MIGRATIONS_ON_STARTUP", "true").lower() == "true"
+)
+# Optional read replica for the list endpoints (same pool settings); lists may
+# lag behind writes by the replication delay
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", "")
+# Connection pool: connections kept open, extra ones allowed during bursts and
+# seconds a request waits for one. Server databases also replace connections
+# older than DB_POOL_RECYCLE seconds and check each one on checkout, so
+# connections dropped by PgBouncer or a server restart are reopened instead of
+# failing a request
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Open a connection per session instead of pooling, for PgBouncer in
+# transaction mode where PgBouncer does the pooling
+DB_DISABLE_POOL = os.getenv("DB_DISABLE_POOL", "false").lower() == "true"
+# PostgreSQL statement time limit, set per transaction so it also holds behind
+# PgBouncer (0 disables)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
 
 # Security Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-super-secret-key-change-in-production-12345")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+# Verified token claims kept in memory until the token expires (0 disables)
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "1024"))
+# Password hashing: bcrypt cost (hashes made with another cost are upgraded on
+# the next login) and the worker threads that may hash at once, by default half
+# the CPUs so request handling keeps the rest
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_THREADS = int(
+    os.getenv("PASSWORD_HASH_THREADS", str(max(1, (os.cpu_count() or 2) // 2)))
+)
+# Login attempts: token buckets per client IP and per account (sustained
+# attempts per minute and burst), and whether anyone may sign up
+LOGIN_IP_RATE_PER_MINUTE = float(os.getenv("LOGIN_IP_RATE_PER_MINUTE", "30"))
+LOGIN_IP_BURST = float(os.getenv("LOGIN_IP_BURST", "20"))
+LOGIN_ACCOUNT_RATE_PER_MINUTE = float(
+    os.getenv("LOGIN_ACCOUNT_RATE_PER_MINUTE", "10")
+)
+LOGIN_ACCOUNT_BURST = float(os.getenv("LOGIN_ACCOUNT_BURST", "5"))
+ALLOW_REGISTRATION = os.getenv("ALLOW_REGISTRATION", "true").lower() == "true"
 
 # CORS Configuration
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
@@ -31,10 +73,10 @@ SUPERWISE_AGENT_ID = os.getenv(
 # If the value is [REDACTED], use the default instead
 TEST_USER_EMAIL = os.getenv("TEST_USER_EMAIL", "admin@superwise.ai")
 if TEST_USER_EMAIL == "[REDACTED]":
-    print(f"[WARNING] TEST_USER_EMAIL was set to [REDACTED], using default: admin@superwise.ai")
+    logging.getLogger(__name__).warning(
+        "TEST_USER_EMAIL was set to [REDACTED], using default: admin@superwise.ai"
+    )
     TEST_USER_EMAIL = "admin@superwise.ai"
-
-print(f"[DEBUG config.py] TEST_USER_EMAIL final value: {repr(TEST_USER_EMAIL)}")
 TEST_USER_PASSWORD = os.getenv("TEST_USER_PASSWORD", "Admin123")
 TEST_USER_FULL_NAME = os.getenv("TEST_USER_FULL_NAME", "Admin")
 TEST_USER_ID = int(os.getenv("TEST_USER_ID", "1"))
@@ -43,4 +85,139 @@ TEST_USER_ID = int(os.getenv("TEST_USER_ID", "1"))
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 LOG_DIR = os.getenv("LOG_DIR", "logs")
 ENABLE_FILE_LOGGING = os.getenv("ENABLE_FILE_LOGGING", "true").lower() == "true"
-ENABLE_CONSOLE_LOGGING = os.getenv("ENABLE_CONSOLE_LOGGING", "true").lower() == "true"
\ No newline at end of file
+ENABLE_CONSOLE_LOGGING = os.getenv("ENABLE_CONSOLE_LOGGING", "true").lower() == "true"
+# "text" or "json" (one object per line); records are written by a background
+# thread through a queue of LOG_QUEUE_SIZE records (dropped, not blocked on, when full)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_QUEUE = os.getenv("LOG_QUEUE", "true").lower() == "true"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Fraction of records below WARNING kept per logger, e.g. "main.hot=0.1,crud=0.5";
+# main.hot carries the per-request messages of the list and health routes
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "main.hot=0.1")
+
+# Worker threads for sync route handlers and DB work (anyio default is 40)
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+
+# Server (run.py / gunicorn.conf.py): address, worker processes (by default one
+# per CPU this process may run on, which a container or taskset can hold below
+# the machine's core count), auto-reload for development (single process),
+# seconds an idle keep-alive connection stays open, pending connections the
+# socket queues, seconds in-flight requests get to finish on shutdown or
+# restart, and requests after which a worker is replaced (0 never; jittered so
+# workers do not restart together)
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "5000"))
+AVAILABLE_CPUS = (
+    len(os.sched_getaffinity(0))
+    if hasattr(os, "sched_getaffinity")
+    else os.cpu_count() or 1
+)
+SERVER_WORKERS_SET = "SERVER_WORKERS" in os.environ
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", str(AVAILABLE_CPUS)))
+SERVER_RELOAD = os.getenv("SERVER_RELOAD", "false").lower() == "true"
+SERVER_KEEPALIVE_SECONDS = int(os.getenv("SERVER_KEEPALIVE_SECONDS", "5"))
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "2048"))
+SERVER_GRACEFUL_TIMEOUT_SECONDS = int(
+    os.getenv("SERVER_GRACEFUL_TIMEOUT_SECONDS", "30")
+)
+SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", "0"))
+
+# Pagination for project list endpoints
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+
+# Seconds browsers may reuse a project or list response without asking again;
+# with 0 they revalidate every time and get 304 Not Modified if nothing changed
+HTTP_CACHE_MAX_AGE_SECONDS = int(os.getenv("HTTP_CACHE_MAX_AGE_SECONDS", "0"))
+
+# Compress responses of at least COMPRESSION_MIN_SIZE bytes: brotli when the
+# optional `brotli` package is installed and the client accepts it, else gzip
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# Bulk test case import/export: rows per insert transaction (and per export
+# page), and how many row errors an import response lists
+BULK_IMPORT_CHUNK_SIZE = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "500"))
+BULK_IMPORT_MAX_ERRORS = int(os.getenv("BULK_IMPORT_MAX_ERRORS", "1000"))
+
+# Test runner: cases executed concurrently per run, results written per batch,
+# and the time limit for a single step
+RUNNER_MAX_WORKERS = int(os.getenv("RUNNER_MAX_WORKERS", "8"))
+RUNNER_RESULT_BATCH_SIZE = int(os.getenv("RUNNER_RESULT_BATCH_SIZE", "50"))
+RUNNER_FLUSH_INTERVAL_SECONDS = float(
+    os.getenv("RUNNER_FLUSH_INTERVAL_SECONDS", "1.0")
+)
+RUNNER_STEP_TIMEOUT_SECONDS = float(os.getenv("RUNNER_STEP_TIMEOUT_SECONDS", "30"))
+# Runs in progress touch their row every RUNNER_HEARTBEAT_SECONDS; queued or
+# running runs silent for RUNNER_STALE_SECONDS lost their process and are failed
+RUNNER_HEARTBEAT_SECONDS = float(os.getenv("RUNNER_HEARTBEAT_SECONDS", "15"))
+RUNNER_STALE_SECONDS = float(os.getenv("RUNNER_STALE_SECONDS", "60"))
+# Simulated duration of each step for the offline "stub" executor
+RUNNER_STUB_STEP_DELAY_SECONDS = float(
+    os.getenv("RUNNER_STUB_STEP_DELAY_SECONDS", "0")
+)
+
+# Live run events: optional redis:// URL to share events between API
+# processes (in-process when unset), pending events kept per slow client, and
+# the keep-alive interval of event streams
+EVENTS_BROKER_URL = os.getenv("EVENTS_BROKER_URL", "")
+EVENTS_MAX_PENDING = int(os.getenv("EVENTS_MAX_PENDING", "1000"))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+
+# AI response cache: lifetime and size of the in-memory tier, and an optional
+# SQLite file that keeps answers across restarts (memory only when unset)
+AI_CACHE_TTL_SECONDS = float(os.getenv("AI_CACHE_TTL_SECONDS", "3600"))
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "256"))
+AI_CACHE_DB_PATH = os.getenv("AI_CACHE_DB_PATH", "")
+
+# AI assistant batches: prompts per request, prompts of one batch in flight at
+# once, and a per-project token bucket (sustained calls per second and burst)
+AI_BATCH_MAX_PROMPTS = int(os.getenv("AI_BATCH_MAX_PROMPTS", "100"))
+AI_BATCH_MAX_CONCURRENCY = int(os.getenv("AI_BATCH_MAX_CONCURRENCY", "50"))
+AI_PROJECT_RATE_PER_SECOND = float(os.getenv("AI_PROJECT_RATE_PER_SECOND", "1"))
+AI_PROJECT_RATE_BURST = float(os.getenv("AI_PROJECT_RATE_BURST", "100"))
+# Batches that would wait longer than this for the project's rate limit get 429
+AI_PROJECT_RATE_MAX_WAIT_SECONDS = float(
+    os.getenv("AI_PROJECT_RATE_MAX_WAIT_SECONDS", "30")
+)
+
+# Background jobs: whether the API process runs a worker (set false when
+# running worker.py separately), jobs run at once per worker, how often idle
+# workers poll, heartbeat and stale-job timing, retry defaults and the largest
+# request body accepted for a background import
+JOB_WORKER_IN_PROCESS = os.getenv("JOB_WORKER_IN_PROCESS", "true").lower() == "true"
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "4"))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1.0"))
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "10"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "60"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF_SECONDS = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "5"))
+JOB_MAX_PAYLOAD_BYTES = int(os.getenv("JOB_MAX_PAYLOAD_BYTES", str(20 * 1024 * 1024)))
+
+# SQLite profile (file databases only): WAL journal and connection pragmas,
+# writes queued on a process-wide lock, and the API routes' writes group-committed
+# by one writer thread in batches of up to SQLITE_WRITE_BATCH_SIZE
+SQLITE_TUNING = os.getenv("SQLITE_TUNING", "true").lower() == "true"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE_MB = int(os.getenv("SQLITE_MMAP_SIZE_MB", "256"))
+SQLITE_WRITE_QUEUE = os.getenv("SQLITE_WRITE_QUEUE", "true").lower() == "true"
+SQLITE_WRITE_BATCH_SIZE = int(os.getenv("SQLITE_WRITE_BATCH_SIZE", "64"))
+
+# Request metrics: Prometheus text at /metrics, and a Server-Timing header on
+# every response (DB time and query count, Superwise time) for browser devtools
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+
+# Superwise client tuning
+SUPERWISE_TIMEOUT_SECONDS = float(os.getenv("SUPERWISE_TIMEOUT_SECONDS", "120"))
+SUPERWISE_CONNECT_TIMEOUT_SECONDS = float(
+    os.getenv("SUPERWISE_CONNECT_TIMEOUT_SECONDS", "10")
+)
+SUPERWISE_MAX_CONNECTIONS = int(os.getenv("SUPERWISE_MAX_CONNECTIONS", "20"))
+SUPERWISE_MAX_CONCURRENCY = int(os.getenv("SUPERWISE_MAX_CONCURRENCY", "10"))
+SUPERWISE_MAX_RETRIES = int(os.getenv("SUPERWISE_MAX_RETRIES", "2"))
+SUPERWISE_RETRY_BACKOFF_SECONDS = float(
+    os.getenv("SUPERWISE_RETRY_BACKOFF_SECONDS", "0.5")
+)
@@ -1,18 +1,29 @@
-from typing import List, Optional
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
 from logging_config import get_logger
 from models import (
+    ChangeAction,
     Element,
     Environment,
+    Job,
+    JobStatus,
     Project,
+    ProjectChange,
     TestCase,
     TestData,
     TestPlan,
     TestPlanTestSuite,
+    TestResult,
+    TestResultStatus,
+    TestRun,
+    TestRunStatus,
     TestStep,
     TestSuite,
     TestSuiteTestCase,
+    User,
 )
+from pagination import PageRequest, paginate
 from schemas import (
     ElementCreate,
     EnvironmentCreate,
@@ -22,21 +33,73 @@ from schemas import (
     TestCaseUpdate,
     TestDataCreate,
     TestPlanCreate,
+    TestRunCreate,
+    TestStepPatch,
+    TestStepUpdate,
     TestSuiteCreate,
 )
-from sqlalchemy import and_
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 # Logger
 logger = get_logger(__name__)
 
 
+def _list_page(
+    query, model, page: Optional[PageRequest], filters: Optional[Dict[str, Any]]
+) -> Tuple[List[Any], Optional[str]]:
+    """Apply equality filters and keyset pagination to a project list query"""
+    for field, value in (filters or {}).items():
+        if value is not None:
+            query = query.filter(getattr(model, field) == value)
+    return paginate(query, model, page or PageRequest())
+
+
+# User CRUD operations
+# Emails are stored lower-cased so lookups can use the unique index
+def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    """Get a user by email"""
+    return db.scalars(select(User).where(User.email == email.strip().lower())).first()
+
+
+def create_user(
+    db: Session,
+    email: str,
+    full_name: str,
+    hashed_password: str,
+    user_id: Optional[int] = None,
+) -> User:
+    """Create a user; `user_id` pins the id, e.g. for the seeded admin"""
+    db_user = User(
+        id=user_id,
+        email=email.strip().lower(),
+        full_name=full_name,
+        hashed_password=hashed_password,
+        is_active=True,
+    )
+    db.add(db_user)
+    db.commit()
+    db.refresh(db_user)
+    logger.info("User created: id=%s, email=%s", db_user.id, db_user.email)
+    return db_user
+
+
+def update_user_password_hash(
+    db: Session, user_id: int, hashed_password: str
+) -> None:
+    """Replace a user's password hash, e.g. after a hash parameter upgrade"""
+    db.query(User).filter(User.id == user_id).update(
+        {User.hashed_password: hashed_password}, synchronize_session=False
+    )
+    db.commit()
+
+
 # Project CRUD operations
 def get_user_projects(db: Session, user_id: int) -> List[Project]:
     """Get all projects for a user"""
-    logger.debug(f"Fetching projects for user_id: {user_id}")
+    logger.debug("Fetching projects for user_id: %s", user_id)
     projects = db.query(Project).filter(Project.owner_id == user_id).all()
-    logger.debug(f"Found {len(projects)} projects for user_id: {user_id}")
+    logger.debug("Found %s projects for user_id: %s", len(projects), user_id)
     return projects
 
 
@@ -53,16 +116,19 @@ def create_user_project(
     db: Session, project_data: ProjectCreate, user_id: int
 ) -> Project:
     """Create a new project for a user"""
-    logger.debug(f"Creating project '{project_data.name}' for user_id: {user_id}")
+    logger.debug("Creating project '%s' for user_id: %s", project_data.name, user_id)
     try:
         db_project = Project(**project_data.dict(), owner_id=user_id)
         db.add(db_project)
         db.commit()
         db.refresh(db_project)
-        logger.info(f"Project created: id={db_project.id}, name={db_project.name}, user_id={user_id}")
+        logger.info(
+            "Project created: id=%s, name=%s, user_id=%s",
+            db_project.id, db_project.name, user_id
+        )
         return db_project
     except Exception as e:
-        logger.error(f"Error creating project: {str(e)}", exc_info=True)
+        logger.error("Error creating project: %s", e, exc_info=True)
         db.rollback()
         raise
 
@@ -78,6 +144,7 @@ def update_user_project(
     for field, value in project_data.dict(exclude_unset=True).items():
         setattr(project, field, value)
 
+    record_change(db, project_id, project, ChangeAction.UPDATED)
     db.commit()
     db.refresh(project)
     return project
@@ -89,15 +156,38 @@ def delete_user_project(db: Session, project_id: int, user_id: int) -> bool:
     if not project:
         return False
 
+    db.execute(delete(ProjectChange).where(ProjectChange.project_id == project_id))
     db.delete(project)
     db.commit()
     return True
 
 
 # Test Case CRUD operations
-def get_project_test_cases(db: Session, project_id: int) -> List[TestCase]:
-    """Get all test cases for a project"""
-    return db.query(TestCase).filter(TestCase.project_id == project_id).all()
+# Loader options for the nested response models. Collections are loaded with
+# selectinload (one extra query per level, no row multiplication); a single
+# test case uses joinedload so its steps come back in the same round trip.
+TEST_CASE_LIST_LOAD = selectinload(TestCase.steps)
+TEST_SUITE_LIST_LOAD = selectinload(TestSuite.test_cases).selectinload(TestCase.steps)
+TEST_PLAN_LIST_LOAD = (
+    selectinload(TestPlan.test_suites)
+    .selectinload(TestSuite.test_cases)
+    .selectinload(TestCase.steps)
+)
+
+
+def get_project_test_cases(
+    db: Session,
+    project_id: int,
+    page: Optional[PageRequest] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[TestCase], Optional[str]]:
+    """Get a page of test cases for a project, with their steps"""
+    query = (
+        db.query(TestCase)
+        .options(TEST_CASE_LIST_LOAD)
+        .filter(TestCase.project_id == project_id)
+    )
+    return _list_page(query, TestCase, page, filters)
 
 
 def get_test_case_by_id(
@@ -106,16 +196,26 @@ def get_test_case_by_id(
     """Get a test case by ID for a specific project"""
     return (
         db.query(TestCase)
+        .options(joinedload(TestCase.steps))
         .filter(and_(TestCase.id == test_case_id, TestCase.project_id == project_id))
         .first()
     )
 
 
+def get_project_test_case_names(db: Session, project_id: int) -> List[str]:
+    """Names of all test cases of a project"""
+    return db.scalars(
+        select(TestCase.name).where(TestCase.project_id == project_id)
+    ).all()
+
+
 def create_project_test_case(
     db: Session, test_case_data: TestCaseCreate, project_id: int, created_by: str
 ) -> TestCase:
     """Create a new test case for a project"""
-    logger.debug(f"Creating test case '{test_case_data.name}' for project_id: {project_id}")
+    logger.debug(
+        "Creating test case '%s' for project_id: %s", test_case_data.name, project_id
+    )
     try:
         # Create test case
         db_test_case = TestCase(
@@ -131,12 +231,64 @@ def create_project_test_case(
             db_step = TestStep(**step_data.dict(), test_case_id=db_test_case.id)
             db.add(db_step)
 
+        record_change(db, project_id, db_test_case, ChangeAction.CREATED)
         db.commit()
         db.refresh(db_test_case)
-        logger.info(f"Test case created: id={db_test_case.id}, name={db_test_case.name}, project_id={project_id}")
+        logger.info(
+            "Test case created: id=%s, name=%s, project_id=%s",
+            db_test_case.id, db_test_case.name, project_id
+        )
         return db_test_case
     except Exception as e:
-        logger.error(f"Error creating test case: {str(e)}", exc_info=True)
+        logger.error("Error creating test case: %s", e, exc_info=True)
+        db.rollback()
+        raise
+
+
+def bulk_create_test_cases(
+    db: Session, test_cases: List[TestCaseCreate], project_id: int, created_by: str
+) -> List[int]:
+    """Insert test cases and their steps in one transaction
+
+    Steps go in as one executemany. Test cases use a batched INSERT .. RETURNING
+    where the dialect can return ids in parameter order (PostgreSQL); SQLite
+    falls back to one statement per case, still inside the same transaction.
+    Returns the new test case ids in input order.
+    """
+    if not test_cases:
+        return []
+    try:
+        test_case_ids = db.scalars(
+            insert(TestCase).returning(TestCase.id, sort_by_parameter_order=True),
+            [
+                {
+                    **test_case_data.dict(exclude={"steps"}),
+                    "project_id": project_id,
+                    "created_by": created_by,
+                }
+                for test_case_data in test_cases
+            ],
+        ).all()
+
+        steps = [
+            {**step_data.dict(), "test_case_id": test_case_id}
+            for test_case_id, test_case_data in zip(test_case_ids, test_cases)
+            for step_data in test_case_data.steps
+        ]
+        if steps:
+            db.execute(insert(TestStep), steps)
+
+        record_changes(
+            db, project_id, "test_case", ChangeAction.CREATED, list(test_case_ids)
+        )
+        db.commit()
+        logger.info(
+            "Bulk created %s test cases with %s steps for project_id=%s",
+            len(test_case_ids), len(steps), project_id
+        )
+        return list(test_case_ids)
+    except Exception as e:
+        logger.error("Error bulk creating test cases: %s", e, exc_info=True)
         db.rollback()
         raise
 
@@ -150,41 +302,136 @@ def update_test_case_by_id(
         return None
 
     # Update test case fields
-    for field, value in test_case_data.dict(
-        exclude={"steps"}, exclude_unset=True
-    ).items():
+    fields = test_case_data.dict(exclude={"steps"}, exclude_unset=True)
+    for field, value in fields.items():
         setattr(test_case, field, value)
 
     # Update test steps
+    steps_changed = False
     if "steps" in test_case_data.dict(exclude_unset=True):
-        # Delete existing steps
-        db.query(TestStep).filter(TestStep.test_case_id == test_case_id).delete()
-
-        # Create new steps
-        for step_data in test_case_data.steps:
-            db_step = TestStep(**step_data.dict(), test_case_id=test_case_id)
-            db.add(db_step)
+        steps_changed = sync_test_steps(db, test_case, test_case_data.steps)
+        if steps_changed:
+            # Step edits alone do not issue an UPDATE on test_cases
+            test_case.updated_at = func.now()
 
+    if fields or steps_changed:
+        record_change(db, project_id, test_case, ChangeAction.UPDATED)
     db.commit()
     db.refresh(test_case)
     return test_case
 
 
+def sync_test_steps(
+    db: Session, test_case: TestCase, steps_data: List[TestStepUpdate]
+) -> bool:
+    """Bring a test case's steps in line with `steps_data`, touching only changes
+
+    Incoming steps are matched to existing ones by id, then by step_number.
+    Matched steps are updated in place (the ORM only writes changed columns),
+    unmatched incoming steps are inserted and leftover existing steps deleted.
+    Returns True if any step was added, changed or removed.
+    """
+    existing = {step.id: step for step in test_case.steps}
+    by_number = {}
+    for step in test_case.steps:
+        by_number.setdefault(step.step_number, step)
+
+    matched = {}
+    unmatched = []
+    for step_data in steps_data:
+        step = existing.get(step_data.id)
+        if step is None or step.id in matched:
+            unmatched.append(step_data)
+        else:
+            matched[step.id] = step_data
+    new_steps = []
+    for step_data in unmatched:
+        step = by_number.get(step_data.step_number)
+        if step is None or step.id in matched:
+            new_steps.append(step_data)
+        else:
+            matched[step.id] = step_data
+
+    changed = False
+    for step in list(test_case.steps):
+        step_data = matched.get(step.id)
+        if step_data is None:
+            db.delete(step)
+            changed = True
+            continue
+        for field, value in step_data.dict(exclude={"id"}).items():
+            if getattr(step, field) != value:
+                setattr(step, field, value)
+                changed = True
+
+    for step_data in new_steps:
+        db.add(TestStep(**step_data.dict(exclude={"id"}), test_case_id=test_case.id))
+        changed = True
+    return changed
+
+
+def update_test_step(
+    db: Session,
+    step_id: int,
+    test_case_id: int,
+    project_id: int,
+    step_data: TestStepPatch,
+) -> Optional[TestStep]:
+    """Update the given fields of a single step of a test case"""
+    step = (
+        db.query(TestStep)
+        .join(TestCase, TestStep.test_case_id == TestCase.id)
+        .filter(
+            and_(
+                TestStep.id == step_id,
+                TestStep.test_case_id == test_case_id,
+                TestCase.project_id == project_id,
+            )
+        )
+        .first()
+    )
+    if not step:
+        return None
+
+    changes = {
+        field: value
+        for field, value in step_data.dict(exclude_unset=True).items()
+        if getattr(step, field) != value
+    }
+    if changes:
+        for field, value in changes.items():
+            setattr(step, field, value)
+        db.query(TestCase).filter(TestCase.id == test_case_id).update(
+            {TestCase.updated_at: func.now()}, synchronize_session=False
+        )
+        record_change(db, project_id, step, ChangeAction.UPDATED)
+        db.commit()
+        db.refresh(step)
+    return step
+
+
 def delete_test_case_by_id(db: Session, test_case_id: int, project_id: int) -> bool:
     """Delete a test case"""
     test_case = get_test_case_by_id(db, test_case_id, project_id)
     if not test_case:
         return False
 
+    record_change(db, project_id, test_case, ChangeAction.DELETED)
     db.delete(test_case)
     db.commit()
     return True
 
 
 # Element CRUD operations
-def get_project_elements(db: Session, project_id: int) -> List[Element]:
-    """Get all elements for a project"""
-    return db.query(Element).filter(Element.project_id == project_id).all()
+def get_project_elements(
+    db: Session,
+    project_id: int,
+    page: Optional[PageRequest] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Element], Optional[str]]:
+    """Get a page of elements for a project"""
+    query = db.query(Element).filter(Element.project_id == project_id)
+    return _list_page(query, Element, page, filters)
 
 
 def create_project_element(
@@ -195,15 +442,26 @@ def create_project_element(
         **element_data.dict(), project_id=project_id, created_by=created_by
     )
     db.add(db_element)
+    record_change(db, project_id, db_element, ChangeAction.CREATED)
     db.commit()
     db.refresh(db_element)
     return db_element
 
 
 # Test Suite CRUD operations
-def get_project_test_suites(db: Session, project_id: int) -> List[TestSuite]:
-    """Get all test suites for a project"""
-    return db.query(TestSuite).filter(TestSuite.project_id == project_id).all()
+def get_project_test_suites(
+    db: Session,
+    project_id: int,
+    page: Optional[PageRequest] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[TestSuite], Optional[str]]:
+    """Get a page of test suites for a project, with their test cases and steps"""
+    query = (
+        db.query(TestSuite)
+        .options(TEST_SUITE_LIST_LOAD)
+        .filter(TestSuite.project_id == project_id)
+    )
+    return _list_page(query, TestSuite, page, filters)
 
 
 def create_project_test_suite(
@@ -225,15 +483,26 @@ def create_project_test_suite(
         )
         db.add(db_suite_case)
 
+    record_change(db, project_id, db_test_suite, ChangeAction.CREATED)
     db.commit()
     db.refresh(db_test_suite)
     return db_test_suite
 
 
 # Test Plan CRUD operations
-def get_project_test_plans(db: Session, project_id: int) -> List[TestPlan]:
-    """Get all test plans for a project"""
-    return db.query(TestPlan).filter(TestPlan.project_id == project_id).all()
+def get_project_test_plans(
+    db: Session,
+    project_id: int,
+    page: Optional[PageRequest] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[TestPlan], Optional[str]]:
+    """Get a page of test plans for a project, with their suites, cases and steps"""
+    query = (
+        db.query(TestPlan)
+        .options(TEST_PLAN_LIST_LOAD)
+        .filter(TestPlan.project_id == project_id)
+    )
+    return _list_page(query, TestPlan, page, filters)
 
 
 def create_project_test_plan(
@@ -255,15 +524,22 @@ def create_project_test_plan(
         )
         db.add(db_plan_suite)
 
+    record_change(db, project_id, db_test_plan, ChangeAction.CREATED)
     db.commit()
     db.refresh(db_test_plan)
     return db_test_plan
 
 
 # Test Data CRUD operations
-def get_project_test_data(db: Session, project_id: int) -> List[TestData]:
-    """Get all test data for a project"""
-    return db.query(TestData).filter(TestData.project_id == project_id).all()
+def get_project_test_data(
+    db: Session,
+    project_id: int,
+    page: Optional[PageRequest] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[TestData], Optional[str]]:
+    """Get a page of test data for a project"""
+    query = db.query(TestData).filter(TestData.project_id == project_id)
+    return _list_page(query, TestData, page, filters)
 
 
 def create_project_test_data(
@@ -274,15 +550,22 @@ def create_project_test_data(
         **test_data.dict(), project_id=project_id, created_by=created_by
     )
     db.add(db_test_data)
+    record_change(db, project_id, db_test_data, ChangeAction.CREATED)
     db.commit()
     db.refresh(db_test_data)
     return db_test_data
 
 
 # Environment CRUD operations
-def get_project_environments(db: Session, project_id: int) -> List[Environment]:
-    """Get all environments for a project"""
-    return db.query(Environment).filter(Environment.project_id == project_id).all()
+def get_project_environments(
+    db: Session,
+    project_id: int,
+    page: Optional[PageRequest] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Environment], Optional[str]]:
+    """Get a page of environments for a project"""
+    query = db.query(Environment).filter(Environment.project_id == project_id)
+    return _list_page(query, Environment, page, filters)
 
 
 def create_project_environment(
@@ -293,6 +576,571 @@ def create_project_environment(
         **environment_data.dict(), project_id=project_id, created_by=created_by
     )
     db.add(db_environment)
+    record_change(db, project_id, db_environment, ChangeAction.CREATED)
     db.commit()
     db.refresh(db_environment)
     return db_environment
+
+
+def get_environment_by_id(
+    db: Session, environment_id: int, project_id: int
+) -> Optional[Environment]:
+    """Get an environment by ID for a specific project"""
+    return (
+        db.query(Environment)
+        .filter(
+            and_(Environment.id == environment_id, Environment.project_id == project_id)
+        )
+        .first()
+    )
+
+
+# Change log
+# Every create, update and delete of a project's test assets bumps the project's
+# change_version and logs the change in the same transaction. The UPDATE takes
+# the project row's lock until commit, so concurrent writers to one project get
+# consecutive versions and commit in version order.
+CHANGE_ENTITIES = {
+    Project: "project",
+    TestCase: "test_case",
+    TestStep: "test_step",
+    Element: "element",
+    TestSuite: "test_suite",
+    TestPlan: "test_plan",
+    TestData: "test_data",
+    Environment: "environment",
+}
+
+
+def record_changes(
+    db: Session,
+    project_id: int,
+    entity: str,
+    action: ChangeAction,
+    entity_ids: List[int],
+) -> None:
+    """Log changes to `entity_ids` under the next versions of a project"""
+    if not entity_ids:
+        return
+    version = db.execute(
+        update(Project)
+        .where(Project.id == project_id)
+        # Keeps updated_at: it tracks edits of the project itself
+        .values(
+            change_version=Project.change_version + len(entity_ids),
+            updated_at=Project.updated_at,
+        )
+        .returning(Project.change_version)
+        .execution_options(synchronize_session=False)
+    ).scalar_one()
+    first = version - len(entity_ids) + 1
+    db.execute(
+        insert(ProjectChange),
+        [
+            {
+                "project_id": project_id,
+                "version": first + offset,
+                "entity": entity,
+                "entity_id": entity_id,
+                "action": action,
+            }
+            for offset, entity_id in enumerate(entity_ids)
+        ],
+    )
+
+
+def record_change(
+    db: Session, project_id: int, row: Any, action: ChangeAction
+) -> None:
+    """Log a change to one row; flushes first so new rows have their id"""
+    db.flush()
+    record_changes(db, project_id, CHANGE_ENTITIES[type(row)], action, [row.id])
+
+
+def get_project_changes(
+    db: Session, project_id: int, since: int, limit: int
+) -> Tuple[List[ProjectChange], bool]:
+    """Change log entries after version `since`, oldest first, and whether
+    more entries follow"""
+    rows = db.scalars(
+        select(ProjectChange)
+        .where(ProjectChange.project_id == project_id, ProjectChange.version > since)
+        .order_by(ProjectChange.version)
+        .limit(limit + 1)
+    ).all()
+    return rows[:limit], len(rows) > limit
+
+
+# Loader options for the current state of changed rows, by change log entity
+CHANGE_LOADS = {
+    "test_case": TEST_CASE_LIST_LOAD,
+    "test_suite": TEST_SUITE_LIST_LOAD,
+    "test_plan": TEST_PLAN_LIST_LOAD,
+}
+
+
+def get_changed_rows(
+    db: Session, project_id: int, entity: str, entity_ids: List[int]
+) -> Dict[int, Any]:
+    """Current rows of one entity by id; deleted rows are missing"""
+    model = next(model for model, name in CHANGE_ENTITIES.items() if name == entity)
+    query = db.query(model).filter(model.id.in_(entity_ids))
+    if model is Project:
+        query = query.filter(Project.id == project_id)
+    elif model is TestStep:
+        query = query.join(TestCase).filter(TestCase.project_id == project_id)
+    else:
+        query = query.filter(model.project_id == project_id)
+    if entity in CHANGE_LOADS:
+        query = query.options(CHANGE_LOADS[entity])
+    return {row.id: row for row in query}
+
+
+# Test Run CRUD operations
+# A finished run sets the project's health: any failed case is an error, cases
+# the executor could not run only a warning
+PROJECT_STATUS_BY_RUN_STATUS = {
+    TestRunStatus.PASSED: "healthy",
+    TestRunStatus.FAILED: "error",
+    TestRunStatus.ERROR: "warning",
+}
+# Runs that a process is still working on
+UNFINISHED_RUN_STATUSES = (TestRunStatus.QUEUED, TestRunStatus.RUNNING)
+
+
+def resolve_run_test_cases(
+    db: Session, run_data: TestRunCreate, project_id: int
+) -> Optional[List[TestCase]]:
+    """Test cases a run covers, with their steps, in execution order
+
+    Returns None if the suite, plan or any of the listed cases does not exist.
+    """
+    if run_data.test_suite_id is not None:
+        suite = (
+            db.query(TestSuite)
+            .options(TEST_SUITE_LIST_LOAD)
+            .filter(
+                and_(
+                    TestSuite.id == run_data.test_suite_id,
+                    TestSuite.project_id == project_id,
+                )
+            )
+            .first()
+        )
+        return list(suite.test_cases) if suite else None
+
+    if run_data.test_plan_id is not None:
+        plan = (
+            db.query(TestPlan)
+            .options(TEST_PLAN_LIST_LOAD)
+            .filter(
+                and_(
+                    TestPlan.id == run_data.test_plan_id,
+                    TestPlan.project_id == project_id,
+                )
+            )
+            .first()
+        )
+        if not plan:
+            return None
+        # A case shared by several suites of the plan runs once
+        cases = {}
+        for suite in plan.test_suites:
+            for test_case in suite.test_cases:
+                cases.setdefault(test_case.id, test_case)
+        return list(cases.values())
+
+    case_ids = list(dict.fromkeys(run_data.test_case_ids or []))
+    found = {
+        test_case.id: test_case
+        for test_case in db.query(TestCase)
+        .options(TEST_CASE_LIST_LOAD)
+        .filter(and_(TestCase.id.in_(case_ids), TestCase.project_id == project_id))
+    }
+    if len(found) != len(case_ids):
+        return None
+    return [found[case_id] for case_id in case_ids]
+
+
+def create_test_run(
+    db: Session,
+    run_data: TestRunCreate,
+    project_id: int,
+    created_by: str,
+    environment: Optional[str],
+    total: int,
+) -> TestRun:
+    """Create a queued test run"""
+    db_test_run = TestRun(
+        test_suite_id=run_data.test_suite_id,
+        test_plan_id=run_data.test_plan_id,
+        executor=run_data.executor,
+        environment=environment,
+        total=total,
+        passed=0,
+        failed=0,
+        errored=0,
+        project_id=project_id,
+        created_by=created_by,
+    )
+    db.add(db_test_run)
+    db.commit()
+    db.refresh(db_test_run)
+    logger.info(
+        "Test run created: id=%s, cases=%s, project_id=%s",
+        db_test_run.id, total, project_id
+    )
+    return db_test_run
+
+
+def get_project_test_runs(
+    db: Session,
+    project_id: int,
+    page: Optional[PageRequest] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[TestRun], Optional[str]]:
+    """Get a page of test runs for a project"""
+    query = db.query(TestRun).filter(TestRun.project_id == project_id)
+    return _list_page(query, TestRun, page, filters)
+
+
+def get_test_run_by_id(
+    db: Session, test_run_id: int, project_id: int
+) -> Optional[TestRun]:
+    """Get a test run with its results for a specific project"""
+    return (
+        db.query(TestRun)
+        .options(selectinload(TestRun.results))
+        .filter(and_(TestRun.id == test_run_id, TestRun.project_id == project_id))
+        .first()
+    )
+
+
+def mark_test_run_started(db: Session, test_run_id: int) -> None:
+    """Move a queued run to running"""
+    db.query(TestRun).filter(TestRun.id == test_run_id).update(
+        {
+            TestRun.status: TestRunStatus.RUNNING,
+            TestRun.started_at: datetime.now(timezone.utc),
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+def heartbeat_test_runs(db: Session, test_run_ids: List[int]) -> None:
+    """Mark runs in progress in this process alive"""
+    if not test_run_ids:
+        return
+    db.query(TestRun).filter(
+        TestRun.id.in_(test_run_ids), TestRun.status.in_(UNFINISHED_RUN_STATUSES)
+    ).update({TestRun.updated_at: func.now()}, synchronize_session=False)
+    db.commit()
+
+
+def fail_stale_test_runs(db: Session, stale_before: datetime) -> int:
+    """Fail queued or running runs whose process stopped sending heartbeats
+
+    Their counts are taken from the results they stored before it stopped.
+    """
+
+    def stored(status: TestResultStatus):
+        return (
+            select(func.count(TestResult.id))
+            .where(TestResult.test_run_id == TestRun.id, TestResult.status == status)
+            .scalar_subquery()
+        )
+
+    failed = (
+        db.query(TestRun)
+        .filter(
+            TestRun.status.in_(UNFINISHED_RUN_STATUSES),
+            TestRun.updated_at < stale_before,
+        )
+        .update(
+            {
+                TestRun.status: TestRunStatus.ERROR,
+                TestRun.finished_at: datetime.now(timezone.utc),
+                TestRun.passed: stored(TestResultStatus.PASSED),
+                TestRun.failed: stored(TestResultStatus.FAILED),
+                TestRun.errored: stored(TestResultStatus.ERROR),
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    if failed:
+        logger.warning("Failed %s test runs whose process stopped", failed)
+    return failed
+
+
+def add_test_results(db: Session, results: List[Dict[str, Any]]) -> None:
+    """Insert a batch of test results with a single executemany"""
+    if not results:
+        return
+    db.execute(insert(TestResult), results)
+    db.commit()
+    logger.debug("Stored %s test results", len(results))
+
+
+def finish_test_run(
+    db: Session,
+    test_run_id: int,
+    project_id: int,
+    status: TestRunStatus,
+    counts: Dict[str, int],
+) -> None:
+    """Record a run's outcome and update the project's status and last run"""
+    finished_at = datetime.now(timezone.utc)
+    db.query(TestRun).filter(TestRun.id == test_run_id).update(
+        {
+            TestRun.status: status,
+            TestRun.finished_at: finished_at,
+            TestRun.passed: counts["passed"],
+            TestRun.failed: counts["failed"],
+            TestRun.errored: counts["errored"],
+        },
+        synchronize_session=False,
+    )
+    project_values = {Project.last_run: finished_at}
+    if status in PROJECT_STATUS_BY_RUN_STATUS:
+        project_values[Project.status] = PROJECT_STATUS_BY_RUN_STATUS[status]
+    db.query(Project).filter(Project.id == project_id).update(
+        project_values, synchronize_session=False
+    )
+    db.commit()
+    logger.info("Test run %s finished: %s, %s", test_run_id, status.value, counts)
+
+
+# Job CRUD operations
+def create_job(
+    db: Session,
+    kind: str,
+    payload: Dict[str, Any],
+    project_id: int,
+    created_by: str,
+    max_attempts: int,
+) -> Job:
+    """Create a queued job"""
+    db_job = Job(
+        kind=kind,
+        status=JobStatus.QUEUED,
+        payload=payload,
+        progress=0,
+        attempts=0,
+        max_attempts=max_attempts,
+        cancel_requested=False,
+        run_after=datetime.now(timezone.utc),
+        project_id=project_id,
+        created_by=created_by,
+    )
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    logger.info(
+        "Job created: id=%s, kind=%s, project_id=%s", db_job.id, kind, project_id
+    )
+    return db_job
+
+
+def get_project_jobs(
+    db: Session,
+    project_id: int,
+    page: Optional[PageRequest] = None,
+    filters: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Job], Optional[str]]:
+    """Get a page of jobs for a project"""
+    query = db.query(Job).filter(Job.project_id == project_id)
+    return _list_page(query, Job, page, filters)
+
+
+def get_job_by_id(db: Session, job_id: int, project_id: int) -> Optional[Job]:
+    """Get a job for a specific project"""
+    return (
+        db.query(Job)
+        .filter(and_(Job.id == job_id, Job.project_id == project_id))
+        .first()
+    )
+
+
+def request_job_cancel(db: Session, job_id: int, project_id: int) -> Optional[Job]:
+    """Cancel a queued job now, or ask the worker running it to stop"""
+    job = get_job_by_id(db, job_id, project_id)
+    if not job:
+        return None
+    if job.status == JobStatus.QUEUED:
+        job.status = JobStatus.CANCELLED
+        job.finished_at = datetime.now(timezone.utc)
+    elif job.status == JobStatus.RUNNING:
+        job.cancel_requested = True
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def retry_job(db: Session, job_id: int, project_id: int) -> Optional[Job]:
+    """Queue a failed or cancelled job again with a fresh set of attempts"""
+    job = get_job_by_id(db, job_id, project_id)
+    if not job:
+        return None
+    job.status = JobStatus.QUEUED
+    job.attempts = 0
+    job.cancel_requested = False
+    job.error = None
+    job.result = None
+    job.progress = 0
+    job.progress_total = None
+    job.progress_message = None
+    job.run_after = datetime.now(timezone.utc)
+    job.started_at = None
+    job.finished_at = None
+    db.commit()
+    db.refresh(job)
+    logger.info("Job %s queued for retry", job_id)
+    return job
+
+
+def claim_next_job(db: Session, worker_id: str) -> Optional[Job]:
+    """Move the oldest due job to running for this worker
+
+    The conditional UPDATE makes the claim safe between workers without
+    row locks; a worker that loses the race tries the next candidate.
+    """
+    now = datetime.now(timezone.utc)
+    candidates = db.scalars(
+        select(Job.id)
+        .where(
+            Job.status == JobStatus.QUEUED,
+            or_(Job.run_after.is_(None), Job.run_after <= now),
+        )
+        .order_by(Job.id)
+        .limit(5)
+    ).all()
+    for job_id in candidates:
+        claimed = (
+            db.query(Job)
+            .filter(Job.id == job_id, Job.status == JobStatus.QUEUED)
+            .update(
+                {
+                    Job.status: JobStatus.RUNNING,
+                    Job.locked_by: worker_id,
+                    Job.heartbeat_at: now,
+                    Job.started_at: now,
+                    Job.attempts: Job.attempts + 1,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if claimed:
+            return db.get(Job, job_id)
+    return None
+
+
+def heartbeat_jobs(db: Session, job_ids: List[int]) -> List[int]:
+    """Mark running jobs alive; returns those whose cancellation was requested"""
+    if not job_ids:
+        return []
+    db.query(Job).filter(Job.id.in_(job_ids), Job.status == JobStatus.RUNNING).update(
+        {Job.heartbeat_at: datetime.now(timezone.utc)}, synchronize_session=False
+    )
+    db.commit()
+    return db.scalars(
+        select(Job.id).where(Job.id.in_(job_ids), Job.cancel_requested.is_(True))
+    ).all()
+
+
+def update_job_progress(
+    db: Session,
+    job_id: int,
+    progress: int,
+    total: Optional[int],
+    message: Optional[str],
+) -> None:
+    """Record how far a running job has got"""
+    db.query(Job).filter(Job.id == job_id).update(
+        {
+            Job.progress: progress,
+            Job.progress_total: total,
+            Job.progress_message: message,
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+def finish_job(
+    db: Session,
+    job_id: int,
+    status: JobStatus,
+    result: Any = None,
+    error: Optional[str] = None,
+    payload: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Record a job's final status; `payload` replaces the stored payload"""
+    values = {
+        Job.status: status,
+        Job.result: result,
+        Job.error: error,
+        Job.locked_by: None,
+        Job.finished_at: datetime.now(timezone.utc),
+    }
+    if payload is not None:
+        values[Job.payload] = payload
+    db.query(Job).filter(Job.id == job_id).update(values, synchronize_session=False)
+    db.commit()
+    logger.info("Job %s finished: %s", job_id, status.value)
+
+
+def requeue_job(
+    db: Session,
+    job_id: int,
+    run_after: datetime,
+    error: Optional[str] = None,
+    refund_attempt: bool = False,
+) -> None:
+    """Put a running job back in the queue, e.g. to retry it later"""
+    values = {
+        Job.status: JobStatus.QUEUED,
+        Job.locked_by: None,
+        Job.run_after: run_after,
+        Job.error: error,
+    }
+    if refund_attempt:
+        values[Job.attempts] = Job.attempts - 1
+    db.query(Job).filter(Job.id == job_id).update(values, synchronize_session=False)
+    db.commit()
+
+
+def requeue_stale_jobs(db: Session, stale_before: datetime) -> int:
+    """Recover running jobs whose worker stopped sending heartbeats"""
+    stale = and_(Job.status == JobStatus.RUNNING, Job.heartbeat_at < stale_before)
+    failed = (
+        db.query(Job)
+        .filter(stale, Job.attempts >= Job.max_attempts)
+        .update(
+            {
+                Job.status: JobStatus.FAILED,
+                Job.error: "Worker stopped responding",
+                Job.locked_by: None,
+                Job.finished_at: datetime.now(timezone.utc),
+            },
+            synchronize_session=False,
+        )
+    )
+    requeued = (
+        db.query(Job)
+        .filter(stale)
+        .update(
+            {
+                Job.status: JobStatus.QUEUED,
+                Job.locked_by: None,
+                Job.run_after: datetime.now(timezone.utc),
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    if failed or requeued:
+        logger.warning("Recovered stale jobs: %s requeued, %s failed", requeued, failed)
+    return requeued
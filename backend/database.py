@@ -1,11 +1,36 @@
+import asyncio
 import os
+import threading
 from pathlib import Path
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
 
+from config import (
+    DATABASE_READ_URL,
+    DB_DISABLE_POOL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_STATEMENT_TIMEOUT_MS,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_MMAP_SIZE_MB,
+    SQLITE_SYNCHRONOUS,
+    SQLITE_TUNING,
+    SQLITE_WRITE_BATCH_SIZE,
+    SQLITE_WRITE_QUEUE,
+)
 from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
 from logging_config import get_logger
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, Pool, QueuePool
+from sqlite_profile import SQLiteWriter, apply_sqlite_profile, sqlite_connect_args
 
 # Logger
 logger = get_logger(__name__)
@@ -19,15 +44,16 @@ if env_path.exists():
 # Database URL - using SQLite for development, easily changeable to PostgreSQL
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./testgenie.db")
 
-# If using SQLite and the path contains "backend", resolve it properly
-if "sqlite" in DATABASE_URL and "backend" in DATABASE_URL:
+
+def _resolve_sqlite_url(url: str) -> str:
+    """Resolve a SQLite path under backend/ to an absolute one"""
+    if "sqlite" not in url or "backend" not in url:
+        return url
     # Remove the sqlite:/// prefix to get just the path
-    db_path = DATABASE_URL.replace("sqlite:///", "")
-    # Get the root directory (parent of backend)
-    root_dir = Path(__file__).parent.parent
+    db_path = url.replace("sqlite:///", "")
     # Get the backend directory
     backend_dir = Path(__file__).parent
-    
+
     # If the path starts with "./backend", resolve from root, otherwise use backend_dir
     if db_path.startswith("./backend/"):
         # Resolve relative to root directory
@@ -36,34 +62,280 @@ if "sqlite" in DATABASE_URL and "backend" in DATABASE_URL:
     else:
         # Already relative to backend or absolute
         absolute_db_path = backend_dir / db_path.lstrip("./")
-    
-    DATABASE_URL = f"sqlite:///{absolute_db_path.as_posix()}"
-
-# Create SQLAlchemy engine
-logger.info(f"Creating database engine with URL: {DATABASE_URL.split('@')[-1] if '@' in DATABASE_URL else DATABASE_URL}")
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-)
-logger.debug("Database engine created successfully")
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    return f"sqlite:///{absolute_db_path.as_posix()}"
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    return ":memory:" in url or url.rstrip("/") == "sqlite:"
+
+
+def _uses_sqlite_profile(url: str) -> bool:
+    # The SQLite profile applies to file databases, not in-memory ones
+    return SQLITE_TUNING and url.startswith("sqlite") and not _is_sqlite_memory(url)
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """Pool keyword arguments for create_engine from the DB_POOL_* settings"""
+    if url.startswith("sqlite"):
+        if _is_sqlite_memory(url):
+            return {}
+        # One local file: no stale connections to detect or recycle
+        return {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+        }
+    if DB_DISABLE_POOL:
+        return {"poolclass": NullPool}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+def set_statement_timeout(engine: Engine, timeout_ms: int) -> None:
+    """Limit every PostgreSQL statement run in a transaction on the engine
+
+    SET LOCAL lasts until the end of the transaction, so the limit holds even
+    when PgBouncer hands the server connection to another client afterwards.
+    """
+
+    @event.listens_for(engine, "begin")
+    def _set_statement_timeout(conn):
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+        finally:
+            cursor.close()
+
+
+def build_engine(url: str) -> Engine:
+    """Create an engine with the pool settings and the profile for its database"""
+    use_sqlite_profile = _uses_sqlite_profile(url)
+    connect_args = {"check_same_thread": False} if "sqlite" in url else {}
+    if use_sqlite_profile:
+        connect_args = sqlite_connect_args(connect_args)
+
+    new_engine = create_engine(url, connect_args=connect_args, **engine_options(url))
+    if use_sqlite_profile:
+        apply_sqlite_profile(
+            new_engine,
+            busy_timeout_ms=SQLITE_BUSY_TIMEOUT_MS,
+            synchronous=SQLITE_SYNCHRONOUS,
+            cache_size_kb=SQLITE_CACHE_SIZE_KB,
+            mmap_size_mb=SQLITE_MMAP_SIZE_MB,
+        )
+    if new_engine.dialect.name == "postgresql" and DB_STATEMENT_TIMEOUT_MS > 0:
+        set_statement_timeout(new_engine, DB_STATEMENT_TIMEOUT_MS)
+    return new_engine
+
+
+DATABASE_URL = _resolve_sqlite_url(DATABASE_URL)
+
+
+def _pool_capacity(pool: Pool) -> Optional[int]:
+    """Maximum number of connections the pool hands out, None if unbounded"""
+    if isinstance(pool, QueuePool) and pool._max_overflow >= 0:
+        return pool.size() + pool._max_overflow
+    return None
+
+
+def _session_slots_for(pool: Pool) -> Optional[asyncio.Semaphore]:
+    capacity = _pool_capacity(pool)
+    return asyncio.Semaphore(capacity) if capacity else None
+
+
+class _LazySessionmaker(sessionmaker):
+    """sessionmaker that creates the engines on first use"""
+
+    def __call__(self, **local_kw):
+        if engine is None:
+            init_database()
+        return super().__call__(**local_kw)
+
+
+# Bound by init_database, which the app lifespan calls at startup; importing
+# this module does not create engines
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
+ReadSessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
+
+engine: Optional[Engine] = None
+# List endpoints read from the replica when one is configured
+read_engine: Optional[Engine] = None
+# Writes from async routes go through one writer thread (see run_write)
+sqlite_writer: Optional[SQLiteWriter] = None
+
+# Requests wait here (without holding a worker thread) for a pooled connection.
+# Without this cap, sync routes block worker threads on checkout while requests
+# that hold connections wait for a free thread to serialize their response.
+_session_slots: Optional[asyncio.Semaphore] = None
+_read_session_slots: Optional[asyncio.Semaphore] = None
+_init_lock = threading.Lock()
+_migrated_revision: Optional[str] = None
+
+
+def init_database() -> Engine:
+    """Create the engines, session slots and SQLite writer, once per process
+
+    Nothing connects to the database until the first session is used.
+    """
+    global engine, read_engine, sqlite_writer, _session_slots, _read_session_slots
+    with _init_lock:
+        if engine is not None:
+            return engine
+
+        logger.info(
+            "Creating database engine with URL: %s", DATABASE_URL.split("@")[-1]
+        )
+        primary = build_engine(DATABASE_URL)
+        _session_slots = _session_slots_for(primary.pool)
+        if DATABASE_READ_URL:
+            logger.info(
+                "Creating read replica engine with URL: %s",
+                DATABASE_READ_URL.split("@")[-1],
+            )
+            read_engine = build_engine(_resolve_sqlite_url(DATABASE_READ_URL))
+            _read_session_slots = _session_slots_for(read_engine.pool)
+        else:
+            read_engine, _read_session_slots = primary, _session_slots
+        if _uses_sqlite_profile(DATABASE_URL) and SQLITE_WRITE_QUEUE:
+            sqlite_writer = SQLiteWriter(primary, SQLITE_WRITE_BATCH_SIZE)
+
+        SessionLocal.configure(bind=primary)
+        ReadSessionLocal.configure(bind=read_engine)
+        # Set last: other threads skip the lock once the engine is there
+        engine = primary
+        logger.debug("Database engine created successfully")
+    return engine
+
+
+def reset_after_fork() -> None:
+    """Forget engines inherited from a parent process (gunicorn post_fork)
+
+    Pooled connections must not be shared across processes; the parent keeps
+    its connections and this process creates its own engines on first use.
+    """
+    global engine, read_engine, sqlite_writer, _session_slots, _read_session_slots
+    global _init_lock
+    for inherited in {engine, read_engine} - {None}:
+        inherited.dispose(close=False)
+    engine = read_engine = sqlite_writer = None
+    _session_slots = _read_session_slots = None
+    _init_lock = threading.Lock()
+
+
+def database_engines() -> List[Engine]:
+    """The engines in use, primary first, created if needed"""
+    init_database()
+    return [engine] if read_engine is engine else [engine, read_engine]
+
 
 # Create Base class
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency to get database session"""
-    db = SessionLocal()
+@asynccontextmanager
+async def _session_scope(session_factory, slots: Optional[asyncio.Semaphore]):
+    if slots is not None:
+        await slots.acquire()
+    db = session_factory()
     try:
         logger.debug("Database session created")
         yield db
     except Exception as e:
-        logger.error(f"Database session error: {str(e)}", exc_info=True)
+        logger.error("Database session error: %s", e, exc_info=True)
         db.rollback()
         raise
     finally:
         logger.debug("Closing database session")
         db.close()
+        if slots is not None:
+            slots.release()
+
+
+async def get_db():
+    """Dependency to get database session
+
+    Declared async so the session is closed on the event loop rather than in a
+    worker thread, and so the wait for a free connection slot does not tie up a
+    thread.
+    """
+    if engine is None:
+        init_database()
+    async with _session_scope(SessionLocal, _session_slots) as db:
+        yield db
+
+
+async def get_read_db():
+    """Dependency to get a session for list endpoints, on the read replica if set"""
+    if engine is None:
+        init_database()
+    async with _session_scope(ReadSessionLocal, _read_session_slots) as db:
+        yield db
+
+
+def run_migrations(revision: str = "head") -> None:
+    """Upgrade the database schema to an Alembic revision (latest by default)
+
+    Skipped when this process, or the parent it was forked from, already
+    upgraded to that revision.
+    """
+    global _migrated_revision
+    if _migrated_revision == revision:
+        return
+    from alembic import command
+    from alembic.config import Config
+
+    backend_dir = Path(__file__).parent
+    alembic_config = Config(str(backend_dir / "alembic.ini"))
+    alembic_config.set_main_option(
+        "script_location", str(backend_dir / "migrations")
+    )
+    logger.info("Applying database migrations up to %s", revision)
+    command.upgrade(alembic_config, revision)
+    _migrated_revision = revision
+
+
+async def run_write(fn, *args):
+    """Run a CRUD function that writes, on its own short-lived session
+
+    With the SQLite writer it joins the writer's next group commit; otherwise
+    it runs through call_with_session in the threadpool.
+    """
+    if engine is None:
+        init_database()
+    if sqlite_writer is not None:
+        return await sqlite_writer.run(fn, *args)
+    return await run_in_threadpool(call_with_session, fn, *args)
+
+
+def close_sqlite_writer() -> None:
+    """Finish queued writes and stop the SQLite writer thread"""
+    if sqlite_writer is not None:
+        sqlite_writer.stop()
+
+
+def call_with_session(fn, *args):
+    """Run a CRUD function on a short-lived session and close it
+
+    Used by async routes that must not hold a pooled connection while they
+    await other I/O; call it through run_in_threadpool.
+    """
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+def call_with_read_session(fn, *args):
+    """call_with_session for reads that may go to the read replica"""
+    db = ReadSessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
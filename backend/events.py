@@ -0,0 +1,227 @@
+"""
+Live event streaming for test runs and jobs
+The runner publishes run, case and step progress to channels ("project:<id>"
+and "run:<id>"), and job workers publish job progress to the project channel;
+the SSE endpoint subscribes to one channel per client.
+
+Each subscription keeps at most one pending event per key (a case's latest
+status replaces the previous one), so a slow client only ever holds the newest
+state rather than a backlog. If more than EVENTS_MAX_PENDING distinct keys pile
+up, the buffer is dropped and the client is told to resync over REST.
+
+The default broker is in-process. Set EVENTS_BROKER_URL to a redis:// URL to
+fan events out across API processes through Redis (or any server speaking its
+pub/sub protocol); that needs the optional `redis` package.
+"""
+import abc
+import asyncio
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+
+from config import EVENTS_BROKER_URL, EVENTS_MAX_PENDING
+from logging_config import get_logger
+
+# Logger
+logger = get_logger(__name__)
+
+RESYNC_EVENT = {"type": "resync"}
+
+
+def project_channel(project_id: int) -> str:
+    return f"project:{project_id}"
+
+
+def run_channel(test_run_id: int) -> str:
+    return f"run:{test_run_id}"
+
+
+def event_key(event: Dict[str, Any]) -> tuple:
+    """Events with the same key supersede each other while pending"""
+    return (
+        event.get("type"),
+        event.get("run_id"),
+        event.get("test_case_id"),
+        event.get("step_number"),
+        event.get("job_id"),
+    )
+
+
+class Subscription:
+    """Coalescing buffer of events for one subscriber"""
+
+    def __init__(self, channel: str, max_pending: int = EVENTS_MAX_PENDING):
+        self.channel = channel
+        self.max_pending = max_pending
+        self.pending: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self.coalesced = 0
+        self._ready = asyncio.Event()
+        self._closed = False
+
+    def push(self, event: Dict[str, Any]) -> None:
+        """Queue an event, replacing a pending one with the same key"""
+        key = event_key(event)
+        if key in self.pending:
+            self.coalesced += 1
+        elif len(self.pending) >= self.max_pending:
+            logger.warning(
+                "Subscriber on %s fell behind, asking it to resync", self.channel
+            )
+            self.pending.clear()
+            self.pending[event_key(RESYNC_EVENT)] = RESYNC_EVENT
+            self._ready.set()
+            return
+        self.pending[key] = event
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next pending event in arrival order, None on timeout or close"""
+        if not self.pending and not self._closed:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if not self.pending:
+            return None
+        _, event = self.pending.popitem(last=False)
+        return event
+
+    def close(self) -> None:
+        self._closed = True
+        self._ready.set()
+
+
+class Broker(abc.ABC):
+    """Publish/subscribe interface used by the runner and the SSE endpoint"""
+
+    @abc.abstractmethod
+    async def publish(self, channel: str, event: Dict[str, Any]) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def subscribe(self, channel: str) -> Subscription:
+        ...
+
+    @abc.abstractmethod
+    async def unsubscribe(self, subscription: Subscription) -> None:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemoryBroker(Broker):
+    """Broker for a single API process"""
+
+    def __init__(self):
+        self.channels: Dict[str, Set[Subscription]] = {}
+
+    def _deliver(self, channel: str, event: Dict[str, Any]) -> None:
+        for subscription in self.channels.get(channel, ()):
+            subscription.push(event)
+
+    async def publish(self, channel: str, event: Dict[str, Any]) -> None:
+        self._deliver(channel, event)
+
+    async def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(channel)
+        self.channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        subscribers = self.channels.get(subscription.channel)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.channels[subscription.channel]
+
+
+class RedisBroker(InMemoryBroker):
+    """Broker that relays events through Redis pub/sub
+
+    Local subscriptions are tracked as in InMemoryBroker; one Redis
+    subscription per process feeds them, so coalescing still happens per
+    client.
+    """
+
+    def __init__(self, url: str):
+        super().__init__()
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "EVENTS_BROKER_URL is set but the 'redis' package is not installed"
+            ) from e
+        self.redis = redis.from_url(url)
+        self.pubsub = self.redis.pubsub()
+        self._reader: Optional[asyncio.Task] = None
+
+    async def publish(self, channel: str, event: Dict[str, Any]) -> None:
+        await self.redis.publish(channel, json.dumps(event, default=str))
+
+    async def subscribe(self, channel: str) -> Subscription:
+        if channel not in self.channels:
+            await self.pubsub.subscribe(channel)
+        subscription = await super().subscribe(channel)
+        if self._reader is None:
+            self._reader = asyncio.create_task(self._read())
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription) -> None:
+        await super().unsubscribe(subscription)
+        if subscription.channel not in self.channels:
+            await self.pubsub.unsubscribe(subscription.channel)
+
+    async def _read(self) -> None:
+        while True:
+            try:
+                message = await self.pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except Exception as e:
+                logger.error("Error reading events from Redis: %s", e)
+                await asyncio.sleep(1.0)
+                continue
+            if message is None:
+                continue
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            self._deliver(channel, json.loads(message["data"]))
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+        await self.pubsub.aclose()
+        await self.redis.aclose()
+
+
+_broker: Optional[Broker] = None
+
+
+def get_broker() -> Broker:
+    """Return the process-wide broker, creating it on first use"""
+    global _broker
+    if _broker is None:
+        if EVENTS_BROKER_URL:
+            _broker = RedisBroker(EVENTS_BROKER_URL)
+        else:
+            _broker = InMemoryBroker()
+        logger.info("Event broker: %s", type(_broker).__name__)
+    return _broker
+
+
+async def close_broker() -> None:
+    """Close the process-wide broker; called on application shutdown"""
+    global _broker
+    if _broker is not None:
+        await _broker.close()
+        _broker = None
+
+
+def format_sse(event: Dict[str, Any], event_id: int) -> str:
+    """Encode an event as a server-sent events message"""
+    data = json.dumps(event, default=str)
+    return f"id: {event_id}\nevent: {event['type']}\ndata: {data}\n\n"
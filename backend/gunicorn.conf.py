@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration for TestGenie Backend
+Used by run.py; also works directly: `gunicorn -c gunicorn.conf.py main:app`.
+All values come from the SERVER_* settings in config.py.
+"""
+import os
+
+from config import (
+    HOST,
+    PORT,
+    SERVER_BACKLOG,
+    SERVER_GRACEFUL_TIMEOUT_SECONDS,
+    SERVER_KEEPALIVE_SECONDS,
+    SERVER_MAX_REQUESTS,
+    SERVER_WORKERS,
+)
+from server import on_starting, post_fork  # noqa: F401 - gunicorn hooks
+
+bind = f"{HOST}:{PORT}"
+workers = SERVER_WORKERS
+worker_class = "server.TestGenieWorker"
+
+# Import the app once before forking; workers share its memory copy-on-write
+preload_app = True
+
+keepalive = SERVER_KEEPALIVE_SECONDS
+backlog = SERVER_BACKLOG
+graceful_timeout = SERVER_GRACEFUL_TIMEOUT_SECONDS
+max_requests = SERVER_MAX_REQUESTS
+max_requests_jitter = SERVER_MAX_REQUESTS // 10
+
+# Worker heartbeat files in memory rather than on a possibly slow container disk
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+# Request lines are logged by the app's own logging; keep gunicorn's errors
+accesslog = None
+errorlog = "-"
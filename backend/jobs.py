@@ -0,0 +1,460 @@
+"""
+Background jobs
+Long-running work (AI generation, large imports) is stored as a row in the
+jobs table and executed by a JobWorker, so it outlives the HTTP request and
+proxy timeouts. The API process runs a worker by default; set
+JOB_WORKER_IN_PROCESS=false and start `python worker.py` to run jobs in a
+separate process. Any number of workers can share the database: jobs are
+claimed with a conditional UPDATE, and jobs of a worker that stops sending
+heartbeats are queued again.
+
+A failed attempt is retried with exponential backoff up to the job's
+max_attempts unless the handler raises PermanentJobError. Cancelling a running
+job takes effect at once in the worker's own process and on its next
+heartbeat elsewhere.
+"""
+import asyncio
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Type
+
+from ai_batch import run_ai_batch
+from ai_cache import cache_key, get_ai_cache
+from bulk_io import import_test_cases
+from config import (
+    JOB_HEARTBEAT_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOB_POLL_INTERVAL_SECONDS,
+    JOB_RETRY_BACKOFF_SECONDS,
+    JOB_STALE_SECONDS,
+    JOB_WORKER_CONCURRENCY,
+)
+from crud import (
+    bulk_create_test_cases,
+    claim_next_job,
+    create_job,
+    finish_job,
+    get_project_test_case_names,
+    heartbeat_jobs,
+    requeue_job,
+    requeue_stale_jobs,
+    update_job_progress,
+)
+from database import SessionLocal
+from events import Broker, get_broker, project_channel
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from logging_config import get_logger
+from models import Job, JobStatus, Project
+from prompts import PROJECT_PROMPTS
+from pydantic import BaseModel, ValidationError
+from schemas import AIAssistantRequest, AIGenerateJob, BulkImportJob, TestCaseCreate
+from sqlalchemy.orm import Session
+from superwise_client import get_superwise_client
+
+# Logger
+logger = get_logger(__name__)
+
+# Minimum seconds between progress writes of one job (the last one always goes)
+PROGRESS_INTERVAL_SECONDS = 0.5
+
+# Bytes per chunk when feeding a stored import to the streaming importer
+IMPORT_CHUNK_BYTES = 64 * 1024
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler for failures that retrying cannot fix"""
+
+
+@dataclass(frozen=True)
+class JobKind:
+    name: str
+    handler: Callable[["JobContext", Any], Awaitable[Any]]
+    payload_model: Type[BaseModel]
+    # Jobs that are not safe to run twice get a single attempt
+    retry: bool = True
+
+
+JOB_KINDS: Dict[str, JobKind] = {}
+
+
+def job_kind(name: str, payload_model: Type[BaseModel], retry: bool = True):
+    """Register a coroutine handler(context, payload) for a job kind"""
+
+    def register(handler):
+        JOB_KINDS[name] = JobKind(name, handler, payload_model, retry)
+        return handler
+
+    return register
+
+
+def enqueue_job(
+    db: Session,
+    kind: str,
+    payload: Dict[str, Any],
+    project_id: int,
+    created_by: str,
+    max_attempts: Optional[int] = None,
+) -> Job:
+    """Validate a job request and store it as queued
+
+    Raises KeyError for an unknown kind and ValidationError for a bad payload.
+    """
+    job_type = JOB_KINDS[kind]
+    job_type.payload_model(**payload)
+    attempts = (max_attempts or JOB_MAX_ATTEMPTS) if job_type.retry else 1
+    return create_job(db, kind, payload, project_id, created_by, attempts)
+
+
+@dataclass
+class JobContext:
+    """What a handler gets besides its payload"""
+
+    job_id: int
+    kind: str
+    project_id: int
+    created_by: str
+    attempt: int
+    worker: "JobWorker"
+    # Stored in place of the payload once the job finishes, e.g. to drop bulk data
+    final_payload: Optional[Dict[str, Any]] = None
+    _last_progress: float = 0.0
+
+    async def progress(
+        self, done: int, total: Optional[int] = None, message: Optional[str] = None
+    ) -> None:
+        """Report progress; frequent calls are thinned out"""
+        now = time.monotonic()
+        final = total is not None and done >= total
+        if not final and now - self._last_progress < PROGRESS_INTERVAL_SECONDS:
+            return
+        self._last_progress = now
+        await self.db(update_job_progress, self.job_id, done, total, message)
+        await self.worker.publish(
+            self,
+            JobStatus.RUNNING,
+            progress=done,
+            progress_total=total,
+            message=message,
+        )
+
+    async def db(self, fn: Callable, *args) -> Any:
+        return await self.worker.db(fn, *args)
+
+
+class JobWorker:
+    """Claims due jobs and runs up to `concurrency` of them at a time"""
+
+    def __init__(
+        self,
+        concurrency: int = JOB_WORKER_CONCURRENCY,
+        poll_interval: float = JOB_POLL_INTERVAL_SECONDS,
+        heartbeat_interval: float = JOB_HEARTBEAT_SECONDS,
+        stale_after: float = JOB_STALE_SECONDS,
+        retry_backoff: float = JOB_RETRY_BACKOFF_SECONDS,
+        session_factory: Callable[[], Session] = SessionLocal,
+        broker: Optional[Broker] = None,
+        worker_id: Optional[str] = None,
+    ):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.retry_backoff = retry_backoff
+        self.session_factory = session_factory
+        self.broker = broker
+        self.worker_id = worker_id or (
+            f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        )
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._cancelling: Set[int] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    async def run(self) -> None:
+        """Process jobs until stop() is called"""
+        self._wakeup = asyncio.Event()
+        heartbeat = asyncio.create_task(self._heartbeat(first_delay=0))
+        logger.info(
+            "Job worker %s started (%s slots)", self.worker_id, self.concurrency
+        )
+        try:
+            while not self._stopping:
+                self._wakeup.clear()
+                await self._claim_jobs()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            heartbeat.cancel()
+            # Jobs interrupted by shutdown go back to the queue, unless their
+            # kind is not safe to run twice
+            tasks = list(self._tasks.values())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info("Job worker %s stopped", self.worker_id)
+
+    def stop(self) -> None:
+        self._stopping = True
+        self.notify()
+
+    def notify(self) -> None:
+        """Wake the worker to look for new jobs now"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a job running on this worker"""
+        task = self._tasks.get(job_id)
+        if task is None:
+            return False
+        self._cancelling.add(job_id)
+        task.cancel()
+        return True
+
+    async def _claim_jobs(self) -> None:
+        while len(self._tasks) < self.concurrency and not self._stopping:
+            try:
+                job = await self.db(claim_next_job, self.worker_id)
+            except Exception as e:
+                logger.error("Error claiming jobs: %s", e)
+                return
+            if job is None:
+                return
+            task = asyncio.create_task(self._execute(job), name=f"job-{job.id}")
+            self._tasks[job.id] = task
+            task.add_done_callback(lambda _: self.notify())
+
+    async def _execute(self, job: Job) -> None:
+        context = JobContext(
+            job.id, job.kind, job.project_id, job.created_by, job.attempts, self
+        )
+        logger.info("Job %s (%s) started, attempt %s", job.id, job.kind, job.attempts)
+        job_type = JOB_KINDS.get(job.kind)
+        try:
+            await self.publish(context, JobStatus.RUNNING)
+            if job_type is None:
+                raise PermanentJobError(f"Unknown job kind: {job.kind}")
+            try:
+                payload = job_type.payload_model(**(job.payload or {}))
+            except ValidationError as e:
+                raise PermanentJobError(str(e)) from e
+            result = await job_type.handler(context, payload)
+        except asyncio.CancelledError:
+            await self._interrupted(context, job_type)
+        except PermanentJobError as e:
+            await self._finish(context, JobStatus.FAILED, error=str(e))
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            if job.attempts < job.max_attempts:
+                delay = self.retry_backoff * 2 ** (job.attempts - 1)
+                run_after = datetime.now(timezone.utc) + timedelta(seconds=delay)
+                await self.db(requeue_job, job.id, run_after, error)
+                await self.publish(context, JobStatus.QUEUED, error=error)
+                logger.warning(
+                    "Job %s failed, retrying in %.0fs: %s", job.id, delay, error
+                )
+            else:
+                logger.error("Job %s failed: %s", job.id, error, exc_info=True)
+                await self._finish(context, JobStatus.FAILED, error=error)
+        else:
+            await self._finish(
+                context, JobStatus.SUCCEEDED, result=jsonable_encoder(result)
+            )
+        finally:
+            self._tasks.pop(job.id, None)
+            self._cancelling.discard(job.id)
+
+    async def _interrupted(
+        self, context: JobContext, job_type: Optional[JobKind]
+    ) -> None:
+        """Settle a job whose task was cancelled by a user or by shutdown"""
+        if context.job_id in self._cancelling:
+            await self._finish(context, JobStatus.CANCELLED, error="Cancelled")
+        elif job_type is not None and not job_type.retry:
+            await self._finish(
+                context, JobStatus.FAILED, error="Interrupted by shutdown"
+            )
+            logger.warning(
+                "Job %s interrupted by shutdown, not retried", context.job_id
+            )
+        else:
+            await self.db(
+                requeue_job, context.job_id, datetime.now(timezone.utc), None, True
+            )
+            logger.info("Job %s interrupted by shutdown, requeued", context.job_id)
+
+    async def _finish(
+        self,
+        context: JobContext,
+        status: JobStatus,
+        result: Any = None,
+        error: Optional[str] = None,
+    ) -> None:
+        await self.db(
+            finish_job, context.job_id, status, result, error, context.final_payload
+        )
+        await self.publish(context, status, error=error)
+
+    async def _heartbeat(self, first_delay: Optional[float] = None) -> None:
+        delay = self.heartbeat_interval if first_delay is None else first_delay
+        while True:
+            await asyncio.sleep(delay)
+            delay = self.heartbeat_interval
+            try:
+                for job_id in await self.db(heartbeat_jobs, list(self._tasks)):
+                    if job_id not in self._cancelling:
+                        logger.info("Cancelling job %s on request", job_id)
+                        self.cancel(job_id)
+                await self._recover_stale()
+            except Exception as e:
+                logger.error("Job heartbeat failed: %s", e)
+
+    async def _recover_stale(self) -> None:
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=self.stale_after)
+        if await self.db(requeue_stale_jobs, stale_before):
+            self.notify()
+
+    async def publish(
+        self, context: JobContext, status: JobStatus, **fields: Any
+    ) -> None:
+        """Send a job event to the project's live event stream"""
+        broker = self.broker or get_broker()
+        await broker.publish(
+            project_channel(context.project_id),
+            {
+                "type": "job",
+                "job_id": context.job_id,
+                "kind": context.kind,
+                "status": status.value,
+                **fields,
+            },
+        )
+
+    async def db(self, fn: Callable, *args) -> Any:
+        return await run_in_threadpool(self._call, fn, *args)
+
+    def _call(self, fn: Callable, *args) -> Any:
+        db = self.session_factory()
+        try:
+            return fn(db, *args)
+        finally:
+            db.close()
+
+
+_worker: Optional[JobWorker] = None
+_worker_task: Optional[asyncio.Task] = None
+
+
+def start_job_worker() -> JobWorker:
+    """Run a job worker in this process"""
+    global _worker, _worker_task
+    if _worker is None:
+        _worker = JobWorker()
+        _worker_task = asyncio.create_task(_worker.run(), name="job-worker")
+    return _worker
+
+
+async def stop_job_worker() -> None:
+    """Stop the in-process worker, requeueing the jobs it was running"""
+    global _worker, _worker_task
+    if _worker is not None:
+        _worker.stop()
+        await asyncio.gather(_worker_task, return_exceptions=True)
+        _worker = _worker_task = None
+
+
+def notify_job_worker() -> None:
+    """Tell the in-process worker a job was queued"""
+    if _worker is not None:
+        _worker.notify()
+
+
+def cancel_local_job(job_id: int) -> bool:
+    """Cancel a job at once if the in-process worker is running it"""
+    return _worker is not None and _worker.cancel(job_id)
+
+
+# Job kinds
+def _load_project(db: Session, project_id: int) -> Optional[Project]:
+    return db.get(Project, project_id)
+
+
+async def _project(context: JobContext) -> Project:
+    project = await context.db(_load_project, context.project_id)
+    if project is None:
+        raise PermanentJobError("Project not found")
+    return project
+
+
+@job_kind("ai_generate", AIGenerateJob)
+async def generate_ai_answer(context: JobContext, request: AIGenerateJob) -> Any:
+    """Project test plans or test cases from Superwise, through the AI cache"""
+    project = await _project(context)
+    template = PROJECT_PROMPTS[request.prompt]
+    answer, _ = await get_ai_cache().get_or_create(
+        cache_key(project, template),
+        lambda: get_superwise_client().ask(template.render(project)),
+        refresh=request.refresh,
+    )
+    return answer
+
+
+@job_kind("ai_batch", AIAssistantRequest)
+async def run_ai_batch_job(context: JobContext, request: AIAssistantRequest) -> Any:
+    """A batch of AI assistant prompts, as for POST /ai-assistant"""
+    if not (request.prompts or request.modules):
+        raise PermanentJobError("Give prompts or modules")
+    project = await _project(context)
+    client = get_superwise_client()
+
+    async def save(test_cases: List[TestCaseCreate]) -> List[int]:
+        return await context.db(
+            bulk_create_test_cases, test_cases, context.project_id, context.created_by
+        )
+
+    async def progress(done: int, total: int) -> None:
+        await context.progress(done, total, "prompts answered")
+
+    existing_names = (
+        await context.db(get_project_test_case_names, context.project_id)
+        if request.persist
+        else ()
+    )
+    return await run_ai_batch(
+        project,
+        request,
+        lambda prompt: client.ask(prompt, request.chat_history),
+        save,
+        progress,
+        existing_names,
+    )
+
+
+@job_kind("bulk_import", BulkImportJob, retry=False)
+async def bulk_import_job(context: JobContext, request: BulkImportJob) -> Any:
+    """Test case import from NDJSON or CSV text, as for POST /test-cases:bulk"""
+    data = request.data.encode()
+    context.final_payload = {"format": request.format, "bytes": len(data)}
+    created = 0
+
+    async def chunks():
+        for start in range(0, len(data), IMPORT_CHUNK_BYTES):
+            yield data[start : start + IMPORT_CHUNK_BYTES]
+
+    async def insert_chunk(test_cases: List[TestCaseCreate]) -> List[int]:
+        nonlocal created
+        ids = await context.db(
+            bulk_create_test_cases, test_cases, context.project_id, context.created_by
+        )
+        created += len(ids)
+        await context.progress(created, None, "test cases imported")
+        return ids
+
+    return await import_test_cases(chunks(), request.format, insert_chunk)
@@ -1,20 +1,161 @@
 """
 Logging configuration for TestGenie Backend
-Provides centralized logging setup with datewise file rotation and console output
+Provides centralized logging setup with datewise file rotation and console output.
+Records are handed to a background listener thread through a queue, so file and
+console I/O stay off the request path, and chatty loggers can be sampled.
 """
+import atexit
+import itertools
+import json
 import logging
 import logging.handlers
 import os
+import queue
 import sys
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
+
+from config import (
+    ENABLE_CONSOLE_LOGGING,
+    ENABLE_FILE_LOGGING,
+    LOG_FORMAT,
+    LOG_LEVEL,
+    LOG_QUEUE,
+    LOG_QUEUE_SIZE,
+    LOG_SAMPLE_RATES,
+)
+
+
+class JsonFormatter(logging.Formatter):
+    """Format each record as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "function": record.funcName,
+            "line": record.lineno,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep one in every N records below WARNING; warnings and errors always pass"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._seen = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        if not self.every:
+            return False
+        return next(self._seen) % self.every == 0
+
+
+class LogQueueHandler(logging.handlers.QueueHandler):
+    """Queue records for the listener thread without ever blocking the caller
+
+    Once ``max_size`` records are waiting, new ones are dropped and counted in
+    ``dropped``. The queue is thread-safe, so the handler lock is skipped.
+    """
+
+    def __init__(
+        self, log_queue: "queue.SimpleQueue[logging.LogRecord]", max_size: int
+    ):
+        super().__init__(log_queue)  # type: ignore[arg-type]
+        self.max_size = max_size
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now (they may change once we return) and render
+        # any traceback; the layout is left to the formatters on the listener
+        # thread. A plain __dict__ copy is much cheaper than copy.copy.
+        prepared = object.__new__(logging.LogRecord)
+        prepared.__dict__.update(record.__dict__)
+        prepared.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            prepared.exc_text = logging.Formatter().formatException(record.exc_info)
+        prepared.msg = prepared.message
+        prepared.args = None
+        prepared.exc_info = None
+        return prepared
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.queue.qsize() >= self.max_size:
+            self.dropped += 1
+            return
+        self.queue.put_nowait(record)
+
+    def handle(self, record: logging.LogRecord) -> bool:  # type: ignore[override]
+        if not self.filter(record):
+            return False
+        self.emit(record)
+        return True
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """Parse ``"main.hot=0.1,crud=0.5"`` into logger name -> fraction kept"""
+    rates = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, rate = item.partition("=")
+        try:
+            rates[name.strip()] = float(rate)
+        except ValueError:
+            print(
+                f"Warning: Ignoring invalid LOG_SAMPLE_RATES entry: {item!r}",
+                file=sys.stderr,
+            )
+    return rates
+
+
+# The running listener and the filters installed by the last setup_logging call
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[LogQueueHandler] = None
+_sampling_filters: Dict[str, SamplingFilter] = {}
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    if _queue_handler is not None and _queue_handler.dropped:
+        print(
+            f"Warning: {_queue_handler.dropped} log records were dropped "
+            "because the log queue was full",
+            file=sys.stderr,
+        )
+    _queue_handler = None
+
+
+atexit.register(stop_logging)
 
 
 def setup_logging(
     log_level: Optional[str] = None,
     log_dir: Optional[str] = None,
-    enable_file_logging: bool = True,
-    enable_console_logging: bool = True,
+    enable_file_logging: Optional[bool] = None,
+    enable_console_logging: Optional[bool] = None,
+    json_format: Optional[bool] = None,
+    use_queue: Optional[bool] = None,
+    sample_rates: Optional[Dict[str, float]] = None,
 ) -> logging.Logger:
     """
     Setup logging configuration for the application
@@ -22,15 +163,34 @@ def setup_logging(
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL). Defaults to INFO
         log_dir: Directory for log files. Defaults to 'logs' (root directory)
-        enable_file_logging: Whether to enable file logging (default: True)
-        enable_console_logging: Whether to enable console logging (default: True)
+        enable_file_logging: Whether to enable file logging
+            (default: ENABLE_FILE_LOGGING or True)
+        enable_console_logging: Whether to enable console logging
+            (default: ENABLE_CONSOLE_LOGGING or True)
+        json_format: Write one JSON object per line (default: LOG_FORMAT == "json")
+        use_queue: Write through a background listener thread
+            (default: LOG_QUEUE or True)
+        sample_rates: Fraction of records below WARNING kept per logger name
+            (default: parsed from LOG_SAMPLE_RATES)
     
     Returns:
         Configured root logger
     """
-    # Get log level from environment or use default
+    global _listener, _queue_handler
+
+    # Get settings from config or use defaults
     if log_level is None:
-        log_level = os.getenv("LOG_LEVEL", "INFO").upper()
+        log_level = LOG_LEVEL
+    if enable_file_logging is None:
+        enable_file_logging = ENABLE_FILE_LOGGING
+    if enable_console_logging is None:
+        enable_console_logging = ENABLE_CONSOLE_LOGGING
+    if json_format is None:
+        json_format = LOG_FORMAT == "json"
+    if use_queue is None:
+        use_queue = LOG_QUEUE
+    if sample_rates is None:
+        sample_rates = parse_sample_rates(LOG_SAMPLE_RATES)
     
     level = getattr(logging, log_level, logging.INFO)
     
@@ -96,19 +256,23 @@ def setup_logging(
     root_logger = logging.getLogger()
     root_logger.setLevel(level)
     
-    # Clear any existing handlers
+    # Stop the previous listener (flushing its queue) and clear existing handlers
+    stop_logging()
     root_logger.handlers.clear()
+    handlers: List[logging.Handler] = []
     
     # Create formatters
-    detailed_formatter = logging.Formatter(
+    detailed_formatter: logging.Formatter = logging.Formatter(
         fmt='%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     
-    console_formatter = logging.Formatter(
+    console_formatter: logging.Formatter = logging.Formatter(
         fmt='%(asctime)s - %(levelname)s - %(name)s - %(message)s',
         datefmt='%H:%M:%S'
     )
+    if json_format:
+        detailed_formatter = console_formatter = JsonFormatter()
     
     # File handler for all logs (with datewise rotation)
     if enable_file_logging:
@@ -125,7 +289,7 @@ def setup_logging(
         app_file_handler.setLevel(logging.DEBUG)
         app_file_handler.setFormatter(detailed_formatter)
         app_file_handler.suffix = "%Y-%m-%d"  # Format: app.log.2024-10-30
-        root_logger.addHandler(app_file_handler)
+        handlers.append(app_file_handler)
         
         # Error log (only errors and above) - rotates daily at midnight
         error_log_file = log_dir / "error.log"
@@ -140,14 +304,37 @@ def setup_logging(
         error_file_handler.setLevel(logging.ERROR)
         error_file_handler.setFormatter(detailed_formatter)
         error_file_handler.suffix = "%Y-%m-%d"  # Format: error.log.2024-10-30
-        root_logger.addHandler(error_file_handler)
+        handlers.append(error_file_handler)
     
     # Console handler
     if enable_console_logging:
         console_handler = logging.StreamHandler()
         console_handler.setLevel(level)
         console_handler.setFormatter(console_formatter)
-        root_logger.addHandler(console_handler)
+        handlers.append(console_handler)
+    
+    # Hand records to a listener thread that owns the handlers, or attach the
+    # handlers directly
+    if use_queue and handlers:
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        _queue_handler = LogQueueHandler(log_queue, LOG_QUEUE_SIZE)
+        root_logger.addHandler(_queue_handler)
+        _listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        _listener.start()
+    else:
+        for handler in handlers:
+            root_logger.addHandler(handler)
+    
+    # Sample chatty loggers (e.g. "main.hot", used by the list and health routes)
+    for name, sampling_filter in _sampling_filters.items():
+        logging.getLogger(name).removeFilter(sampling_filter)
+    _sampling_filters.clear()
+    for name, rate in sample_rates.items():
+        if rate < 1:
+            _sampling_filters[name] = SamplingFilter(rate)
+            logging.getLogger(name).addFilter(_sampling_filters[name])
     
     # Reduce noise from third-party libraries
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
@@ -168,8 +355,3 @@ def get_logger(name: str) -> logging.Logger:
         Logger instance
     """
     return logging.getLogger(name)
-
-
-# Initialize logging on module import
-setup_logging()
-
@@ -1,115 +1,322 @@
 from datetime import datetime
-from typing import List
-import os
-
-from auth import create_access_token, verify_token
+from typing import Awaitable, Callable, List, Optional
+import json
+import math
+from contextlib import asynccontextmanager
+
+from ai_batch import batch_prompts, project_rate_limiter, run_ai_batch
+from ai_cache import cache_key, get_ai_cache
+from ai_parsing import TestCaseParser, parse_answer, stream_answer_text
+from anyio import to_thread
+from auth import (
+    check_password,
+    create_access_token,
+    get_password_hash,
+    get_password_hash_async,
+    password_needs_rehash,
+    verify_token,
+)
+from bulk_io import detect_import_format, export_test_cases, import_test_cases
+from compression import CompressionMiddleware
+from conditional import NotModifiedError, collection_state, etag_matches, make_etag
 from config import (
+    AI_BATCH_MAX_PROMPTS,
+    AI_PROJECT_RATE_MAX_WAIT_SECONDS,
+    ALLOW_REGISTRATION,
+    COMPRESSION_MIN_SIZE,
+    DEFAULT_PAGE_SIZE,
+    EVENTS_HEARTBEAT_SECONDS,
     FRONTEND_URL,
-    SUPERWISE_AGENT_ID,
+    HTTP_CACHE_MAX_AGE_SECONDS,
+    JOB_MAX_PAYLOAD_BYTES,
+    JOB_WORKER_IN_PROCESS,
+    MAX_PAGE_SIZE,
+    METRICS_ENABLED,
+    RESPONSE_COMPRESSION,
+    RUN_MIGRATIONS_ON_STARTUP,
+    SERVER_TIMING_ENABLED,
     SUPERWISE_API_URL,
+    LOGIN_ACCOUNT_BURST,
+    LOGIN_ACCOUNT_RATE_PER_MINUTE,
+    LOGIN_IP_BURST,
+    LOGIN_IP_RATE_PER_MINUTE,
     TEST_USER_EMAIL,
     TEST_USER_PASSWORD,
     TEST_USER_FULL_NAME,
     TEST_USER_ID,
+    THREADPOOL_SIZE,
 )
 from crud import *
-from database import Base, engine, get_db
-from dotenv import load_dotenv
-from fastapi import Depends, FastAPI, HTTPException, status
+from database import (
+    call_with_read_session,
+    call_with_session,
+    close_sqlite_writer,
+    database_engines,
+    get_read_db,
+    run_migrations,
+    run_write,
+)
+from events import close_broker, format_sse, get_broker, project_channel, run_channel
+from jobs import (
+    JOB_KINDS,
+    cancel_local_job,
+    enqueue_job,
+    notify_job_worker,
+    start_job_worker,
+    stop_job_worker,
+)
+from fastapi import (
+    APIRouter,
+    Depends,
+    FastAPI,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from logging_config import get_logger
+from logging_config import get_logger, setup_logging
+from metrics import (
+    PROMETHEUS_CONTENT_TYPE,
+    MetricsMiddleware,
+    instrument_engine,
+    render_metrics,
+)
 from models import *
+from pagination import InvalidCursorError, PageRequest
+from pydantic import ValidationError
+from prompts import TEST_CASES_PROMPT, TEST_PLANS_PROMPT, PromptTemplate
+from rate_limit import RateLimiter
+from runner import (
+    EXECUTORS,
+    cancel_active_runs,
+    create_executor,
+    prepare_test_run,
+    start_run_heartbeat,
+    start_test_run,
+    stop_run_heartbeat,
+)
 from schemas import *
+from serialization import FastJSONResponse, trusted_response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-
-# Load environment variables
-# load_dotenv()
+from superwise_client import (
+    SuperwiseError,
+    SuperwiseStream,
+    close_superwise_client,
+    get_superwise_client,
+)
 
 # Configure logging
 logger = get_logger(__name__)
+# Per-request messages of the health and list routes, sampled by LOG_SAMPLE_RATES
+hot_logger = get_logger(f"{__name__}.hot")
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Routes are registered here and mounted by create_app
+router = APIRouter()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the process's resources at startup and release them at shutdown"""
+    await startup_event()
+    try:
+        yield
+    finally:
+        await shutdown_event()
 
-# Initialize FastAPI app
-app = FastAPI(
-    title="TestGenie API", description="Test Management Platform API", version="1.0.0"
-)
 
-@app.on_event("startup")
 async def startup_event():
+    setup_logging()
+    # Sync routes and CRUD calls run in anyio's worker threads
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    # Creates the engines; nothing connects until the migrations below
+    engines = database_engines()
+    if METRICS_ENABLED:
+        for db_engine in engines:
+            instrument_engine(db_engine)
+    if RUN_MIGRATIONS_ON_STARTUP:
+        run_migrations()
+    await run_in_threadpool(call_with_session, _seed_admin_user)
+    if JOB_WORKER_IN_PROCESS:
+        start_job_worker()
+    start_run_heartbeat()
     logger.info("=" * 50)
     logger.info("TestGenie Backend Starting")
-    logger.info(f"Frontend URL: {FRONTEND_URL}")
-    logger.info(f"Superwise API URL: {SUPERWISE_API_URL}")
+    logger.info("Frontend URL: %s", FRONTEND_URL)
+    logger.info("Superwise API URL: %s", SUPERWISE_API_URL)
     logger.info("=" * 50)
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[FRONTEND_URL],  # Use FRONTEND_URL from config
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+
+async def shutdown_event():
+    await cancel_active_runs()
+    await stop_run_heartbeat()
+    await stop_job_worker()
+    await run_in_threadpool(close_sqlite_writer)
+    await close_broker()
+    await close_superwise_client()
+    logger.info("TestGenie Backend stopped")
+
 
 # Security
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+# Login attempt limits per client IP and per account
+login_ip_limiter = RateLimiter(LOGIN_IP_RATE_PER_MINUTE / 60, LOGIN_IP_BURST)
+login_account_limiter = RateLimiter(
+    LOGIN_ACCOUNT_RATE_PER_MINUTE / 60, LOGIN_ACCOUNT_BURST
+)
 
-# User credentials from environment variables
-HARDCODED_USER = {
-    "email": TEST_USER_EMAIL,
-    "password": TEST_USER_PASSWORD,
-    "full_name": TEST_USER_FULL_NAME,
-    "id": TEST_USER_ID,
-}
 
+def _authenticate(token: str) -> dict:
+    """Resolve a bearer token to the current user or raise 401"""
+    payload = verify_token(token)
+    # The token carries the user's id and name, so no database lookup is needed
+    if not payload or payload.get("sub") is None or payload.get("uid") is None:
+        logger.warning("Token verification failed or token has no user")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    logger.debug("Authenticated user: %s", payload["sub"])
+    return {
+        "id": payload["uid"],
+        "email": payload["sub"],
+        "full_name": payload.get("name", ""),
+    }
 
-def get_current_user(
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
 ):
-    """Get current authenticated user"""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    """Get current authenticated user
 
-    try:
-        payload = verify_token(credentials.credentials)
-        if payload is None:
-            logger.warning("Token verification failed: payload is None")
-            raise credentials_exception
+    Async because it does no I/O: verified claims come from the token cache,
+    so the check runs on the event loop instead of a worker thread.
+    """
+    return _authenticate(credentials.credentials)
 
-        email: str = payload.get("sub")
-        if email is None:
-            logger.warning("Token payload missing email/sub field")
-            raise credentials_exception
 
-    except Exception as e:
-        logger.error(f"Error validating token: {str(e)}", exc_info=True)
-        raise credentials_exception
+async def get_stream_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    access_token: Optional[str] = Query(None, description="For EventSource clients"),
+):
+    """Authenticate from the Authorization header or an access_token parameter
 
-    # For hardcoded user, return the hardcoded user data
-    if payload.get("sub") == HARDCODED_USER["email"]:
-        logger.debug(f"Authenticated user: {email}")
-        return HARDCODED_USER
+    Browsers' EventSource cannot send headers, so event streams also accept
+    the token as a query parameter.
+    """
+    token = credentials.credentials if credentials else access_token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return _authenticate(token)
 
-    logger.warning(f"User not found in system: {email}")
-    raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="User not found",
-        headers={"WWW-Authenticate": "Bearer"},
+
+def get_page_request(
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+    limit: Optional[int] = Query(
+        None, ge=1, le=MAX_PAGE_SIZE, description=f"Default {DEFAULT_PAGE_SIZE}"
+    ),
+    sort: str = Query("-updated_at", pattern="^-?updated_at$"),
+) -> PageRequest:
+    """Pagination parameters shared by the project list endpoints
+
+    Clients that send neither `cursor` nor `limit` predate pagination and get
+    the whole list.
+    """
+    if limit is None and cursor is not None:
+        limit = DEFAULT_PAGE_SIZE
+    return PageRequest(limit=limit, cursor=cursor, descending=sort.startswith("-"))
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    """Expose the cursor of the next page, if there is one, as a header"""
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)}
     )
 
 
+# Write routes go through run_write: with the SQLite writer every write joins
+# its group commit instead of contending with it for the database write lock
+def as_response(schema, fn):
+    """Wrap a CRUD write for run_write so it returns `schema` built from its row
+
+    The response is validated while the write's session is still open, since
+    run_write closes it before returning and relationships load lazily.
+    """
+
+    def write(db: Session, *args):
+        row = fn(db, *args)
+        return None if row is None else schema.model_validate(row)
+
+    return write
+
+
+# Conditional GET for a project and its lists: browsers send If-None-Match with
+# the ETag of their cached copy and get 304 without the rows being loaded
+PROJECT_CACHE_CONTROL = (
+    f"private, max-age={HTTP_CACHE_MAX_AGE_SECONDS}"
+    if HTTP_CACHE_MAX_AGE_SECONDS > 0
+    else "private, no-cache"
+)
+
+
+def project_etag(*models):
+    """Dependency that answers a still-current If-None-Match with 304
+
+    `models` are the tables the response is built from; the project row itself
+    is always part of the fingerprint. Unknown projects fall through to the
+    route's own 404. Routes using it must take their session from get_read_db
+    too, so FastAPI hands both the same session: a second session would wait
+    for a connection slot held by the request itself.
+    """
+
+    def check_etag(
+        project_id: int,
+        request: Request,
+        response: Response,
+        current_user: dict = Depends(get_current_user),
+        db: Session = Depends(get_read_db),
+    ) -> None:
+        state = collection_state(db, project_id, current_user["id"], models)
+        if state is None:
+            return
+        headers = {"Cache-Control": PROJECT_CACHE_CONTROL}
+        if state.settled:
+            headers["ETag"] = make_etag(state, request.url.query)
+            if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+                raise NotModifiedError(headers)
+        response.headers.update(headers)
+
+    return check_etag
+
+
+async def not_modified_handler(request: Request, exc: NotModifiedError):
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=exc.headers)
+
+
 # Health check endpoint
-@app.get("/api/health")
+@router.get("/api/health")
 async def health_check():
     """Health check endpoint"""
-    logger.debug("Health check endpoint accessed")
+    hot_logger.debug("Health check endpoint accessed")
     return {
         "status": "OK",
         "message": "TestGenie API is running",
@@ -117,177 +324,409 @@ async def health_check():
     }
 
 
+if METRICS_ENABLED:
+
+    @router.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Request latency, DB query and Superwise call metrics for Prometheus"""
+        return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 # Authentication endpoints
-@app.post("/api/auth/login")
-async def login(login_data: UserLogin):
-    """Login user with hardcoded credentials"""
-    logger.info(f"Login attempt for email: {login_data.email}")
-    
-    if (
-        login_data.email == HARDCODED_USER["email"]
-        and login_data.password == HARDCODED_USER["password"]
-    ):
-        logger.info(f"Login successful for user: {login_data.email}")
-        access_token = create_access_token(data={"sub": HARDCODED_USER["email"]})
-        return {
-            "access_token": access_token,
-            "token_type": "bearer",
-            "user": {
-                "id": HARDCODED_USER["id"],
-                "email": HARDCODED_USER["email"],
-                "full_name": HARDCODED_USER["full_name"],
-                "created_at": datetime.now().isoformat(),
-            },
-        }
-    else:
-        logger.warning(f"Failed login attempt for email: {login_data.email}")
+def _seed_admin_user(db: Session) -> None:
+    """Create the TEST_USER_* account if it does not exist yet
+
+    It gets TEST_USER_ID, the owner of projects created while logins were
+    checked against these settings alone.
+    """
+    try:
+        if get_user_by_email(db, TEST_USER_EMAIL):
+            return
+        user_id = TEST_USER_ID if db.get(User, TEST_USER_ID) is None else None
+        create_user(
+            db,
+            TEST_USER_EMAIL,
+            TEST_USER_FULL_NAME,
+            get_password_hash(TEST_USER_PASSWORD),
+            user_id,
+        )
+    except IntegrityError:
+        # Another server worker created it first
+        db.rollback()
+    except Exception as e:
+        logger.error("Could not create the admin user: %s", e)
+        db.rollback()
+
+
+def _check_login_rate(request: Request, email: Optional[str] = None) -> None:
+    """Take a login attempt from the client's and the account's buckets"""
+    client_ip = request.client.host if request.client else "unknown"
+    checks = [(login_ip_limiter, client_ip)]
+    if email:
+        checks.append((login_account_limiter, email))
+    for limiter, key in checks:
+        bucket = limiter.bucket(key)
+        if not bucket.try_acquire():
+            logger.warning("Login rate limit reached for %s", key)
+            raise _rate_limited(
+                bucket.wait_time(), "Too many login attempts, try again later"
+            )
+
+
+def _login_response(user: User) -> dict:
+    access_token = create_access_token(
+        data={"sub": user.email, "uid": user.id, "name": user.full_name}
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "user": {
+            "id": user.id,
+            "email": user.email,
+            "full_name": user.full_name,
+            "created_at": (user.created_at or datetime.now()).isoformat(),
+        },
+    }
+
+
+@router.post("/api/auth/login")
+async def login(login_data: UserLogin, request: Request):
+    """Log in with the email and password of a user account"""
+    email = login_data.email.strip().lower()
+    logger.info("Login attempt for email: %s", email)
+    _check_login_rate(request, email)
+
+    user = await run_in_threadpool(call_with_session, get_user_by_email, email)
+    valid = await check_password(
+        login_data.password, user.hashed_password if user else None
+    )
+    if not valid or not user.is_active:
+        logger.warning("Failed login attempt for email: %s", email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password"
         )
 
+    if password_needs_rehash(user.hashed_password):
+        hashed_password = await get_password_hash_async(login_data.password)
+        await run_write(update_user_password_hash, user.id, hashed_password)
+        logger.info("Upgraded password hash for user: %s", user.id)
+
+    logger.info("Login successful for user: %s", email)
+    return _login_response(user)
+
+
+@router.post("/api/auth/register", status_code=status.HTTP_201_CREATED)
+async def register(user_data: UserCreate, request: Request):
+    """Create a user account and log it in"""
+    if not ALLOW_REGISTRATION:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Registration is disabled"
+        )
+    _check_login_rate(request)
+    hashed_password = await get_password_hash_async(user_data.password)
+    try:
+        user = await run_write(
+            create_user,
+            user_data.email,
+            user_data.full_name,
+            hashed_password,
+        )
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Email is already registered"
+        )
+    return _login_response(user)
+
 
 # Project endpoints
-@app.get("/api/projects", response_model=List[ProjectResponse])
-async def get_projects(
-    current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)
+# Routes that only use the sync DB session are plain `def` so FastAPI runs them
+# in its threadpool; async routes wrap CRUD calls in run_in_threadpool.
+@router.get("/api/projects", response_model=List[ProjectResponse])
+def get_projects(
+    current_user: dict = Depends(get_current_user), db: Session = Depends(get_read_db)
 ):
     """Get all projects for the current user"""
-    logger.info(f"Fetching projects for user: {current_user['id']}")
+    hot_logger.info("Fetching projects for user: %s", current_user["id"])
     projects = get_user_projects(db, current_user["id"])
-    logger.debug(f"Found {len(projects)} projects for user: {current_user['id']}")
+    hot_logger.debug(
+        "Found %s projects for user: %s", len(projects), current_user["id"]
+    )
     return projects
 
 
-@app.post("/api/projects", response_model=ProjectResponse)
+@router.post("/api/projects", response_model=ProjectResponse)
 async def create_project(
     project_data: ProjectCreate,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
 ):
     """Create a new project"""
-    logger.info(f"Creating project '{project_data.name}' for user: {current_user['id']}")
+    logger.info(
+        "Creating project '%s' for user: %s", project_data.name, current_user["id"]
+    )
     try:
-        project = create_user_project(db, project_data, current_user["id"])
-        logger.info(f"Project created successfully: {project.id} - {project.name}")
+        project = await run_write(
+            as_response(ProjectResponse, create_user_project),
+            project_data,
+            current_user["id"],
+        )
+        logger.info("Project created successfully: %s - %s", project.id, project.name)
         return project
     except Exception as e:
-        logger.error(f"Error creating project: {str(e)}", exc_info=True)
+        logger.error("Error creating project: %s", e, exc_info=True)
         raise
 
 
-@app.get("/api/projects/{project_id}", response_model=ProjectResponse)
-async def get_project(
+@router.get(
+    "/api/projects/{project_id}",
+    response_model=ProjectResponse,
+    dependencies=[Depends(project_etag())],
+)
+def get_project(
     project_id: int,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Get a specific project"""
-    logger.debug(f"Fetching project {project_id} for user: {current_user['id']}")
+    logger.debug("Fetching project %s for user: %s", project_id, current_user["id"])
     project = get_project_by_id(db, project_id, current_user["id"])
     if not project:
-        logger.warning(f"Project {project_id} not found for user: {current_user['id']}")
+        logger.warning(
+            "Project %s not found for user: %s", project_id, current_user["id"]
+        )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
     return project
 
 
-@app.put("/api/projects/{project_id}", response_model=ProjectResponse)
+@router.put("/api/projects/{project_id}", response_model=ProjectResponse)
 async def update_project(
     project_id: int,
     project_data: ProjectUpdate,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
 ):
     """Update a project"""
-    logger.info(f"Updating project {project_id} for user: {current_user['id']}")
-    project = update_user_project(db, project_id, project_data, current_user["id"])
+    logger.info("Updating project %s for user: %s", project_id, current_user["id"])
+    project = await run_write(
+        as_response(ProjectResponse, update_user_project),
+        project_id,
+        project_data,
+        current_user["id"],
+    )
     if not project:
-        logger.warning(f"Project {project_id} not found for update by user: {current_user['id']}")
+        logger.warning(
+            "Project %s not found for update by user: %s",
+            project_id,
+            current_user["id"],
+        )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
-    logger.info(f"Project {project_id} updated successfully")
+    await run_in_threadpool(get_ai_cache().invalidate_project, project_id)
+    logger.info("Project %s updated successfully", project_id)
     return project
 
 
-@app.delete("/api/projects/{project_id}")
+@router.delete("/api/projects/{project_id}")
 async def delete_project(
     project_id: int,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
 ):
     """Delete a project"""
-    logger.info(f"Deleting project {project_id} for user: {current_user['id']}")
-    success = delete_user_project(db, project_id, current_user["id"])
+    logger.info("Deleting project %s for user: %s", project_id, current_user["id"])
+    success = await run_write(delete_user_project, project_id, current_user["id"])
     if not success:
-        logger.warning(f"Project {project_id} not found for deletion by user: {current_user['id']}")
+        logger.warning(
+            "Project %s not found for deletion by user: %s",
+            project_id,
+            current_user["id"],
+        )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
-    logger.info(f"Project {project_id} deleted successfully")
+    await run_in_threadpool(get_ai_cache().invalidate_project, project_id)
+    logger.info("Project %s deleted successfully", project_id)
     return {"message": "Project deleted successfully"}
 
 
+# Change log endpoint
+# Clients that keep a copy of a project poll for what changed since the version
+# they last saw instead of downloading every collection again
+CHANGE_RESPONSES = {
+    "project": ProjectResponse,
+    "test_case": TestCaseResponse,
+    "test_step": TestStepResponse,
+    "element": ElementResponse,
+    "test_suite": TestSuiteResponse,
+    "test_plan": TestPlanResponse,
+    "test_data": TestDataResponse,
+    "environment": EnvironmentResponse,
+}
+
+
+@router.get(
+    "/api/projects/{project_id}/changes",
+    response_model=ProjectChangesResponse,
+    dependencies=[Depends(project_etag())],
+)
+def get_changes(
+    project_id: int,
+    since: int = Query(0, ge=0, description="Version from the previous response"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+):
+    """Changes to a project's test assets after version `since`
+
+    A row changed several times in the requested range appears once, at its
+    latest change, with its current state.
+    """
+    project = get_project_by_id(db, project_id, current_user["id"])
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+        )
+
+    entries, has_more = get_project_changes(db, project_id, since, limit)
+    latest = {}
+    for entry in entries:
+        key = (entry.entity, entry.entity_id)
+        latest.pop(key, None)
+        latest[key] = entry
+
+    ids_by_entity = {}
+    for entity, entity_id in latest:
+        ids_by_entity.setdefault(entity, []).append(entity_id)
+    rows = {
+        (entity, row_id): row
+        for entity, entity_ids in ids_by_entity.items()
+        for row_id, row in get_changed_rows(db, project_id, entity, entity_ids).items()
+    }
+
+    changes = []
+    for key, entry in latest.items():
+        row = rows.get(key)
+        data = None
+        if row is not None:
+            data = CHANGE_RESPONSES[entry.entity].model_validate(row).model_dump(
+                mode="json"
+            )
+        changes.append(
+            ProjectChangeResponse(
+                version=entry.version,
+                entity=entry.entity,
+                entity_id=entry.entity_id,
+                action=entry.action,
+                changed_at=entry.changed_at,
+                data=data,
+            )
+        )
+    hot_logger.debug(
+        "Returning %s changes after version %s for project %s",
+        len(changes), since, project_id,
+    )
+    return ProjectChangesResponse(
+        version=entries[-1].version if entries else project.change_version,
+        has_more=has_more,
+        changes=changes,
+    )
+
+
 # Test Case endpoints
-@app.get("/api/projects/{project_id}/test-cases", response_model=List[TestCaseResponse])
-async def get_test_cases(
+@router.get(
+    "/api/projects/{project_id}/test-cases",
+    response_model=List[TestCaseResponse],
+    dependencies=[Depends(project_etag(TestCase))],
+)
+def get_test_cases(
     project_id: int,
+    response: Response,
+    status_filter: Optional[TestCaseStatus] = Query(None, alias="status"),
+    priority: Optional[TestCasePriority] = None,
+    assignee: Optional[str] = None,
+    environment: Optional[str] = None,
+    page: PageRequest = Depends(get_page_request),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Get all test cases for a project"""
-    logger.debug(f"Fetching test cases for project {project_id}")
+    hot_logger.debug("Fetching test cases for project %s", project_id)
     # Verify project ownership
     project = get_project_by_id(db, project_id, current_user["id"])
     if not project:
-        logger.warning(f"Project {project_id} not found for user: {current_user['id']}")
+        logger.warning(
+            "Project %s not found for user: %s", project_id, current_user["id"]
+        )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    test_cases = get_project_test_cases(db, project_id)
-    logger.debug(f"Found {len(test_cases)} test cases for project {project_id}")
-    return test_cases
+    test_cases, next_cursor = get_project_test_cases(
+        db,
+        project_id,
+        page,
+        {
+            "status": status_filter,
+            "priority": priority,
+            "assignee": assignee,
+            "environment": environment,
+        },
+    )
+    set_next_cursor(response, next_cursor)
+    hot_logger.debug(
+        "Found %s test cases for project %s", len(test_cases), project_id
+    )
+    return trusted_response(TestCaseResponse, test_cases, response)
 
 
-@app.post("/api/projects/{project_id}/test-cases", response_model=TestCaseResponse)
+@router.post("/api/projects/{project_id}/test-cases", response_model=TestCaseResponse)
 async def create_test_case(
     project_id: int,
     test_case_data: TestCaseCreate,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
 ):
     """Create a new test case"""
-    logger.info(f"Creating test case '{test_case_data.name}' for project {project_id}")
+    logger.info(
+        "Creating test case '%s' for project %s", test_case_data.name, project_id
+    )
     # Verify project ownership
-    project = get_project_by_id(db, project_id, current_user["id"])
+    project = await run_in_threadpool(
+        call_with_session, get_project_by_id, project_id, current_user["id"]
+    )
     if not project:
-        logger.warning(f"Project {project_id} not found for user: {current_user['id']}")
+        logger.warning(
+            "Project %s not found for user: %s", project_id, current_user["id"]
+        )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
     try:
-        test_case = create_project_test_case(
-            db, test_case_data, project_id, current_user["full_name"]
+        test_case = await run_write(
+            as_response(TestCaseResponse, create_project_test_case),
+            test_case_data,
+            project_id,
+            current_user["full_name"],
+        )
+        logger.info(
+            "Test case created successfully: %s - %s", test_case.id, test_case.name
         )
-        logger.info(f"Test case created successfully: {test_case.id} - {test_case.name}")
         return test_case
     except Exception as e:
-        logger.error(f"Error creating test case: {str(e)}", exc_info=True)
+        logger.error("Error creating test case: %s", e, exc_info=True)
         raise
 
 
-@app.get(
+@router.get(
     "/api/projects/{project_id}/test-cases/{test_case_id}",
     response_model=TestCaseResponse,
+    dependencies=[Depends(project_etag(TestCase))],
 )
-async def get_test_case(
+def get_test_case(
     project_id: int,
     test_case_id: int,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Get a specific test case"""
     # Verify project ownership
@@ -305,7 +744,7 @@ async def get_test_case(
     return test_case
 
 
-@app.put(
+@router.put(
     "/api/projects/{project_id}/test-cases/{test_case_id}",
     response_model=TestCaseResponse,
 )
@@ -314,17 +753,23 @@ async def update_test_case(
     test_case_id: int,
     test_case_data: TestCaseUpdate,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
 ):
     """Update a test case"""
     # Verify project ownership
-    project = get_project_by_id(db, project_id, current_user["id"])
+    project = await run_in_threadpool(
+        call_with_session, get_project_by_id, project_id, current_user["id"]
+    )
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    test_case = update_test_case_by_id(db, test_case_id, test_case_data, project_id)
+    test_case = await run_write(
+        as_response(TestCaseResponse, update_test_case_by_id),
+        test_case_id,
+        test_case_data,
+        project_id,
+    )
     if not test_case:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Test case not found"
@@ -332,22 +777,58 @@ async def update_test_case(
     return test_case
 
 
-@app.delete("/api/projects/{project_id}/test-cases/{test_case_id}")
+@router.patch(
+    "/api/projects/{project_id}/test-cases/{test_case_id}/steps/{step_id}",
+    response_model=TestStepResponse,
+)
+async def patch_test_step(
+    project_id: int,
+    test_case_id: int,
+    step_id: int,
+    step_data: TestStepPatch,
+    current_user: dict = Depends(get_current_user),
+):
+    """Update the given fields of a single test step"""
+    # Verify project ownership
+    project = await run_in_threadpool(
+        call_with_session, get_project_by_id, project_id, current_user["id"]
+    )
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+        )
+
+    step = await run_write(
+        as_response(TestStepResponse, update_test_step),
+        step_id,
+        test_case_id,
+        project_id,
+        step_data,
+    )
+    if not step:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Test step not found"
+        )
+    return step
+
+
+@router.delete("/api/projects/{project_id}/test-cases/{test_case_id}")
 async def delete_test_case(
     project_id: int,
     test_case_id: int,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
 ):
     """Delete a test case"""
     # Verify project ownership
-    project = get_project_by_id(db, project_id, current_user["id"])
+    project = await run_in_threadpool(
+        call_with_session, get_project_by_id, project_id, current_user["id"]
+    )
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    success = delete_test_case_by_id(db, test_case_id, project_id)
+    success = await run_write(delete_test_case_by_id, test_case_id, project_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Test case not found"
@@ -355,12 +836,125 @@ async def delete_test_case(
     return {"message": "Test case deleted successfully"}
 
 
+# Bulk import/export endpoints
+@router.post(
+    "/api/projects/{project_id}/test-cases:bulk",
+    response_model=BulkImportResponse,
+    responses={202: {"model": JobResponse}},
+)
+async def bulk_import_test_cases(
+    project_id: int,
+    request: Request,
+    background: bool = Query(False),
+    current_user: dict = Depends(get_current_user),
+):
+    """Import test cases from an NDJSON or CSV request body
+
+    With `background` the body is stored and imported by a bulk_import job;
+    the response is the queued job.
+    """
+    # Verify project ownership
+    project = await run_in_threadpool(
+        call_with_session, get_project_by_id, project_id, current_user["id"]
+    )
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+        )
+
+    import_format = detect_import_format(request.headers.get("content-type"))
+    if import_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send application/x-ndjson or text/csv",
+        )
+
+    if background:
+        body = bytearray()
+        async for chunk in request.stream():
+            body.extend(chunk)
+            if len(body) > JOB_MAX_PAYLOAD_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Background imports are limited to {JOB_MAX_PAYLOAD_BYTES} "
+                    "bytes",
+                )
+        try:
+            data = body.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Body is not UTF-8"
+            )
+        job = await _enqueue_job(
+            project_id,
+            "bulk_import",
+            {"format": import_format, "data": data},
+            current_user["full_name"],
+        )
+        return JSONResponse(
+            jsonable_encoder(JobResponse.model_validate(job)),
+            status_code=status.HTTP_202_ACCEPTED,
+        )
+
+    async def insert_chunk(test_cases: List[TestCaseCreate]) -> List[int]:
+        return await run_write(
+            bulk_create_test_cases,
+            test_cases,
+            project_id,
+            current_user["full_name"],
+        )
+
+    logger.info(
+        "Bulk importing %s test cases for project %s", import_format, project_id
+    )
+    result = await import_test_cases(request.stream(), import_format, insert_chunk)
+    logger.info(
+        "Bulk import for project %s: %s created, %s failed",
+        project_id,
+        result.created,
+        result.failed,
+    )
+    return result
+
+
+@router.get("/api/projects/{project_id}/test-cases:export")
+async def export_project_test_cases(
+    project_id: int,
+    current_user: dict = Depends(get_current_user),
+):
+    """Stream all test cases of a project as NDJSON"""
+    # Verify project ownership
+    project = await run_in_threadpool(
+        call_with_read_session, get_project_by_id, project_id, current_user["id"]
+    )
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+        )
+
+    # Each page uses its own short-lived session, so a slow client does not
+    # hold a pooled connection for the whole download
+    def load_page(page: PageRequest):
+        return call_with_read_session(get_project_test_cases, project_id, page)
+
+    return StreamingResponse(
+        export_test_cases(load_page), media_type="application/x-ndjson"
+    )
+
+
 # Element endpoints
-@app.get("/api/projects/{project_id}/elements", response_model=List[ElementResponse])
-async def get_elements(
+@router.get(
+    "/api/projects/{project_id}/elements",
+    response_model=List[ElementResponse],
+    dependencies=[Depends(project_etag(Element))],
+)
+def get_elements(
     project_id: int,
+    response: Response,
+    status_filter: Optional[ElementStatus] = Query(None, alias="status"),
+    page: PageRequest = Depends(get_page_request),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Get all elements for a project"""
     # Verify project ownership
@@ -370,39 +964,51 @@ async def get_elements(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    elements = get_project_elements(db, project_id)
-    return elements
+    elements, next_cursor = get_project_elements(
+        db, project_id, page, {"status": status_filter}
+    )
+    set_next_cursor(response, next_cursor)
+    return trusted_response(ElementResponse, elements, response)
 
 
-@app.post("/api/projects/{project_id}/elements", response_model=ElementResponse)
+@router.post("/api/projects/{project_id}/elements", response_model=ElementResponse)
 async def create_element(
     project_id: int,
     element_data: ElementCreate,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
 ):
     """Create a new element"""
     # Verify project ownership
-    project = get_project_by_id(db, project_id, current_user["id"])
+    project = await run_in_threadpool(
+        call_with_session, get_project_by_id, project_id, current_user["id"]
+    )
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    element = create_project_element(
-        db, element_data, project_id, current_user["full_name"]
+    element = await run_write(
+        as_response(ElementResponse, create_project_element),
+        element_data,
+        project_id,
+        current_user["full_name"],
     )
     return element
 
 
 # Test Suite endpoints
-@app.get(
-    "/api/projects/{project_id}/test-suites", response_model=List[TestSuiteResponse]
+@router.get(
+    "/api/projects/{project_id}/test-suites",
+    response_model=List[TestSuiteResponse],
+    dependencies=[Depends(project_etag(TestSuite, TestCase))],
 )
-async def get_test_suites(
+def get_test_suites(
     project_id: int,
+    response: Response,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    page: PageRequest = Depends(get_page_request),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Get all test suites for a project"""
     # Verify project ownership
@@ -412,37 +1018,51 @@ async def get_test_suites(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    test_suites = get_project_test_suites(db, project_id)
-    return test_suites
+    test_suites, next_cursor = get_project_test_suites(
+        db, project_id, page, {"status": status_filter}
+    )
+    set_next_cursor(response, next_cursor)
+    return trusted_response(TestSuiteResponse, test_suites, response)
 
 
-@app.post("/api/projects/{project_id}/test-suites", response_model=TestSuiteResponse)
+@router.post("/api/projects/{project_id}/test-suites", response_model=TestSuiteResponse)
 async def create_test_suite(
     project_id: int,
     test_suite_data: TestSuiteCreate,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
 ):
     """Create a new test suite"""
     # Verify project ownership
-    project = get_project_by_id(db, project_id, current_user["id"])
+    project = await run_in_threadpool(
+        call_with_session, get_project_by_id, project_id, current_user["id"]
+    )
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    test_suite = create_project_test_suite(
-        db, test_suite_data, project_id, current_user["full_name"]
+    test_suite = await run_write(
+        as_response(TestSuiteResponse, create_project_test_suite),
+        test_suite_data,
+        project_id,
+        current_user["full_name"],
     )
     return test_suite
 
 
 # Test Plan endpoints
-@app.get("/api/projects/{project_id}/test-plans", response_model=List[TestPlanResponse])
-async def get_test_plans(
+@router.get(
+    "/api/projects/{project_id}/test-plans",
+    response_model=List[TestPlanResponse],
+    dependencies=[Depends(project_etag(TestPlan, TestSuite, TestCase))],
+)
+def get_test_plans(
     project_id: int,
+    response: Response,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    page: PageRequest = Depends(get_page_request),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Get all test plans for a project"""
     # Verify project ownership
@@ -452,76 +1072,424 @@ async def get_test_plans(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    test_plans = get_project_test_plans(db, project_id)
-    return test_plans
+    test_plans, next_cursor = get_project_test_plans(
+        db, project_id, page, {"status": status_filter}
+    )
+    set_next_cursor(response, next_cursor)
+    return trusted_response(TestPlanResponse, test_plans, response)
+
+
+async def _ask_superwise(prompt: str, chat_history: Optional[list] = None) -> dict:
+    """Call the shared Superwise client and map failures to HTTP errors"""
+    try:
+        return await get_superwise_client().ask(prompt, chat_history)
+    except SuperwiseError as e:
+        logger.error("Error calling Superwise AI API: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error calling Superwise AI API: {str(e)}",
+        )
+    except Exception as e:
+        logger.error("Unexpected error calling Superwise AI API: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Unexpected error: {str(e)}",
+        )
+
+
+async def _open_superwise_stream(
+    prompt: str, chat_history: Optional[list] = None
+) -> SuperwiseStream:
+    try:
+        return await get_superwise_client().stream(prompt, chat_history)
+    except SuperwiseError as e:
+        logger.error("Error calling Superwise AI API: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error calling Superwise AI API: {str(e)}",
+        )
+
+
+async def _stream_superwise(
+    prompt: str,
+    chat_history: Optional[list] = None,
+    on_complete: Optional[Callable[[bytes], Awaitable[None]]] = None,
+) -> StreamingResponse:
+    """Relay a Superwise answer to the client as it is generated
+
+    The upstream call is closed as soon as the client disconnects. Time to
+    first byte is sent as a Server-Timing header; the total is logged when the
+    answer completes. `on_complete` receives a complete JSON body, e.g. to
+    cache it.
+    """
+    upstream = await _open_superwise_stream(prompt, chat_history)
+    ttfb_ms = upstream.ttfb * 1000
+    buffer = [] if on_complete and "json" in upstream.media_type else None
+
+    async def relay():
+        try:
+            async for chunk in upstream:
+                if buffer is not None:
+                    buffer.append(chunk)
+                yield chunk
+        except SuperwiseError as e:
+            logger.error("Superwise stream failed after %s bytes: %s", upstream.size, e)
+            return
+        finally:
+            if upstream.total is None:
+                logger.info(
+                    "Superwise stream closed early after %s bytes", upstream.size
+                )
+        logger.info(
+            "Superwise stream finished: ttfb %.0fms, total %.0fms, %s bytes",
+            ttfb_ms,
+            upstream.total * 1000,
+            upstream.size,
+        )
+        if buffer is not None:
+            await on_complete(b"".join(buffer))
+
+    return StreamingResponse(
+        relay(),
+        media_type=upstream.media_type,
+        headers={
+            "Server-Timing": f"superwise-ttfb;dur={ttfb_ms:.1f}",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+        # Runs even if the body was never iterated, so the slot is always freed
+        background=BackgroundTask(upstream.aclose),
+    )
+
+
+async def _cached_ai_response(
+    project_id: int,
+    template: PromptTemplate,
+    user_id: int,
+    response: Response,
+    refresh: bool,
+    stream: bool,
+):
+    """Answer a project prompt from the AI cache, asking Superwise on a miss
+
+    With `stream` a miss is relayed to the client as it is generated and
+    cached once complete.
+    """
+    # Verify project ownership
+    project = await run_in_threadpool(
+        call_with_session, get_project_by_id, project_id, user_id
+    )
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+        )
+
+    cache = get_ai_cache()
+    key = cache_key(project, template)
+    prompt = template.render(project)
+    if stream:
+        answer = None if refresh else await cache.lookup(key)
+        if answer is None:
+            logger.info("Streaming AI %s for project %s", template.name, project.name)
+
+            async def store(body: bytes) -> None:
+                try:
+                    await cache.store(key, json.loads(body))
+                except ValueError:
+                    logger.warning(
+                        "AI %s answer is not JSON, not cached", template.name
+                    )
+
+            streamed = await _stream_superwise(prompt, on_complete=store)
+            streamed.headers["X-Cache"] = "MISS"
+            return streamed
+        hit = True
+    else:
+        answer, hit = await cache.get_or_create(
+            key, lambda: _ask_superwise(prompt), refresh=refresh
+        )
+    response.headers["X-Cache"] = "HIT" if hit else "MISS"
+    logger.info(
+        "AI %s for project %s: %s",
+        template.name,
+        project.name,
+        "cache hit" if hit else "generated by Superwise AI",
+    )
+    return answer
 
 
 # AI Test Plans endpoint
-@app.get("/api/projects/{project_id}/ai-test-plans")
+@router.get("/api/projects/{project_id}/ai-test-plans")
 async def get_ai_test_plans(
     project_id: int,
+    response: Response,
+    refresh: bool = Query(False),
+    stream: bool = Query(False),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
 ):
-    """Call Superwise AI API to generate test plans"""
+    """Generate test plans with Superwise AI; `refresh` bypasses the cache"""
+    return await _cached_ai_response(
+        project_id, TEST_PLANS_PROMPT, current_user["id"], response, refresh, stream
+    )
+
+
+def _ndjson_line(kind: str, **fields) -> bytes:
+    return (json.dumps({"type": kind, **jsonable_encoder(fields)}) + "\n").encode()
+
+
+def _parsed_rows(test_cases: List[TestCaseCreate]):
+    for test_case in test_cases:
+        yield _ndjson_line("test_case", test_case=test_case)
+
+
+def _parsed_summary(parser: TestCaseParser, **fields) -> bytes:
+    return _ndjson_line(
+        "done", duplicates=parser.duplicates, rejected=parser.rejected, **fields
+    )
+
+
+async def _stream_parsed_test_cases(
+    project_id: int, user_id: int, refresh: bool
+) -> StreamingResponse:
+    """Relay AI test cases as NDJSON rows, each sent once its record is complete
+
+    Lines are `{"type": "test_case", "test_case": {...}}` followed by one
+    `{"type": "done", "duplicates": n, "rejected": [...]}`. A cached answer is
+    parsed at once; otherwise the agent's answer is parsed as it streams and
+    cached when it completes.
+    """
     # Verify project ownership
-    project = get_project_by_id(db, project_id, current_user["id"])
+    project = await run_in_threadpool(
+        call_with_session, get_project_by_id, project_id, user_id
+    )
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
+    existing_names = await run_in_threadpool(
+        call_with_session, get_project_test_case_names, project_id
+    )
+    cache = get_ai_cache()
+    key = cache_key(project, TEST_CASES_PROMPT)
+    answer = None if refresh else await cache.lookup(key)
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+    if answer is not None:
+        parser = parse_answer(answer, existing_names)
+
+        async def cached_rows():
+            for line in _parsed_rows(parser.test_cases):
+                yield line
+            yield _parsed_summary(parser)
+
+        return StreamingResponse(
+            cached_rows(),
+            media_type="application/x-ndjson",
+            headers={**headers, "X-Cache": "HIT"},
+        )
 
-    try:
-        import requests
-
-        logger.info(f"Calling Superwise AI API for test plans - project: {project.name}")
-        # Prepare the request to Superwise AI API
-        superwise_url = f"{SUPERWISE_API_URL}/{SUPERWISE_AGENT_ID}/v1/ask"
-
-        # Prepare the payload
-        payload = {
-            "input": (
-                "create test case plan for "
-                + project.name
-                + ". Please do not include any test cases. "
-                "Please do not provide any data in tables format."
-            ),
-            "chat_history": [],
-        }
+    logger.info("Streaming parsed AI test cases for project %s", project.name)
+    upstream = await _open_superwise_stream(TEST_CASES_PROMPT.render(project))
+    parser = TestCaseParser(existing_names)
+    body, text = [], []
+
+    async def chunks():
+        async for chunk in upstream:
+            body.append(chunk)
+            yield chunk
+
+    async def rows():
+        try:
+            async for piece in stream_answer_text(chunks(), upstream.media_type):
+                text.append(piece)
+                for line in _parsed_rows(parser.feed(piece)):
+                    yield line
+        except SuperwiseError as e:
+            logger.error("Superwise stream failed after %s bytes: %s", upstream.size, e)
+            yield _parsed_summary(parser, error=str(e))
+            return
+        yield _parsed_summary(parser)
+        if upstream.total is not None:
+            # Server-sent events are cached as the answer they add up to
+            try:
+                answer = (
+                    json.loads(b"".join(body))
+                    if "json" in upstream.media_type
+                    else {"output": "".join(text)}
+                )
+            except ValueError:
+                logger.warning("AI test cases answer is not JSON, not cached")
+                return
+            await cache.store(key, answer)
+
+    return StreamingResponse(
+        rows(),
+        media_type="application/x-ndjson",
+        headers={
+            **headers,
+            "X-Cache": "MISS",
+            "Server-Timing": f"superwise-ttfb;dur={upstream.ttfb * 1000:.1f}",
+        },
+        background=BackgroundTask(upstream.aclose),
+    )
+
+
+async def _parse_ai_test_cases(
+    project_id: int, user_id: int, response: Response, refresh: bool
+) -> TestCaseParser:
+    """The project's AI test cases, minus names the project already has"""
+    answer = await _cached_ai_response(
+        project_id, TEST_CASES_PROMPT, user_id, response, refresh, False
+    )
+    existing_names = await run_in_threadpool(
+        call_with_session, get_project_test_case_names, project_id
+    )
+    return parse_answer(answer, existing_names)
+
+
+# AI Test Cases endpoint
+@router.get(
+    "/api/projects/{project_id}/ai-test-cases",
+    responses={200: {"model": AITestCasesResponse}},
+)
+async def get_ai_test_cases(
+    project_id: int,
+    response: Response,
+    refresh: bool = Query(False),
+    stream: bool = Query(False),
+    parsed: bool = Query(False),
+    current_user: dict = Depends(get_current_user),
+):
+    """Generate test cases with Superwise AI; `refresh` bypasses the cache
+
+    With `parsed` the answer comes back as validated test cases, leaving out
+    names the project already has; with `stream` too, as NDJSON rows.
+    """
+    if parsed and stream:
+        return await _stream_parsed_test_cases(project_id, current_user["id"], refresh)
+    if parsed:
+        parser = await _parse_ai_test_cases(
+            project_id, current_user["id"], response, refresh
+        )
+        return AITestCasesResponse(
+            test_cases=parser.test_cases,
+            duplicates=parser.duplicates,
+            rejected=parser.rejected,
+        )
+    return await _cached_ai_response(
+        project_id, TEST_CASES_PROMPT, current_user["id"], response, refresh, stream
+    )
+
+
+@router.post(
+    "/api/projects/{project_id}/ai-test-cases", response_model=AITestCasesResponse
+)
+async def save_ai_test_cases(
+    project_id: int,
+    response: Response,
+    refresh: bool = Query(False),
+    current_user: dict = Depends(get_current_user),
+):
+    """Save the project's AI test cases that it does not have yet"""
+    parser = await _parse_ai_test_cases(
+        project_id, current_user["id"], response, refresh
+    )
+    created_ids = await run_write(
+        bulk_create_test_cases,
+        parser.test_cases,
+        project_id,
+        current_user["full_name"],
+    )
+    logger.info(
+        "Saved %s AI test cases for project %s, %s duplicates, %s rejected",
+        len(created_ids),
+        project_id,
+        parser.duplicates,
+        len(parser.rejected),
+    )
+    return AITestCasesResponse(
+        test_cases=parser.test_cases,
+        duplicates=parser.duplicates,
+        rejected=parser.rejected,
+        created_ids=created_ids,
+    )
 
-        # Make the request to Superwise AI
-        headers = {"accept": "application/json", "content-type": "application/json"}
 
-        logger.debug(f"POST {superwise_url}")
-        response = requests.post(superwise_url, json=payload, headers=headers)
-        response.raise_for_status()
+@router.get("/api/ai-cache/stats")
+async def get_ai_cache_stats(current_user: dict = Depends(get_current_user)):
+    """Hit/miss counters of the AI response cache"""
+    return get_ai_cache().snapshot()
 
-        logger.info("Successfully received AI test plans response")
-        # Return the response from Superwise AI
-        return response.json()
 
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Request error calling Superwise AI API: {str(e)}", exc_info=True)
+# Test Data endpoints
+@router.get(
+    "/api/projects/{project_id}/test-data",
+    response_model=List[TestDataResponse],
+    dependencies=[Depends(project_etag(TestData))],
+)
+def get_test_data(
+    project_id: int,
+    response: Response,
+    status_filter: Optional[TestDataStatus] = Query(None, alias="status"),
+    page: PageRequest = Depends(get_page_request),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+):
+    """Get all test data for a project"""
+    # Verify project ownership
+    project = get_project_by_id(db, project_id, current_user["id"])
+    if not project:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error calling Superwise AI API: {str(e)}",
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
-    except Exception as e:
-        logger.error(f"Unexpected error in AI test plans endpoint: {str(e)}", exc_info=True)
+
+    test_data, next_cursor = get_project_test_data(
+        db, project_id, page, {"status": status_filter}
+    )
+    set_next_cursor(response, next_cursor)
+    return trusted_response(TestDataResponse, test_data, response)
+
+
+@router.post("/api/projects/{project_id}/test-data", response_model=TestDataResponse)
+async def create_test_data(
+    project_id: int,
+    test_data: TestDataCreate,
+    current_user: dict = Depends(get_current_user),
+):
+    """Create new test data"""
+    # Verify project ownership
+    project = await run_in_threadpool(
+        call_with_session, get_project_by_id, project_id, current_user["id"]
+    )
+    if not project:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Unexpected error: {str(e)}",
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
+    data = await run_write(
+        as_response(TestDataResponse, create_project_test_data),
+        test_data,
+        project_id,
+        current_user["full_name"],
+    )
+    return data
 
-# AI Test Cases endpoint
-@app.get("/api/projects/{project_id}/ai-test-cases")
-async def get_ai_test_cases(
+
+# Environment endpoints
+@router.get(
+    "/api/projects/{project_id}/environments",
+    response_model=List[EnvironmentResponse],
+    dependencies=[Depends(project_etag(Environment))],
+)
+def get_environments(
     project_id: int,
+    response: Response,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    page: PageRequest = Depends(get_page_request),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    """Call Superwise AI API to generate test plans"""
+    """Get all environments for a project"""
     # Verify project ownership
     project = get_project_by_id(db, project_id, current_user["id"])
     if not project:
@@ -529,60 +1497,107 @@ async def get_ai_test_cases(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    try:
-        import requests
-
-        logger.info(f"Calling Superwise AI API for test cases - project: {project.name}")
-        # Prepare the request to Superwise AI API
-        superwise_url = f"{SUPERWISE_API_URL}/{SUPERWISE_AGENT_ID}/v1/ask"
-
-        # Prepare the payload
-        payload = {
-            "input": (
-                "create test cases for "
-                + project.name
-                + ". The response must be in json form and should have the fields "
-                "Test Case Name, Description, Priority, Browsers, "
-                "Environment, Test Steps. "
-                "The json format should be aligned for all records so it can easily "
-                "render on UI tables."
-            ),
-            "chat_history": [],
-        }
+    environments, next_cursor = get_project_environments(
+        db, project_id, page, {"status": status_filter}
+    )
+    set_next_cursor(response, next_cursor)
+    return trusted_response(EnvironmentResponse, environments, response)
 
-        # Make the request to Superwise AI
-        headers = {"accept": "application/json", "content-type": "application/json"}
 
-        logger.debug(f"POST {superwise_url}")
-        response = requests.post(superwise_url, json=payload, headers=headers)
-        response.raise_for_status()
+@router.post(
+    "/api/projects/{project_id}/environments", response_model=EnvironmentResponse
+)
+async def create_environment(
+    project_id: int,
+    environment_data: EnvironmentCreate,
+    current_user: dict = Depends(get_current_user),
+):
+    """Create a new environment"""
+    # Verify project ownership
+    project = await run_in_threadpool(
+        call_with_session, get_project_by_id, project_id, current_user["id"]
+    )
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+        )
+
+    environment = await run_write(
+        as_response(EnvironmentResponse, create_project_environment),
+        environment_data,
+        project_id,
+        current_user["full_name"],
+    )
+    return environment
 
-        logger.info("Successfully received AI test cases response")
-        # Return the response from Superwise AI
-        return response.json()
 
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Request error calling Superwise AI API: {str(e)}", exc_info=True)
+# Test Run endpoints
+@router.post(
+    "/api/projects/{project_id}/test-runs",
+    response_model=TestRunResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_test_run_endpoint(
+    project_id: int,
+    run_data: TestRunCreate,
+    current_user: dict = Depends(get_current_user),
+):
+    """Start running a test suite, test plan or list of test cases"""
+    # Verify project ownership
+    project = await run_in_threadpool(
+        call_with_session, get_project_by_id, project_id, current_user["id"]
+    )
+    if not project:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error calling Superwise AI API: {str(e)}",
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
-    except Exception as e:
-        logger.error(f"Unexpected error in AI test cases endpoint: {str(e)}", exc_info=True)
+
+    targets = [run_data.test_suite_id, run_data.test_plan_id, run_data.test_case_ids]
+    if sum(target is not None for target in targets) != 1:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Unexpected error: {str(e)}",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Give exactly one of test_suite_id, test_plan_id or test_case_ids",
+        )
+    if run_data.executor not in EXECUTORS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown executor, expected one of: {', '.join(EXECUTORS)}",
         )
 
+    prepared = await run_write(
+        prepare_test_run,
+        run_data,
+        project_id,
+        current_user["full_name"],
+    )
+    if not prepared:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Test suite, test plan, test case or environment not found",
+        )
+    test_run, cases, base_url = prepared
 
-# Test Data endpoints
-@app.get("/api/projects/{project_id}/test-data", response_model=List[TestDataResponse])
-async def get_test_data(
+    start_test_run(
+        test_run.id, project_id, cases, create_executor(run_data.executor, base_url)
+    )
+    logger.info("Test run %s queued for project %s", test_run.id, project_id)
+    return test_run
+
+
+@router.get(
+    "/api/projects/{project_id}/test-runs",
+    response_model=List[TestRunResponse],
+    dependencies=[Depends(project_etag(TestRun))],
+)
+def get_test_runs(
     project_id: int,
+    response: Response,
+    status_filter: Optional[TestRunStatus] = Query(None, alias="status"),
+    page: PageRequest = Depends(get_page_request),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    """Get all test data for a project"""
+    """Get all test runs for a project"""
     # Verify project ownership
     project = get_project_by_id(db, project_id, current_user["id"])
     if not project:
@@ -590,18 +1605,25 @@ async def get_test_data(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    test_data = get_project_test_data(db, project_id)
-    return test_data
+    test_runs, next_cursor = get_project_test_runs(
+        db, project_id, page, {"status": status_filter}
+    )
+    set_next_cursor(response, next_cursor)
+    return trusted_response(TestRunResponse, test_runs, response)
 
 
-@app.post("/api/projects/{project_id}/test-data", response_model=TestDataResponse)
-async def create_test_data(
+@router.get(
+    "/api/projects/{project_id}/test-runs/{test_run_id}",
+    response_model=TestRunDetailResponse,
+    dependencies=[Depends(project_etag(TestRun, TestResult))],
+)
+def get_test_run(
     project_id: int,
-    test_data: TestDataCreate,
+    test_run_id: int,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    """Create new test data"""
+    """Get a test run with its results"""
     # Verify project ownership
     project = get_project_by_id(db, project_id, current_user["id"])
     if not project:
@@ -609,22 +1631,156 @@ async def create_test_data(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    data = create_project_test_data(
-        db, test_data, project_id, current_user["full_name"]
+    test_run = get_test_run_by_id(db, test_run_id, project_id)
+    if not test_run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Test run not found"
+        )
+    return test_run
+
+
+@router.get("/api/projects/{project_id}/events")
+async def stream_project_events(
+    project_id: int,
+    request: Request,
+    run_id: Optional[int] = None,
+    current_user: dict = Depends(get_stream_user),
+):
+    """Stream live test run progress as server-sent events
+
+    Covers every run of the project, or one run with `run_id`. A `resync`
+    event means the client fell behind and should reload state over REST.
+    """
+    # Verify project ownership
+    project = await run_in_threadpool(
+        call_with_session, get_project_by_id, project_id, current_user["id"]
+    )
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+        )
+
+    broker = get_broker()
+    channel = run_channel(run_id) if run_id else project_channel(project_id)
+    # Subscribe before reading the snapshot so no update falls in between
+    subscription = await broker.subscribe(channel)
+    snapshot = None
+    if run_id:
+        test_run = await run_in_threadpool(
+            call_with_session, get_test_run_by_id, run_id, project_id
+        )
+        if not test_run:
+            await broker.unsubscribe(subscription)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Test run not found"
+            )
+        snapshot = {
+            "type": "run",
+            "run_id": test_run.id,
+            **TestRunResponse.model_validate(test_run).model_dump(
+                mode="json", include={"status", "total", "passed", "failed", "errored"}
+            ),
+        }
+
+    async def event_stream():
+        event_id = 0
+        try:
+            if snapshot:
+                event_id += 1
+                yield format_sse(snapshot, event_id)
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=EVENTS_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                event_id += 1
+                yield format_sse(event, event_id)
+        finally:
+            await broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    return data
 
 
-# Environment endpoints
-@app.get(
-    "/api/projects/{project_id}/environments", response_model=List[EnvironmentResponse]
+# Job endpoints
+async def _enqueue_job(
+    project_id: int,
+    kind: str,
+    payload: dict,
+    created_by: str,
+    max_attempts: Optional[int] = None,
+) -> Job:
+    """Store a job and wake the in-process worker"""
+    try:
+        job = await run_write(
+            enqueue_job,
+            kind,
+            payload,
+            project_id,
+            created_by,
+            max_attempts,
+        )
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown job kind, expected one of: {', '.join(JOB_KINDS)}",
+        )
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=jsonable_encoder(e.errors()),
+        )
+    notify_job_worker()
+    return job
+
+
+@router.post(
+    "/api/projects/{project_id}/jobs",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
 )
-async def get_environments(
+async def create_job_endpoint(
     project_id: int,
+    job_data: JobCreate,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
 ):
-    """Get all environments for a project"""
+    """Queue a background job"""
+    # Verify project ownership
+    project = await run_in_threadpool(
+        call_with_session, get_project_by_id, project_id, current_user["id"]
+    )
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+        )
+
+    return await _enqueue_job(
+        project_id,
+        job_data.kind,
+        job_data.payload,
+        current_user["full_name"],
+        job_data.max_attempts,
+    )
+
+
+@router.get(
+    "/api/projects/{project_id}/jobs",
+    response_model=List[JobResponse],
+    dependencies=[Depends(project_etag(Job))],
+)
+def get_jobs(
+    project_id: int,
+    response: Response,
+    status_filter: Optional[JobStatus] = Query(None, alias="status"),
+    kind: Optional[str] = None,
+    page: PageRequest = Depends(get_page_request),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+):
+    """Get all jobs for a project"""
     # Verify project ownership
     project = get_project_by_id(db, project_id, current_user["id"])
     if not project:
@@ -632,18 +1788,25 @@ async def get_environments(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    environments = get_project_environments(db, project_id)
-    return environments
+    jobs, next_cursor = get_project_jobs(
+        db, project_id, page, {"status": status_filter, "kind": kind}
+    )
+    set_next_cursor(response, next_cursor)
+    return trusted_response(JobResponse, jobs, response)
 
 
-@app.post("/api/projects/{project_id}/environments", response_model=EnvironmentResponse)
-async def create_environment(
+@router.get(
+    "/api/projects/{project_id}/jobs/{job_id}",
+    response_model=JobDetailResponse,
+    dependencies=[Depends(project_etag(Job))],
+)
+def get_job(
     project_id: int,
-    environment_data: EnvironmentCreate,
+    job_id: int,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    """Create a new environment"""
+    """Get a job's status, progress and result"""
     # Verify project ownership
     project = get_project_by_id(db, project_id, current_user["id"])
     if not project:
@@ -651,28 +1814,235 @@ async def create_environment(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    environment = create_project_environment(
-        db, environment_data, project_id, current_user["full_name"]
+    job = get_job_by_id(db, job_id, project_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
+        )
+    return job
+
+
+@router.post(
+    "/api/projects/{project_id}/jobs/{job_id}/cancel", response_model=JobResponse
+)
+async def cancel_job(
+    project_id: int,
+    job_id: int,
+    current_user: dict = Depends(get_current_user),
+):
+    """Cancel a queued or running job"""
+    # Verify project ownership
+    project = await run_in_threadpool(
+        call_with_session, get_project_by_id, project_id, current_user["id"]
     )
-    return environment
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+        )
+
+    job = await run_write(request_job_cancel, job_id, project_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
+        )
+    if job.status not in (JobStatus.RUNNING, JobStatus.CANCELLED):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job already {job.status.value}",
+        )
+    cancel_local_job(job_id)
+    return job
+
+
+@router.post(
+    "/api/projects/{project_id}/jobs/{job_id}/retry", response_model=JobResponse
+)
+async def retry_job_endpoint(
+    project_id: int,
+    job_id: int,
+    current_user: dict = Depends(get_current_user),
+):
+    """Queue a failed or cancelled job again"""
+    # Verify project ownership
+    project = await run_in_threadpool(
+        call_with_session, get_project_by_id, project_id, current_user["id"]
+    )
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+        )
+
+    job = await run_in_threadpool(call_with_session, get_job_by_id, job_id, project_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
+        )
+    if job.status not in (JobStatus.FAILED, JobStatus.CANCELLED):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Only failed or cancelled jobs can be retried, "
+            f"not {job.status.value}",
+        )
+    job_type = JOB_KINDS.get(job.kind)
+    if job_type is None or not job_type.retry:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{job.kind} jobs cannot be retried",
+        )
+    job = await run_write(retry_job, job_id, project_id)
+    notify_job_worker()
+    return job
 
 
 # AI Assistant endpoint
-@app.post("/api/projects/{project_id}/ai-assistant")
+def _rate_limited(
+    retry_after: float,
+    detail: str = "AI rate limit reached for this project, try again later",
+) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+@router.post(
+    "/api/projects/{project_id}/ai-assistant",
+    responses={200: {"model": AIBatchResponse}, 202: {"model": JobResponse}},
+)
 async def ai_assistant(
     project_id: int,
-    request_data: dict,
+    request_data: AIAssistantRequest,
+    stream: bool = Query(False),
+    background: bool = Query(False),
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
 ):
-    """Call Superwise AI API to generate test plans"""
+    """Forward a chat message, or a batch of prompts, to the Superwise AI assistant
+
+    A batch (`prompts` and/or `modules`) runs concurrently and returns each
+    answer plus the merged test cases; `persist` saves those test cases. With
+    `background` the batch runs as an ai_batch job and the queued job is
+    returned.
+    """
     # Verify project ownership
-    project = get_project_by_id(db, project_id, current_user["id"])
+    project = await run_in_threadpool(
+        call_with_session, get_project_by_id, project_id, current_user["id"]
+    )
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
+    batch = batch_prompts(project, request_data)
+    if not batch:
+        prompt = request_data.input
+        if not prompt:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="input is required"
+            )
+        bucket = project_rate_limiter.bucket(project_id)
+        if not await bucket.acquire(timeout=AI_PROJECT_RATE_MAX_WAIT_SECONDS):
+            raise _rate_limited(bucket.wait_time())
+
+        logger.info("Calling Superwise AI assistant - project: %s", project.name)
+        if stream:
+            return await _stream_superwise(prompt, request_data.chat_history)
+        return await _ask_superwise(prompt, request_data.chat_history)
+
+    if request_data.input or stream:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Batches cannot be combined with input or streaming",
+        )
+    if len(batch) > AI_BATCH_MAX_PROMPTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {AI_BATCH_MAX_PROMPTS} prompts per batch",
+        )
+    if background:
+        job = await _enqueue_job(
+            project_id,
+            "ai_batch",
+            request_data.model_dump(exclude={"input"}),
+            current_user["full_name"],
+        )
+        return JSONResponse(
+            jsonable_encoder(JobResponse.model_validate(job)),
+            status_code=status.HTTP_202_ACCEPTED,
+        )
+    wait = project_rate_limiter.bucket(project_id).wait_time(len(batch))
+    if wait > AI_PROJECT_RATE_MAX_WAIT_SECONDS:
+        raise _rate_limited(wait)
+
+    logger.info(
+        "Running AI batch of %s prompts - project: %s", len(batch), project.name
+    )
+
+    async def save(test_cases: List[TestCaseCreate]) -> List[int]:
+        return await run_write(
+            bulk_create_test_cases,
+            test_cases,
+            project_id,
+            current_user["full_name"],
+        )
+
+    # Persisted batches skip test cases the project already has
+    existing_names = (
+        await run_in_threadpool(
+            call_with_session, get_project_test_case_names, project_id
+        )
+        if request_data.persist
+        else ()
+    )
+    return await run_ai_batch(
+        project,
+        request_data,
+        lambda prompt: _ask_superwise(prompt, request_data.chat_history),
+        save,
+        existing_names=existing_names,
+    )
+
+
+def create_app() -> FastAPI:
+    """Build the API application
+
+    Importing this module only defines the routes; logging handlers, database
+    engines, the job worker and outbound clients are set up by the lifespan
+    when a server starts the app.
+    """
+    app = FastAPI(
+        title="TestGenie API",
+        description="Test Management Platform API",
+        version="1.0.0",
+        lifespan=lifespan,
+        default_response_class=FastJSONResponse,
+    )
+
+    # Compression (innermost, so the other middleware see the final headers)
+    if RESPONSE_COMPRESSION:
+        app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+
+    # CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[FRONTEND_URL],  # Use FRONTEND_URL from config
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Cache", "Server-Timing", "ETag"],
+    )
+    # Request metrics (outermost, so the timing includes the other middleware)
+    if METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware, server_timing=SERVER_TIMING_ENABLED)
+
+    app.add_exception_handler(InvalidCursorError, invalid_cursor_handler)
+    app.add_exception_handler(NotModifiedError, not_modified_handler)
+    app.include_router(router)
+    return app
+
+
+app = create_app()
+
 
 if __name__ == "__main__":
     import uvicorn
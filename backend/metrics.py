@@ -0,0 +1,294 @@
+"""
+Request performance metrics for TestGenie Backend
+Per-route latency histograms, in-flight requests, DB queries per request and
+Superwise call timings, rendered in the Prometheus text format for `/metrics`.
+Metrics are kept per process.
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket upper bounds, in seconds unless noted
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)  # queries
+SUPERWISE_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = (
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Histogram:
+    """Prometheus histogram with a fixed set of label names"""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [
+                    [0] * (len(self.buckets) + 1),
+                    0.0,
+                    0,
+                ]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = [(k, list(v[0]), v[1], v[2]) for k, v in self._series.items()]
+        for label_values, counts, total, count in sorted(series):
+            cumulative = 0
+            bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labels + ("le",), label_values + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Gauge:
+    """Prometheus gauge without labels"""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: int = 1) -> None:
+        self.inc(-amount)
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {_format_value(self.value)}",
+        ]
+
+
+REQUEST_DURATION = Histogram(
+    "testgenie_http_request_duration_seconds",
+    "Time to handle a request, by route template",
+    ("method", "route", "status"),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "testgenie_http_requests_in_flight", "Requests currently being handled"
+)
+REQUEST_DB_QUERIES = Histogram(
+    "testgenie_http_request_db_queries",
+    "SQL statements executed per request",
+    ("method", "route"),
+    QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "testgenie_http_request_db_seconds",
+    "Time spent executing SQL per request",
+    ("method", "route"),
+    DB_BUCKETS,
+)
+DB_QUERY_DURATION = Histogram(
+    "testgenie_db_query_duration_seconds",
+    "Time to execute one SQL statement",
+    (),
+    DB_BUCKETS,
+)
+SUPERWISE_DURATION = Histogram(
+    "testgenie_superwise_request_duration_seconds",
+    "Time to a Superwise response (headers only for streamed calls), by status "
+    "code or transport error",
+    ("outcome",),
+    SUPERWISE_BUCKETS,
+)
+METRICS = [
+    REQUEST_DURATION,
+    REQUESTS_IN_FLIGHT,
+    REQUEST_DB_QUERIES,
+    REQUEST_DB_SECONDS,
+    DB_QUERY_DURATION,
+    SUPERWISE_DURATION,
+]
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+@dataclass
+class RequestStats:
+    """Work done on behalf of the current request
+
+    Worker threads started with run_in_threadpool copy the request's context,
+    so they add to the same object.
+    """
+
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    superwise_calls: int = 0
+    superwise_seconds: float = 0.0
+
+    def server_timing(self, elapsed: float) -> str:
+        """Value of the Server-Timing header, durations in milliseconds"""
+        parts = [
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries"'
+        ]
+        if self.superwise_calls:
+            parts.append(
+                f"superwise;dur={self.superwise_seconds * 1000:.1f};"
+                f'desc="{self.superwise_calls} calls"'
+            )
+        parts.append(f"total;dur={elapsed * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Stats of the request being handled, None outside a request"""
+    return _request_stats.get()
+
+
+def record_db_query(seconds: float) -> None:
+    DB_QUERY_DURATION.observe(seconds)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += seconds
+
+
+def record_superwise_call(seconds: float, outcome: str) -> None:
+    SUPERWISE_DURATION.observe(seconds, outcome)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.superwise_calls += 1
+        stats.superwise_seconds += seconds
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    record_db_query(time.perf_counter() - conn.info["query_started"].pop())
+
+
+def _handle_error(exception_context):
+    # Failed statements skip after_cursor_execute; drop their start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every SQL statement run on the engine"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """ASGI middleware that times requests and collects their DB and Superwise work
+
+    Requests are labelled with their route template (`/api/projects/{project_id}`),
+    or "unmatched", so the number of series stays bounded. With `server_timing`
+    the response carries a Server-Timing header with the work done up to the
+    moment the headers were sent.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        stats.server_timing(time.perf_counter() - started),
+                    )
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - started
+            REQUESTS_IN_FLIGHT.dec()
+            _request_stats.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            REQUEST_DURATION.observe(elapsed, method, route, str(status_code))
+            REQUEST_DB_QUERIES.observe(stats.db_queries, method, route)
+            REQUEST_DB_SECONDS.observe(stats.db_seconds, method, route)
@@ -0,0 +1,51 @@
+"""
+Alembic environment for the TestGenie backend
+Uses the application's engine and model metadata so migrations always target
+the same database as the API
+"""
+from alembic import context
+from sqlalchemy.engine import Connection
+
+import models  # noqa: F401 - registers the tables on Base
+from database import Base, init_database
+
+target_metadata = Base.metadata
+engine = init_database()
+
+
+def run_migrations_offline() -> None:
+    """Emit migration SQL without connecting to the database"""
+    context.configure(
+        url=engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Apply migrations on a connection from the application engine"""
+    connection = context.config.attributes.get("connection")
+    if isinstance(connection, Connection):
+        _run(connection)
+    else:
+        with engine.connect() as connection:
+            _run(connection)
+
+
+def _run(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,226 @@
+"""initial schema
+
+Baseline matching the tables previously created by Base.metadata.create_all.
+Databases created that way already have these tables, so each table is only
+created when missing and the revision is then simply stamped.
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-01-06 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _timestamps():
+    return [
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+        ),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    ]
+
+
+def _project_fk():
+    return sa.Column(
+        "project_id", sa.Integer(), sa.ForeignKey("projects.id"), nullable=False
+    )
+
+
+TABLES = {
+    "users": lambda: [
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("full_name", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("is_active", sa.Boolean()),
+        *_timestamps(),
+    ],
+    "projects": lambda: [
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("application_name", sa.String()),
+        sa.Column("version", sa.String()),
+        sa.Column("color", sa.String()),
+        sa.Column("status", sa.String()),
+        *_timestamps(),
+        sa.Column("last_run", sa.DateTime(timezone=True)),
+        sa.Column(
+            "owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False
+        ),
+    ],
+    "test_cases": lambda: [
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "DRAFT", "IN_REVIEW", "READY", "OBSOLETE", "REWORK",
+                name="testcasestatus",
+            ),
+        ),
+        sa.Column(
+            "priority",
+            sa.Enum("CRITICAL", "MAJOR", "MEDIUM", "MINOR", name="testcasepriority"),
+        ),
+        sa.Column("assignee", sa.String()),
+        sa.Column("reviewer", sa.String()),
+        sa.Column("browsers", sa.JSON()),
+        sa.Column("environment", sa.String()),
+        *_timestamps(),
+        sa.Column("created_by", sa.String(), nullable=False),
+        _project_fk(),
+    ],
+    "test_steps": lambda: [
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("step_number", sa.Integer(), nullable=False),
+        sa.Column("action", sa.String(), nullable=False),
+        sa.Column("element", sa.String()),
+        sa.Column("value", sa.String()),
+        sa.Column("description", sa.Text()),
+        _timestamps()[0],
+        sa.Column(
+            "test_case_id",
+            sa.Integer(),
+            sa.ForeignKey("test_cases.id"),
+            nullable=False,
+        ),
+    ],
+    "elements": lambda: [
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("selector", sa.String(), nullable=False),
+        sa.Column(
+            "type",
+            sa.Enum(
+                "BUTTON", "INPUT", "LINK", "DROPDOWN", "CHECKBOX", "RADIO", "OTHER",
+                name="elementtype",
+            ),
+            nullable=False,
+        ),
+        sa.Column("description", sa.Text()),
+        sa.Column(
+            "status",
+            sa.Enum("ACTIVE", "INACTIVE", "DEPRECATED", name="elementstatus"),
+        ),
+        *_timestamps(),
+        sa.Column("created_by", sa.String(), nullable=False),
+        _project_fk(),
+    ],
+    "test_suites": lambda: [
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("status", sa.String()),
+        *_timestamps(),
+        sa.Column("created_by", sa.String(), nullable=False),
+        _project_fk(),
+    ],
+    "test_suite_test_cases": lambda: [
+        sa.Column(
+            "test_suite_id",
+            sa.Integer(),
+            sa.ForeignKey("test_suites.id"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "test_case_id",
+            sa.Integer(),
+            sa.ForeignKey("test_cases.id"),
+            primary_key=True,
+        ),
+    ],
+    "test_plans": lambda: [
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("status", sa.String()),
+        *_timestamps(),
+        sa.Column("created_by", sa.String(), nullable=False),
+        _project_fk(),
+    ],
+    "test_plan_test_suites": lambda: [
+        sa.Column(
+            "test_plan_id",
+            sa.Integer(),
+            sa.ForeignKey("test_plans.id"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "test_suite_id",
+            sa.Integer(),
+            sa.ForeignKey("test_suites.id"),
+            primary_key=True,
+        ),
+    ],
+    "test_data": lambda: [
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column(
+            "type",
+            sa.Enum("CSV", "JSON", "EXCEL", "DATABASE", "API", name="testdatatype"),
+            nullable=False,
+        ),
+        sa.Column("description", sa.Text()),
+        sa.Column("records", sa.Integer()),
+        sa.Column(
+            "status",
+            sa.Enum("ACTIVE", "INACTIVE", "ERROR", name="testdatastatus"),
+        ),
+        *_timestamps(),
+        sa.Column("created_by", sa.String(), nullable=False),
+        _project_fk(),
+    ],
+    "environments": lambda: [
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("url", sa.String()),
+        sa.Column("status", sa.String()),
+        *_timestamps(),
+        sa.Column("created_by", sa.String(), nullable=False),
+        _project_fk(),
+    ],
+}
+
+# Single-column indexes from `index=True` on the original models
+INDEXES = {
+    "users": [("ix_users_id", ["id"], False), ("ix_users_email", ["email"], True)],
+    "projects": [("ix_projects_id", ["id"], False)],
+    "test_cases": [("ix_test_cases_id", ["id"], False)],
+    "test_steps": [("ix_test_steps_id", ["id"], False)],
+    "elements": [("ix_elements_id", ["id"], False)],
+    "test_suites": [("ix_test_suites_id", ["id"], False)],
+    "test_plans": [("ix_test_plans_id", ["id"], False)],
+    "test_data": [("ix_test_data_id", ["id"], False)],
+    "environments": [("ix_environments_id", ["id"], False)],
+}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, columns in TABLES.items():
+        if inspector.has_table(table):
+            continue
+        op.create_table(table, *columns())
+        for name, index_columns, unique in INDEXES.get(table, []):
+            op.create_index(name, table, index_columns, unique=unique)
+
+
+def downgrade() -> None:
+    for table in reversed(list(TABLES)):
+        op.drop_table(table)
@@ -0,0 +1,62 @@
+"""project scoped indexes
+
+Composite indexes for the project list endpoints, which filter on project_id
+(and optionally status) and page by (updated_at, id); an index for loading a
+case's steps in order; and reverse-lookup indexes on the association tables.
+Also backfills updated_at so keyset pagination can sort on the bare column.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-01-06 00:00:01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PROJECT_TABLES = [
+    "test_cases",
+    "elements",
+    "test_suites",
+    "test_plans",
+    "test_data",
+    "environments",
+]
+
+INDEXES = [
+    ("ix_projects_owner_id", "projects", ["owner_id"]),
+    ("ix_test_steps_test_case_id_step_number", "test_steps", ["test_case_id", "step_number"]),
+    ("ix_test_suite_test_cases_test_case_id", "test_suite_test_cases", ["test_case_id"]),
+    ("ix_test_plan_test_suites_test_suite_id", "test_plan_test_suites", ["test_suite_id"]),
+] + [
+    index
+    for table in PROJECT_TABLES
+    for index in (
+        (f"ix_{table}_project_id_updated_at", table, ["project_id", "updated_at"]),
+        (f"ix_{table}_project_id_status", table, ["project_id", "status", "updated_at"]),
+    )
+]
+
+
+def upgrade() -> None:
+    for table in PROJECT_TABLES + ["projects"]:
+        op.execute(
+            sa.text(
+                f"UPDATE {table} SET updated_at = created_at WHERE updated_at IS NULL"
+            )
+        )
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
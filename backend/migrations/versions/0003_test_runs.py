@@ -0,0 +1,91 @@
+"""test runs
+
+Tables for the test execution engine: one test_runs row per execution of a
+suite, plan or list of cases, and one test_results row per executed case.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-01-13 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "test_runs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "QUEUED", "RUNNING", "PASSED", "FAILED", "ERROR", "CANCELLED",
+                name="testrunstatus",
+            ),
+        ),
+        sa.Column("executor", sa.String(), nullable=False),
+        sa.Column("environment", sa.String()),
+        sa.Column("total", sa.Integer()),
+        sa.Column("passed", sa.Integer()),
+        sa.Column("failed", sa.Integer()),
+        sa.Column("errored", sa.Integer()),
+        sa.Column("started_at", sa.DateTime(timezone=True)),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now()
+        ),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("created_by", sa.String(), nullable=False),
+        sa.Column(
+            "project_id", sa.Integer(), sa.ForeignKey("projects.id"), nullable=False
+        ),
+        sa.Column("test_suite_id", sa.Integer(), sa.ForeignKey("test_suites.id")),
+        sa.Column("test_plan_id", sa.Integer(), sa.ForeignKey("test_plans.id")),
+    )
+    op.create_index("ix_test_runs_id", "test_runs", ["id"])
+    op.create_index(
+        "ix_test_runs_project_id_updated_at", "test_runs", ["project_id", "updated_at"]
+    )
+    op.create_index(
+        "ix_test_runs_project_id_status",
+        "test_runs",
+        ["project_id", "status", "updated_at"],
+    )
+
+    op.create_table(
+        "test_results",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("test_case_id", sa.Integer(), nullable=False),
+        sa.Column("test_case_name", sa.String(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("PASSED", "FAILED", "ERROR", name="testresultstatus"),
+            nullable=False,
+        ),
+        sa.Column("duration_ms", sa.Integer()),
+        sa.Column("error", sa.Text()),
+        sa.Column("step_results", sa.JSON()),
+        sa.Column("started_at", sa.DateTime(timezone=True)),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+        sa.Column(
+            "test_run_id", sa.Integer(), sa.ForeignKey("test_runs.id"), nullable=False
+        ),
+    )
+    op.create_index("ix_test_results_id", "test_results", ["id"])
+    op.create_index("ix_test_results_test_run_id", "test_results", ["test_run_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("test_results")
+    op.drop_table("test_runs")
+    sa.Enum(name="testresultstatus").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="testrunstatus").drop(op.get_bind(), checkfirst=True)
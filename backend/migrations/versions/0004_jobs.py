@@ -0,0 +1,73 @@
+"""jobs
+
+Durable background jobs (AI generation, bulk imports): one row per job with
+its payload, progress, result and retry state. Workers claim queued rows whose
+run_after has passed.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-01-20 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "QUEUED", "RUNNING", "SUCCEEDED", "FAILED", "CANCELLED",
+                name="jobstatus",
+            ),
+            nullable=False,
+        ),
+        sa.Column("payload", sa.JSON()),
+        sa.Column("result", sa.JSON()),
+        sa.Column("error", sa.Text()),
+        sa.Column("progress", sa.Integer()),
+        sa.Column("progress_total", sa.Integer()),
+        sa.Column("progress_message", sa.String()),
+        sa.Column("attempts", sa.Integer()),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("cancel_requested", sa.Boolean()),
+        sa.Column("run_after", sa.DateTime(timezone=True)),
+        sa.Column("locked_by", sa.String()),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True)),
+        sa.Column("started_at", sa.DateTime(timezone=True)),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now()
+        ),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("created_by", sa.String(), nullable=False),
+        sa.Column(
+            "project_id", sa.Integer(), sa.ForeignKey("projects.id"), nullable=False
+        ),
+    )
+    op.create_index("ix_jobs_id", "jobs", ["id"])
+    op.create_index("ix_jobs_status_run_after", "jobs", ["status", "run_after"])
+    op.create_index(
+        "ix_jobs_project_id_updated_at", "jobs", ["project_id", "updated_at"]
+    )
+    op.create_index(
+        "ix_jobs_project_id_status", "jobs", ["project_id", "status", "updated_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("jobs")
+    sa.Enum(name="jobstatus").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,59 @@
+"""project changes
+
+Per-project change log for delta sync: projects.change_version counts the
+changes made to a project's test assets, and project_changes holds one row per
+change keyed by (project_id, version), so reading the changes since a version
+is a single range scan.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-01-27 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "projects",
+        sa.Column(
+            "change_version", sa.Integer(), nullable=False, server_default="0"
+        ),
+    )
+    op.create_table(
+        "project_changes",
+        sa.Column(
+            "project_id",
+            sa.Integer(),
+            sa.ForeignKey("projects.id"),
+            primary_key=True,
+        ),
+        sa.Column("version", sa.Integer(), primary_key=True),
+        sa.Column("entity", sa.String(), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "action",
+            sa.Enum("CREATED", "UPDATED", "DELETED", name="changeaction"),
+            nullable=False,
+        ),
+        sa.Column(
+            "changed_at", sa.DateTime(timezone=True), server_default=sa.func.now()
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("project_changes")
+    sa.Enum(name="changeaction").drop(op.get_bind(), checkfirst=True)
+    with op.batch_alter_table("projects") as batch_op:
+        batch_op.drop_column("change_version")
@@ -8,6 +8,7 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -44,11 +45,15 @@ class Project(Base):
     color = Column(String, default="#F54927")
     status = Column(String, default="healthy")  # healthy, warning, error
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), default=func.now(), onupdate=func.now()
+    )
     last_run = Column(DateTime(timezone=True))
+    # Version of the newest entry in the project's change log
+    change_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Foreign keys
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
 
     # Relationships
     owner = relationship("User", back_populates="projects")
@@ -70,6 +75,34 @@ class Project(Base):
     environments = relationship(
         "Environment", back_populates="project", cascade="all, delete-orphan"
     )
+    test_runs = relationship(
+        "TestRun", back_populates="project", cascade="all, delete-orphan"
+    )
+    jobs = relationship("Job", back_populates="project", cascade="all, delete-orphan")
+
+
+class ChangeAction(str, enum.Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+
+
+class ProjectChange(Base):
+    """One entry of a project's change log
+
+    Versions count up from 1 per project without gaps, in commit order. Rows are
+    deleted with their project by delete_user_project rather than through a
+    relationship, so deleting a project does not load its whole log.
+    """
+
+    __tablename__ = "project_changes"
+
+    project_id = Column(Integer, ForeignKey("projects.id"), primary_key=True)
+    version = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)  # test_case, test_step, element, ...
+    entity_id = Column(Integer, nullable=False)
+    action = Column(Enum(ChangeAction), nullable=False)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
 class TestCaseStatus(str, enum.Enum):
@@ -89,6 +122,10 @@ class TestCasePriority(str, enum.Enum):
 
 class TestCase(Base):
     __tablename__ = "test_cases"
+    __table_args__ = (
+        Index("ix_test_cases_project_id_updated_at", "project_id", "updated_at"),
+        Index("ix_test_cases_project_id_status", "project_id", "status", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -100,7 +137,9 @@ class TestCase(Base):
     browsers = Column(JSON)  # List of supported browsers
     environment = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), default=func.now(), onupdate=func.now()
+    )
     created_by = Column(String, nullable=False)
 
     # Foreign keys
@@ -115,6 +154,9 @@ class TestCase(Base):
 
 class TestStep(Base):
     __tablename__ = "test_steps"
+    __table_args__ = (
+        Index("ix_test_steps_test_case_id_step_number", "test_case_id", "step_number"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     step_number = Column(Integer, nullable=False)
@@ -149,6 +191,10 @@ class ElementStatus(str, enum.Enum):
 
 class Element(Base):
     __tablename__ = "elements"
+    __table_args__ = (
+        Index("ix_elements_project_id_updated_at", "project_id", "updated_at"),
+        Index("ix_elements_project_id_status", "project_id", "status", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -157,7 +203,9 @@ class Element(Base):
     description = Column(Text)
     status = Column(Enum(ElementStatus), default=ElementStatus.ACTIVE)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), default=func.now(), onupdate=func.now()
+    )
     created_by = Column(String, nullable=False)
 
     # Foreign keys
@@ -169,13 +217,19 @@ class Element(Base):
 
 class TestSuite(Base):
     __tablename__ = "test_suites"
+    __table_args__ = (
+        Index("ix_test_suites_project_id_updated_at", "project_id", "updated_at"),
+        Index("ix_test_suites_project_id_status", "project_id", "status", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     description = Column(Text)
     status = Column(String, default="active")  # active, inactive
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), default=func.now(), onupdate=func.now()
+    )
     created_by = Column(String, nullable=False)
 
     # Foreign keys
@@ -190,18 +244,26 @@ class TestSuiteTestCase(Base):
     __tablename__ = "test_suite_test_cases"
 
     test_suite_id = Column(Integer, ForeignKey("test_suites.id"), primary_key=True)
-    test_case_id = Column(Integer, ForeignKey("test_cases.id"), primary_key=True)
+    test_case_id = Column(
+        Integer, ForeignKey("test_cases.id"), primary_key=True, index=True
+    )
 
 
 class TestPlan(Base):
     __tablename__ = "test_plans"
+    __table_args__ = (
+        Index("ix_test_plans_project_id_updated_at", "project_id", "updated_at"),
+        Index("ix_test_plans_project_id_status", "project_id", "status", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     description = Column(Text)
     status = Column(String, default="draft")  # draft, active, completed
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), default=func.now(), onupdate=func.now()
+    )
     created_by = Column(String, nullable=False)
 
     # Foreign keys
@@ -216,7 +278,9 @@ class TestPlanTestSuite(Base):
     __tablename__ = "test_plan_test_suites"
 
     test_plan_id = Column(Integer, ForeignKey("test_plans.id"), primary_key=True)
-    test_suite_id = Column(Integer, ForeignKey("test_suites.id"), primary_key=True)
+    test_suite_id = Column(
+        Integer, ForeignKey("test_suites.id"), primary_key=True, index=True
+    )
 
 
 class TestDataType(str, enum.Enum):
@@ -235,6 +299,10 @@ class TestDataStatus(str, enum.Enum):
 
 class TestData(Base):
     __tablename__ = "test_data"
+    __table_args__ = (
+        Index("ix_test_data_project_id_updated_at", "project_id", "updated_at"),
+        Index("ix_test_data_project_id_status", "project_id", "status", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -243,7 +311,9 @@ class TestData(Base):
     records = Column(Integer, default=0)
     status = Column(Enum(TestDataStatus), default=TestDataStatus.ACTIVE)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), default=func.now(), onupdate=func.now()
+    )
     created_by = Column(String, nullable=False)
 
     # Foreign keys
@@ -255,6 +325,12 @@ class TestData(Base):
 
 class Environment(Base):
     __tablename__ = "environments"
+    __table_args__ = (
+        Index("ix_environments_project_id_updated_at", "project_id", "updated_at"),
+        Index(
+            "ix_environments_project_id_status", "project_id", "status", "updated_at"
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -262,7 +338,9 @@ class Environment(Base):
     url = Column(String)
     status = Column(String, default="active")  # active, inactive
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), default=func.now(), onupdate=func.now()
+    )
     created_by = Column(String, nullable=False)
 
     # Foreign keys
@@ -270,3 +348,125 @@ class Environment(Base):
 
     # Relationships
     project = relationship("Project", back_populates="environments")
+
+
+class TestRunStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    PASSED = "passed"
+    FAILED = "failed"
+    ERROR = "error"
+    CANCELLED = "cancelled"
+
+
+class TestResultStatus(str, enum.Enum):
+    PASSED = "passed"
+    FAILED = "failed"
+    ERROR = "error"
+
+
+class TestRun(Base):
+    __tablename__ = "test_runs"
+    __table_args__ = (
+        Index("ix_test_runs_project_id_updated_at", "project_id", "updated_at"),
+        Index("ix_test_runs_project_id_status", "project_id", "status", "updated_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(Enum(TestRunStatus), default=TestRunStatus.QUEUED)
+    executor = Column(String, nullable=False)
+    environment = Column(String)
+    total = Column(Integer, default=0)
+    passed = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    errored = Column(Integer, default=0)
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), default=func.now(), onupdate=func.now()
+    )
+    created_by = Column(String, nullable=False)
+
+    # Foreign keys
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    test_suite_id = Column(Integer, ForeignKey("test_suites.id"))
+    test_plan_id = Column(Integer, ForeignKey("test_plans.id"))
+
+    # Relationships
+    project = relationship("Project", back_populates="test_runs")
+    results = relationship(
+        "TestResult", back_populates="test_run", cascade="all, delete-orphan"
+    )
+
+
+class TestResult(Base):
+    __tablename__ = "test_results"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Name is copied so results stay readable after the case is edited or deleted
+    test_case_id = Column(Integer, nullable=False)
+    test_case_name = Column(String, nullable=False)
+    status = Column(Enum(TestResultStatus), nullable=False)
+    duration_ms = Column(Integer)
+    error = Column(Text)
+    step_results = Column(JSON)  # [{step_number, status, duration_ms, message}]
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+
+    # Foreign keys
+    test_run_id = Column(
+        Integer, ForeignKey("test_runs.id"), nullable=False, index=True
+    )
+
+    # Relationships
+    test_run = relationship("TestRun", back_populates="results")
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers claim the oldest due job
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+        Index("ix_jobs_project_id_updated_at", "project_id", "updated_at"),
+        Index("ix_jobs_project_id_status", "project_id", "status", "updated_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    payload = Column(JSON)
+    result = Column(JSON)
+    error = Column(Text)
+    progress = Column(Integer, default=0)
+    progress_total = Column(Integer)
+    progress_message = Column(String)
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    cancel_requested = Column(Boolean, default=False)
+    # Not claimed before this time; pushed back between retries
+    run_after = Column(DateTime(timezone=True))
+    # Worker holding the job and its last sign of life while running
+    locked_by = Column(String)
+    heartbeat_at = Column(DateTime(timezone=True))
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), default=func.now(), onupdate=func.now()
+    )
+    created_by = Column(String, nullable=False)
+
+    # Foreign keys
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+
+    # Relationships
+    project = relationship("Project", back_populates="jobs")
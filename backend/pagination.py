@@ -0,0 +1,107 @@
+"""
+Keyset (cursor) pagination for project list endpoints
+Pages are ordered by (updated_at, id) so every page, however deep, is a single
+range scan instead of an OFFSET over all earlier rows
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from config import DEFAULT_PAGE_SIZE
+from sqlalchemy import and_, literal, or_
+from sqlalchemy.orm import Query
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+@dataclass
+class PageRequest:
+    """Requested page: size, position and sort direction
+
+    A limit of None asks for every remaining row in one page.
+    """
+
+    limit: Optional[int] = DEFAULT_PAGE_SIZE
+    cursor: Optional[str] = None
+    descending: bool = True
+
+
+def sort_key(model: Any):
+    """Column rows are ordered by
+
+    updated_at is set on insert and backfilled by migration 0002, so the bare
+    column is used and the (project_id, updated_at) index serves the scan.
+    """
+    return model.updated_at
+
+
+def encode_cursor(row: Any) -> str:
+    """Encode the position just after `row` as an opaque cursor"""
+    timestamp = row.updated_at or row.created_at
+    payload = {"id": row.id, "ts": timestamp.isoformat() if timestamp else None}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, Optional[datetime]]:
+    """Decode a cursor into the (id, timestamp) of the last row already seen"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        timestamp = datetime.fromisoformat(payload["ts"]) if payload["ts"] else None
+        return int(payload["id"]), timestamp
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+
+def _stored_forms(query: Query, timestamp: Optional[datetime]) -> Tuple[Any, Any]:
+    """Lowest and highest form in which the database may hold `timestamp`
+
+    SQLite keeps datetimes as text: a whole second written by CURRENT_TIMESTAMP
+    (the func.now() defaults) reads "2024-01-01 12:00:00", the same second bound
+    from Python "2024-01-01 12:00:00.000000", and the two sort apart. Other
+    databases hold a single value.
+    """
+    if (
+        timestamp is not None
+        and timestamp.microsecond == 0
+        and query.session.get_bind().dialect.name == "sqlite"
+    ):
+        return literal(timestamp.strftime("%Y-%m-%d %H:%M:%S")), timestamp
+    return timestamp, timestamp
+
+
+def paginate(
+    query: Query, model: Any, page: PageRequest
+) -> Tuple[List[Any], Optional[str]]:
+    """Apply keyset ordering and limits; return the rows and the next cursor"""
+    key = sort_key(model)
+    if page.cursor:
+        last_id, last_timestamp = decode_cursor(page.cursor)
+        # The position encoded in the cursor, not the cursor row's current key:
+        # the row may have been edited or deleted since the previous page
+        low, high = _stored_forms(query, last_timestamp)
+        if page.descending:
+            query = query.filter(
+                or_(key < low, and_(key <= high, model.id < last_id))
+            )
+        else:
+            query = query.filter(
+                or_(key > high, and_(key >= low, model.id > last_id))
+            )
+
+    if page.descending:
+        query = query.order_by(key.desc(), model.id.desc())
+    else:
+        query = query.order_by(key.asc(), model.id.asc())
+
+    if page.limit is None:
+        return query.all(), None
+    rows = query.limit(page.limit + 1).all()
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
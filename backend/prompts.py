@@ -0,0 +1,61 @@
+"""
+Prompt templates for the Superwise AI endpoints
+Bump a template's version whenever its text changes so cached responses built
+from the old prompt are no longer served.
+"""
+from dataclasses import dataclass
+
+from models import Project
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A versioned prompt rendered from project fields"""
+
+    name: str
+    version: int
+    template: str
+
+    def render(self, project: Project, **fields: str) -> str:
+        return self.template.format(project_name=project.name, **fields)
+
+
+TEST_PLANS_PROMPT = PromptTemplate(
+    name="test-plans",
+    version=1,
+    template=(
+        "create test case plan for {project_name}. "
+        "Please do not include any test cases. "
+        "Please do not provide any data in tables format."
+    ),
+)
+
+TEST_CASES_PROMPT = PromptTemplate(
+    name="test-cases",
+    version=1,
+    template=(
+        "create test cases for {project_name}. "
+        "The response must be in json form and should have the fields "
+        "Test Case Name, Description, Priority, Browsers, "
+        "Environment, Test Steps. "
+        "The json format should be aligned for all records so it can easily "
+        "render on UI tables."
+    ),
+)
+
+# Project-level prompts by name, for callers that pick one at runtime
+PROJECT_PROMPTS = {
+    template.name: template for template in (TEST_PLANS_PROMPT, TEST_CASES_PROMPT)
+}
+
+MODULE_TEST_CASES_PROMPT = PromptTemplate(
+    name="module-test-cases",
+    version=1,
+    template=(
+        "create test cases for the {module} module of {project_name}. "
+        "The response must be a json array whose records have the fields "
+        "Test Case Name, Description, Priority, Browsers, "
+        "Environment, Test Steps. "
+        "Do not include any text outside the json array."
+    ),
+)
@@ -0,0 +1,83 @@
+"""
+Token bucket rate limiting
+A bucket holds up to `capacity` tokens and refills at `rate` tokens per
+second; callers either take a token immediately (try_acquire) or wait for one
+(acquire). RateLimiter keeps one bucket per key, such as a project id, and
+forgets the least recently used keys beyond `max_keys`.
+
+Buckets are not thread-safe; use them from the event loop.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class TokenBucket:
+    """Allows bursts of `capacity` and a sustained `rate` per second"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens if available right now"""
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """Seconds until `tokens` will be available"""
+        self._refill()
+        if self.tokens >= tokens:
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (tokens - self.tokens) / self.rate
+
+    async def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """Wait for tokens; False if they would not arrive within timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.try_acquire(tokens):
+            delay = self.wait_time(tokens)
+            if deadline is not None and time.monotonic() + delay > deadline:
+                return False
+            await asyncio.sleep(delay)
+        return True
+
+
+class RateLimiter:
+    """One token bucket per key"""
+
+    def __init__(self, rate: float, capacity: float, max_keys: int = 10000):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Hashable, TokenBucket]" = OrderedDict()
+
+    def bucket(self, key: Hashable) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.capacity)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def try_acquire(self, key: Hashable, tokens: float = 1) -> bool:
+        return self.bucket(key).try_acquire(tokens)
+
+    async def acquire(
+        self, key: Hashable, tokens: float = 1, timeout: Optional[float] = None
+    ) -> bool:
+        return await self.bucket(key).acquire(tokens, timeout)
@@ -1,21 +1,58 @@
 #!/usr/bin/env python3
 """
 TestGenie Backend Server
-Run this script to start the FastAPI backend server
+Run this script to start the FastAPI backend server. By default it runs
+gunicorn with SERVER_WORKERS uvicorn workers (see gunicorn.conf.py); with
+SERVER_RELOAD=true it runs a single auto-reloading process for development.
 """
 
+import sys
+from pathlib import Path
+
 import uvicorn
+from config import (
+    HOST,
+    PORT,
+    SERVER_KEEPALIVE_SECONDS,
+    SERVER_RELOAD,
+    SERVER_WORKERS,
+    SERVER_WORKERS_SET,
+)
 
-if __name__ == "__main__":
-    print("Starting TestGenie Backend Server...")
-    print("API Documentation: http://localhost:5000/docs")
-    print("Health Check: http://localhost:5000/api/health")
-    print("Test Endpoint: http://localhost:5000/api/test")
+BACKEND_DIR = Path(__file__).parent
+
+
+def main() -> None:
+    if SERVER_RELOAD:
+        print("Starting TestGenie Backend Server (auto-reload)...")
+        print(f"API Documentation: http://localhost:{PORT}/docs")
+        print(f"Health Check: http://localhost:{PORT}/api/health")
+        uvicorn.run("main:app", host=HOST, port=PORT, reload=True, log_level="info")
+        return
 
-    uvicorn.run(
+    try:
+        from gunicorn.app.wsgiapp import run
+    except ImportError:
+        # gunicorn does not run on Windows; uvicorn's own workers do not
+        # preload, so only start several when SERVER_WORKERS asks for them
+        uvicorn.run(
+            "main:app",
+            host=HOST,
+            port=PORT,
+            workers=SERVER_WORKERS if SERVER_WORKERS_SET else 1,
+            timeout_keep_alive=SERVER_KEEPALIVE_SECONDS,
+            log_level="info",
+        )
+        return
+
+    sys.argv = [
+        "gunicorn",
+        "--chdir", str(BACKEND_DIR),
+        "--config", str(BACKEND_DIR / "gunicorn.conf.py"),
         "main:app",
-        host="0.0.0.0",
-        port=5000,
-        reload=True,  # Enable auto-reload for development
-        log_level="info",
-    )
+    ]
+    run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,536 @@
+"""
+Test execution engine
+A run executes each test case's steps in order through an Executor. Cases run
+concurrently on a fixed number of worker coroutines, results are written in
+batches, and the run's totals and the project's status/last_run are recorded
+when it finishes. Runs are started as background tasks of the API process.
+Progress (run totals, case and step status) is published to the event broker
+as it happens.
+"""
+import abc
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from config import (
+    RUNNER_FLUSH_INTERVAL_SECONDS,
+    RUNNER_HEARTBEAT_SECONDS,
+    RUNNER_MAX_WORKERS,
+    RUNNER_RESULT_BATCH_SIZE,
+    RUNNER_STALE_SECONDS,
+    RUNNER_STEP_TIMEOUT_SECONDS,
+    RUNNER_STUB_STEP_DELAY_SECONDS,
+)
+from crud import (
+    add_test_results,
+    create_test_run,
+    fail_stale_test_runs,
+    finish_test_run,
+    get_environment_by_id,
+    heartbeat_test_runs,
+    mark_test_run_started,
+    resolve_run_test_cases,
+)
+from database import SessionLocal, call_with_session
+from events import Broker, get_broker, project_channel, run_channel
+from fastapi.concurrency import run_in_threadpool
+from logging_config import get_logger
+from models import TestCase, TestResultStatus, TestRun, TestRunStatus
+from schemas import TestRunCreate
+from sqlalchemy.orm import Session
+
+if TYPE_CHECKING:
+    import httpx
+
+# Logger
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class StepSpec:
+    """A test step detached from the ORM session"""
+
+    step_number: int
+    action: str
+    element: Optional[str] = None
+    value: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class CaseSpec:
+    """A test case and its ordered steps, detached from the ORM session"""
+
+    id: int
+    name: str
+    steps: Tuple[StepSpec, ...] = ()
+
+    @classmethod
+    def from_model(cls, test_case: TestCase) -> "CaseSpec":
+        steps = sorted(test_case.steps, key=lambda step: step.step_number)
+        return cls(
+            id=test_case.id,
+            name=test_case.name,
+            steps=tuple(
+                StepSpec(step.step_number, step.action, step.element, step.value)
+                for step in steps
+            ),
+        )
+
+
+@dataclass
+class RunSummary:
+    """Running totals of a test run"""
+
+    total: int = 0
+    passed: int = 0
+    failed: int = 0
+    errored: int = 0
+
+    @property
+    def status(self) -> TestRunStatus:
+        if self.failed:
+            return TestRunStatus.FAILED
+        if self.errored:
+            return TestRunStatus.ERROR
+        return TestRunStatus.PASSED
+
+    def counts(self) -> Dict[str, int]:
+        return {"passed": self.passed, "failed": self.failed, "errored": self.errored}
+
+
+class StepFailure(Exception):
+    """A step ran but the condition it checks did not hold"""
+
+
+class Executor(abc.ABC):
+    """Runs test steps; subclasses implement run_step
+
+    `state` is a dict private to the current test case, for passing data (such
+    as the last response) between its steps. Raise StepFailure when a check
+    fails; any other exception marks the case as errored.
+    """
+
+    name = ""
+
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = base_url
+
+    async def __aenter__(self) -> "Executor":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    @abc.abstractmethod
+    async def run_step(self, step: StepSpec, state: Dict[str, Any]) -> Optional[str]:
+        ...
+
+
+class StubExecutor(Executor):
+    """Offline executor: every step passes after a fixed delay
+
+    The actions "fail" and "error" simulate a failed check and a broken step.
+    """
+
+    name = "stub"
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        delay: float = RUNNER_STUB_STEP_DELAY_SECONDS,
+    ):
+        super().__init__(base_url)
+        self.delay = delay
+
+    async def run_step(self, step: StepSpec, state: Dict[str, Any]) -> Optional[str]:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        action = step.action.lower()
+        if action == "fail":
+            raise StepFailure(step.value or "Simulated failure")
+        if action == "error":
+            raise RuntimeError(step.value or "Simulated error")
+        return None
+
+
+class HttpExecutor(Executor):
+    """Runs API steps with httpx against the run's environment URL
+
+    Request actions (get/open/navigate, post, put, patch, delete) send the
+    request to `element` (a path or URL) with `value` as the body. Check
+    actions apply to the case's last response: assert_status compares the
+    status code with `value`, assert_text looks for `value` in the body.
+    """
+
+    name = "http"
+    REQUEST_ACTIONS = {
+        "get": "GET",
+        "open": "GET",
+        "navigate": "GET",
+        "post": "POST",
+        "put": "PUT",
+        "patch": "PATCH",
+        "delete": "DELETE",
+    }
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
+    ):
+        super().__init__(base_url)
+        # httpx is only imported once a run uses this executor
+        import httpx
+
+        self.client = httpx.AsyncClient(
+            base_url=base_url or "",
+            transport=transport,
+            timeout=RUNNER_STEP_TIMEOUT_SECONDS,
+            follow_redirects=True,
+        )
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.client.aclose()
+
+    async def run_step(self, step: StepSpec, state: Dict[str, Any]) -> Optional[str]:
+        action = step.action.lower()
+        if action in self.REQUEST_ACTIONS:
+            method = self.REQUEST_ACTIONS[action]
+            if method == "GET":
+                target, body = step.element or step.value or "/", None
+            else:
+                target, body = step.element or "/", step.value
+            response = await self.client.request(method, target, content=body)
+            state["response"] = response
+            return f"{method} {response.url} -> {response.status_code}"
+
+        response = state.get("response")
+        if response is None:
+            raise StepFailure(f"{step.action} needs a request step before it")
+        if action == "assert_status":
+            expected = (step.value or "").strip()
+            if str(response.status_code) != expected:
+                raise StepFailure(
+                    f"Expected status {expected}, got {response.status_code}"
+                )
+            return None
+        if action == "assert_text":
+            if (step.value or "") not in response.text:
+                raise StepFailure(f"Response does not contain {step.value!r}")
+            return None
+        raise ValueError(f"Unsupported action for the http executor: {step.action}")
+
+
+EXECUTORS = {StubExecutor.name: StubExecutor, HttpExecutor.name: HttpExecutor}
+
+
+def create_executor(name: str, base_url: Optional[str] = None) -> Executor:
+    """Instantiate a registered executor by name"""
+    return EXECUTORS[name](base_url)
+
+
+def prepare_test_run(
+    db: Session, run_data: TestRunCreate, project_id: int, created_by: str
+) -> Optional[Tuple[TestRun, List[CaseSpec], Optional[str]]]:
+    """Create a queued run and snapshot its cases
+
+    Returns the run, its cases and the environment URL, or None if the target
+    or the environment does not exist in the project.
+    """
+    environment = None
+    if run_data.environment_id is not None:
+        environment = get_environment_by_id(db, run_data.environment_id, project_id)
+        if not environment:
+            return None
+
+    test_cases = resolve_run_test_cases(db, run_data, project_id)
+    if test_cases is None:
+        return None
+    cases = [CaseSpec.from_model(test_case) for test_case in test_cases]
+
+    test_run = create_test_run(
+        db,
+        run_data,
+        project_id,
+        created_by,
+        environment.name if environment else None,
+        len(cases),
+    )
+    return test_run, cases, environment.url if environment else None
+
+
+@dataclass
+class Runner:
+    """Executes the cases of one run and persists the outcome"""
+
+    executor: Executor
+    max_workers: int = RUNNER_MAX_WORKERS
+    batch_size: int = RUNNER_RESULT_BATCH_SIZE
+    flush_interval: float = RUNNER_FLUSH_INTERVAL_SECONDS
+    step_timeout: float = RUNNER_STEP_TIMEOUT_SECONDS
+    session_factory: Callable[[], Session] = field(default=SessionLocal)
+    broker: Broker = field(default_factory=get_broker)
+    channels: Tuple[str, ...] = ()
+
+    async def run(
+        self, test_run_id: int, project_id: int, cases: List[CaseSpec]
+    ) -> RunSummary:
+        """Execute `cases` and record the results of run `test_run_id`"""
+        summary = RunSummary(total=len(cases))
+        status = TestRunStatus.ERROR
+        self.channels = (run_channel(test_run_id), project_channel(project_id))
+        await self._db(mark_test_run_started, test_run_id)
+        await self._publish_run(test_run_id, TestRunStatus.RUNNING, summary)
+        logger.info("Test run %s started: %s cases", test_run_id, len(cases))
+
+        pending: asyncio.Queue = asyncio.Queue()
+        for case in cases:
+            pending.put_nowait(case)
+        results: asyncio.Queue = asyncio.Queue()
+        writer = asyncio.create_task(self._write_results(results))
+        workers = [
+            asyncio.create_task(self._worker(test_run_id, pending, results, summary))
+            for _ in range(min(self.max_workers, len(cases)))
+        ]
+        try:
+            async with self.executor:
+                await asyncio.gather(*workers)
+            await results.put(None)
+            await writer
+            status = summary.status
+        except asyncio.CancelledError:
+            status = TestRunStatus.CANCELLED
+            raise
+        except Exception as e:
+            logger.error("Test run %s crashed: %s", test_run_id, e, exc_info=True)
+            raise
+        finally:
+            for task in workers:
+                task.cancel()
+            # Results already queued are written, also when the run is cancelled
+            if not writer.done():
+                results.put_nowait(None)
+            await asyncio.shield(asyncio.gather(writer, return_exceptions=True))
+            await asyncio.shield(self._finish(test_run_id, project_id, status, summary))
+        return summary
+
+    async def _finish(
+        self,
+        test_run_id: int,
+        project_id: int,
+        status: TestRunStatus,
+        summary: RunSummary,
+    ) -> None:
+        await self._db(
+            finish_test_run, test_run_id, project_id, status, summary.counts()
+        )
+        await self._publish_run(test_run_id, status, summary)
+
+    async def _publish(self, event: Dict[str, Any]) -> None:
+        for channel in self.channels:
+            await self.broker.publish(channel, event)
+
+    async def _publish_run(
+        self, test_run_id: int, status: TestRunStatus, summary: RunSummary
+    ) -> None:
+        await self._publish(
+            {
+                "type": "run",
+                "run_id": test_run_id,
+                "status": status.value,
+                "total": summary.total,
+                **summary.counts(),
+            }
+        )
+
+    async def run_case(self, test_run_id: int, case: CaseSpec) -> Dict[str, Any]:
+        """Run a case's steps in order, skipping the rest after the first failure"""
+        state: Dict[str, Any] = {}
+        status = TestResultStatus.PASSED
+        error = None
+        step_results = []
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        case_event = {"type": "case", "run_id": test_run_id, "test_case_id": case.id}
+        await self._publish({**case_event, "name": case.name, "status": "running"})
+
+        for step in case.steps:
+            if status != TestResultStatus.PASSED:
+                step_results.append(
+                    {"step_number": step.step_number, "status": "skipped"}
+                )
+                continue
+            step_started = time.perf_counter()
+            step_status = TestResultStatus.PASSED
+            try:
+                message = await asyncio.wait_for(
+                    self.executor.run_step(step, state), self.step_timeout
+                )
+            except StepFailure as e:
+                step_status, message = TestResultStatus.FAILED, str(e)
+            except asyncio.TimeoutError:
+                step_status = TestResultStatus.ERROR
+                message = f"Timed out after {self.step_timeout}s"
+            except Exception as e:
+                step_status = TestResultStatus.ERROR
+                message = str(e) or type(e).__name__
+            if step_status != TestResultStatus.PASSED:
+                status = step_status
+                error = f"Step {step.step_number} ({step.action}): {message}"
+            step_result = {
+                "step_number": step.step_number,
+                "status": step_status.value,
+                "duration_ms": round((time.perf_counter() - step_started) * 1000),
+                "message": message,
+            }
+            step_results.append(step_result)
+            await self._publish({**case_event, "type": "step", **step_result})
+
+        duration_ms = round((time.perf_counter() - started) * 1000)
+        await self._publish(
+            {
+                **case_event,
+                "name": case.name,
+                "status": status.value,
+                "duration_ms": duration_ms,
+                "error": error,
+            }
+        )
+        return {
+            "test_run_id": test_run_id,
+            "test_case_id": case.id,
+            "test_case_name": case.name,
+            "status": status,
+            "duration_ms": duration_ms,
+            "error": error,
+            "step_results": step_results,
+            "started_at": started_at,
+            "finished_at": datetime.now(timezone.utc),
+        }
+
+    async def _worker(
+        self,
+        test_run_id: int,
+        pending: asyncio.Queue,
+        results: asyncio.Queue,
+        summary: RunSummary,
+    ) -> None:
+        while not pending.empty():
+            case = pending.get_nowait()
+            result = await self.run_case(test_run_id, case)
+            if result["status"] == TestResultStatus.PASSED:
+                summary.passed += 1
+            elif result["status"] == TestResultStatus.FAILED:
+                summary.failed += 1
+            else:
+                summary.errored += 1
+            await results.put(result)
+            await self._publish_run(test_run_id, TestRunStatus.RUNNING, summary)
+
+    async def _write_results(self, results: asyncio.Queue) -> None:
+        """Insert results in batches: when a batch fills or the queue goes idle"""
+        batch: List[Dict[str, Any]] = []
+        done = False
+        while not done:
+            idle = False
+            try:
+                result = await asyncio.wait_for(results.get(), self.flush_interval)
+            except asyncio.TimeoutError:
+                idle = True
+            else:
+                if result is None:
+                    done = True
+                else:
+                    batch.append(result)
+            if batch and (done or idle or len(batch) >= self.batch_size):
+                await self._db(add_test_results, batch)
+                batch = []
+
+    async def _db(self, fn: Callable, *args) -> Any:
+        return await run_in_threadpool(self._call, fn, *args)
+
+    def _call(self, fn: Callable, *args) -> Any:
+        db = self.session_factory()
+        try:
+            return fn(db, *args)
+        finally:
+            db.close()
+
+
+# Background runs by id, kept referenced so they are not garbage collected
+_active_runs: Dict[int, asyncio.Task] = {}
+
+
+def start_test_run(
+    test_run_id: int, project_id: int, cases: List[CaseSpec], executor: Executor
+) -> asyncio.Task:
+    """Run a prepared test run in the background"""
+    task = asyncio.create_task(
+        Runner(executor).run(test_run_id, project_id, cases),
+        name=f"test-run-{test_run_id}",
+    )
+    _active_runs[test_run_id] = task
+    task.add_done_callback(_forget_run)
+    return task
+
+
+def _forget_run(task: asyncio.Task) -> None:
+    test_run_id = int(task.get_name().rsplit("-", 1)[-1])
+    _active_runs.pop(test_run_id, None)
+    # Failures were logged and recorded on the run by Runner.run
+    if not task.cancelled():
+        task.exception()
+
+
+async def cancel_active_runs() -> None:
+    """Cancel runs still in progress and wait for them to record it"""
+    tasks = list(_active_runs.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _run_heartbeat(interval: float, stale_after: float) -> None:
+    while True:
+        try:
+            await run_in_threadpool(
+                call_with_session, heartbeat_test_runs, list(_active_runs)
+            )
+            stale_before = datetime.now(timezone.utc) - timedelta(seconds=stale_after)
+            await run_in_threadpool(
+                call_with_session, fail_stale_test_runs, stale_before
+            )
+        except Exception as e:
+            logger.error("Test run heartbeat failed: %s", e)
+        await asyncio.sleep(interval)
+
+
+_heartbeat_task: Optional[asyncio.Task] = None
+
+
+def start_run_heartbeat(
+    interval: float = RUNNER_HEARTBEAT_SECONDS,
+    stale_after: float = RUNNER_STALE_SECONDS,
+) -> None:
+    """Keep this process's runs alive and fail the runs of processes that died
+
+    Runs execute in the process that started them. When it crashes or restarts
+    their heartbeat stops, and the next process to check marks them as errored
+    instead of leaving them running forever.
+    """
+    global _heartbeat_task
+    if _heartbeat_task is None:
+        _heartbeat_task = asyncio.create_task(
+            _run_heartbeat(interval, stale_after), name="test-run-heartbeat"
+        )
+
+
+async def stop_run_heartbeat() -> None:
+    """Stop the heartbeat started by start_run_heartbeat"""
+    global _heartbeat_task
+    if _heartbeat_task is not None:
+        _heartbeat_task.cancel()
+        await asyncio.gather(_heartbeat_task, return_exceptions=True)
+        _heartbeat_task = None
@@ -1,16 +1,20 @@
 import re
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, List, Literal, Optional
 
 from models import (
+    ChangeAction,
     ElementStatus,
     ElementType,
+    JobStatus,
     TestCasePriority,
     TestCaseStatus,
     TestDataStatus,
     TestDataType,
+    TestResultStatus,
+    TestRunStatus,
 )
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 # Email validation function
@@ -28,6 +32,17 @@ class UserLogin(BaseModel):
     password: str = Field(..., description="User password")
 
 
+class UserCreate(BaseModel):
+    email: str = Field(..., description="User email address")
+    password: str = Field(..., min_length=8, description="User password")
+    full_name: str = Field(..., min_length=1)
+
+    @field_validator("email")
+    @classmethod
+    def check_email(cls, value: str) -> str:
+        return validate_email(value.strip())
+
+
 class UserResponse(BaseModel):
     id: int
     email: str
@@ -62,6 +77,8 @@ class ProjectResponse(ProjectBase):
     updated_at: Optional[datetime] = None
     last_run: Optional[datetime] = None
     owner_id: int
+    # Latest change log version; start polling /changes?since= from here
+    change_version: int = 0
 
     class Config:
         from_attributes = True
@@ -80,6 +97,19 @@ class TestStepCreate(TestStepBase):
     pass
 
 
+class TestStepUpdate(TestStepBase):
+    # Existing step to update; steps without an id are matched by step_number
+    id: Optional[int] = None
+
+
+class TestStepPatch(BaseModel):
+    step_number: Optional[int] = None
+    action: Optional[str] = None
+    element: Optional[str] = None
+    value: Optional[str] = None
+    description: Optional[str] = None
+
+
 class TestStepResponse(TestStepBase):
     id: int
     created_at: datetime
@@ -105,7 +135,7 @@ class TestCaseCreate(TestCaseBase):
 
 
 class TestCaseUpdate(TestCaseBase):
-    steps: List[TestStepCreate] = []
+    steps: List[TestStepUpdate] = []
 
 
 class TestCaseResponse(TestCaseBase):
@@ -120,6 +150,19 @@ class TestCaseResponse(TestCaseBase):
         from_attributes = True
 
 
+# Bulk import schemas
+class BulkImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class BulkImportResponse(BaseModel):
+    created: int = 0
+    failed: int = 0
+    errors: List[BulkImportRowError] = []
+    errors_truncated: bool = False
+
+
 # Element schemas
 class ElementBase(BaseModel):
     name: str
@@ -255,3 +298,158 @@ class EnvironmentResponse(EnvironmentBase):
 
     class Config:
         from_attributes = True
+
+
+# Test Run schemas
+class TestRunCreate(BaseModel):
+    # Exactly one of the targets must be given
+    test_suite_id: Optional[int] = None
+    test_plan_id: Optional[int] = None
+    test_case_ids: Optional[List[int]] = None
+    executor: str = "stub"
+    environment_id: Optional[int] = None
+
+
+class TestRunResponse(BaseModel):
+    id: int
+    status: TestRunStatus
+    executor: str
+    environment: Optional[str] = None
+    total: int
+    passed: int
+    failed: int
+    errored: int
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    created_by: str
+    project_id: int
+    test_suite_id: Optional[int] = None
+    test_plan_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
+class TestResultResponse(BaseModel):
+    id: int
+    test_case_id: int
+    test_case_name: str
+    status: TestResultStatus
+    duration_ms: Optional[int] = None
+    error: Optional[str] = None
+    step_results: List[dict] = []
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class TestRunDetailResponse(TestRunResponse):
+    results: List[TestResultResponse] = []
+
+
+# AI assistant schemas
+class AIAssistantRequest(BaseModel):
+    # Either one chat message (input) or a batch of prompts and/or modules
+    input: Optional[str] = None
+    chat_history: List[Any] = []
+    prompts: List[str] = []
+    modules: List[str] = []
+    # Save the generated test cases to the project
+    persist: bool = False
+
+
+class AIBatchItemResult(BaseModel):
+    prompt: str
+    module: Optional[str] = None
+    ok: bool
+    output: Any = None
+    test_cases: int = 0
+    error: Optional[str] = None
+    duration_ms: int
+
+
+class AIBatchResponse(BaseModel):
+    results: List[AIBatchItemResult]
+    test_cases: List[TestCaseCreate]
+    duplicates: int = 0
+    created_ids: List[int] = []
+    elapsed_ms: int
+
+
+class AITestCaseRejection(BaseModel):
+    index: int
+    name: Optional[str] = None
+    error: str
+
+
+class AITestCasesResponse(BaseModel):
+    test_cases: List[TestCaseCreate]
+    duplicates: int = 0
+    rejected: List[AITestCaseRejection] = []
+    created_ids: List[int] = []
+
+
+# Job schemas
+class JobCreate(BaseModel):
+    kind: str
+    payload: dict = {}
+    # Defaults to the kind's own limit
+    max_attempts: Optional[int] = Field(None, ge=1, le=10)
+
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    progress: int = 0
+    progress_total: Optional[int] = None
+    progress_message: Optional[str] = None
+    attempts: int = 0
+    max_attempts: int
+    cancel_requested: bool = False
+    error: Optional[str] = None
+    run_after: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    created_by: str
+    project_id: int
+
+    class Config:
+        from_attributes = True
+
+
+class JobDetailResponse(JobResponse):
+    result: Any = None
+
+
+class ProjectChangeResponse(BaseModel):
+    version: int
+    entity: str
+    entity_id: int
+    action: ChangeAction
+    changed_at: Optional[datetime] = None
+    # Current state of the row, as its own endpoint returns it; None if deleted
+    data: Optional[dict] = None
+
+
+class ProjectChangesResponse(BaseModel):
+    # Pass back as ?since= to get the changes after these
+    version: int
+    has_more: bool = False
+    changes: List[ProjectChangeResponse] = []
+
+
+class AIGenerateJob(BaseModel):
+    prompt: Literal["test-plans", "test-cases"]
+    refresh: bool = False
+
+
+class BulkImportJob(BaseModel):
+    format: Literal["ndjson", "csv"]
+    data: str
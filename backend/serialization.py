@@ -0,0 +1,105 @@
+"""
+Fast JSON serialization for TestGenie Backend
+Responses are encoded with orjson. Read routes that return rows straight from
+the database can also skip pydantic: trusted_dump walks a response model's
+fields and reads them off the ORM objects, nested models included, without
+validating or converting values that the database already typed.
+"""
+from functools import lru_cache
+from typing import (
+    Any,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+    get_args,
+    get_origin,
+)
+
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+_MISSING = object()
+
+
+class FastJSONResponse(ORJSONResponse):
+    """orjson response whose output matches pydantic's JSON mode
+
+    UTC datetimes end in Z, as pydantic writes them.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        )
+
+
+def _nested_model(annotation: Any) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """The response model inside a field annotation, and whether it is a list"""
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            return None, False
+        annotation = args[0]
+    is_list = get_origin(annotation) in (list, List)
+    if is_list:
+        annotation = get_args(annotation)[0]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, is_list
+    return None, False
+
+
+@lru_cache(maxsize=None)
+def _field_plan(schema: Type[BaseModel]) -> List[tuple]:
+    """(name, nested model, is list, default) for each field of a model"""
+    plan = []
+    for name, field in schema.model_fields.items():
+        nested, is_list = _nested_model(field.annotation)
+        default = _MISSING if field.is_required() else field.get_default(
+            call_default_factory=True
+        )
+        plan.append((name, nested, is_list, default))
+    return plan
+
+
+def trusted_dump(schema: Type[BaseModel], obj: Any) -> dict:
+    """A response model's fields read from an ORM object, for orjson
+
+    Only for rows loaded from our own database: values are not validated, so
+    the result matches model_validate(obj).model_dump(mode="json") only as
+    long as the columns already have the field types.
+    """
+    data = {}
+    for name, nested, is_list, default in _field_plan(schema):
+        value = getattr(obj, name, _MISSING)
+        if value is _MISSING:
+            if default is _MISSING:
+                raise AttributeError(f"{type(obj).__name__} has no field {name}")
+            value = default
+        elif nested is not None and value is not None:
+            if is_list:
+                value = [trusted_dump(nested, item) for item in value]
+            else:
+                value = trusted_dump(nested, value)
+        data[name] = value
+    return data
+
+
+def trusted_response(
+    schema: Type[BaseModel], rows: Sequence[Any], response: Optional[Response] = None
+) -> FastJSONResponse:
+    """JSON response for a list of ORM rows, without response model validation
+
+    Headers set on the route's `response` parameter (cursor, ETag) are kept,
+    since FastAPI only merges them into responses it builds itself.
+    """
+    result = FastJSONResponse([trusted_dump(schema, row) for row in rows])
+    if response is not None:
+        for name, value in response.headers.items():
+            if name != "content-length":
+                result.headers[name] = value
+    return result
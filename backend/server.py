@@ -0,0 +1,37 @@
+"""
+Production server hooks for TestGenie Backend
+The gunicorn worker class and the master/worker hooks used by gunicorn.conf.py.
+The app is imported once in the master (preload) and forked into workers; each
+worker then opens its own engines, threads and clients in the app lifespan.
+"""
+from config import RUN_MIGRATIONS_ON_STARTUP, SERVER_GRACEFUL_TIMEOUT_SECONDS
+from database import reset_after_fork, run_migrations
+from sqlite_profile import reset_write_lock
+from uvicorn.workers import UvicornWorker
+
+
+class TestGenieWorker(UvicornWorker):
+    """Uvicorn worker on uvloop and httptools when installed
+
+    Open connections (event streams in particular) get a few seconds less than
+    gunicorn's graceful timeout to finish, so the lifespan shutdown still runs
+    before gunicorn kills the worker.
+    """
+
+    CONFIG_KWARGS = {
+        "loop": "auto",
+        "http": "auto",
+        "timeout_graceful_shutdown": max(1, SERVER_GRACEFUL_TIMEOUT_SECONDS - 5),
+    }
+
+
+def on_starting(server) -> None:
+    """Apply migrations once in the master instead of racing in every worker"""
+    if RUN_MIGRATIONS_ON_STARTUP:
+        run_migrations()
+
+
+def post_fork(server, worker) -> None:
+    """Drop state inherited from the master that must not be shared"""
+    reset_after_fork()
+    reset_write_lock()
@@ -0,0 +1,212 @@
+"""
+SQLite production profile for TestGenie Backend
+Connection pragmas (WAL, synchronous, cache, mmap, busy timeout), a process-wide
+writer lock so write transactions queue in the process instead of polling on
+SQLite's busy handler, and a writer thread that group-commits queued writes.
+"""
+import asyncio
+import contextvars
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from logging_config import get_logger
+
+# Logger
+logger = get_logger(__name__)
+
+# Statements that make SQLite take the database write lock
+WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+# One writer at a time per process; the holder is marked on its connection
+_write_lock = threading.Lock()
+_write_lock_timeout = 5.0
+
+
+class WriterConnection(sqlite3.Connection):
+    """sqlite3 connection that gives the process writer lock back on commit"""
+
+    holds_write_lock = False
+
+    def acquire_write_lock(self) -> None:
+        if not self.holds_write_lock:
+            # After the timeout go ahead anyway and leave it to busy_timeout
+            self.holds_write_lock = _write_lock.acquire(timeout=_write_lock_timeout)
+
+    def release_write_lock(self) -> None:
+        if self.holds_write_lock:
+            self.holds_write_lock = False
+            _write_lock.release()
+
+    def commit(self) -> None:
+        try:
+            super().commit()
+        finally:
+            self.release_write_lock()
+
+    def rollback(self) -> None:
+        try:
+            super().rollback()
+        finally:
+            self.release_write_lock()
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self.release_write_lock()
+
+
+def reset_write_lock() -> None:
+    """Replace the writer lock in a forked process
+
+    A lock held by another thread of the parent at fork time would stay held
+    forever in the child.
+    """
+    global _write_lock
+    _write_lock = threading.Lock()
+
+
+def sqlite_connect_args(connect_args: dict) -> dict:
+    """connect_args for create_engine that use WriterConnection"""
+    return {**connect_args, "factory": WriterConnection}
+
+
+def apply_sqlite_profile(
+    engine: Engine,
+    busy_timeout_ms: int,
+    synchronous: str,
+    cache_size_kb: int,
+    mmap_size_mb: int,
+) -> None:
+    """Set the pragmas on every new connection and take the writer lock on writes"""
+    global _write_lock_timeout
+    _write_lock_timeout = busy_timeout_ms / 1000
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute(f"PRAGMA synchronous={synchronous}")
+            cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+            cursor.execute(f"PRAGMA cache_size=-{int(cache_size_kb)}")
+            cursor.execute(f"PRAGMA mmap_size={int(mmap_size_mb) * 1024 * 1024}")
+        finally:
+            cursor.close()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def take_write_lock(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip()[:7].upper().startswith(WRITE_PREFIXES):
+            dbapi_connection = conn.connection.dbapi_connection
+            if isinstance(dbapi_connection, WriterConnection):
+                dbapi_connection.acquire_write_lock()
+
+
+class SQLiteWriter:
+    """Runs write functions on one thread, committing each batch once
+
+    Each function gets a session on the batch's connection whose commit only
+    releases a SAVEPOINT, so a failing function is rolled back alone while the
+    rest of the batch commits together. Futures resolve after the batch commit.
+    """
+
+    def __init__(self, engine: Engine, batch_size: int = 64):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.batches = 0
+        self.writes = 0
+        self._queue: "queue.SimpleQueue[Optional[Tuple]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args) -> "Future[Any]":
+        """Queue `fn(session, *args)` and return a future for its result"""
+        future: "Future[Any]" = Future()
+        self._queue.put((fn, args, future, contextvars.copy_context()))
+        if self._thread is None:
+            self._start()
+        return future
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Queue `fn(session, *args)` and wait for it to be committed"""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stop(self) -> None:
+        """Finish the queued writes and stop the thread"""
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name="sqlite-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _loop(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch: List[Tuple]) -> None:
+        outcomes = []
+        try:
+            with self.engine.connect() as conn:
+                dbapi_connection = conn.connection.dbapi_connection
+                if isinstance(dbapi_connection, WriterConnection):
+                    dbapi_connection.acquire_write_lock()
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+                for fn, args, future, context in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    session = Session(
+                        bind=conn,
+                        join_transaction_mode="create_savepoint",
+                        autoflush=False,
+                    )
+                    try:
+                        outcomes.append((future, context.run(fn, session, *args), None))
+                    except Exception as e:
+                        session.rollback()
+                        outcomes.append((future, None, e))
+                    finally:
+                        session.close()
+                conn.commit()
+        except Exception as e:
+            logger.error("SQLite write batch failed: %s", e, exc_info=True)
+            for _, _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.writes += len(outcomes)
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
@@ -0,0 +1,275 @@
+"""
+Async client for the Superwise agent API
+Shares one keep-alive connection pool per process, bounds concurrent calls and
+retries transient failures with exponential backoff
+"""
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional
+
+from config import (
+    SUPERWISE_AGENT_ID,
+    SUPERWISE_API_URL,
+    SUPERWISE_CONNECT_TIMEOUT_SECONDS,
+    SUPERWISE_MAX_CONCURRENCY,
+    SUPERWISE_MAX_CONNECTIONS,
+    SUPERWISE_MAX_RETRIES,
+    SUPERWISE_RETRY_BACKOFF_SECONDS,
+    SUPERWISE_TIMEOUT_SECONDS,
+)
+from logging_config import get_logger
+from metrics import record_superwise_call
+
+if TYPE_CHECKING:
+    import httpx
+
+# Logger
+logger = get_logger(__name__)
+
+# Upstream statuses worth retrying; everything else is returned to the caller
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+# A Retry-After longer than this is returned to the caller instead of waited out
+MAX_RETRY_AFTER_SECONDS = 30.0
+
+# Streaming calls accept server-sent events and fall back to a chunked JSON body
+STREAM_ACCEPT = "text/event-stream, application/json"
+
+
+class SuperwiseError(Exception):
+    """Raised when the Superwise API call fails after all retries"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def retry_after_seconds(response: "httpx.Response") -> Optional[float]:
+    """Seconds a 429 or 503 response's Retry-After header asks the client to wait"""
+    value = response.headers.get("retry-after")
+    if response.status_code not in (429, 503) or not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class SuperwiseClient:
+    """Pooled async HTTP client for the Superwise agent `/v1/ask` endpoint"""
+
+    def __init__(
+        self,
+        api_url: str = SUPERWISE_API_URL,
+        agent_id: str = SUPERWISE_AGENT_ID,
+        timeout: float = SUPERWISE_TIMEOUT_SECONDS,
+        connect_timeout: float = SUPERWISE_CONNECT_TIMEOUT_SECONDS,
+        max_connections: int = SUPERWISE_MAX_CONNECTIONS,
+        max_concurrency: int = SUPERWISE_MAX_CONCURRENCY,
+        max_retries: int = SUPERWISE_MAX_RETRIES,
+        backoff: float = SUPERWISE_RETRY_BACKOFF_SECONDS,
+    ):
+        self.ask_url = f"{api_url.rstrip('/')}/{agent_id}/v1/ask"
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # httpx is imported with the first client rather than at startup
+        import httpx
+
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            headers={"accept": "application/json", "content-type": "application/json"},
+        )
+
+    async def ask(
+        self, prompt: str, chat_history: Optional[List[Any]] = None
+    ) -> Dict[str, Any]:
+        """Send a prompt to the agent and return the decoded JSON response"""
+        payload = {"input": prompt, "chat_history": chat_history or []}
+        async with self._semaphore:
+            return await self._post_with_retries(payload)
+
+    async def stream(
+        self, prompt: str, chat_history: Optional[List[Any]] = None
+    ) -> "SuperwiseStream":
+        """Send a prompt and return once the agent starts answering
+
+        Retries happen only before the first byte; the caller must iterate or
+        close the returned stream to free the connection and concurrency slot.
+        """
+        payload = {"input": prompt, "chat_history": chat_history or []}
+        started = time.monotonic()
+        await self._semaphore.acquire()
+        try:
+            response = await self._post_with_retries(payload, stream=True)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return SuperwiseStream(response, self._semaphore, started)
+
+    async def _post_with_retries(
+        self, payload: Dict[str, Any], stream: bool = False
+    ) -> Any:
+        """POST the payload, retrying connection errors and retryable statuses
+
+        Only errors raised before the request reached Superwise are retried; a
+        read timeout may mean the agent is still answering, so it is not sent
+        again. Returns the decoded JSON body, or with `stream` the open
+        response whose headers have arrived but whose body is still unread.
+        """
+        import httpx
+
+        attempt = 0
+        while True:
+            try:
+                logger.debug("POST %s (attempt %s)", self.ask_url, attempt + 1)
+                request = self._client.build_request(
+                    "POST",
+                    self.ask_url,
+                    json=payload,
+                    headers={"accept": STREAM_ACCEPT} if stream else None,
+                )
+                sent = time.perf_counter()
+                try:
+                    response = await self._client.send(request, stream=stream)
+                except httpx.TransportError as e:
+                    record_superwise_call(time.perf_counter() - sent, type(e).__name__)
+                    raise
+                record_superwise_call(
+                    time.perf_counter() - sent, str(response.status_code)
+                )
+                delay = self._retry_delay(attempt, response=response)
+                if delay is not None:
+                    await response.aclose()
+                    logger.warning(
+                        "Superwise returned %s, retrying", response.status_code
+                    )
+                else:
+                    if response.is_error:
+                        await response.aread()
+                        await response.aclose()
+                    response.raise_for_status()
+                    return response if stream else response.json()
+            except httpx.HTTPStatusError as e:
+                raise SuperwiseError(str(e), e.response.status_code) from e
+            except httpx.TransportError as e:
+                delay = self._retry_delay(attempt, error=e)
+                if delay is None:
+                    raise SuperwiseError(f"{type(e).__name__}: {e}") from e
+                logger.warning("Superwise connection error, retrying: %r", e)
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def _retry_delay(
+        self,
+        attempt: int,
+        response: Optional["httpx.Response"] = None,
+        error: Optional[Exception] = None,
+    ) -> Optional[float]:
+        """Seconds to wait before retrying, or None to give up
+
+        A Retry-After on the response stretches the backoff, unless it asks
+        for too long a wait.
+        """
+        import httpx
+
+        if attempt >= self.max_retries:
+            return None
+        delay = self.backoff * (2**attempt) * (1 + random.random())
+        if error is not None:
+            # Raised before the request reached Superwise, so safe to send again
+            connect_errors = (
+                httpx.ConnectError,
+                httpx.ConnectTimeout,
+                httpx.PoolTimeout,
+            )
+            return delay if isinstance(error, connect_errors) else None
+        assert response is not None
+        if response.status_code not in RETRYABLE_STATUS_CODES:
+            return None
+        retry_after = retry_after_seconds(response)
+        if retry_after is None:
+            return delay
+        if retry_after > MAX_RETRY_AFTER_SECONDS:
+            return None
+        return max(delay, retry_after)
+
+    async def aclose(self) -> None:
+        """Close pooled connections"""
+        await self._client.aclose()
+
+
+class SuperwiseStream:
+    """An agent answer being received, with its timing
+
+    `ttfb` is the time from sending the prompt to the response headers;
+    `total` is set once the body has been fully read. Closing early (for
+    example when the browser disconnects) drops the upstream connection.
+    """
+
+    def __init__(
+        self, response: "httpx.Response", semaphore: asyncio.Semaphore, started: float
+    ):
+        self.response = response
+        self.started = started
+        self.ttfb = time.monotonic() - started
+        self.total: Optional[float] = None
+        self.size = 0
+        self._semaphore = semaphore
+        self._closed = False
+
+    @property
+    def media_type(self) -> str:
+        return self.response.headers.get("content-type", "application/json")
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        import httpx
+
+        try:
+            async for chunk in self.response.aiter_bytes():
+                self.size += len(chunk)
+                yield chunk
+            self.total = time.monotonic() - self.started
+        except httpx.HTTPError as e:
+            raise SuperwiseError(f"{type(e).__name__}: {e}") from e
+        finally:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        if not self._closed:
+            self._closed = True
+            await self.response.aclose()
+            self._semaphore.release()
+
+
+_client: Optional[SuperwiseClient] = None
+
+
+def get_superwise_client() -> SuperwiseClient:
+    """Return the process-wide Superwise client, creating it on first use"""
+    global _client
+    if _client is None:
+        _client = SuperwiseClient()
+    return _client
+
+
+async def close_superwise_client() -> None:
+    """Close the process-wide Superwise client if it was created"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
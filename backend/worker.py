@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+TestGenie Job Worker
+Runs background jobs outside the API process. Start any number of these next
+to API processes started with JOB_WORKER_IN_PROCESS=false; they share work
+through the jobs table, so no broker is needed.
+"""
+import asyncio
+import signal
+
+from config import RUN_MIGRATIONS_ON_STARTUP
+from database import run_migrations
+from events import close_broker
+from jobs import JobWorker
+from logging_config import get_logger, setup_logging
+from superwise_client import close_superwise_client
+
+# Logger
+logger = get_logger(__name__)
+
+
+async def main() -> None:
+    setup_logging()
+    if RUN_MIGRATIONS_ON_STARTUP:
+        run_migrations()
+    worker = JobWorker()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, worker.stop)
+    try:
+        await worker.run()
+    finally:
+        await close_broker()
+        await close_superwise_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -96,6 +96,7 @@ export default function SignupModal({ isOpen, onClose }: SignupModalProps) {
         setErrors({ general: response.error });
       } else if (response.data) {
         console.log('Registration successful, redirecting to dashboard...');
+        apiClient.setToken(response.data.access_token);
         // Close modal and redirect to dashboard
         onClose();
         router.push('/dashboard');
@@ -18,12 +18,17 @@ interface TestCase {
 }
 
 interface AiTestCase {
-  "Test Case Name": string;
-  "Description": string;
-  "Priority": string;
-  "Browsers": string[];
-  "Environment": string[];
-  "Test Steps": string[];
+  name: string;
+  description: string | null;
+  priority: 'critical' | 'major' | 'medium' | 'minor';
+  browsers: string[];
+  environment: string | null;
+  steps: { step_number: number; action: string }[];
+}
+
+interface AiTestCasesResponse {
+  test_cases: AiTestCase[];
+  duplicates: number;
 }
 
 export default function TestCasesPage() {
@@ -46,41 +51,15 @@ export default function TestCasesPage() {
       const response = await apiClient.getAiTestCases(parseInt(projectId));
       
       if (response.data) {
-        // Extract the output from the response
-        const aiOutput = (response.data as any).output || response.data;
-        console.log('AI Output:', aiOutput); // Debug log
-        
-        try {
-          // Try to extract JSON from the response (in case there's extra text)
-          let jsonString = aiOutput;
-          
-          // Look for JSON array pattern
-          const jsonMatch = aiOutput.match(/\[[\s\S]*\]/);
-          if (jsonMatch) {
-            jsonString = jsonMatch[0];
-          }
-          
-          console.log('Extracted JSON:', jsonString); // Debug log
-          
-          // Try to parse as JSON
-          const parsedData = JSON.parse(jsonString);
-          console.log('Parsed Data:', parsedData); // Debug log
-          
-          if (Array.isArray(parsedData) && parsedData.length > 0) {
-            setAiTestCases(parsedData);
-            setAiResponse(''); // Clear markdown response
-            console.log('Set AI Test Cases:', parsedData); // Debug log
-          } else {
-            setAiResponse(aiOutput); // Fallback to markdown
-            setAiTestCases([]);
-            console.log('Fallback to markdown'); // Debug log
-          }
-        } catch (parseError) {
-          console.error('JSON Parse Error:', parseError); // Debug log
-          // If not JSON, treat as markdown
-          setAiResponse(aiOutput);
-          setAiTestCases([]);
-        }
+        const { test_cases, duplicates } = response.data as AiTestCasesResponse;
+        setAiTestCases(test_cases);
+        setAiResponse(
+          test_cases.length > 0
+            ? ''
+            : duplicates > 0
+              ? 'All generated test cases already exist in this project.'
+              : 'No test cases were generated.'
+        );
       } else if (response.error) {
         setAiResponse(`Error: ${response.error}`);
         setAiTestCases([]);
@@ -313,7 +292,7 @@ export default function TestCasesPage() {
                               wordBreak: 'break-word',
                               lineHeight: '1.4'
                             }}>
-                              {testCase["Test Case Name"]}
+                              {testCase.name}
                             </div>
                           </div>
                           <div className="table-cell description" style={{ wordWrap: 'break-word', overflowWrap: 'break-word' }}>
@@ -324,26 +303,26 @@ export default function TestCasesPage() {
                               lineHeight: '1.4',
                               whiteSpace: 'normal'
                             }}>
-                              {testCase["Description"]}
+                              {testCase.description}
                             </div>
                           </div>
                           <div className="table-cell priority">
-                            <span className={`priority-indicator ${testCase["Priority"].toLowerCase()}`} style={{
+                            <span className={`priority-indicator ${testCase.priority}`} style={{
                               padding: '0.25rem 0.5rem',
                               borderRadius: '0.25rem',
                               fontSize: '0.75rem',
                               fontWeight: '500',
-                              backgroundColor: testCase["Priority"].toLowerCase() === 'high' ? '#fef2f2' : 
-                                             testCase["Priority"].toLowerCase() === 'medium' ? '#fef3c7' : '#f0fdf4',
-                              color: testCase["Priority"].toLowerCase() === 'high' ? '#dc2626' : 
-                                     testCase["Priority"].toLowerCase() === 'medium' ? '#d97706' : '#16a34a'
+                              backgroundColor: ['critical', 'major'].includes(testCase.priority) ? '#fef2f2' : 
+                                             testCase.priority === 'medium' ? '#fef3c7' : '#f0fdf4',
+                              color: ['critical', 'major'].includes(testCase.priority) ? '#dc2626' : 
+                                     testCase.priority === 'medium' ? '#d97706' : '#16a34a'
                             }}>
-                              {testCase["Priority"]}
+                              {testCase.priority}
                             </span>
                           </div>
                           <div className="table-cell browsers">
                             <div className="browsers-list" style={{ display: 'flex', flexWrap: 'wrap', gap: '0.25rem' }}>
-                              {testCase["Browsers"].map((browser, idx) => (
+                              {testCase.browsers.map((browser, idx) => (
                                 <span key={idx} className="browser-tag" style={{
                                   backgroundColor: '#e0e7ff',
                                   color: '#3730a3',
@@ -358,7 +337,7 @@ export default function TestCasesPage() {
                           </div>
                           <div className="table-cell environment">
                             <div className="environment-list" style={{ display: 'flex', flexWrap: 'wrap', gap: '0.25rem' }}>
-                              {testCase["Environment"].map((env, idx) => (
+                              {(testCase.environment ? testCase.environment.split(', ') : []).map((env, idx) => (
                                 <span key={idx} className="environment-tag" style={{
                                   backgroundColor: '#f0fdf4',
                                   color: '#166534',
@@ -381,13 +360,13 @@ export default function TestCasesPage() {
                                 wordBreak: 'break-word',
                                 lineHeight: '1.4'
                               }}>
-                                {testCase["Test Steps"].map((step, idx) => (
+                                {testCase.steps.map((step, idx) => (
                                   <li key={idx} style={{ 
                                     marginBottom: '0.5rem',
                                     wordBreak: 'break-word',
                                     whiteSpace: 'normal'
                                   }}>
-                                    {step}
+                                    {step.action}
                                   </li>
                                 ))}
                               </ol>
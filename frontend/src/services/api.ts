@@ -81,6 +81,51 @@ class ApiClient {
     }
   }
 
+  // Reads a streamed response, passing each decoded chunk to onChunk as it
+  // arrives. Aborting the signal closes the request (and the upstream AI call).
+  private async streamRequest(
+    endpoint: string,
+    onChunk: (text: string) => void,
+    options: RequestInit = {}
+  ): Promise<ApiResponse<string>> {
+    const url = `${this.baseURL}${endpoint}`;
+    const headers: HeadersInit = {
+      'Content-Type': 'application/json',
+      ...options.headers,
+    };
+
+    if (this.token) {
+      headers.Authorization = `Bearer ${this.token}`;
+    }
+
+    try {
+      const response = await fetch(url, { ...options, headers });
+
+      if (!response.ok || !response.body) {
+        const data = await response.json().catch(() => ({}));
+        return {
+          error: data.detail || `HTTP ${response.status}: ${response.statusText}`,
+        };
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let text = '';
+      for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        const chunk = decoder.decode(value, { stream: true });
+        text += chunk;
+        onChunk(chunk);
+      }
+      return { data: text };
+    } catch (error) {
+      return {
+        error: error instanceof Error ? error.message : 'Network error',
+      };
+    }
+  }
+
   // Authentication
   async login(email: string, password: string) {
     return this.request('/api/auth/login', {
@@ -222,6 +267,14 @@ class ApiClient {
     });
   }
 
+  // Generates test cases for several modules concurrently; persist saves them
+  async generateAiTestCases(projectId: number, modules: string[], persist = false) {
+    return this.request(`/api/projects/${projectId}/ai-assistant`, {
+      method: 'POST',
+      body: JSON.stringify({ modules, persist }),
+    });
+  }
+
   // AI Test Plans
   async getAiTestPlans(projectId: number) {
     return this.request(`/api/projects/${projectId}/ai-test-plans`, {
@@ -229,12 +282,46 @@ class ApiClient {
     });
   }
 
-  // AI Test Cases
+  // AI Test Cases, parsed and validated by the backend; names the project
+  // already has are left out
   async getAiTestCases(projectId: number) {
-    return this.request(`/api/projects/${projectId}/ai-test-cases`, {
+    return this.request(`/api/projects/${projectId}/ai-test-cases?parsed=true`, {
       method: 'GET',
     });
   }
+
+  async saveAiTestCases(projectId: number) {
+    return this.request(`/api/projects/${projectId}/ai-test-cases`, {
+      method: 'POST',
+    });
+  }
+
+  // Streamed variants of the AI calls; pass an AbortSignal to cancel
+  async streamAiAssistant(
+    projectId: number,
+    input: string,
+    chatHistory: any[] = [],
+    onChunk: (text: string) => void,
+    signal?: AbortSignal
+  ) {
+    return this.streamRequest(`/api/projects/${projectId}/ai-assistant?stream=true`, onChunk, {
+      method: 'POST',
+      body: JSON.stringify({ input, chat_history: chatHistory }),
+      signal,
+    });
+  }
+
+  async streamAiTestPlans(projectId: number, onChunk: (text: string) => void, signal?: AbortSignal) {
+    return this.streamRequest(`/api/projects/${projectId}/ai-test-plans?stream=true`, onChunk, {
+      signal,
+    });
+  }
+
+  async streamAiTestCases(projectId: number, onChunk: (text: string) => void, signal?: AbortSignal) {
+    return this.streamRequest(`/api/projects/${projectId}/ai-test-cases?stream=true`, onChunk, {
+      signal,
+    });
+  }
 }
 
 export const apiClient = new ApiClient(API_BASE_URL);
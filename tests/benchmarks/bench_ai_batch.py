@@ -0,0 +1,94 @@
+# TestGenie AI Batch Benchmark
+# Run with: python tests/benchmarks/bench_ai_batch.py [--modules 50] [--ai-delay 2]
+#
+# Starts a fake Superwise agent that answers each prompt with a few test cases
+# after --ai-delay seconds, then generates and saves test cases for --modules
+# modules through one batched /ai-assistant request. With --serial it also
+# times the same modules sent one request at a time. Exits non-zero if the
+# batch takes more than a few agent latencies.
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from harness import create_project, fake_superwise, login, run_backend
+
+
+def agent_output(prompt):
+    """Three test cases named after the module in the prompt"""
+    module = prompt.split(" module of ")[0].rsplit("for the ", 1)[-1]
+    return json.dumps(
+        [
+            {
+                "Test Case Name": f"{module}: case {n}",
+                "Description": "Generated by the fake agent",
+                "Priority": "Medium",
+                "Browsers": ["Chrome"],
+                "Environment": ["Staging"],
+                "Test Steps": ["Open the page", "Check the result"],
+            }
+            for n in range(3)
+        ]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modules", type=int, default=50)
+    parser.add_argument("--ai-delay", type=float, default=2.0)
+    parser.add_argument("--serial", action="store_true")
+    args = parser.parse_args()
+
+    modules = [f"module {n}" for n in range(args.modules)]
+    env = {
+        "SUPERWISE_MAX_CONCURRENCY": str(args.modules),
+        "SUPERWISE_MAX_CONNECTIONS": str(args.modules),
+        "AI_BATCH_MAX_CONCURRENCY": str(args.modules),
+    }
+    with fake_superwise(delay=args.ai_delay, output=agent_output) as superwise_url:
+        env["SUPERWISE_API_URL"] = superwise_url
+        with run_backend(env=env) as base_url:
+            headers = login(base_url)
+            project_id = create_project(base_url, headers)
+            url = f"{base_url}/api/projects/{project_id}/ai-assistant"
+
+            started = time.perf_counter()
+            response = requests.post(
+                url,
+                json={"modules": modules, "persist": True},
+                headers=headers,
+                timeout=600,
+            )
+            batch_seconds = time.perf_counter() - started
+            response.raise_for_status()
+            result = response.json()
+            failed = sum(not item["ok"] for item in result["results"])
+            print(
+                f"batch      {len(modules)} modules in {batch_seconds:6.2f}s: "
+                f"{len(result['test_cases'])} test cases, {result['duplicates']} "
+                f"duplicates, {len(result['created_ids'])} saved, {failed} failed"
+            )
+
+            if args.serial:
+                started = time.perf_counter()
+                for module in modules:
+                    requests.post(
+                        url, json={"input": module}, headers=headers, timeout=600
+                    ).raise_for_status()
+                serial_seconds = time.perf_counter() - started
+                print(f"serial     {len(modules)} modules in {serial_seconds:6.2f}s")
+
+    if failed or batch_seconds > 3 * args.ai_delay:
+        print(f"FAIL: batch took {batch_seconds:.2f}s for a {args.ai_delay}s agent")
+        sys.exit(1)
+    print("OK: a batch of modules takes about one agent latency")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# TestGenie AI Streaming Benchmark
+# Run with: python tests/benchmarks/bench_ai_streaming.py [--ai-delay 3] [--chunks 30]
+#
+# Starts a fake Superwise agent that streams its answer as server-sent events
+# over --ai-delay seconds and compares, through the backend, time to first byte
+# and total time of the buffered AI endpoint against ?stream=true. Then opens a
+# stream, disconnects after the first chunk and checks that the backend dropped
+# the upstream call instead of reading it to the end.
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from harness import create_project, fake_superwise, login, run_backend
+
+
+async def timed_get(client, url, headers):
+    """Return (ttfb_ms, total_ms, body size) for one request"""
+    started = time.perf_counter()
+    ttfb = None
+    size = 0
+    async with client.stream("GET", url, headers=headers) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            if ttfb is None:
+                ttfb = time.perf_counter() - started
+            size += len(chunk)
+    return ttfb * 1000, (time.perf_counter() - started) * 1000, size
+
+
+async def disconnect_early(client, url, headers):
+    async with client.stream("GET", url, headers=headers) as response:
+        async for _ in response.aiter_bytes():
+            break
+
+
+async def run(base_url, headers, project_id, ai_delay, events):
+    path = f"/api/projects/{project_id}/ai-test-plans?refresh=true"
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        for label, url in (("buffered", path), ("streamed", path + "&stream=true")):
+            ttfb, total, size = await timed_get(client, url, headers)
+            print(f"{label:<10} ttfb={ttfb:>8.0f}ms total={total:>8.0f}ms bytes={size}")
+
+        events.clear()
+        await disconnect_early(client, path + "&stream=true", headers)
+        deadline = time.monotonic() + ai_delay
+        while not events and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+    return events[:1] == ["disconnected"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ai-delay", type=float, default=3.0)
+    parser.add_argument("--chunks", type=int, default=30)
+    args = parser.parse_args()
+
+    events = []
+    with fake_superwise(delay=args.ai_delay, chunks=args.chunks, events=events) as url:
+        with run_backend(env={"SUPERWISE_API_URL": url}) as base_url:
+            headers = login(base_url)
+            project_id = create_project(base_url, headers)
+            cancelled = asyncio.run(
+                run(base_url, headers, project_id, args.ai_delay, events)
+            )
+
+    if not cancelled:
+        print("FAIL: upstream stream kept running after the client disconnected")
+        sys.exit(1)
+    print("OK: client disconnect cancelled the upstream call")
+
+
+if __name__ == "__main__":
+    main()
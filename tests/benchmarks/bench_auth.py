@@ -0,0 +1,109 @@
+# TestGenie Auth Overhead Benchmark
+# Run with: python tests/benchmarks/bench_auth.py [--requests 20000] [--concurrency 200]
+#
+# Measures what authentication adds to each request, in process so network
+# noise does not hide it: verify_token per call with and without the token
+# claims cache, then requests per second through the ASGI app for an
+# unauthenticated route and an authenticated one with the cache on and off.
+# Exits non-zero if a cached verification is not much cheaper than a decode.
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from harness import BACKEND_DIR  # noqa: F401 - puts the backend on sys.path
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench_auth.db"
+)
+os.environ.setdefault("ENABLE_FILE_LOGGING", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import httpx  # noqa: E402
+
+import auth  # noqa: E402
+from config import TEST_USER_EMAIL, TEST_USER_FULL_NAME, TEST_USER_ID  # noqa: E402
+from main import app  # noqa: E402
+
+
+def time_verify(token, calls):
+    """Microseconds per verify_token call"""
+    started = time.perf_counter()
+    for _ in range(calls):
+        assert auth.verify_token(token) is not None
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+async def requests_per_second(path, headers, total, concurrency):
+    transport = httpx.ASGITransport(app=app)
+    client = httpx.AsyncClient(transport=transport, base_url="http://bench")
+    async with client:
+        remaining = iter(range(total))
+
+        async def worker():
+            for _ in remaining:
+                response = await client.get(path, headers=headers)
+                assert response.status_code == 200, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = auth.create_access_token(
+        {"sub": TEST_USER_EMAIL, "uid": TEST_USER_ID, "name": TEST_USER_FULL_NAME}
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+
+    cache_size = auth.token_cache.max_entries
+    auth.token_cache.max_entries = 0
+    auth.token_cache.clear()
+    uncached_us = time_verify(token, args.calls)
+    auth.token_cache.max_entries = cache_size
+    cached_us = time_verify(token, args.calls)
+    print(f"verify_token  uncached {uncached_us:8.1f}us  cached {cached_us:8.1f}us")
+
+    def rps(path, request_headers):
+        return asyncio.run(
+            requests_per_second(path, request_headers, args.requests, args.concurrency)
+        )
+
+    baseline = rps("/api/health", {})
+    cached = rps("/api/ai-cache/stats", headers)
+    auth.token_cache.max_entries = 0
+    auth.token_cache.clear()
+    uncached = rps("/api/ai-cache/stats", headers)
+    auth.token_cache.max_entries = cache_size
+
+    for label, value in (
+        ("no auth (/api/health)", baseline),
+        ("auth, cached claims", cached),
+        ("auth, decode every request", uncached),
+    ):
+        print(f"{label:<32} {value:9.0f} req/s  {1e6 / value:8.1f}us/request")
+    print(
+        f"auth overhead per request: {1e6 / cached - 1e6 / baseline:.1f}us cached, "
+        f"{1e6 / uncached - 1e6 / baseline:.1f}us uncached"
+    )
+
+    if cached_us * 3 > uncached_us:
+        print("FAIL: cached token verification is not clearly cheaper")
+        sys.exit(1)
+    print("OK: verified tokens are served from the claims cache")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# TestGenie Bulk Import Benchmark
+# Run with: python tests/benchmarks/bench_bulk_import.py [--cases 20000] [--steps 5]
+#
+# Starts the backend and imports --cases test cases with --steps steps each
+# through POST /test-cases:bulk (streamed NDJSON), then times --sample cases
+# through the one-case-per-request endpoint and extrapolates it to --cases.
+# Finally streams the project back out through /test-cases:export.
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from harness import create_project, login, run_backend
+
+
+def make_case(n, steps):
+    return {
+        "name": f"Imported case {n}",
+        "description": "Legacy suite import",
+        "priority": "major",
+        "browsers": ["chrome", "firefox"],
+        "steps": [
+            {"step_number": s, "action": "click", "element": f"#button-{s}"}
+            for s in range(1, steps + 1)
+        ],
+    }
+
+
+def ndjson_body(cases, steps):
+    """Yield the request body line by line so it is sent chunked"""
+    for n in range(cases):
+        yield (json.dumps(make_case(n, steps)) + "\n").encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cases", type=int, default=20_000)
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--sample", type=int, default=500)
+    args = parser.parse_args()
+
+    with run_backend() as base_url:
+        headers = login(base_url)
+        session = requests.Session()
+
+        project_id = create_project(base_url, headers, "Bulk import")
+        started = time.perf_counter()
+        response = session.post(
+            f"{base_url}/api/projects/{project_id}/test-cases:bulk",
+            data=ndjson_body(args.cases, args.steps),
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+            timeout=600,
+        )
+        response.raise_for_status()
+        bulk_seconds = time.perf_counter() - started
+        result = response.json()
+        print(
+            f"bulk import:      {result['created']} created, {result['failed']} failed "
+            f"in {bulk_seconds:.2f}s ({result['created'] / bulk_seconds:,.0f} cases/s)"
+        )
+
+        single_project = create_project(base_url, headers, "Single import")
+        started = time.perf_counter()
+        for n in range(args.sample):
+            session.post(
+                f"{base_url}/api/projects/{single_project}/test-cases",
+                json=make_case(n, args.steps),
+                headers=headers,
+                timeout=30,
+            ).raise_for_status()
+        single_seconds = time.perf_counter() - started
+        rate = args.sample / single_seconds
+        print(
+            f"one per request:  {args.sample} created in {single_seconds:.2f}s "
+            f"({rate:,.0f} cases/s, ~{args.cases / rate:.0f}s for {args.cases})"
+        )
+
+        started = time.perf_counter()
+        with session.get(
+            f"{base_url}/api/projects/{project_id}/test-cases:export",
+            headers=headers,
+            stream=True,
+            timeout=600,
+        ) as response:
+            response.raise_for_status()
+            exported = sum(1 for line in response.iter_lines() if line)
+        print(f"export:           {exported} cases in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# TestGenie Concurrency Benchmark
+# Run with: python tests/benchmarks/bench_concurrency.py [--compare-ref <git-ref>]
+#
+# Seeds a project with test cases, then drives /api/projects/{id}/test-cases and
+# /api/projects at 50, 200 and 1000 concurrent clients and reports p50/p99
+# latency. With --compare-ref the same load is replayed against the backend as
+# it was at that ref (for example the commit before a change) for a
+# before/after comparison.
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from harness import (
+    BACKEND_DIR,
+    checkout_backend,
+    create_project,
+    login,
+    run_backend,
+    summarize,
+)
+
+
+def seed(base_url, headers, cases):
+    """Create a project with the given number of test cases"""
+    project_id = create_project(base_url, headers)
+    for index in range(cases):
+        requests.post(
+            f"{base_url}/api/projects/{project_id}/test-cases",
+            json={
+                "name": f"Case {index}",
+                "steps": [
+                    {"step_number": n, "action": "click", "element": f"#el-{n}"}
+                    for n in range(1, 6)
+                ],
+            },
+            headers=headers,
+            timeout=10,
+        ).raise_for_status()
+    return project_id
+
+
+async def drive(base_url, headers, paths, clients, requests_per_client, timeout):
+    """Run `clients` concurrent loops; return latencies in ms and an error count"""
+    samples = []
+    errors = 0
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=timeout, limits=limits
+    ) as client:
+
+        async def worker(offset):
+            nonlocal errors
+            for n in range(requests_per_client):
+                path = paths[(offset + n) % len(paths)]
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path, headers=headers)
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                samples.append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(*(worker(i) for i in range(clients)))
+    return samples, errors
+
+
+def run_suite(label, backend_dir, args):
+    results = []
+    with run_backend(backend_dir=backend_dir) as base_url:
+        headers = login(base_url)
+        project_id = seed(base_url, headers, args.cases)
+        paths = [f"/api/projects/{project_id}/test-cases", "/api/projects"]
+        for clients in args.clients:
+            samples, errors = asyncio.run(
+                drive(
+                    base_url, headers, paths, clients,
+                    args.requests_per_client, args.timeout,
+                )
+            )
+            summary = summarize(f"{label} clients={clients}", samples)
+            summary["errors"] = errors
+            if errors:
+                print(f"  {errors} requests failed or timed out after {args.timeout}s")
+            results.append(summary)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--requests-per-client", type=int, default=5)
+    parser.add_argument("--cases", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--compare-ref", help="git ref to benchmark as 'before'")
+    args = parser.parse_args()
+
+    if args.compare_ref:
+        with checkout_backend(args.compare_ref) as before_dir:
+            run_suite(f"before ({args.compare_ref})", before_dir, args)
+    run_suite("after (working tree)", BACKEND_DIR, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# TestGenie Connection Pool Benchmark
+# Run with: python tests/benchmarks/bench_db_pool.py [--bursts 5] [--burst-size 100]
+#           [--database-url postgresql://...] [--read-url postgresql://...]
+#
+# Sends bursts of concurrent list requests with idle gaps in between, first with
+# a pool too small for the burst (2 connections, no overflow, 1 s timeout) and
+# then with --pool-size and --max-overflow. Prints latency and failed requests.
+# Requests wait for a free connection before taking a worker thread, so an
+# undersized pool shows as latency; pool timeouts would surface as 500s.
+#
+# The default database is a fresh SQLite file standing in for a server. With
+# --database-url pointing at PostgreSQL (e.g. `docker run -e
+# POSTGRES_PASSWORD=bench -p 5432:5432 postgres:16` and
+# `pip install psycopg2-binary`), two more runs drop every server connection
+# between bursts, as a PgBouncer or server restart would: without and with
+# DB_POOL_PRE_PING. --read-url routes the list endpoints to a replica (the same
+# URL works as a stand-in).
+
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from harness import create_project, login, run_backend, summarize
+
+LIST_PATHS = ["/api/projects", "/api/projects/{id}/test-cases", "/api/projects/{id}/jobs"]
+
+TERMINATE_CONNECTIONS = (
+    "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+    "WHERE datname = current_database() AND pid <> pg_backend_pid()"
+)
+
+
+def drop_server_connections(database_url):
+    """Close every other connection to the database on the server side"""
+    from sqlalchemy import create_engine
+
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql(TERMINATE_CONNECTIONS)
+    finally:
+        engine.dispose()
+
+
+async def burst(client, headers, project_id, size, latencies, failures):
+    async def one(n):
+        path = LIST_PATHS[n % len(LIST_PATHS)].format(id=project_id)
+        started = time.perf_counter()
+        try:
+            response = await client.get(path, headers=headers)
+        except httpx.TransportError as e:
+            failures[type(e).__name__] += 1
+        else:
+            if response.status_code >= 400:
+                failures[response.status_code] += 1
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(one(n) for n in range(size)))
+
+
+async def run_bursts(base_url, headers, project_id, args, between=None):
+    latencies, failures = [], Counter()
+    limits = httpx.Limits(max_connections=args.burst_size + 5)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        for n in range(args.bursts):
+            if n and between is not None:
+                between()
+            await burst(
+                client, headers, project_id, args.burst_size, latencies, failures
+            )
+            await asyncio.sleep(args.idle)
+    return latencies, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bursts", type=int, default=5)
+    parser.add_argument("--burst-size", type=int, default=100)
+    parser.add_argument("--idle", type=float, default=1.0)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--max-overflow", type=int, default=20)
+    parser.add_argument("--database-url")
+    parser.add_argument("--read-url")
+    args = parser.parse_args()
+
+    base_env = {"JOB_WORKER_IN_PROCESS": "false"}
+    if args.database_url:
+        base_env["DATABASE_URL"] = args.database_url
+    if args.read_url:
+        base_env["DATABASE_READ_URL"] = args.read_url
+
+    configured = {
+        "DB_POOL_SIZE": str(args.pool_size),
+        "DB_MAX_OVERFLOW": str(args.max_overflow),
+    }
+    runs = [
+        (
+            "pool of 2",
+            {"DB_POOL_SIZE": "2", "DB_MAX_OVERFLOW": "0", "DB_POOL_TIMEOUT": "1"},
+            None,
+        ),
+        (f"pool of {args.pool_size}+{args.max_overflow}", configured, None),
+    ]
+    if args.database_url and args.database_url.startswith("postgresql"):
+        drop = lambda: drop_server_connections(args.database_url)  # noqa: E731
+        runs += [
+            ("dropped connections", {**configured, "DB_POOL_PRE_PING": "false"}, drop),
+            ("dropped + pre-ping", {**configured, "DB_POOL_PRE_PING": "true"}, drop),
+        ]
+
+    failed = {}
+    for label, env, between in runs:
+        with run_backend(env={**base_env, **env}) as base_url:
+            headers = login(base_url)
+            project_id = create_project(base_url, headers)
+            latencies, failures = asyncio.run(
+                run_bursts(base_url, headers, project_id, args, between)
+            )
+        print(f"{label}: {len(latencies)} requests, failures {dict(failures)}")
+        summarize(f"  lists ({label})", latencies)
+        failed[label] = sum(failures.values())
+
+    # Without pre-ping, the first requests after a drop are expected to fail
+    if any(count for label, count in failed.items() if label != "dropped connections"):
+        print("FAIL: requests failed with the configured pool")
+        sys.exit(1)
+    print("OK: bursts are served by the configured pool")
+
+
+if __name__ == "__main__":
+    main()
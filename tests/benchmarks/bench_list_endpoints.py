@@ -0,0 +1,123 @@
+# TestGenie List Endpoint Benchmark
+# Run with: python tests/benchmarks/bench_list_endpoints.py [--rows 100000]
+#
+# Seeds a SQLite database with --rows test cases spread over several projects,
+# then times the first page, a deep page and a filtered page of
+# /api/projects/{id}/test-cases, first at migration 0001 (no project indexes)
+# and again after upgrading to head.
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from harness import BACKEND_DIR, HARDCODED_USER, summarize
+
+
+def seed(engine, rows, projects):
+    """Bulk insert projects, test cases and three steps per case"""
+    from sqlalchemy import insert
+
+    from models import Project, TestCase, TestStep
+
+    started = time.perf_counter()
+    base = datetime(2024, 1, 1)
+    statuses = ["DRAFT", "IN_REVIEW", "READY", "OBSOLETE", "REWORK"]
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Project),
+            [{"name": f"Project {n}", "owner_id": 1} for n in range(projects)],
+        )
+        chunk = 10_000
+        for start in range(0, rows, chunk):
+            cases = [
+                {
+                    "id": n + 1,
+                    "name": f"Case {n}",
+                    "status": statuses[n % len(statuses)],
+                    "priority": "MEDIUM",
+                    "browsers": ["chrome"],
+                    "created_by": "bench",
+                    "project_id": n % projects + 1,
+                    "created_at": base + timedelta(seconds=n),
+                    "updated_at": base + timedelta(seconds=n),
+                }
+                for n in range(start, min(start + chunk, rows))
+            ]
+            conn.execute(insert(TestCase), cases)
+            conn.execute(
+                insert(TestStep),
+                [
+                    {"test_case_id": case["id"], "step_number": s, "action": "click"}
+                    for case in cases
+                    for s in range(1, 4)
+                ],
+            )
+    print(f"Seeded {rows} test cases in {time.perf_counter() - started:.1f}s")
+
+
+def measure(client, headers, project_id, label, repeat):
+    """Time first, deep and filtered pages of the test case list"""
+    url = f"/api/projects/{project_id}/test-cases"
+
+    cursor = None
+    for _ in range(50):
+        response = client.get(url, params={"limit": 100, "cursor": cursor}, headers=headers)
+        cursor = response.headers.get("x-next-cursor")
+
+    cases = {
+        "first page": {"limit": 100},
+        "page 51": {"limit": 100, "cursor": cursor},
+        "status=ready": {"limit": 100, "status": "ready"},
+    }
+    for name, params in cases.items():
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = client.get(url, params=params, headers=headers)
+            response.raise_for_status()
+            samples.append((time.perf_counter() - started) * 1000)
+        summarize(f"{label} {name}", samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        os.environ["RUN_MIGRATIONS_ON_STARTUP"] = "false"
+        os.environ.setdefault("ENABLE_FILE_LOGGING", "false")
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        os.chdir(BACKEND_DIR)
+
+        from fastapi.testclient import TestClient
+
+        import database
+        import main as backend
+
+        database.run_migrations("0001")
+        seed(database.init_database(), args.rows, args.projects)
+
+        client = TestClient(backend.app)
+        token = client.post(
+            "/api/auth/login",
+            json={"email": HARDCODED_USER["email"], "password": HARDCODED_USER["password"]},
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        measure(client, headers, 1, "without indexes:", args.repeat)
+        database.run_migrations("head")
+        measure(client, headers, 1, "with indexes:   ", args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# TestGenie Logging Overhead Benchmark
+# Run with: python tests/benchmarks/bench_logging.py [--requests 5000] [--concurrency 50]
+#
+# Measures what logging costs the code that logs, in process with file logging
+# to a throwaway directory: the caller's median time per logger call (a
+# disabled debug line built eagerly with an f-string vs lazily with %-args, and
+# an enabled info line written synchronously vs handed to the queue listener),
+# then the best of --rounds runs of requests per second for the health and
+# project list routes with logging off, with the old synchronous file handlers
+# and with the queued, sampled pipeline. Exits non-zero if a queued info call is not cheaper for the caller
+# than a synchronous file write.
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from harness import BACKEND_DIR  # noqa: F401 - puts the backend on sys.path
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench_logging.db"
+)
+os.environ.setdefault("ENABLE_FILE_LOGGING", "false")
+os.environ.setdefault("ENABLE_CONSOLE_LOGGING", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("JOB_WORKER_IN_PROCESS", "false")
+
+import httpx  # noqa: E402
+
+import logging_config  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from config import TEST_USER_EMAIL, TEST_USER_FULL_NAME, TEST_USER_ID  # noqa: E402
+from main import app  # noqa: E402
+
+LOG_DIR = tempfile.mkdtemp()
+
+# httpx logs every client request at INFO; keep the client out of the numbers
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def configure(mode):
+    """Set up logging as 'off', 'sync' (direct file handlers) or 'queued'"""
+    if mode == "off":
+        logging_config.setup_logging(
+            log_level="WARNING",
+            enable_file_logging=False,
+            enable_console_logging=False,
+        )
+        return
+    logging_config.setup_logging(
+        log_level="INFO",
+        log_dir=LOG_DIR,
+        enable_file_logging=True,
+        enable_console_logging=False,
+        use_queue=mode == "queued",
+        sample_rates=None if mode == "queued" else {},
+    )
+
+
+def time_calls(call, calls):
+    """Median nanoseconds the caller spends per call"""
+    samples = []
+    for n in range(calls):
+        started = time.perf_counter_ns()
+        call(n)
+        samples.append(time.perf_counter_ns() - started)
+    return statistics.median(samples)
+
+
+def micro(calls):
+    logger = logging.getLogger("bench.logging")
+    item = {"id": 42, "name": "Checkout", "steps": list(range(20))}
+
+    configure("off")
+    eager = time_calls(lambda n: logger.debug(f"Loaded {item} ({n})"), calls)
+    lazy = time_calls(lambda n: logger.debug("Loaded %s (%s)", item, n), calls)
+    print(f"disabled debug   eager f-string {eager:8.0f}ns   lazy %-args {lazy:8.0f}ns")
+
+    configure("sync")
+    sync = time_calls(lambda n: logger.info("Fetched project %s", n), calls)
+    configure("queued")
+    queued = time_calls(lambda n: logger.info("Fetched project %s", n), calls)
+    logging_config.stop_logging()
+    print(f"enabled info     sync file write {sync:7.0f}ns   queued {queued:8.0f}ns")
+    return sync, queued
+
+
+async def requests_per_second(client, path, headers, total, concurrency):
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            response = await client.get(path, headers=headers)
+            assert response.status_code == 200, response.text
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - started)
+
+
+async def run_requests(total, concurrency, rounds):
+    token = create_access_token(
+        {"sub": TEST_USER_EMAIL, "uid": TEST_USER_ID, "name": TEST_USER_FULL_NAME}
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    lifespan = app.router.lifespan_context(app)
+    async with lifespan, httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        response = await client.post(
+            "/api/projects", json={"name": "Logging bench"}, headers=headers
+        )
+        assert response.status_code == 200, response.text
+
+        # Interleave the modes and keep each one's best round, so drift on a
+        # busy machine does not land on a single mode
+        results = {}
+        for _ in range(rounds):
+            for mode in ("off", "sync", "queued"):
+                configure(mode)
+                for path in ("/api/health", "/api/projects"):
+                    value = await requests_per_second(
+                        client, path, headers, total, concurrency
+                    )
+                    results[mode, path] = max(value, results.get((mode, path), 0))
+                logging_config.stop_logging()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    sync_ns, queued_ns = micro(args.calls)
+    results = asyncio.run(run_requests(args.requests, args.concurrency, args.rounds))
+
+    for path in ("/api/health", "/api/projects"):
+        baseline = 1e6 / results["off", path]
+        for mode, label in (
+            ("off", "logging off"),
+            ("sync", "sync file handlers"),
+            ("queued", "queued + sampled"),
+        ):
+            value = results[mode, path]
+            print(
+                f"{path:<14} {label:<20} {value:8.0f} req/s  "
+                f"+{1e6 / value - baseline:7.1f}us/request"
+            )
+
+    if queued_ns >= sync_ns:
+        print("FAIL: a queued log call is not cheaper than a synchronous write")
+        sys.exit(1)
+    print("OK: log file I/O is off the request path")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# TestGenie Serialization Benchmark
+# Run with: python tests/benchmarks/bench_serialization.py [--suites 50] [--cases 100]
+#
+# Builds one test plan over suites x cases test cases (5k by default, 3 steps
+# each) and times turning the loaded rows into a response body three ways:
+# pydantic validation with jsonable_encoder and the stdlib json module (the old
+# path), validation with orjson, and trusted_dump with orjson (the list routes
+# now). Then reports the bytes on the wire of GET /test-plans uncompressed,
+# gzip and, when the brotli package is installed, brotli.
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from harness import BACKEND_DIR  # noqa: F401 - puts the backend on sys.path
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench_serialization.db"
+)
+os.environ.setdefault("ENABLE_FILE_LOGGING", "false")
+os.environ.setdefault("JOB_WORKER_IN_PROCESS", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import orjson  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import compression  # noqa: E402
+import crud  # noqa: E402
+import database  # noqa: E402
+from config import TEST_USER_EMAIL, TEST_USER_PASSWORD  # noqa: E402
+from main import app  # noqa: E402
+from schemas import (  # noqa: E402
+    TestCaseCreate,
+    TestPlanCreate,
+    TestPlanResponse,
+    TestStepCreate,
+    TestSuiteCreate,
+)
+from serialization import FastJSONResponse, trusted_dump  # noqa: E402
+
+
+def seed_plan(db, project_id, suites, cases):
+    """One plan over `suites` suites of `cases` test cases each"""
+    suite_ids = []
+    for suite_index in range(suites):
+        steps = [
+            TestStepCreate(step_number=n, action="click", element=f"#e{n}")
+            for n in range(1, 4)
+        ]
+        case_ids = crud.bulk_create_test_cases(
+            db,
+            [
+                TestCaseCreate(name=f"Case {suite_index}.{n}", steps=steps)
+                for n in range(cases)
+            ],
+            project_id,
+            "bench",
+        )
+        suite = crud.create_project_test_suite(
+            db,
+            TestSuiteCreate(name=f"Suite {suite_index}", test_case_ids=case_ids),
+            project_id,
+            "bench",
+        )
+        suite_ids.append(suite.id)
+    crud.create_project_test_plan(
+        db, TestPlanCreate(name="Plan", test_suite_ids=suite_ids), project_id, "bench"
+    )
+
+
+def stdlib_body(plans):
+    validated = [TestPlanResponse.model_validate(plan) for plan in plans]
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def validated_orjson_body(plans):
+    return FastJSONResponse(
+        [TestPlanResponse.model_validate(plan).model_dump() for plan in plans]
+    ).body
+
+
+def trusted_body(plans):
+    dumped = [trusted_dump(TestPlanResponse, plan) for plan in plans]
+    return FastJSONResponse(dumped).body
+
+
+def best_ms(fn, plans, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(plans)
+        times.append((time.perf_counter() - started) * 1000)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--suites", type=int, default=50)
+    parser.add_argument("--cases", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        token = client.post(
+            "/api/auth/login",
+            json={"email": TEST_USER_EMAIL, "password": TEST_USER_PASSWORD},
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        project_id = client.post(
+            "/api/projects", json={"name": "Serialization"}, headers=headers
+        ).json()["id"]
+
+        db = database.SessionLocal()
+        try:
+            seed_plan(db, project_id, args.suites, args.cases)
+            db.expunge_all()
+            plans, _ = crud.get_project_test_plans(db, project_id)
+
+            assert orjson.loads(trusted_body(plans)) == orjson.loads(
+                stdlib_body(plans)
+            ), "trusted_dump differs from the validated output"
+            print(f"plan with {args.suites * args.cases} test cases")
+            baseline = None
+            for label, fn in (
+                ("validate + jsonable_encoder + json", stdlib_body),
+                ("validate + orjson", validated_orjson_body),
+                ("trusted_dump + orjson", trusted_body),
+            ):
+                elapsed = best_ms(fn, plans, args.repeat)
+                baseline = baseline or elapsed
+                print(f"{label:<40} {elapsed:9.1f}ms  {baseline / elapsed:5.1f}x")
+        finally:
+            db.close()
+
+        path = f"/api/projects/{project_id}/test-plans"
+        encodings = ["identity", "gzip"]
+        if compression.brotli is not None:
+            encodings.append("br")
+        for encoding in encodings:
+            started = time.perf_counter()
+            response = client.get(
+                path, headers={**headers, "Accept-Encoding": encoding}
+            )
+            elapsed = (time.perf_counter() - started) * 1000
+            assert response.status_code == 200, response.text
+            size = int(response.headers["content-length"])
+            print(f"GET test-plans {encoding:<24} {size:>10} bytes  {elapsed:7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
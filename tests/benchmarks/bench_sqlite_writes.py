@@ -0,0 +1,236 @@
+# TestGenie SQLite Write Concurrency Benchmark
+# Run with: python tests/benchmarks/bench_sqlite_writes.py [--writers 32] [--readers 8]
+#           [--seconds 5] [--per-writer 100]
+#
+# Compares three setups on a fresh SQLite file each: no SQLite profile, the
+# pragmas and writer lock without the writer thread, and the full profile.
+#
+# First in process, so HTTP overhead does not hide the database: --writers
+# threads run small read-then-insert transactions (or submit them to the
+# writer thread) while one thread keeps reading. Then through the API:
+# --writers clients create test cases (a sync route, serialized by the writer
+# lock) and queue jobs (an async route, group-committed by the writer thread)
+# while --readers clients page through the test case list.
+#
+# Prints write throughput, write and read latency and failures ("database is
+# locked" surfaces as OperationalError in process and as 500s over HTTP).
+# Exits non-zero if the full profile fails any write.
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from harness import BACKEND_DIR  # noqa: F401 - puts the backend on sys.path
+from harness import create_project, login, run_backend, summarize
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/unused.db")
+os.environ.setdefault("ENABLE_FILE_LOGGING", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from sqlalchemy import create_engine, func, select  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from crud import create_user  # noqa: E402
+from database import Base  # noqa: E402
+from models import User  # noqa: E402
+from sqlite_profile import (  # noqa: E402
+    SQLiteWriter,
+    apply_sqlite_profile,
+    sqlite_connect_args,
+)
+
+PROFILES = {
+    "no profile": {"SQLITE_TUNING": "false"},
+    "pragmas + writer lock": {"SQLITE_WRITE_QUEUE": "false"},
+    "full profile": {},
+}
+
+
+def make_engine(path, profile):
+    connect_args = {"check_same_thread": False}
+    if profile == "no profile":
+        return create_engine(f"sqlite:///{path}", connect_args=connect_args)
+    engine = create_engine(
+        f"sqlite:///{path}", connect_args=sqlite_connect_args(connect_args)
+    )
+    apply_sqlite_profile(
+        engine,
+        busy_timeout_ms=5000,
+        synchronous="NORMAL",
+        cache_size_kb=65536,
+        mmap_size_mb=256,
+    )
+    return engine
+
+
+def run_in_process(profile, writers, per_writer):
+    """Write transactions per second, write latencies and failures"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(Path(tmp) / "bench.db", profile)
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+        writer = SQLiteWriter(engine) if profile == "full profile" else None
+        latencies, failures = [], Counter()
+        stop = threading.Event()
+
+        def write(worker):
+            for n in range(per_writer):
+                email = f"user{worker}-{n}@example.com"
+                started = time.perf_counter()
+                try:
+                    if writer is not None:
+                        writer.submit(create_user, email, "Bench", "hash").result()
+                    else:
+                        db = session_factory()
+                        try:
+                            db.query(User).filter(User.email == email).first()
+                            create_user(db, email, "Bench", "hash")
+                        finally:
+                            db.close()
+                except Exception as e:
+                    failures[type(e).__name__] += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        def read():
+            while not stop.is_set():
+                with engine.connect() as conn:
+                    conn.execute(select(func.count()).select_from(User)).scalar()
+
+        reader = threading.Thread(target=read)
+        threads = [threading.Thread(target=write, args=(w,)) for w in range(writers)]
+        started = time.perf_counter()
+        reader.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        reader.join()
+        if writer is not None:
+            writer.stop()
+        engine.dispose()
+    return len(latencies) / elapsed, latencies, failures
+
+
+async def write_loop(client, headers, project_id, worker, stop, latencies, failures):
+    n = 0
+    while not stop.is_set():
+        if worker % 2:
+            request = client.post(
+                f"/api/projects/{project_id}/test-cases",
+                json={"name": f"Case {worker}-{n}", "steps": []},
+                headers=headers,
+            )
+        else:
+            request = client.post(
+                f"/api/projects/{project_id}/jobs",
+                json={"kind": "ai_generate", "payload": {"prompt": "test-plans"}},
+                headers=headers,
+            )
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.TransportError as e:
+            failures[type(e).__name__] += 1
+        else:
+            if response.status_code >= 400:
+                failures[response.status_code] += 1
+        latencies.append((time.perf_counter() - started) * 1000)
+        n += 1
+
+
+async def read_loop(client, headers, project_id, stop, latencies, failures):
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            response = await client.get(
+                f"/api/projects/{project_id}/test-cases",
+                params={"limit": 50},
+                headers=headers,
+            )
+        except httpx.TransportError as e:
+            failures[type(e).__name__] += 1
+        else:
+            if response.status_code >= 400:
+                failures[response.status_code] += 1
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def run_load(base_url, headers, project_id, writers, readers, seconds):
+    limits = httpx.Limits(max_connections=writers + readers + 5)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        stop = asyncio.Event()
+        writes, reads = [], []
+        write_failures, read_failures = Counter(), Counter()
+        tasks = [
+            asyncio.create_task(
+                write_loop(client, headers, project_id, w, stop, writes, write_failures)
+            )
+            for w in range(writers)
+        ] + [
+            asyncio.create_task(
+                read_loop(client, headers, project_id, stop, reads, read_failures)
+            )
+            for _ in range(readers)
+        ]
+        await asyncio.sleep(seconds)
+        stop.set()
+        await asyncio.gather(*tasks)
+    return writes, reads, write_failures, read_failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=32)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--per-writer", type=int, default=100)
+    args = parser.parse_args()
+
+    failed = Counter()
+    print("In process")
+    for label in PROFILES:
+        rate, latencies, failures = run_in_process(label, args.writers, args.per_writer)
+        print(f"{label}: {rate:.0f} write transactions/s, failures {dict(failures)}")
+        summarize(f"  writes ({label})", latencies)
+        failed[label] += sum(failures.values())
+
+    print("Through the API")
+    env = {"JOB_WORKER_IN_PROCESS": "false"}
+    for label, profile_env in PROFILES.items():
+        with run_backend(env={**env, **profile_env}) as base_url:
+            headers = login(base_url)
+            project_id = create_project(base_url, headers)
+            writes, reads, write_failures, read_failures = asyncio.run(
+                run_load(
+                    base_url, headers, project_id,
+                    args.writers, args.readers, args.seconds,
+                )
+            )
+        print(
+            f"{label}: {len(writes) / args.seconds:.0f} writes/s, failures "
+            f"{dict(write_failures)} (writes) {dict(read_failures)} (reads)"
+        )
+        summarize(f"  writes ({label})", writes)
+        summarize(f"  reads ({label})", reads)
+        failed[label] += sum(write_failures.values())
+
+    if failed["full profile"]:
+        print("FAIL: writes failed with the SQLite profile on")
+        sys.exit(1)
+    print("OK: concurrent writes succeed with the SQLite profile")
+
+
+if __name__ == "__main__":
+    main()
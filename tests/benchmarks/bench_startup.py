@@ -0,0 +1,136 @@
+# TestGenie Startup Benchmark
+# Run with: python tests/benchmarks/bench_startup.py [--runs 5] [--record startup.jsonl]
+#           [--compare-ref <git-ref>]
+#
+# Measures cold start as a scale-from-zero replica sees it: the time to
+# `import main` in a fresh interpreter, and the time from launching uvicorn to
+# the first 200 from /api/health (migrations on an existing database included).
+# Reports the median of --runs after one warm-up run that compiles bytecode and
+# creates the database. With --compare-ref the backend as it was at that ref is
+# measured too. --record appends the result with the current commit to a JSON
+# lines file, so startup time can be tracked over time.
+
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from harness import BACKEND_DIR, checkout_backend, free_port
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import main; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def health_ok(port):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+    try:
+        connection.request("GET", "/api/health")
+        return connection.getresponse().status == 200
+    except OSError:
+        return False
+    finally:
+        connection.close()
+
+
+def time_to_first_200(backend_dir, env, timeout=60.0):
+    """Seconds from launching uvicorn to the first 200 from /api/health"""
+    port = free_port()
+    command = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+    ]
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=backend_dir, env=env)
+    try:
+        while not health_ok(port):
+            if process.poll() is not None:
+                raise RuntimeError("Backend exited before answering /api/health")
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError("Backend did not answer /api/health in time")
+            time.sleep(0.005)
+        return time.perf_counter() - started
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def import_time(backend_dir, env):
+    """Seconds to import main in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=backend_dir, env=env, check=True, capture_output=True, text=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure(backend_dir, runs):
+    """Median import and first-200 times in seconds"""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{Path(tmp) / 'bench.db'}",
+            "ENABLE_FILE_LOGGING": "false",
+            "LOG_LEVEL": "WARNING",
+            "JOB_WORKER_IN_PROCESS": "false",
+        }
+        # Warm-up: writes bytecode caches and migrates the database
+        time_to_first_200(backend_dir, env)
+        imports = [import_time(backend_dir, env) for _ in range(runs)]
+        starts = [time_to_first_200(backend_dir, env) for _ in range(runs)]
+    return statistics.median(imports), statistics.median(starts)
+
+
+def report(label, result):
+    imported, first_200 = result
+    print(
+        f"{label:<24} import main {imported * 1000:8.0f}ms   "
+        f"launch to first 200 {first_200 * 1000:8.0f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--compare-ref")
+    parser.add_argument("--record", help="JSON lines file to append the result to")
+    args = parser.parse_args()
+
+    result = measure(BACKEND_DIR, args.runs)
+    report("working tree", result)
+    if args.compare_ref:
+        with checkout_backend(args.compare_ref) as backend_dir:
+            report(args.compare_ref, measure(backend_dir, args.runs))
+
+    if args.record:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True,
+        ).stdout.strip()
+        entry = {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": commit,
+            "runs": args.runs,
+            "import_ms": round(result[0] * 1000),
+            "first_200_ms": round(result[1] * 1000),
+        }
+        with open(args.record, "a") as record:
+            record.write(json.dumps(entry) + "\n")
+        print(f"Recorded in {args.record}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# TestGenie Step Update Benchmark
+# Run with: python tests/benchmarks/bench_step_updates.py [--compare-ref <git-ref>]
+#
+# Creates a test case with --steps steps, then edits one step at a time through
+# PUT /test-cases/{id} (the full case is sent back, as the UI does) and through
+# PATCH /test-cases/{id}/steps/{step_id}. Triggers on test_steps count the rows
+# actually inserted, updated and deleted. With --compare-ref the PUT run is
+# repeated against the backend at that ref for a before/after comparison.
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from harness import (
+    BACKEND_DIR,
+    checkout_backend,
+    create_project,
+    login,
+    run_backend,
+    summarize,
+)
+
+
+def install_write_counters(db_path):
+    """Count rows written to test_steps with triggers
+
+    Row ids cannot be compared between snapshots: after deleting every step,
+    SQLite hands the same ids out again to the reinserted rows.
+    """
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE bench_step_writes (op TEXT PRIMARY KEY, rows INT)")
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute("INSERT INTO bench_step_writes VALUES (?, 0)", (op,))
+            conn.execute(
+                f"CREATE TRIGGER bench_step_{op.lower()} AFTER {op} ON test_steps "
+                f"BEGIN UPDATE bench_step_writes SET rows = rows + 1 "
+                f"WHERE op = '{op}'; END"
+            )
+
+
+def write_counts(db_path):
+    """Rows inserted, updated and deleted in test_steps so far"""
+    with sqlite3.connect(db_path) as conn:
+        counts = dict(conn.execute("SELECT op, rows FROM bench_step_writes"))
+    return [counts["INSERT"], counts["UPDATE"], counts["DELETE"]]
+
+
+def run_edits(label, backend_dir, args, use_patch):
+    """Edit one step per request and report rows written and latency"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "steps.db"
+        env = {"DATABASE_URL": f"sqlite:///{db_path}"}
+        with run_backend(env=env, backend_dir=backend_dir) as base_url:
+            headers = login(base_url)
+            session = requests.Session()
+            project_id = create_project(base_url, headers)
+            case_url = f"{base_url}/api/projects/{project_id}/test-cases"
+            case = session.post(
+                case_url,
+                json={
+                    "name": "Long case",
+                    "steps": [
+                        {"step_number": n, "action": "click", "element": f"#e{n}"}
+                        for n in range(1, args.steps + 1)
+                    ],
+                },
+                headers=headers,
+                timeout=30,
+            ).json()
+            case_url = f"{case_url}/{case['id']}"
+            install_write_counters(db_path)
+
+            samples = []
+            for edit in range(args.edits):
+                case = session.get(case_url, headers=headers, timeout=30).json()
+                step = sorted(case["steps"], key=lambda s: s["step_number"])[
+                    edit % args.steps
+                ]
+                started = time.perf_counter()
+                if use_patch:
+                    response = session.patch(
+                        f"{case_url}/steps/{step['id']}",
+                        json={"value": f"edit {edit}"},
+                        headers=headers,
+                        timeout=30,
+                    )
+                else:
+                    step["value"] = f"edit {edit}"
+                    response = session.put(
+                        case_url, json=case, headers=headers, timeout=30
+                    )
+                response.raise_for_status()
+                samples.append((time.perf_counter() - started) * 1000)
+            totals = write_counts(db_path)
+
+    inserted, updated, deleted = (total / args.edits for total in totals)
+    print(
+        f"{label:<40} rows written per edit: {inserted + updated + deleted:>6.1f} "
+        f"(insert {inserted:.1f}, update {updated:.1f}, delete {deleted:.1f})"
+    )
+    summarize(f"{label} latency", samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--edits", type=int, default=50)
+    parser.add_argument("--compare-ref", help="git ref to benchmark as 'before'")
+    args = parser.parse_args()
+
+    if args.compare_ref:
+        with checkout_backend(args.compare_ref) as before_dir:
+            run_edits(f"PUT before ({args.compare_ref})", before_dir, args, False)
+    run_edits("PUT after (working tree)", BACKEND_DIR, args, False)
+    run_edits("PATCH step (working tree)", BACKEND_DIR, args, True)
+
+
+if __name__ == "__main__":
+    main()
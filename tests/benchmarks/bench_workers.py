@@ -0,0 +1,87 @@
+# TestGenie Server Workers Benchmark
+# Run with: python tests/benchmarks/bench_workers.py [--workers 1 2 4 8]
+#           [--duration 10] [--concurrency 64]
+#
+# Starts the production server (gunicorn.conf.py, preloaded app, uvicorn
+# workers) with each worker count and keeps --concurrency clients busy on
+# /api/health and the project list for --duration seconds. Prints req/s and
+# latency per worker count. Throughput should grow with workers up to the number
+# of CPU cores; the load generator runs on the same machine and takes a share of
+# them, so run it on a machine with spare cores for numbers that mean anything.
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from harness import create_project, login, run_backend, summarize
+
+SERVER_ARGS = [
+    sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app",
+    "--bind", "127.0.0.1:{port}", "--log-level", "warning",
+]
+
+
+async def drive(base_url, headers, paths, duration, concurrency):
+    """Keep concurrency clients busy for duration seconds"""
+    latencies, failures = [], Counter()
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+
+        async def client_loop(n):
+            while time.perf_counter() < deadline:
+                path = paths[n % len(paths)]
+                n += 1
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path, headers=headers)
+                except httpx.TransportError as e:
+                    failures[type(e).__name__] += 1
+                    continue
+                if response.status_code >= 400:
+                    failures[response.status_code] += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, failures, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPU cores")
+    for workers in args.workers:
+        env = {
+            "SERVER_WORKERS": str(workers),
+            "JOB_WORKER_IN_PROCESS": "false",
+        }
+        with run_backend(env=env, args=SERVER_ARGS) as base_url:
+            headers = login(base_url)
+            create_project(base_url, headers)
+            paths = ["/api/health", "/api/projects"]
+            # Warm-up: every worker opens its connections and fills its caches
+            asyncio.run(drive(base_url, headers, paths, 1.0, args.concurrency))
+            latencies, failures, elapsed = asyncio.run(
+                drive(base_url, headers, paths, args.duration, args.concurrency)
+            )
+        rate = len(latencies) / elapsed
+        print(f"{workers} worker(s): {rate:8.0f} req/s, failures {dict(failures)}")
+        summarize(f"  health + projects ({workers} workers)", latencies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# TestGenie Benchmark Harness
+# Shared helpers for the load tests and benchmarks in this directory.
+# These scripts are run directly (python tests/benchmarks/<name>.py) and are not
+# collected by pytest.
+
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+# Add the tests directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from conftest import BACKEND_DIR, HARDCODED_USER, get_test_headers
+
+
+def free_port():
+    """Return a TCP port that is free on localhost"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(samples, pct):
+    """Return the pct-th percentile (0-100) of a list of samples"""
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(label, samples_ms):
+    """Print a one-line latency summary and return it as a dict"""
+    summary = {
+        "label": label,
+        "count": len(samples_ms),
+        "p50_ms": round(percentile(samples_ms, 50), 2),
+        "p99_ms": round(percentile(samples_ms, 99), 2),
+        "max_ms": round(max(samples_ms), 2) if samples_ms else float("nan"),
+        "mean_ms": round(statistics.fmean(samples_ms), 2) if samples_ms else float("nan"),
+    }
+    print(
+        f"{label:<40} n={summary['count']:<6} p50={summary['p50_ms']:>9.2f}ms "
+        f"p99={summary['p99_ms']:>9.2f}ms max={summary['max_ms']:>9.2f}ms"
+    )
+    return summary
+
+
+def wait_for_health(base_url, timeout=30.0):
+    """Poll /api/health until it answers 200 or the timeout expires"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{base_url}/api/health", timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"Backend at {base_url} did not become healthy")
+
+
+@contextmanager
+def checkout_backend(ref):
+    """Export the backend directory at a git ref and yield its path"""
+    repo_root = Path(BACKEND_DIR).parent
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = subprocess.run(
+            ["git", "archive", ref, "backend"],
+            cwd=repo_root, check=True, capture_output=True,
+        )
+        subprocess.run(["tar", "-x", "-C", tmp], input=archive.stdout, check=True)
+        yield Path(tmp) / "backend"
+
+
+@contextmanager
+def run_backend(env=None, args=None, backend_dir=BACKEND_DIR):
+    """Start the backend with uvicorn on a free port and yield its base URL"""
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        process_env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{Path(tmp) / 'bench.db'}",
+            "ENABLE_FILE_LOGGING": "false",
+            "LOG_LEVEL": "WARNING",
+            **(env or {}),
+        }
+        command = args or [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        ]
+        command = [part.replace("{port}", str(port)) for part in command]
+        process = subprocess.Popen(command, cwd=backend_dir, env=process_env)
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            wait_for_health(base_url)
+            yield base_url
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def login(base_url):
+    """Log in as the configured test user and return auth headers"""
+    response = requests.post(
+        f"{base_url}/api/auth/login",
+        json={"email": HARDCODED_USER["email"], "password": HARDCODED_USER["password"]},
+        headers=get_test_headers(),
+        timeout=10,
+    )
+    response.raise_for_status()
+    return get_test_headers(response.json()["access_token"])
+
+
+def create_project(base_url, headers, name="Benchmark Project"):
+    """Create a project and return its id"""
+    response = requests.post(
+        f"{base_url}/api/projects", json={"name": name}, headers=headers, timeout=10
+    )
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+@contextmanager
+def fake_superwise(delay=2.0, output=None, chunks=0, events=None):
+    """Serve a fake Superwise agent API that answers /v1/ask after a delay
+
+    output may be a function of the prompt. With chunks > 0, requests
+    accepting text/event-stream get the answer as that many server-sent events
+    spread over the delay. "finished" or "disconnected" is appended to events
+    when each stream ends.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("content-length", 0))
+            prompt = json.loads(self.rfile.read(length) or "{}").get("input", "")
+            answer = output(prompt) if callable(output) else output
+            body = json.dumps({"output": answer or "[]"}).encode()
+            if chunks and "text/event-stream" in self.headers.get("accept", ""):
+                return self.stream()
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def stream(self):
+            self.send_response(200)
+            self.send_header("content-type", "text/event-stream")
+            self.end_headers()
+            try:
+                for n in range(chunks):
+                    time.sleep(delay / chunks)
+                    token = json.dumps({"output": f"token {n} "})
+                    self.wfile.write(f"data: {token}\n\n".encode())
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                if events is not None:
+                    events.append("disconnected")
+                return
+            if events is not None:
+                events.append("finished")
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        # Room for a burst of concurrent connections from the backend
+        request_queue_size = 256
+
+    server = Server(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
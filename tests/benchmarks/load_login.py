@@ -0,0 +1,100 @@
+# TestGenie Login Storm Load Test
+# Run with: python tests/benchmarks/load_login.py [--logins 50] [--seconds 3]
+#
+# Starts the backend with the login rate limits lifted, so every attempt pays
+# for a bcrypt check, and measures /api/projects and
+# /api/projects/{id}/test-cases latency idle and while --logins clients post
+# logins (half with a wrong password) in a loop. Password checks run on their
+# own few threads (PASSWORD_HASH_THREADS), so CRUD requests should not queue
+# behind them. Exits non-zero if CRUD p99 during the storm exceeds --max-p99-ms.
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from harness import HARDCODED_USER, create_project, login, run_backend, summarize
+from load_superwise import probe
+
+
+async def log_in_loop(client, password, stop, outcomes):
+    """Post logins until stop is set, counting response statuses"""
+    while not stop.is_set():
+        response = await client.post(
+            "/api/auth/login",
+            json={"email": HARDCODED_USER["email"], "password": password},
+        )
+        outcomes[response.status_code] = outcomes.get(response.status_code, 0) + 1
+
+
+async def run_load(base_url, headers, project_id, logins, seconds):
+    limits = httpx.Limits(max_connections=logins + 10)
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=60, limits=limits
+    ) as client:
+        urls = ["/api/projects", f"/api/projects/{project_id}/test-cases"]
+
+        idle = []
+        stop = asyncio.Event()
+        probes = [
+            asyncio.create_task(probe(client, u, headers, stop, idle)) for u in urls
+        ]
+        await asyncio.sleep(seconds)
+        stop.set()
+        await asyncio.gather(*probes)
+
+        busy = []
+        outcomes = {}
+        stop = asyncio.Event()
+        passwords = [HARDCODED_USER["password"], "wrong password"]
+        storm = [
+            asyncio.create_task(
+                log_in_loop(client, passwords[n % 2], stop, outcomes)
+            )
+            for n in range(logins)
+        ]
+        probes = [
+            asyncio.create_task(probe(client, u, headers, stop, busy)) for u in urls
+        ]
+        await asyncio.sleep(seconds)
+        stop.set()
+        await asyncio.gather(*probes, *storm)
+
+    attempts = sum(outcomes.values())
+    print(
+        f"logins: {attempts} attempts in {seconds:.1f}s "
+        f"({attempts / seconds:.0f}/s), statuses {dict(sorted(outcomes.items()))}"
+    )
+    return summarize("CRUD idle", idle), summarize("CRUD during login storm", busy)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--max-p99-ms", type=float, default=250.0)
+    args = parser.parse_args()
+
+    env = {
+        "LOGIN_IP_BURST": "1000000",
+        "LOGIN_ACCOUNT_BURST": "1000000",
+    }
+    with run_backend(env=env) as base_url:
+        headers = login(base_url)
+        project_id = create_project(base_url, headers)
+        _, busy = asyncio.run(
+            run_load(base_url, headers, project_id, args.logins, args.seconds)
+        )
+
+    if busy["p99_ms"] > args.max_p99_ms:
+        print(f"FAIL: p99 {busy['p99_ms']}ms exceeds {args.max_p99_ms}ms")
+        sys.exit(1)
+    print("OK: CRUD endpoints stay responsive during a login storm")
+
+
+if __name__ == "__main__":
+    main()
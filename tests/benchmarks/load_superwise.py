@@ -0,0 +1,97 @@
+# TestGenie Superwise Load Test
+# Run with: python tests/benchmarks/load_superwise.py [--ai-calls 20] [--ai-delay 2]
+#
+# Starts a fake Superwise agent that answers slowly, starts the backend pointed at
+# it, fires a burst of concurrent AI requests and measures /api/projects and
+# /api/projects/{id}/test-cases latency while those calls are still in flight.
+# Exits non-zero if the CRUD endpoints stall behind the AI calls.
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from harness import create_project, fake_superwise, login, run_backend, summarize
+
+
+async def probe(client, url, headers, stop, samples):
+    """Request url in a loop until stop is set, recording latency in ms"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get(url, headers=headers)
+        response.raise_for_status()
+        samples.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.01)
+
+
+async def run_load(base_url, headers, project_id, ai_calls, probe_seconds):
+    limits = httpx.Limits(max_connections=ai_calls + 10)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        urls = ["/api/projects", f"/api/projects/{project_id}/test-cases"]
+
+        # Baseline: CRUD latency with no AI traffic
+        idle = []
+        stop = asyncio.Event()
+        probes = [asyncio.create_task(probe(client, u, headers, stop, idle)) for u in urls]
+        await asyncio.sleep(probe_seconds)
+        stop.set()
+        await asyncio.gather(*probes)
+
+        # Same probes while a burst of AI calls is in flight
+        busy = []
+        stop = asyncio.Event()
+        ai_started = time.perf_counter()
+        # refresh=true so every call reaches the agent instead of the AI cache
+        ai_tasks = [
+            asyncio.create_task(
+                client.get(
+                    f"/api/projects/{project_id}/ai-test-cases?refresh=true",
+                    headers=headers,
+                )
+            )
+            for _ in range(ai_calls)
+        ]
+        probes = [asyncio.create_task(probe(client, u, headers, stop, busy)) for u in urls]
+        await asyncio.sleep(probe_seconds)
+        stop.set()
+        await asyncio.gather(*probes)
+        ai_responses = await asyncio.gather(*ai_tasks)
+        ai_elapsed = time.perf_counter() - ai_started
+
+    failed = [r.status_code for r in ai_responses if r.status_code != 200]
+    print(f"AI calls: {ai_calls} completed in {ai_elapsed:.2f}s, failures: {failed}")
+    return summarize("CRUD idle", idle), summarize("CRUD during AI calls", busy)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ai-calls", type=int, default=20)
+    parser.add_argument("--ai-delay", type=float, default=2.0)
+    parser.add_argument("--max-p99-ms", type=float, default=250.0)
+    args = parser.parse_args()
+
+    with fake_superwise(delay=args.ai_delay) as superwise_url:
+        env = {
+            "SUPERWISE_API_URL": superwise_url,
+            "SUPERWISE_MAX_CONCURRENCY": str(args.ai_calls),
+        }
+        with run_backend(env=env) as base_url:
+            headers = login(base_url)
+            project_id = create_project(base_url, headers)
+            _, busy = asyncio.run(
+                run_load(base_url, headers, project_id, args.ai_calls, args.ai_delay / 2)
+            )
+
+    if busy["p99_ms"] > args.max_p99_ms:
+        print(f"FAIL: p99 {busy['p99_ms']}ms exceeds {args.max_p99_ms}ms")
+        sys.exit(1)
+    print("OK: CRUD endpoints stay responsive while AI calls are in flight")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ import os
 import sys
 from pathlib import Path
 
+import pytest
+
 # Add the backend directory to Python path for imports
 BACKEND_DIR = Path(__file__).parent.parent / "backend"
 sys.path.insert(0, str(BACKEND_DIR))
@@ -27,6 +29,7 @@ HARDCODED_USER = {
     "full_name": os.getenv("TEST_USER_FULL_NAME", "Admin")
 }
 
+
 def get_test_headers(token=None):
     """Get headers for API requests"""
     headers = {
@@ -36,3 +39,47 @@ def get_test_headers(token=None):
     if token:
         headers["Authorization"] = f"Bearer {token}"
     return headers
+
+
+@pytest.fixture
+def db_engine():
+    """In-memory SQLite engine with the full schema, for unit tests"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+
+    from database import Base
+    import models  # noqa: F401 - registers the tables on Base
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(db_engine):
+    """Session bound to the in-memory unit test engine"""
+    from sqlalchemy.orm import sessionmaker
+
+    session = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def query_counter(db_engine):
+    """List that collects every SQL statement executed on the test engine"""
+    from sqlalchemy import event
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(db_engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,116 @@
+# TestGenie AI Batch Tests
+# Run with: python -m pytest tests/unit/test_ai_batch.py
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from ai_batch import BatchPrompt, merge_test_cases, run_batch
+from rate_limit import RateLimiter, TokenBucket
+
+
+def answer(*names):
+    records = [
+        {
+            "Test Case Name": name,
+            "Description": f"Checks {name}",
+            "Priority": "High",
+            "Browsers": ["Chrome", "Firefox"],
+            "Environment": ["Staging"],
+            "Test Steps": ["Open the page", "Submit the form"],
+        }
+        for name in names
+    ]
+    return {"output": f"Here are the test cases:\n```json\n{json.dumps(records)}\n```"}
+
+
+class FakeAgent:
+    """Answers every prompt after a delay, tracking concurrency"""
+
+    def __init__(self, delay=0.05, fail_on=()):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.active = 0
+        self.peak = 0
+
+    async def __call__(self, prompt):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if prompt in self.fail_on:
+                raise RuntimeError("agent unavailable")
+            return answer(f"{prompt} works", "Shared login")
+        finally:
+            self.active -= 1
+
+
+def unlimited():
+    return RateLimiter(rate=1000, capacity=1000)
+
+
+@pytest.mark.unit
+class TestAIBatch:
+    """Concurrent fan-out, failure isolation and merging"""
+
+    def test_prompts_run_concurrently_up_to_the_cap(self):
+        agent = FakeAgent(delay=0.1)
+        prompts = [BatchPrompt(f"module {n}") for n in range(50)]
+
+        started = time.monotonic()
+        items = asyncio.run(
+            run_batch(prompts, agent, 1, max_concurrency=25, rate_limiter=unlimited())
+        )
+        elapsed = time.monotonic() - started
+
+        assert agent.peak == 25
+        assert elapsed < 0.5
+        assert [item.prompt.prompt for item in items] == [p.prompt for p in prompts]
+
+    def test_failed_prompt_does_not_fail_the_batch(self):
+        prompts = [BatchPrompt("a"), BatchPrompt("b"), BatchPrompt("c")]
+
+        items = asyncio.run(
+            run_batch(prompts, FakeAgent(fail_on={"b"}), 1, rate_limiter=unlimited())
+        )
+
+        assert [item.error for item in items] == [None, "agent unavailable", None]
+        test_cases, duplicates = merge_test_cases(items)
+        assert [t.name for t in test_cases] == ["a works", "Shared login", "c works"]
+        assert duplicates == 1
+
+    def test_merge_skips_names_the_project_has(self):
+        items = asyncio.run(
+            run_batch([BatchPrompt("a")], FakeAgent(), 1, rate_limiter=unlimited())
+        )
+
+        test_cases, duplicates = merge_test_cases(items, ["shared LOGIN"])
+        assert [t.name for t in test_cases] == ["a works"]
+        assert duplicates == 1
+
+
+@pytest.mark.unit
+class TestRateLimit:
+    """Token buckets per key"""
+
+    def test_burst_then_refill(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr("rate_limit.time.monotonic", lambda: now[0])
+        bucket = TokenBucket(rate=2, capacity=3)
+
+        assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+        assert bucket.wait_time() == pytest.approx(0.5)
+        now[0] += 0.5
+        assert bucket.try_acquire()
+
+    def test_batch_is_paced_by_project_bucket(self):
+        limiter = RateLimiter(rate=100, capacity=2)
+        prompts = [BatchPrompt(str(n)) for n in range(6)]
+
+        started = time.monotonic()
+        asyncio.run(run_batch(prompts, FakeAgent(delay=0), 1, rate_limiter=limiter))
+
+        # 2 from the burst, the other 4 at 100/s
+        assert time.monotonic() - started >= 0.035
@@ -0,0 +1,120 @@
+# TestGenie AI Response Cache Tests
+# Run with: python -m pytest tests/unit/test_ai_cache.py
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from ai_cache import AICache, CacheKey, cache_key
+from models import Project
+from prompts import TEST_CASES_PROMPT, TEST_PLANS_PROMPT
+
+
+def key(project_id=1, prompt="test-plans"):
+    return CacheKey(project_id, prompt, 1, "2024-01-01T00:00:00")
+
+
+class Upstream:
+    """Stands in for the Superwise call and counts invocations"""
+
+    def __init__(self, delay=0.0, error=None):
+        self.calls = 0
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {"answer": f"response {self.calls}"}
+
+
+@pytest.mark.unit
+class TestAICache:
+    """TTL/LRU memory tier, single-flight misses and invalidation"""
+
+    def test_repeat_request_is_served_from_cache(self):
+        cache, upstream = AICache(db_path=""), Upstream()
+
+        async def ask_twice():
+            return [await cache.get_or_create(key(), upstream) for _ in range(2)]
+
+        (first, first_hit), (second, second_hit) = asyncio.run(ask_twice())
+
+        assert upstream.calls == 1
+        assert (first_hit, second_hit) == (False, True)
+        assert first == second
+        assert cache.snapshot()["hits"] == 1
+
+    def test_concurrent_misses_share_one_upstream_call(self):
+        cache, upstream = AICache(db_path=""), Upstream(delay=0.05)
+
+        async def ask_together():
+            return await asyncio.gather(
+                *(cache.get_or_create(key(), upstream) for _ in range(5))
+            )
+
+        results = asyncio.run(ask_together())
+
+        assert upstream.calls == 1
+        assert len({r[0]["answer"] for r in results}) == 1
+        assert cache.stats.coalesced == 4
+
+    def test_failures_are_not_cached(self):
+        cache = AICache(db_path="")
+        failing = Upstream(error=RuntimeError("upstream down"))
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(cache.get_or_create(key(), failing))
+
+        _, hit = asyncio.run(cache.get_or_create(key(), Upstream()))
+        assert not hit
+
+    def test_lru_eviction_ttl_and_invalidation(self, monkeypatch):
+        cache = AICache(ttl=60, max_entries=2, db_path="")
+        cache.put(key(1), "a")
+        cache.put(key(2), "b")
+        cache.get(key(1))
+        cache.put(key(3), "c")
+
+        assert cache.get(key(2)) is None
+        assert cache.stats.evictions == 1
+
+        cache.invalidate_project(1)
+        assert cache.get(key(1)) is None
+        assert cache.get(key(3)) == "c"
+
+        clock = time.monotonic() + 61
+        monkeypatch.setattr("ai_cache.time.monotonic", lambda: clock)
+        assert cache.get(key(3)) is None
+        assert cache.stats.expirations == 1
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        path = str(tmp_path / "ai_cache.sqlite3")
+        asyncio.run(AICache(db_path=path).get_or_create(key(), Upstream()))
+
+        restarted, upstream = AICache(db_path=path), Upstream()
+        value, hit = asyncio.run(restarted.get_or_create(key(), upstream))
+
+        assert hit and upstream.calls == 0
+        assert value == {"answer": "response 1"}
+        assert restarted.stats.disk_hits == 1
+
+        restarted.invalidate_project(1)
+        assert AICache(db_path=path).disk.get(key()) is None
+
+    def test_key_tracks_prompt_and_project_changes(self):
+        project = Project(
+            id=7, name="Shop", created_at=datetime(2024, 1, 1, tzinfo=timezone.utc)
+        )
+        before = cache_key(project, TEST_PLANS_PROMPT)
+        project.updated_at = datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+        assert cache_key(project, TEST_PLANS_PROMPT) != before
+        assert cache_key(project, TEST_CASES_PROMPT) != cache_key(
+            project, TEST_PLANS_PROMPT
+        )
+        assert "Shop" in TEST_PLANS_PROMPT.render(project)
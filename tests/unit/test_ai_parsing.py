@@ -0,0 +1,139 @@
+# TestGenie AI Test Case Parsing Tests
+# Run with: python -m pytest tests/unit/test_ai_parsing.py
+
+import asyncio
+import json
+
+import pytest
+
+from ai_parsing import (
+    JSONRecordExtractor,
+    TestCaseParser,
+    parse_answer,
+    parse_test_cases,
+    stream_answer_text,
+)
+from models import TestCasePriority
+
+
+def record(name, **fields):
+    return {
+        "Test Case Name": name,
+        "Description": f"Checks {name}",
+        "Priority": "High",
+        "Browsers": ["Chrome", "Firefox"],
+        "Environment": ["Staging", "Production"],
+        "Test Steps": ["Open the page", "Submit the form"],
+        **fields,
+    }
+
+
+def answer_text(*records):
+    return f"Here are the test cases:\n```json\n{json.dumps(list(records))}\n```\nDone."
+
+
+@pytest.mark.unit
+class TestJSONRecordExtractor:
+    """Incremental extraction of records from free text"""
+
+    def test_records_are_yielded_as_they_complete(self):
+        text = answer_text(record("Login {a}"), record('Quote "b" \\ c'))
+        extractor = JSONRecordExtractor()
+
+        names = []
+        for char in text:
+            names += [r["Test Case Name"] for r in extractor.feed(char)]
+
+        assert names == ["Login {a}", 'Quote "b" \\ c']
+
+    def test_truncated_answer_gives_the_complete_records(self):
+        text = answer_text(record("First"), record("Second"))
+        cut = text.index("Second") - 5
+
+        records = JSONRecordExtractor().feed(text[:cut])
+
+        assert [r["Test Case Name"] for r in records] == ["First"]
+
+    def test_wrapped_lists_and_broken_objects(self):
+        text = '{"oops": } then {"test_cases": [{"Test Case Name": "Wrapped"}]}'
+
+        records = JSONRecordExtractor().feed(text)
+
+        assert records == [{"Test Case Name": "Wrapped"}]
+
+
+@pytest.mark.unit
+class TestTestCaseParser:
+    """Validation and de-duplication into TestCaseCreate"""
+
+    def test_agent_records_map_to_test_cases(self):
+        (test_case,) = parse_test_cases({"output": answer_text(record("Checkout"))})
+
+        assert test_case.priority == TestCasePriority.MAJOR
+        assert test_case.browsers == ["chrome", "firefox"]
+        assert test_case.environment == "Staging, Production"
+        assert [s.action for s in test_case.steps] == [
+            "Open the page",
+            "Submit the form",
+        ]
+
+    def test_text_steps_split_on_lines_not_commas(self):
+        steps = "Type 'a, b' into Search\nPress Enter, then wait"
+        text = answer_text(record("Text steps", **{"Test Steps": steps}))
+
+        (test_case,) = parse_test_cases({"output": text})
+
+        assert [s.action for s in test_case.steps] == [
+            "Type 'a, b' into Search",
+            "Press Enter, then wait",
+        ]
+
+    def test_existing_and_repeated_names_and_invalid_records(self):
+        text = answer_text(
+            record("Login"),
+            record("Search"),
+            record("search"),
+            record("", Description="no name"),
+            record("Bad steps", **{"Test Steps": [{"action": "Go", "element": [1]}]}),
+        )
+
+        parser = parse_answer({"output": text}, existing_names=["LOGIN"])
+
+        assert [t.name for t in parser.test_cases] == ["Search"]
+        assert parser.duplicates == 2
+        assert [r.index for r in parser.rejected] == [3, 4]
+        assert parser.rejected[1].name == "Bad steps"
+
+    def test_streamed_events_parse_like_the_whole_answer(self):
+        text = answer_text(record("One"), record("Two"), record("Three"))
+        pieces = [text[i : i + 7] for i in range(0, len(text), 7)]
+        events = [f"data: {json.dumps({'output': p})}\n\n".encode() for p in pieces]
+
+        async def chunks():
+            # Event boundaries do not line up with network chunks
+            body = b"".join(events) + b"data: [DONE]\n\n"
+            for start in range(0, len(body), 13):
+                yield body[start : start + 13]
+
+        async def collect():
+            parser = TestCaseParser()
+            async for piece in stream_answer_text(chunks(), "text/event-stream"):
+                parser.feed(piece)
+            return parser
+
+        parser = asyncio.run(collect())
+        assert [t.name for t in parser.test_cases] == ["One", "Two", "Three"]
+
+    def test_event_data_keeps_its_own_whitespace(self):
+        body = b"data:  indented\r\ndata:plain \r\ndata: [DONE]\r\n\r\n"
+
+        async def chunks():
+            yield body
+
+        async def collect():
+            return [
+                piece
+                async for piece in stream_answer_text(chunks(), "text/event-stream")
+            ]
+
+        assert asyncio.run(collect()) == [" indented", "plain "]
@@ -0,0 +1,61 @@
+# TestGenie Token Cache Tests
+# Run with: python -m pytest tests/unit/test_auth.py
+
+from datetime import timedelta
+
+import pytest
+from jose import jwt
+
+import auth
+from auth import TokenCache, create_access_token, verify_token
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """Count signature checks and start from an empty token cache"""
+    calls = []
+    decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(jwt, "decode", counting_decode)
+    monkeypatch.setattr(auth, "token_cache", TokenCache(max_entries=2))
+    return calls
+
+
+@pytest.mark.unit
+class TestTokenCache:
+    """Verified claims are reused until the token expires"""
+
+    def test_repeat_verification_skips_the_decode(self, decodes):
+        token = create_access_token({"sub": "a@example.com"})
+
+        claims = [verify_token(token) for _ in range(3)]
+
+        assert [c["sub"] for c in claims] == ["a@example.com"] * 3
+        assert len(decodes) == 1
+        claims[1]["sub"] = "changed"
+        assert verify_token(token)["sub"] == "a@example.com"
+
+    def test_expired_token_is_dropped_and_rejected(self, decodes, monkeypatch):
+        token = create_access_token({"sub": "a@example.com"}, timedelta(minutes=1))
+        assert verify_token(token) is not None
+
+        real_time = auth.time.time
+        monkeypatch.setattr(auth.time, "time", lambda: real_time() + 120)
+
+        assert auth.token_cache.get(token) is None
+        assert len(auth.token_cache) == 0
+
+    def test_invalid_tokens_are_not_cached_and_size_is_bounded(self, decodes):
+        tokens = [create_access_token({"sub": f"{n}@example.com"}) for n in range(3)]
+
+        assert verify_token(tokens[0] + "x") is None
+        for token in tokens:
+            verify_token(token)
+
+        assert len(auth.token_cache) == 2
+        assert auth.token_cache.get(tokens[0]) is None
+        assert auth.token_cache.get(tokens[2])["sub"] == "2@example.com"
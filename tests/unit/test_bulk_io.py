@@ -0,0 +1,134 @@
+# TestGenie Bulk Import/Export Tests
+# Run with: python -m pytest tests/unit/test_bulk_io.py
+
+import asyncio
+import json
+
+import pytest
+
+from bulk_io import CSV, NDJSON, export_test_cases, import_test_cases
+from crud import bulk_create_test_cases, create_user_project, get_project_test_cases
+from models import TestCase, TestStep
+from schemas import ProjectCreate, TestCaseCreate, TestStepCreate
+
+
+async def stream(body, chunk_size=7):
+    """Yield a request body in small chunks, splitting lines mid-way"""
+    data = body.encode()
+    for start in range(0, len(data), chunk_size):
+        yield data[start : start + chunk_size]
+
+
+def run_import(db, project_id, body, import_format, chunk_size=3):
+    """Import `body` into a project, inserting through the given session"""
+
+    async def insert_chunk(test_cases):
+        return bulk_create_test_cases(db, test_cases, project_id, "tester")
+
+    return asyncio.run(
+        import_test_cases(stream(body), import_format, insert_chunk, chunk_size)
+    )
+
+
+def ndjson(*rows):
+    return "\n".join(row if isinstance(row, str) else json.dumps(row) for row in rows)
+
+
+@pytest.fixture
+def project_id(db_session):
+    return create_user_project(db_session, ProjectCreate(name="Bulk"), user_id=1).id
+
+
+@pytest.mark.unit
+class TestBulkImport:
+    """Streaming NDJSON/CSV import with batched inserts"""
+
+    def test_steps_are_inserted_in_one_statement(
+        self, db_session, query_counter, project_id
+    ):
+        cases = [
+            TestCaseCreate(
+                name=f"Case {n}",
+                steps=[TestStepCreate(step_number=i, action="click") for i in (1, 2)],
+            )
+            for n in range(200)
+        ]
+        query_counter.clear()
+
+        ids = bulk_create_test_cases(db_session, cases, project_id, "tester")
+
+        steps = [s for s in query_counter if s.startswith("INSERT INTO test_steps")]
+        assert len(steps) == 1
+        assert len(ids) == 200
+        assert db_session.query(TestStep).count() == 400
+        assert [db_session.get(TestCase, i).name for i in ids[:3]] == [
+            "Case 0",
+            "Case 1",
+            "Case 2",
+        ]
+
+    def test_bad_rows_are_reported_and_skipped(self, db_session, project_id):
+        body = ndjson(
+            {"name": "one"},
+            "{not json",
+            {"name": "two", "priority": "urgent"},
+            "",
+            ["not", "an", "object"],
+            {"name": "three", "steps": [{"step_number": 1, "action": "open"}]},
+        )
+
+        result = run_import(db_session, project_id, body, NDJSON)
+
+        assert (result.created, result.failed) == (2, 3)
+        assert [error.row for error in result.errors] == [2, 3, 4]
+        assert "priority" in result.errors[1].error
+        assert db_session.query(TestCase).count() == 2
+
+    def test_failed_chunk_is_retried_row_by_row(self, db_session, project_id):
+        calls = []
+
+        async def insert_chunk(test_cases):
+            calls.append(len(test_cases))
+            if any(case.name == "poison" for case in test_cases):
+                raise RuntimeError("constraint failed")
+            return bulk_create_test_cases(db_session, test_cases, project_id, "t")
+
+        body = ndjson({"name": "a"}, {"name": "poison"}, {"name": "b"})
+        result = asyncio.run(import_test_cases(stream(body), NDJSON, insert_chunk, 3))
+
+        assert calls == [3, 1, 1, 1]
+        assert (result.created, result.failed) == (2, 1)
+        assert result.errors[0].row == 2
+
+    def test_csv_with_quoted_newlines_and_lists(self, db_session, project_id):
+        body = (
+            "name,description,priority,browsers,steps\r\n"
+            'Login,"Line one\r\nsays ""hi""",critical,chrome; firefox,'
+            '"[{""step_number"": 1, ""action"": ""open""}]"\r\n'
+            "Logout,,minor,,\r\n"
+        )
+
+        result = run_import(db_session, project_id, body, CSV)
+
+        assert (result.created, result.failed) == (2, 0)
+        login = db_session.query(TestCase).filter_by(name="Login").one()
+        assert login.description == 'Line one\nsays "hi"'
+        assert login.browsers == ["chrome", "firefox"]
+        assert [step.action for step in login.steps] == ["open"]
+
+    def test_export_round_trips(self, db_session, project_id):
+        body = ndjson(*({"name": f"Case {n}", "assignee": "qa"} for n in range(7)))
+        run_import(db_session, project_id, body, NDJSON)
+
+        exported = "".join(
+            export_test_cases(
+                lambda page: get_project_test_cases(db_session, project_id, page),
+                chunk_size=3,
+            )
+        )
+        rows = [json.loads(line) for line in exported.splitlines()]
+        assert [row["name"] for row in rows] == [f"Case {n}" for n in range(7)]
+
+        target = create_user_project(db_session, ProjectCreate(name="Copy"), 1).id
+        result = run_import(db_session, target, exported, NDJSON)
+        assert (result.created, result.failed) == (7, 0)
@@ -0,0 +1,84 @@
+# TestGenie Change Log Tests
+# Run with: python -m pytest tests/unit/test_change_log.py
+
+import pytest
+
+from crud import (
+    bulk_create_test_cases,
+    create_project_test_case,
+    create_user_project,
+    delete_test_case_by_id,
+    get_changed_rows,
+    get_project_changes,
+    update_test_step,
+    update_user_project,
+)
+from models import ChangeAction, Project
+from schemas import (
+    ProjectCreate,
+    ProjectUpdate,
+    TestCaseCreate,
+    TestStepCreate,
+    TestStepPatch,
+)
+
+
+@pytest.mark.unit
+class TestChangeLog:
+    """Versions and entries written by the CRUD functions"""
+
+    def test_mutations_are_logged_in_order(self, db_session):
+        project_id = create_user_project(
+            db_session, ProjectCreate(name="Synced"), user_id=1
+        ).id
+        case = create_project_test_case(
+            db_session,
+            TestCaseCreate(
+                name="Login", steps=[TestStepCreate(step_number=1, action="click")]
+            ),
+            project_id,
+            "tester",
+        )
+        update_test_step(
+            db_session,
+            case.steps[0].id,
+            case.id,
+            project_id,
+            TestStepPatch(action="type"),
+        )
+        bulk_ids = bulk_create_test_cases(
+            db_session,
+            [TestCaseCreate(name="A"), TestCaseCreate(name="B")],
+            project_id,
+            "tester",
+        )
+        delete_test_case_by_id(db_session, case.id, project_id)
+
+        changes, has_more = get_project_changes(db_session, project_id, 0, 100)
+
+        assert not has_more
+        assert [change.version for change in changes] == [1, 2, 3, 4, 5]
+        assert [(c.entity, c.entity_id, c.action) for c in changes] == [
+            ("test_case", case.id, ChangeAction.CREATED),
+            ("test_step", case.steps[0].id, ChangeAction.UPDATED),
+            ("test_case", bulk_ids[0], ChangeAction.CREATED),
+            ("test_case", bulk_ids[1], ChangeAction.CREATED),
+            ("test_case", case.id, ChangeAction.DELETED),
+        ]
+        assert db_session.get(Project, project_id).change_version == 5
+        # Deleted rows have no current state
+        rows = get_changed_rows(
+            db_session, project_id, "test_case", [case.id, *bulk_ids]
+        )
+        assert sorted(rows) == sorted(bulk_ids)
+
+    def test_since_and_limit(self, db_session):
+        project = create_user_project(db_session, ProjectCreate(name="P"), user_id=1)
+        for name in ["One", "Two", "Three"]:
+            update_user_project(db_session, project.id, ProjectUpdate(name=name), 1)
+
+        changes, has_more = get_project_changes(db_session, project.id, 1, 1)
+
+        assert [change.version for change in changes] == [2]
+        assert has_more
+        assert get_project_changes(db_session, project.id, 3, 10) == ([], False)
@@ -0,0 +1,76 @@
+# TestGenie Response Compression Tests
+# Run with: python -m pytest tests/unit/test_compression.py
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from compression import CompressionMiddleware, choose_encoding
+
+BODY = "test case " * 500
+
+
+def make_app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse(BODY, headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([BODY, BODY]), media_type="application/x-ndjson")
+
+    @app.get("/events")
+    def events():
+        return StreamingResponse(iter(["data: 1\n\n"]), media_type="text/event-stream")
+
+    return app
+
+
+def get(app, path, accept_encoding="gzip"):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        headers = {"Accept-Encoding": accept_encoding}
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await c.get(path, headers=headers)
+
+    return asyncio.run(run())
+
+
+@pytest.mark.unit
+class TestCompression:
+    """Bodies over the threshold are compressed; streams stay streams"""
+
+    def test_large_body_is_gzipped(self):
+        response = get(make_app(), "/large")
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < len(BODY)
+        assert response.headers["etag"] == 'W/"v1"'
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.text == BODY
+
+    def test_small_and_unaccepted_bodies_are_left_alone(self):
+        app = make_app()
+        assert "content-encoding" not in get(app, "/small").headers
+        assert "content-encoding" not in get(app, "/large", "identity").headers
+
+    def test_streams(self):
+        app = make_app()
+        streamed = get(app, "/stream")
+        assert streamed.headers["content-encoding"] == "gzip"
+        assert streamed.text == BODY * 2
+        assert "content-encoding" not in get(app, "/events").headers
+
+    def test_choose_encoding(self):
+        assert choose_encoding("gzip, deflate") == "gzip"
+        assert choose_encoding("gzip;q=0, deflate") is None
+        assert choose_encoding("") is None
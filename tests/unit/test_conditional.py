@@ -0,0 +1,172 @@
+# TestGenie Conditional GET Tests
+# Run with: python -m pytest tests/unit/test_conditional.py
+
+import asyncio
+from datetime import datetime
+
+import httpx
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import database
+from conditional import collection_state, etag_matches, make_etag
+from crud import add_test_results, create_user_project, update_test_case_by_id
+from main import create_app, get_current_user
+from models import Job, TestCase, TestResultStatus, TestRun, TestSuite
+from schemas import ProjectCreate, TestCaseUpdate
+
+
+def seed_project(db):
+    """A project with one test case last updated well in the past"""
+    project = create_user_project(db, ProjectCreate(name="Cached"), user_id=1)
+    project.updated_at = datetime(2024, 1, 1)
+    db.add(
+        TestCase(
+            name="Case",
+            project_id=project.id,
+            created_by="tester",
+            updated_at=datetime(2024, 1, 1),
+        )
+    )
+    db.commit()
+    return project.id
+
+
+@pytest.mark.unit
+class TestCollectionState:
+    """Fingerprints of a project's collections"""
+
+    def test_one_query_that_checks_ownership(self, db_session, query_counter):
+        project_id = seed_project(db_session)
+        query_counter.clear()
+
+        state = collection_state(db_session, project_id, 1, [TestSuite, TestCase])
+
+        assert len(query_counter) == 1
+        assert state.settled
+        assert collection_state(db_session, project_id, 2, [TestCase]) is None
+
+    def test_changes_change_the_etag(self, db_session):
+        project_id = seed_project(db_session)
+        before = make_etag(collection_state(db_session, project_id, 1, [TestCase]))
+
+        case = db_session.query(TestCase).filter_by(project_id=project_id).one()
+        update_test_case_by_id(
+            db_session, case.id, TestCaseUpdate(name="New"), project_id
+        )
+        state = collection_state(db_session, project_id, 1, [TestCase])
+
+        # The change log version makes edits visible within the same second
+        assert state.settled
+        assert make_etag(state) != before
+        assert make_etag(state, "limit=1") != make_etag(state)
+
+    def test_run_in_the_current_second_is_not_settled(self, db_session):
+        project_id = seed_project(db_session)
+        assert collection_state(db_session, project_id, 1, [TestRun]).settled
+
+        db_session.add(
+            TestRun(executor="manual", project_id=project_id, created_by="t")
+        )
+        db_session.commit()
+
+        assert not collection_state(db_session, project_id, 1, [TestRun]).settled
+
+
+@pytest.fixture
+def one_slot_app(db_engine, monkeypatch):
+    """The API with a single connection slot, as with DB_POOL_SIZE=1"""
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+    slots = asyncio.Semaphore(1)
+    monkeypatch.setattr(database, "engine", db_engine)
+    monkeypatch.setattr(database, "read_engine", db_engine)
+    monkeypatch.setattr(database, "SessionLocal", factory)
+    monkeypatch.setattr(database, "ReadSessionLocal", factory)
+    monkeypatch.setattr(database, "_session_slots", slots)
+    monkeypatch.setattr(database, "_read_session_slots", slots)
+    app = create_app()
+    app.dependency_overrides[get_current_user] = lambda: {"id": 1}
+    return app
+
+
+def get(app, path, etag=None):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        headers = {"If-None-Match": etag} if etag else {}
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await asyncio.wait_for(c.get(path, headers=headers), 10)
+
+    return asyncio.run(run())
+
+
+@pytest.mark.unit
+class TestProjectRoutes:
+    """Conditional GET through the API routes"""
+
+    def test_one_session_per_request(self, db_session, one_slot_app):
+        project_id = seed_project(db_session)
+
+        response = get(one_slot_app, f"/api/projects/{project_id}")
+
+        assert response.status_code == 200
+        assert response.headers["etag"]
+
+    def test_detail_routes(self, db_session, one_slot_app):
+        project_id = seed_project(db_session)
+        past = datetime(2024, 1, 1)
+        case = db_session.query(TestCase).filter_by(project_id=project_id).one()
+        case.browsers = []
+        run = TestRun(
+            executor="manual", project_id=project_id, created_by="t", updated_at=past
+        )
+        job = Job(
+            kind="import",
+            max_attempts=1,
+            project_id=project_id,
+            created_by="t",
+            updated_at=past,
+        )
+        db_session.add_all([run, job])
+        db_session.commit()
+
+        base = f"/api/projects/{project_id}"
+        for path in (
+            f"{base}/test-cases/{case.id}",
+            f"{base}/test-runs/{run.id}",
+            f"{base}/jobs/{job.id}",
+        ):
+            response = get(one_slot_app, path)
+            assert response.status_code == 200, path
+            assert response.headers["cache-control"].startswith("private")
+            etag = response.headers["etag"]
+            assert get(one_slot_app, path, etag).status_code == 304, path
+
+        # A new result changes the run's ETag though the run row is untouched
+        run_path = f"{base}/test-runs/{run.id}"
+        etag = get(one_slot_app, run_path).headers["etag"]
+        add_test_results(
+            db_session,
+            [
+                {
+                    "test_run_id": run.id,
+                    "test_case_id": case.id,
+                    "test_case_name": case.name,
+                    "status": TestResultStatus.PASSED,
+                    "step_results": [],
+                }
+            ],
+        )
+        assert get(one_slot_app, run_path, etag).status_code == 200
+
+
+@pytest.mark.unit
+class TestEtagMatches:
+    """If-None-Match comparison"""
+
+    def test_matches(self):
+        etag = '"abc"'
+        assert etag_matches('"abc"', etag)
+        assert etag_matches('"old", W/"abc"', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"old"', etag)
+        assert not etag_matches(None, etag)
@@ -0,0 +1,75 @@
+# TestGenie Database Engine Tests
+# Run with: python -m pytest tests/unit/test_database.py
+
+import asyncio
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+import database
+from database import engine_options, get_read_db
+
+
+@pytest.mark.unit
+class TestEngineOptions:
+    """Pool settings per kind of database"""
+
+    def test_sqlite(self):
+        assert engine_options("sqlite://") == {}
+        assert engine_options("sqlite:///:memory:") == {}
+        options = engine_options("sqlite:////tmp/testgenie.db")
+        assert options["pool_size"] == database.DB_POOL_SIZE
+        assert "pool_pre_ping" not in options
+
+    def test_server_database(self, monkeypatch):
+        monkeypatch.setattr(database, "DB_POOL_PRE_PING", True)
+        monkeypatch.setattr(database, "DB_POOL_RECYCLE", 300)
+        options = engine_options("postgresql://app@db/testgenie")
+        assert options["pool_pre_ping"] is True
+        assert options["pool_recycle"] == 300
+        assert options["max_overflow"] == database.DB_MAX_OVERFLOW
+
+        monkeypatch.setattr(database, "DB_DISABLE_POOL", True)
+        assert engine_options("postgresql://app@pgbouncer/testgenie") == {
+            "poolclass": NullPool
+        }
+
+
+@pytest.mark.unit
+class TestReadSessions:
+    """List endpoints get sessions from the read replica factory"""
+
+    def test_get_read_db_uses_replica(self, db_engine, monkeypatch):
+        replica = sessionmaker(bind=db_engine)
+        monkeypatch.setattr(database, "engine", db_engine)
+        monkeypatch.setattr(database, "ReadSessionLocal", replica)
+
+        async def first_session():
+            sessions = get_read_db()
+            db = await sessions.__anext__()
+            await sessions.aclose()
+            return db
+
+        assert asyncio.run(first_session()).get_bind() is db_engine
+
+
+@pytest.mark.unit
+class TestResetAfterFork:
+    """Server workers drop the engines inherited from the master"""
+
+    def test_inherited_engines_are_forgotten(self, db_engine, monkeypatch):
+        disposed = []
+        monkeypatch.setattr(
+            db_engine, "dispose", lambda close=True: disposed.append(close)
+        )
+        for name in ("sqlite_writer", "_session_slots", "_read_session_slots"):
+            monkeypatch.setattr(database, name, None)
+        monkeypatch.setattr(database, "engine", db_engine)
+        monkeypatch.setattr(database, "read_engine", db_engine)
+
+        database.reset_after_fork()
+
+        assert disposed == [False]
+        assert database.engine is None
+        assert database.read_engine is None
@@ -0,0 +1,107 @@
+# TestGenie Eager Loading Tests
+# Run with: python -m pytest tests/unit/test_eager_loading.py
+
+import pytest
+
+from crud import (
+    create_project_test_case,
+    create_project_test_plan,
+    create_project_test_suite,
+    create_user_project,
+    get_project_test_cases,
+    get_project_test_plans,
+    get_project_test_suites,
+)
+from schemas import (
+    ProjectCreate,
+    TestCaseCreate,
+    TestCaseResponse,
+    TestPlanCreate,
+    TestPlanResponse,
+    TestStepCreate,
+    TestSuiteCreate,
+    TestSuiteResponse,
+)
+
+
+def seed_project(db, suites, cases_per_suite, steps_per_case=3):
+    """Create a project with one plan over `suites` suites of fresh cases"""
+    project_id = create_user_project(db, ProjectCreate(name="Eager"), user_id=1).id
+    suite_ids = []
+    for suite_index in range(suites):
+        case_ids = []
+        for case_index in range(cases_per_suite):
+            steps = [
+                TestStepCreate(step_number=n, action="click", element=f"#e{n}")
+                for n in range(1, steps_per_case + 1)
+            ]
+            case = create_project_test_case(
+                db,
+                TestCaseCreate(name=f"Case {suite_index}.{case_index}", steps=steps),
+                project_id,
+                "tester",
+            )
+            case_ids.append(case.id)
+        suite = create_project_test_suite(
+            db,
+            TestSuiteCreate(name=f"Suite {suite_index}", test_case_ids=case_ids),
+            project_id,
+            "tester",
+        )
+        suite_ids.append(suite.id)
+    create_project_test_plan(
+        db, TestPlanCreate(name="Plan", test_suite_ids=suite_ids), project_id, "tester"
+    )
+    db.expunge_all()
+    return project_id
+
+
+def count_queries(db, query_counter, load, response_model):
+    """Run a lister and serialize its result, returning the statement count"""
+    db.expunge_all()
+    query_counter.clear()
+    rows, _ = load(db)
+    [response_model.model_validate(row) for row in rows]
+    return len(query_counter)
+
+
+@pytest.mark.unit
+class TestEagerLoading:
+    """Nested list responses load in a fixed number of queries"""
+
+    @pytest.mark.parametrize(
+        "load, response_model, expected",
+        [
+            (get_project_test_cases, TestCaseResponse, 2),
+            (get_project_test_suites, TestSuiteResponse, 3),
+            (get_project_test_plans, TestPlanResponse, 4),
+        ],
+    )
+    def test_query_count_is_constant(
+        self, db_session, query_counter, load, response_model, expected
+    ):
+        small = seed_project(db_session, suites=1, cases_per_suite=2)
+        large = seed_project(db_session, suites=6, cases_per_suite=8)
+
+        small_count = count_queries(
+            db_session, query_counter, lambda db: load(db, small), response_model
+        )
+        large_count = count_queries(
+            db_session, query_counter, lambda db: load(db, large), response_model
+        )
+
+        assert small_count == large_count == expected
+
+    def test_plan_graph_is_complete(self, db_session):
+        project_id = seed_project(db_session, suites=2, cases_per_suite=3)
+
+        [plan], _ = get_project_test_plans(db_session, project_id)
+        response = TestPlanResponse.model_validate(plan)
+
+        assert len(response.test_suites) == 2
+        assert all(len(suite.test_cases) == 3 for suite in response.test_suites)
+        assert all(
+            len(case.steps) == 3
+            for suite in response.test_suites
+            for case in suite.test_cases
+        )
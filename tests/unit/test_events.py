@@ -0,0 +1,104 @@
+# TestGenie Live Event Tests
+# Run with: python -m pytest tests/unit/test_events.py
+
+import asyncio
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from crud import create_test_run, create_user_project
+from events import RESYNC_EVENT, InMemoryBroker, Subscription, run_channel
+from runner import CaseSpec, Runner, StepSpec, StubExecutor
+from schemas import ProjectCreate, TestRunCreate
+
+
+def drain(subscription):
+    """Pop every pending event without waiting"""
+
+    async def collect():
+        events = []
+        while subscription.pending:
+            events.append(await subscription.get())
+        return events
+
+    return asyncio.run(collect())
+
+
+def case_event(case_id, status):
+    return {"type": "case", "run_id": 1, "test_case_id": case_id, "status": status}
+
+
+@pytest.mark.unit
+class TestSubscription:
+    """Per-subscriber coalescing and overflow"""
+
+    def test_newer_event_replaces_pending_one(self):
+        subscription = Subscription("run:1")
+        for status in ("running", "passed"):
+            subscription.push(case_event(1, status))
+        subscription.push(case_event(2, "running"))
+        subscription.push(case_event(1, "failed"))
+
+        events = drain(subscription)
+
+        assert [(e["test_case_id"], e["status"]) for e in events] == [
+            (1, "failed"),
+            (2, "running"),
+        ]
+        assert subscription.coalesced == 2
+
+    def test_overflow_asks_for_resync(self):
+        subscription = Subscription("run:1", max_pending=3)
+        for case_id in range(10):
+            subscription.push(case_event(case_id, "running"))
+
+        events = drain(subscription)
+
+        assert events[0] == RESYNC_EVENT
+        assert len(events) <= 3
+
+    def test_get_times_out_when_idle(self):
+        assert asyncio.run(Subscription("run:1").get(timeout=0.01)) is None
+
+
+@pytest.mark.unit
+class TestRunEvents:
+    """The runner publishes progress to run and project channels"""
+
+    def test_run_publishes_case_step_and_run_events(self, db_engine, db_session):
+        project_id = create_user_project(db_session, ProjectCreate(name="Live"), 1).id
+        run_id = create_test_run(
+            db_session, TestRunCreate(), project_id, "tester", None, 3
+        ).id
+        cases = [
+            CaseSpec(n, f"Case {n}", (StepSpec(1, "open"), StepSpec(2, "click")))
+            for n in range(1, 4)
+        ]
+        broker = InMemoryBroker()
+
+        async def run():
+            subscription = await broker.subscribe(run_channel(run_id))
+            runner = Runner(
+                StubExecutor(),
+                session_factory=sessionmaker(bind=db_engine),
+                broker=broker,
+            )
+            await runner.run(run_id, project_id, cases)
+            return subscription
+
+        events = drain(asyncio.run(run()))
+
+        by_type = {}
+        for event in events:
+            by_type.setdefault(event["type"], []).append(event)
+        assert len(by_type["step"]) == 6
+        assert {e["status"] for e in by_type["case"]} == {"passed"}
+        assert by_type["run"][-1] == {
+            "type": "run",
+            "run_id": run_id,
+            "status": "passed",
+            "total": 3,
+            "passed": 3,
+            "failed": 0,
+            "errored": 0,
+        }
@@ -0,0 +1,202 @@
+# TestGenie Background Job Tests
+# Run with: python -m pytest tests/unit/test_jobs.py
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import jobs
+from crud import claim_next_job, create_user_project, requeue_stale_jobs
+from database import Base
+from events import InMemoryBroker
+from jobs import JOB_KINDS, JobWorker, PermanentJobError, enqueue_job, job_kind
+from models import Job, JobStatus
+from schemas import ProjectCreate
+
+
+class EchoJob(BaseModel):
+    value: int = 0
+    failures: int = 0
+    permanent: bool = False
+    sleep: float = 0.0
+
+
+CALLS = []
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    """File-backed engine: the worker's sessions run on several threads, which
+    must not share the single connection of the in-memory engine"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def echo_kind():
+    """A test job kind that can fail, sleep and report progress"""
+
+    @job_kind("echo", EchoJob)
+    async def echo(context, payload):
+        CALLS.append(context.attempt)
+        if payload.permanent:
+            raise PermanentJobError("bad input")
+        if context.attempt <= payload.failures:
+            raise RuntimeError(f"attempt {context.attempt} failed")
+        await context.progress(1, 2, "halfway")
+        await asyncio.sleep(payload.sleep)
+        await context.progress(2, 2, "done")
+        return {"value": payload.value * 2}
+
+    CALLS.clear()
+    yield
+    JOB_KINDS.pop("echo", None)
+
+
+def run_worker(db_engine, until, timeout=5.0, **options):
+    """Run a worker until `until(session)` holds, then stop it"""
+    session_factory = sessionmaker(bind=db_engine)
+    worker = JobWorker(
+        poll_interval=0.02,
+        heartbeat_interval=0.05,
+        retry_backoff=0.01,
+        session_factory=session_factory,
+        broker=InMemoryBroker(),
+        **options,
+    )
+
+    async def main():
+        task = asyncio.create_task(worker.run())
+        deadline = asyncio.get_running_loop().time() + timeout
+        while asyncio.get_running_loop().time() < deadline:
+            session = session_factory()
+            try:
+                if until(session):
+                    break
+            finally:
+                session.close()
+            await asyncio.sleep(0.02)
+        worker.stop()
+        await task
+
+    asyncio.run(main())
+    return worker
+
+
+def job_status(job_id, *statuses):
+    return lambda session: session.get(Job, job_id).status in statuses
+
+
+@pytest.mark.unit
+class TestJobWorker:
+    """Claiming, retries, cancellation and recovery of background jobs"""
+
+    def project(self, db_session):
+        return create_user_project(db_session, ProjectCreate(name="Jobs"), 1).id
+
+    def test_job_runs_to_success_with_progress(self, db_engine, db_session):
+        job = enqueue_job(
+            db_session, "echo", {"value": 21}, self.project(db_session), "t"
+        )
+        run_worker(db_engine, job_status(job.id, JobStatus.SUCCEEDED))
+        db_session.refresh(job)
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.result == {"value": 42}
+        assert (job.progress, job.progress_total) == (2, 2)
+        assert job.attempts == 1 and job.locked_by is None
+
+    def test_failed_attempts_are_retried_then_give_up(self, db_engine, db_session):
+        project_id = self.project(db_session)
+        recovers = enqueue_job(db_session, "echo", {"failures": 1}, project_id, "t")
+        gives_up = enqueue_job(
+            db_session, "echo", {"failures": 5}, project_id, "t", max_attempts=2
+        )
+        finished = (JobStatus.SUCCEEDED, JobStatus.FAILED)
+        run_worker(
+            db_engine,
+            lambda s: job_status(recovers.id, *finished)(s)
+            and job_status(gives_up.id, *finished)(s),
+        )
+        db_session.refresh(recovers)
+        db_session.refresh(gives_up)
+        assert (recovers.status, recovers.attempts) == (JobStatus.SUCCEEDED, 2)
+        assert (gives_up.status, gives_up.attempts) == (JobStatus.FAILED, 2)
+        assert gives_up.error == "attempt 2 failed"
+
+    def test_permanent_error_is_not_retried(self, db_engine, db_session):
+        job = enqueue_job(
+            db_session, "echo", {"permanent": True}, self.project(db_session), "t"
+        )
+        run_worker(db_engine, job_status(job.id, JobStatus.FAILED))
+        db_session.refresh(job)
+        assert (job.status, job.attempts, job.error) == (
+            JobStatus.FAILED,
+            1,
+            "bad input",
+        )
+        assert CALLS == [1]
+
+    def test_cancel_request_stops_a_running_job(self, db_engine, db_session):
+        job = enqueue_job(
+            db_session, "echo", {"sleep": 30}, self.project(db_session), "t"
+        )
+
+        def cancel_when_running(session):
+            current = session.get(Job, job.id)
+            if current.status == JobStatus.RUNNING and not current.cancel_requested:
+                current.cancel_requested = True
+                session.commit()
+            return current.status == JobStatus.CANCELLED
+
+        run_worker(db_engine, cancel_when_running)
+        db_session.refresh(job)
+        assert job.status == JobStatus.CANCELLED
+
+    def test_shutdown_requeues_running_jobs(self, db_engine, db_session):
+        job = enqueue_job(
+            db_session, "echo", {"sleep": 30}, self.project(db_session), "t"
+        )
+        run_worker(db_engine, job_status(job.id, JobStatus.RUNNING))
+        db_session.refresh(job)
+        assert job.status == JobStatus.QUEUED
+        assert job.attempts == 0 and job.locked_by is None
+
+    def test_shutdown_fails_running_jobs_that_must_not_rerun(
+        self, db_engine, db_session, monkeypatch
+    ):
+        async def slow_import(chunks, format, insert_chunk):
+            await asyncio.sleep(30)
+
+        monkeypatch.setattr(jobs, "import_test_cases", slow_import)
+        job = enqueue_job(
+            db_session,
+            "bulk_import",
+            {"format": "ndjson", "data": ""},
+            self.project(db_session),
+            "t",
+        )
+        run_worker(db_engine, job_status(job.id, JobStatus.RUNNING))
+        db_session.refresh(job)
+        assert (job.status, job.error) == (JobStatus.FAILED, "Interrupted by shutdown")
+        assert job.attempts == 1 and job.locked_by is None
+
+    def test_stale_running_jobs_are_requeued(self, db_session):
+        project_id = self.project(db_session)
+        job = enqueue_job(db_session, "echo", {}, project_id, "t")
+        claimed = claim_next_job(db_session, "gone-worker")
+        assert claimed.id == job.id
+        assert claim_next_job(db_session, "other-worker") is None
+
+        later = datetime.now(timezone.utc) + timedelta(minutes=5)
+        assert requeue_stale_jobs(db_session, later) == 1
+        db_session.refresh(job)
+        assert job.status == JobStatus.QUEUED and job.locked_by is None
+        assert claim_next_job(db_session, "other-worker").id == job.id
@@ -0,0 +1,126 @@
+# TestGenie Logging Pipeline Tests
+# Run with: python -m pytest tests/unit/test_logging.py
+
+import json
+import logging
+import sys
+import threading
+
+import pytest
+
+import logging_config
+from logging_config import JsonFormatter, SamplingFilter, parse_sample_rates
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    """A log directory for setup_logging, restoring the default setup afterwards"""
+    yield tmp_path
+    logging_config.setup_logging()
+
+
+def records(name, levelno, count):
+    return [
+        logging.LogRecord(name, levelno, __file__, 1, "message %s", (n,), None)
+        for n in range(count)
+    ]
+
+
+@pytest.mark.unit
+class TestSampling:
+    """Sampled loggers keep one in N routine records and every warning"""
+
+    def test_keeps_one_in_n_below_warning(self):
+        sampler = SamplingFilter(0.25)
+        kept = [r for r in records("main.hot", logging.INFO, 20) if sampler.filter(r)]
+        assert len(kept) == 5
+
+        warnings = records("main.hot", logging.WARNING, 3)
+        assert all(sampler.filter(r) for r in warnings)
+
+    def test_zero_rate_drops_routine_records(self):
+        sampler = SamplingFilter(0)
+        assert not any(sampler.filter(r) for r in records("x", logging.DEBUG, 5))
+        assert sampler.filter(records("x", logging.ERROR, 1)[0])
+
+    def test_parse_sample_rates(self):
+        assert parse_sample_rates("main.hot=0.1, crud=0.5,,bad=x") == {
+            "main.hot": 0.1,
+            "crud": 0.5,
+        }
+
+
+@pytest.mark.unit
+class TestQueuedLogging:
+    """Records reach the files from the listener thread, not the caller"""
+
+    def test_files_are_written_by_listener_thread(self, log_dir, monkeypatch):
+        writers = []
+        emit = logging.FileHandler.emit
+
+        def recording_emit(handler, record):
+            writers.append(threading.current_thread())
+            emit(handler, record)
+
+        monkeypatch.setattr(logging.FileHandler, "emit", recording_emit)
+        logging_config.setup_logging(
+            log_level="INFO",
+            log_dir=str(log_dir),
+            enable_file_logging=True,
+            enable_console_logging=False,
+            use_queue=True,
+            sample_rates={},
+        )
+        logger = logging.getLogger("test.queue")
+        logger.info("saved %s rows", 3)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("import failed")
+        logging_config.stop_logging()
+
+        app_log = (log_dir / "app.log").read_text()
+        assert "saved 3 rows" in app_log
+        error_log = (log_dir / "error.log").read_text()
+        assert "import failed" in error_log
+        assert "ValueError: boom" in error_log
+        assert writers and threading.current_thread() not in writers
+
+    def test_sampled_logger_and_json_output(self, log_dir):
+        logging_config.setup_logging(
+            log_level="INFO",
+            log_dir=str(log_dir),
+            enable_file_logging=True,
+            enable_console_logging=False,
+            json_format=True,
+            sample_rates={"test.hot": 0.5},
+        )
+        hot = logging.getLogger("test.hot")
+        for n in range(10):
+            hot.info("listed %s projects", n)
+        hot.warning("slow list")
+        logging_config.stop_logging()
+
+        lines = (log_dir / "app.log").read_text().splitlines()
+        entries = [json.loads(line) for line in lines]
+        assert [e["message"] for e in entries] == [
+            "listed 0 projects",
+            "listed 2 projects",
+            "listed 4 projects",
+            "listed 6 projects",
+            "listed 8 projects",
+            "slow list",
+        ]
+        assert entries[-1]["level"] == "WARNING"
+        assert entries[-1]["logger"] == "test.hot"
+
+    def test_json_formatter_includes_traceback(self):
+        try:
+            raise KeyError("missing")
+        except KeyError:
+            record = logging.LogRecord(
+                "x", logging.ERROR, __file__, 7, "failed %s", ("job",), sys.exc_info()
+            )
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry["message"] == "failed job"
+        assert "KeyError: 'missing'" in entry["exc_info"]
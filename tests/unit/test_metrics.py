@@ -0,0 +1,122 @@
+# TestGenie Request Metrics Tests
+# Run with: python -m pytest tests/unit/test_metrics.py
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import text
+
+import metrics
+from metrics import Histogram, MetricsMiddleware, instrument_engine
+from superwise_client import SuperwiseClient
+
+
+@pytest.fixture
+def fresh_metrics(monkeypatch):
+    """Empty histograms for the duration of a test"""
+    fresh = []
+    for old in metrics.METRICS:
+        if isinstance(old, Histogram):
+            new = Histogram(old.name, old.description, old.labels, old.buckets)
+            for name, value in list(vars(metrics).items()):
+                if value is old:
+                    monkeypatch.setattr(metrics, name, new)
+            old = new
+        fresh.append(old)
+    monkeypatch.setattr(metrics, "METRICS", fresh)
+
+
+def make_app(db_engine):
+    instrument_engine(db_engine)
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, server_timing=True)
+
+    @app.get("/projects/{project_id}/items")
+    def items(project_id: int):
+        with db_engine.connect() as conn:
+            for _ in range(3):
+                conn.execute(text("SELECT 1"))
+        return {"project_id": project_id}
+
+    @app.get("/ask")
+    async def ask():
+        def handler(request):
+            return httpx.Response(200, json={"output": "ok"})
+
+        client = SuperwiseClient(api_url="http://agent.test", agent_id="a")
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return await client.ask("hello")
+
+    return app
+
+
+def get(app, path):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+            return await client.get(path)
+
+    return asyncio.run(run())
+
+
+@pytest.mark.unit
+class TestHistogram:
+    """Histograms render cumulative Prometheus buckets"""
+
+    def test_render(self):
+        histogram = Histogram("h", "Help", ("route",), (0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 5.0):
+            histogram.observe(value, '/a"b')
+
+        assert histogram.render() == [
+            "# HELP h Help",
+            "# TYPE h histogram",
+            'h_bucket{route="/a\\"b",le="0.1"} 1',
+            'h_bucket{route="/a\\"b",le="1"} 3',
+            'h_bucket{route="/a\\"b",le="+Inf"} 4',
+            'h_sum{route="/a\\"b"} 6.25',
+            'h_count{route="/a\\"b"} 4',
+        ]
+
+
+@pytest.mark.unit
+class TestMetricsMiddleware:
+    """Requests are timed per route template with their DB and Superwise work"""
+
+    def test_counts_queries_from_worker_threads(self, db_engine, fresh_metrics):
+        app = make_app(db_engine)
+        response = get(app, "/projects/7/items")
+
+        assert response.status_code == 200
+        assert 'db;dur=' in response.headers["server-timing"]
+        assert '"3 queries"' in response.headers["server-timing"]
+
+        rendered = metrics.render_metrics()
+        assert (
+            'testgenie_http_request_duration_seconds_count{method="GET",'
+            'route="/projects/{project_id}/items",status="200"} 1'
+        ) in rendered
+        assert (
+            'testgenie_http_request_db_queries_sum{method="GET",'
+            'route="/projects/{project_id}/items"} 3'
+        ) in rendered
+
+    def test_unmatched_paths_share_one_series(self, db_engine, fresh_metrics):
+        app = make_app(db_engine)
+        for path in ("/missing/1", "/missing/2"):
+            assert get(app, path).status_code == 404
+
+        assert (
+            'testgenie_http_request_duration_seconds_count{method="GET",'
+            'route="unmatched",status="404"} 2'
+        ) in metrics.render_metrics()
+
+    def test_superwise_calls(self, db_engine, fresh_metrics):
+        response = get(make_app(db_engine), "/ask")
+
+        assert 'superwise;dur=' in response.headers["server-timing"]
+        assert (
+            'testgenie_superwise_request_duration_seconds_count{outcome="200"} 1'
+        ) in metrics.render_metrics()
@@ -0,0 +1,167 @@
+# TestGenie Pagination Tests
+# Run with: python -m pytest tests/unit/test_pagination.py
+
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from config import DEFAULT_PAGE_SIZE
+from crud import (
+    create_project_test_case,
+    create_user_project,
+    get_project_test_cases,
+    update_test_case_by_id,
+)
+from database import get_read_db
+from main import create_app, get_current_user
+from models import TestCase, TestCasePriority, TestCaseStatus
+from pagination import InvalidCursorError, PageRequest
+from schemas import ProjectCreate, TestCaseCreate, TestCaseUpdate
+
+
+def seed_cases(db, count):
+    """Create a project with `count` cases, many sharing the same timestamp"""
+    project_id = create_user_project(db, ProjectCreate(name="Paged"), user_id=1).id
+    base = datetime(2024, 1, 1, 12, 0, 0)
+    for index in range(count):
+        db.add(
+            TestCase(
+                name=f"Case {index}",
+                project_id=project_id,
+                created_by="tester",
+                created_at=base,
+                # Groups of three share an updated_at to exercise the id tiebreak
+                updated_at=base + timedelta(seconds=index // 3),
+                status=TestCaseStatus.READY if index % 2 else TestCaseStatus.DRAFT,
+                priority=TestCasePriority.MAJOR,
+            )
+        )
+    db.commit()
+    return project_id
+
+
+def walk(db, project_id, limit, descending=True, filters=None):
+    """Follow cursors until the last page and return the ids in order"""
+    ids, cursor = [], None
+    while True:
+        page = PageRequest(limit=limit, cursor=cursor, descending=descending)
+        rows, cursor = get_project_test_cases(db, project_id, page, filters)
+        assert len(rows) <= limit
+        ids.extend(row.id for row in rows)
+        if cursor is None:
+            return ids
+
+
+def sort_tuple(case):
+    return (case.updated_at, case.id)
+
+
+@pytest.mark.unit
+class TestKeysetPagination:
+    """Cursor pagination over (updated_at, id)"""
+
+    @pytest.mark.parametrize("descending", [True, False])
+    def test_walks_every_row_once_in_order(self, db_session, descending):
+        project_id = seed_cases(db_session, 25)
+
+        ids = walk(db_session, project_id, limit=7, descending=descending)
+
+        cases = db_session.query(TestCase).filter_by(project_id=project_id).all()
+        expected = [c.id for c in sorted(cases, key=sort_tuple, reverse=descending)]
+        assert ids == expected
+
+    def test_filters_apply_across_pages(self, db_session):
+        project_id = seed_cases(db_session, 20)
+
+        ids = walk(db_session, project_id, limit=4, filters={"status": "ready"})
+
+        statuses = {db_session.get(TestCase, i).status for i in ids}
+        assert len(ids) == 10
+        assert statuses == {TestCaseStatus.READY}
+
+    def test_deleted_cursor_row_does_not_restart(self, db_session):
+        project_id = seed_cases(db_session, 10)
+        first, cursor = get_project_test_cases(
+            db_session, project_id, PageRequest(limit=5)
+        )
+        seen = [row.id for row in first]
+        db_session.delete(first[-1])
+        db_session.commit()
+
+        rest, _ = get_project_test_cases(
+            db_session, project_id, PageRequest(limit=50, cursor=cursor)
+        )
+
+        assert not set(seen) & {row.id for row in rest}
+        assert len(rest) == 5
+
+    @pytest.mark.parametrize("descending", [True, False])
+    def test_edited_cursor_row_keeps_the_position(self, db_session, descending):
+        project_id = seed_cases(db_session, 10)
+        first, cursor = get_project_test_cases(
+            db_session, project_id, PageRequest(limit=5, descending=descending)
+        )
+        seen = [row.id for row in first]
+        update_test_case_by_id(
+            db_session, first[-1].id, TestCaseUpdate(name="Edited"), project_id
+        )
+
+        rest, _ = get_project_test_cases(
+            db_session,
+            project_id,
+            PageRequest(limit=50, cursor=cursor, descending=descending),
+        )
+
+        # The edited row now sorts last, so ascending order serves it again
+        unseen = {row.id for row in rest} - {first[-1].id}
+        assert len(unseen) == 5
+        assert not set(seen) & unseen
+
+    @pytest.mark.parametrize("descending", [True, False])
+    def test_server_default_timestamps(self, db_session, descending):
+        project_id = create_user_project(
+            db_session, ProjectCreate(name="Paged"), user_id=1
+        ).id
+        for index in range(6):
+            create_project_test_case(
+                db_session, TestCaseCreate(name=f"Case {index}"), project_id, "tester"
+            )
+
+        ids = walk(db_session, project_id, limit=2, descending=descending)
+
+        assert sorted(ids) == sorted(set(ids))
+        assert len(ids) == 6
+
+    def test_invalid_cursor(self, db_session):
+        project_id = seed_cases(db_session, 1)
+
+        with pytest.raises(InvalidCursorError):
+            get_project_test_cases(
+                db_session, project_id, PageRequest(cursor="not-a-cursor")
+            )
+
+
+@pytest.mark.unit
+class TestListRoutes:
+    """The list routes page only for clients that ask for it"""
+
+    def test_whole_list_without_cursor_or_limit(self, db_session):
+        project_id = seed_cases(db_session, DEFAULT_PAGE_SIZE + 20)
+        app = create_app()
+        app.dependency_overrides[get_current_user] = lambda: {"id": 1}
+        app.dependency_overrides[get_read_db] = lambda: db_session
+        path = f"/api/projects/{project_id}/test-cases"
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+                return await c.get(path), await c.get(path, params={"limit": 50})
+
+        everything, page = asyncio.run(run())
+
+        assert len(everything.json()) == DEFAULT_PAGE_SIZE + 20
+        assert "x-next-cursor" not in everything.headers
+        assert len(page.json()) == 50
+        assert page.headers["x-next-cursor"]
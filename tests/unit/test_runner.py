@@ -0,0 +1,254 @@
+# TestGenie Test Runner Tests
+# Run with: python -m pytest tests/unit/test_runner.py
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from crud import (
+    add_test_results,
+    create_test_run,
+    create_user_project,
+    fail_stale_test_runs,
+    heartbeat_test_runs,
+)
+from models import Project, TestResult, TestResultStatus, TestRun, TestRunStatus
+from runner import (
+    CaseSpec,
+    Executor,
+    HttpExecutor,
+    Runner,
+    StepFailure,
+    StepSpec,
+    StubExecutor,
+)
+from schemas import ProjectCreate, TestRunCreate
+
+
+def make_cases(count, actions=("open", "click")):
+    return [
+        CaseSpec(
+            id=n + 1,
+            name=f"Case {n}",
+            steps=tuple(StepSpec(i, action) for i, action in enumerate(actions, 1)),
+        )
+        for n in range(count)
+    ]
+
+
+def new_run(db, total):
+    """Create a project and a queued run, returning their ids"""
+    project_id = create_user_project(db, ProjectCreate(name="Runs"), user_id=1).id
+    run = create_test_run(db, TestRunCreate(), project_id, "tester", None, total)
+    return project_id, run.id
+
+
+def execute(db_engine, executor, project_id, run_id, cases, **options):
+    runner = Runner(executor, session_factory=sessionmaker(bind=db_engine), **options)
+    return asyncio.run(runner.run(run_id, project_id, cases))
+
+
+class CountingExecutor(Executor):
+    """Records how many steps are in flight at once"""
+
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.peak = 0
+
+    async def run_step(self, step, state):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+
+
+class HangingExecutor(Executor):
+    """Completes the first `fast` steps and hangs on the rest"""
+
+    def __init__(self, fast):
+        super().__init__()
+        self.fast = fast
+        self.calls = 0
+
+    async def run_step(self, step, state):
+        self.calls += 1
+        if self.calls > self.fast:
+            await asyncio.sleep(60)
+
+
+@pytest.mark.unit
+class TestRunner:
+    """Parallel execution, batched results and run bookkeeping"""
+
+    def test_cases_run_on_a_bounded_pool(self, db_engine, db_session):
+        project_id, run_id = new_run(db_session, 12)
+        executor = CountingExecutor()
+
+        summary = execute(
+            db_engine, executor, project_id, run_id, make_cases(12), max_workers=4
+        )
+
+        assert executor.peak == 4
+        assert (summary.passed, summary.failed, summary.errored) == (12, 0, 0)
+
+    def test_results_are_inserted_in_batches(
+        self, db_engine, db_session, query_counter
+    ):
+        project_id, run_id = new_run(db_session, 12)
+        query_counter.clear()
+
+        execute(
+            db_engine,
+            StubExecutor(),
+            project_id,
+            run_id,
+            make_cases(12),
+            batch_size=5,
+            flush_interval=60,
+        )
+
+        inserts = [s for s in query_counter if "INTO test_results" in s]
+        assert len(inserts) == 3
+        assert db_session.query(TestResult).filter_by(test_run_id=run_id).count() == 12
+
+    def test_failures_update_run_and_project(self, db_engine, db_session):
+        project_id, run_id = new_run(db_session, 3)
+        cases = make_cases(2) + make_cases(1, actions=("open", "fail", "click"))
+
+        execute(db_engine, StubExecutor(), project_id, run_id, cases)
+
+        db_session.expire_all()
+        run = db_session.get(TestRun, run_id)
+        assert run.status == TestRunStatus.FAILED
+        assert (run.passed, run.failed, run.errored) == (2, 1, 0)
+        assert run.started_at is not None and run.finished_at is not None
+        project = db_session.get(Project, project_id)
+        assert project.status == "error"
+        assert project.last_run is not None
+
+        failed = [r for r in run.results if r.error]
+        assert failed[0].error == "Step 2 (fail): Simulated failure"
+        assert [s["status"] for s in failed[0].step_results] == [
+            "passed",
+            "failed",
+            "skipped",
+        ]
+
+    def test_slow_step_times_out_as_error(self, db_engine, db_session):
+        project_id, run_id = new_run(db_session, 1)
+
+        summary = execute(
+            db_engine,
+            StubExecutor(delay=1),
+            project_id,
+            run_id,
+            make_cases(1),
+            step_timeout=0.01,
+        )
+
+        assert summary.status == TestRunStatus.ERROR
+        db_session.expire_all()
+        assert db_session.get(Project, project_id).status == "warning"
+
+    def test_cancelled_run_writes_buffered_results(self, db_engine, db_session):
+        project_id, run_id = new_run(db_session, 6)
+        executor = HangingExecutor(fast=3)
+        runner = Runner(
+            executor,
+            session_factory=sessionmaker(bind=db_engine),
+            max_workers=2,
+            flush_interval=60,
+        )
+
+        async def run_then_cancel():
+            task = asyncio.create_task(
+                runner.run(run_id, project_id, make_cases(6, actions=("open",)))
+            )
+            while executor.calls < 5:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        asyncio.run(run_then_cancel())
+
+        db_session.expire_all()
+        assert db_session.get(TestRun, run_id).status == TestRunStatus.CANCELLED
+        assert db_session.query(TestResult).filter_by(test_run_id=run_id).count() == 3
+
+
+@pytest.mark.unit
+class TestRunRecovery:
+    """Runs left behind by a process that stopped are failed"""
+
+    def test_stale_runs_are_failed(self, db_session):
+        project_id, stale_id = new_run(db_session, 2)
+        live_id = create_test_run(
+            db_session, TestRunCreate(), project_id, "tester", None, 1
+        ).id
+        long_ago = datetime(2024, 1, 1)
+        db_session.query(TestRun).update(
+            {TestRun.status: TestRunStatus.RUNNING, TestRun.updated_at: long_ago}
+        )
+        db_session.commit()
+        add_test_results(
+            db_session,
+            [
+                {
+                    "test_run_id": stale_id,
+                    "test_case_id": 1,
+                    "test_case_name": "Case",
+                    "status": TestResultStatus.PASSED,
+                }
+            ],
+        )
+        heartbeat_test_runs(db_session, [live_id])
+
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=60)
+        assert fail_stale_test_runs(db_session, stale_before) == 1
+
+        db_session.expire_all()
+        stale = db_session.get(TestRun, stale_id)
+        assert stale.status == TestRunStatus.ERROR
+        assert stale.finished_at is not None
+        assert (stale.passed, stale.failed, stale.errored) == (1, 0, 0)
+        assert db_session.get(TestRun, live_id).status == TestRunStatus.RUNNING
+
+
+@pytest.mark.unit
+class TestHttpExecutor:
+    """HTTP steps against a mocked transport"""
+
+    def run_steps(self, *steps):
+        def handler(request):
+            if request.url.path == "/health":
+                return httpx.Response(200, text="OK: service is up")
+            return httpx.Response(404, text="missing")
+
+        async def run():
+            state = {}
+            async with HttpExecutor(
+                "http://app.test", transport=httpx.MockTransport(handler)
+            ) as executor:
+                for step in steps:
+                    await executor.run_step(step, state)
+            return state["response"]
+
+        return asyncio.run(run())
+
+    def test_request_and_checks(self):
+        response = self.run_steps(
+            StepSpec(1, "open", "/health"),
+            StepSpec(2, "assert_status", value="200"),
+            StepSpec(3, "assert_text", value="service is up"),
+        )
+        assert response.status_code == 200
+
+    def test_failed_check(self):
+        with pytest.raises(StepFailure, match="Expected status 200, got 404"):
+            self.run_steps(
+                StepSpec(1, "get", "/nope"), StepSpec(2, "assert_status", value="200")
+            )
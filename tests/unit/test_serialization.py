@@ -0,0 +1,49 @@
+# TestGenie Serialization Tests
+# Run with: python -m pytest tests/unit/test_serialization.py
+
+import json
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+
+from crud import get_project_test_plans
+from schemas import TestPlanResponse
+from serialization import FastJSONResponse, trusted_dump, trusted_response
+from test_eager_loading import seed_project
+
+
+@pytest.mark.unit
+class TestTrustedDump:
+    """ORM rows serialized without validation match the validated output"""
+
+    def test_nested_plan_matches_model_dump(self, db_session):
+        project_id = seed_project(db_session, suites=2, cases_per_suite=3)
+        plans, _ = get_project_test_plans(db_session, project_id)
+
+        trusted = orjson.loads(FastJSONResponse(
+            [trusted_dump(TestPlanResponse, plan) for plan in plans]
+        ).body)
+        validated = [
+            json.loads(TestPlanResponse.model_validate(plan).model_dump_json())
+            for plan in plans
+        ]
+
+        assert trusted == validated
+        assert len(trusted[0]["test_suites"][1]["test_cases"][2]["steps"]) == 3
+
+    def test_response_keeps_route_headers(self, db_session):
+        from fastapi import Response
+
+        route_response = Response()
+        del route_response.headers["content-length"]
+        route_response.headers["X-Next-Cursor"] = "abc"
+
+        result = trusted_response(TestPlanResponse, [], route_response)
+
+        assert result.headers["x-next-cursor"] == "abc"
+        assert result.body == b"[]"
+
+    def test_utc_datetimes_end_in_z(self):
+        moment = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+        assert FastJSONResponse({"at": moment}).body == b'{"at":"2024-01-01T12:00:00Z"}'
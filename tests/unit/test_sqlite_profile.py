@@ -0,0 +1,183 @@
+# TestGenie SQLite Profile Tests
+# Run with: python -m pytest tests/unit/test_sqlite_profile.py
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+import database
+import sqlite_profile
+from crud import create_user, create_user_project
+from database import Base
+from main import create_app, get_current_user
+from models import TestCase, User
+from schemas import ProjectCreate
+from sqlite_profile import SQLiteWriter, apply_sqlite_profile, sqlite_connect_args
+
+
+@pytest.fixture
+def tuned_engine(tmp_path):
+    """File-backed engine with the SQLite profile applied"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'tuned.db'}",
+        connect_args=sqlite_connect_args({"check_same_thread": False}),
+    )
+    apply_sqlite_profile(
+        engine,
+        busy_timeout_ms=5000,
+        synchronous="NORMAL",
+        cache_size_kb=8192,
+        mmap_size_mb=16,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def count_users(engine):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(User)).scalar()
+
+
+@pytest.mark.unit
+class TestSQLiteProfile:
+    """Pragmas on connect and one writer at a time"""
+
+    def test_pragmas(self, tuned_engine):
+        with tuned_engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+            assert conn.exec_driver_sql("PRAGMA cache_size").scalar() == -8192
+
+    def test_concurrent_write_transactions(self, tuned_engine):
+        session_factory = sessionmaker(bind=tuned_engine, autoflush=False)
+        errors = []
+
+        def write(worker):
+            for n in range(25):
+                db = session_factory()
+                try:
+                    # Read first, as CRUD functions do, then write
+                    db.query(User).filter(User.email == "none").first()
+                    create_user(db, f"w{worker}-{n}@example.com", "W", "hash")
+                except Exception as e:
+                    errors.append(e)
+                finally:
+                    db.close()
+
+        threads = [threading.Thread(target=write, args=(w,)) for w in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert count_users(tuned_engine) == 200
+        assert not sqlite_profile._write_lock.locked()
+
+
+@pytest.mark.unit
+class TestSQLiteWriter:
+    """Queued writes share commits; a failing write is rolled back alone"""
+
+    def test_group_commit(self, tuned_engine):
+        writer = SQLiteWriter(tuned_engine, batch_size=16)
+
+        def fails(db):
+            db.add(User(email="rolled@back.io", full_name="x", hashed_password="h"))
+            db.flush()
+            raise ValueError("invalid row")
+
+        async def run():
+            writes = [
+                writer.run(create_user, f"u{n}@example.com", "U", "hash")
+                for n in range(40)
+            ]
+            return await asyncio.gather(*writes, writer.run(fails), return_exceptions=True)
+
+        try:
+            results = asyncio.run(run())
+        finally:
+            writer.stop()
+
+        assert all(isinstance(user, User) for user in results[:40])
+        assert results[0].id is not None
+        assert isinstance(results[40], ValueError)
+        assert count_users(tuned_engine) == 40
+        assert writer.writes == 41
+        assert writer.batches < 41
+        assert not sqlite_profile._write_lock.locked()
+
+
+@pytest.fixture
+def writer_app(tuned_engine, monkeypatch):
+    """The API on the tuned engine, with writes going through a SQLiteWriter"""
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=tuned_engine)
+    writer = SQLiteWriter(tuned_engine, batch_size=16)
+    monkeypatch.setattr(database, "engine", tuned_engine)
+    monkeypatch.setattr(database, "read_engine", tuned_engine)
+    monkeypatch.setattr(database, "SessionLocal", factory)
+    monkeypatch.setattr(database, "ReadSessionLocal", factory)
+    monkeypatch.setattr(database, "sqlite_writer", writer)
+    monkeypatch.setattr(database, "_session_slots", None)
+    monkeypatch.setattr(database, "_read_session_slots", None)
+    app = create_app()
+    app.dependency_overrides[get_current_user] = lambda: {
+        "id": 1,
+        "full_name": "Tester",
+    }
+    yield app, writer
+    writer.stop()
+
+
+@pytest.mark.unit
+class TestWriteRoutes:
+    """Write routes join the writer's group commits alongside reads"""
+
+    def test_mixed_workload(self, tuned_engine, writer_app):
+        app, writer = writer_app
+        db = sessionmaker(bind=tuned_engine)()
+        project_id = create_user_project(db, ProjectCreate(name="Mixed"), 1).id
+        db.close()
+        base = f"/api/projects/{project_id}"
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+
+                async def create_and_edit(n):
+                    step = {"step_number": 1, "action": "go"}
+                    payload = {"name": f"Case {n}", "steps": [step]}
+                    created = await c.post(f"{base}/test-cases", json=payload)
+                    case = created.json()
+                    edited = await c.put(
+                        f"{base}/test-cases/{case['id']}", json={"name": f"Edited {n}"}
+                    )
+                    step_id = case["steps"][0]["id"]
+                    patched = await c.patch(
+                        f"{base}/test-cases/{case['id']}/steps/{step_id}",
+                        json={"action": "click"},
+                    )
+                    return [created, edited, patched]
+
+                writes = asyncio.gather(*(create_and_edit(n) for n in range(20)))
+                lists = (c.get(f"{base}/test-cases") for _ in range(20))
+                reads = asyncio.gather(*lists)
+                return await asyncio.wait_for(asyncio.gather(writes, reads), 30)
+
+        writes, reads = asyncio.run(run())
+
+        responses = [response for group in writes for response in group] + reads
+        assert [r.status_code for r in responses] == [200] * len(responses)
+        assert writes[0][2].json()["action"] == "click"
+        assert writer.writes == 60
+        assert writer.batches < 60
+        with tuned_engine.connect() as conn:
+            names = conn.execute(select(TestCase.name)).scalars().all()
+        assert sorted(names) == sorted(f"Edited {n}" for n in range(20))
+        assert not sqlite_profile._write_lock.locked()
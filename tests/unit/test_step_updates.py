@@ -0,0 +1,156 @@
+# TestGenie Test Step Update Tests
+# Run with: python -m pytest tests/unit/test_step_updates.py
+
+from datetime import datetime
+
+import pytest
+
+from crud import (
+    create_project_test_case,
+    create_user_project,
+    update_test_case_by_id,
+    update_test_step,
+)
+from models import TestCase, TestStep
+from schemas import (
+    ProjectCreate,
+    TestCaseCreate,
+    TestCaseUpdate,
+    TestStepCreate,
+    TestStepPatch,
+    TestStepUpdate,
+)
+
+OLD_TIMESTAMP = datetime(2020, 1, 1)
+
+
+def seed_case(db, steps):
+    """Create a case with `steps` steps and an old updated_at"""
+    project_id = create_user_project(db, ProjectCreate(name="Steps"), user_id=1).id
+    case = create_project_test_case(
+        db,
+        TestCaseCreate(
+            name="Long case",
+            steps=[
+                TestStepCreate(step_number=n, action="click", element=f"#e{n}")
+                for n in range(1, steps + 1)
+            ],
+        ),
+        project_id,
+        "tester",
+    )
+    db.query(TestCase).filter_by(id=case.id).update({"updated_at": OLD_TIMESTAMP})
+    db.commit()
+    db.expire_all()
+    return project_id, case.id
+
+
+def current_steps(db, test_case_id):
+    """Steps of a case as TestStepUpdate payloads, ids included"""
+    steps = db.query(TestStep).filter_by(test_case_id=test_case_id)
+    return [
+        TestStepUpdate(
+            id=s.id,
+            step_number=s.step_number,
+            action=s.action,
+            element=s.element,
+            value=s.value,
+            description=s.description,
+        )
+        for s in steps.order_by(TestStep.step_number)
+    ]
+
+
+STEP_WRITES = ("INSERT INTO test_steps", "UPDATE test_steps", "DELETE FROM test_steps")
+
+
+def step_writes(statements):
+    """Verbs of the statements that wrote to test_steps"""
+    return [s.split()[0] for s in statements if s.startswith(STEP_WRITES)]
+
+
+@pytest.mark.unit
+class TestStepDiffing:
+    """update_test_case_by_id writes only the steps that changed"""
+
+    def test_editing_one_step_updates_one_row(self, db_session, query_counter):
+        project_id, case_id = seed_case(db_session, 200)
+        steps = current_steps(db_session, case_id)
+        ids_before = [s.id for s in steps]
+        steps[99].action = "type"
+        query_counter.clear()
+
+        case = update_test_case_by_id(
+            db_session,
+            case_id,
+            TestCaseUpdate(name="Long case", steps=steps),
+            project_id,
+        )
+
+        assert step_writes(query_counter) == ["UPDATE"]
+        assert [s.id for s in current_steps(db_session, case_id)] == ids_before
+        assert [s.action for s in case.steps].count("type") == 1
+        assert case.updated_at.replace(tzinfo=None) > OLD_TIMESTAMP
+
+    def test_unchanged_steps_write_nothing(self, db_session, query_counter):
+        project_id, case_id = seed_case(db_session, 20)
+        steps = current_steps(db_session, case_id)
+        query_counter.clear()
+
+        update_test_case_by_id(
+            db_session,
+            case_id,
+            TestCaseUpdate(name="Long case", steps=steps),
+            project_id,
+        )
+
+        assert step_writes(query_counter) == []
+
+    def test_steps_without_ids_match_by_step_number(self, db_session, query_counter):
+        project_id, case_id = seed_case(db_session, 3)
+        ids_before = [s.id for s in current_steps(db_session, case_id)]
+        steps = [
+            TestStepUpdate(step_number=1, action="click", element="#e1"),
+            TestStepUpdate(step_number=2, action="hover", element="#e2"),
+            TestStepUpdate(step_number=4, action="submit"),
+        ]
+        query_counter.clear()
+
+        update_test_case_by_id(
+            db_session,
+            case_id,
+            TestCaseUpdate(name="Long case", steps=steps),
+            project_id,
+        )
+
+        assert sorted(step_writes(query_counter)) == ["DELETE", "INSERT", "UPDATE"]
+        after = current_steps(db_session, case_id)
+        assert [s.step_number for s in after] == [1, 2, 4]
+        assert [s.id for s in after[:2]] == ids_before[:2]
+        assert after[1].action == "hover"
+
+    def test_patch_single_step(self, db_session, query_counter):
+        project_id, case_id = seed_case(db_session, 5)
+        step_id = current_steps(db_session, case_id)[2].id
+        query_counter.clear()
+
+        step = update_test_step(
+            db_session, step_id, case_id, project_id, TestStepPatch(value="hello")
+        )
+
+        assert (step.value, step.action) == ("hello", "click")
+        assert step_writes(query_counter) == ["UPDATE"]
+        case = db_session.get(TestCase, case_id)
+        db_session.refresh(case)
+        assert case.updated_at.replace(tzinfo=None) > OLD_TIMESTAMP
+
+    def test_patch_checks_project(self, db_session):
+        project_id, case_id = seed_case(db_session, 1)
+        step_id = current_steps(db_session, case_id)[0].id
+
+        assert (
+            update_test_step(
+                db_session, step_id, case_id, project_id + 1, TestStepPatch(value="x")
+            )
+            is None
+        )
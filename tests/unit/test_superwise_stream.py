@@ -0,0 +1,118 @@
+# TestGenie Superwise Streaming Tests
+# Run with: python -m pytest tests/unit/test_superwise_stream.py
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from superwise_client import SuperwiseClient, SuperwiseError
+
+
+def make_client(handler, **options):
+    client = SuperwiseClient(api_url="http://agent.test", agent_id="a", **options)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+async def tokens(count):
+    for n in range(count):
+        yield f"data: token {n}\n\n".encode()
+
+
+@pytest.mark.unit
+class TestSuperwiseStream:
+    """Streamed answers, early close and retries before the first byte"""
+
+    def test_stream_relays_chunks_and_timing(self):
+        def handler(request):
+            assert "text/event-stream" in request.headers["accept"]
+            return httpx.Response(
+                200, headers={"content-type": "text/event-stream"}, content=tokens(3)
+            )
+
+        async def run():
+            stream = await make_client(handler).stream("hello")
+            body = b"".join([chunk async for chunk in stream])
+            return stream, body
+
+        stream, body = asyncio.run(run())
+
+        assert body.count(b"data: token") == 3
+        assert stream.media_type == "text/event-stream"
+        assert stream.ttfb <= stream.total
+
+    def test_early_close_frees_the_concurrency_slot(self):
+        def handler(request):
+            return httpx.Response(200, content=tokens(100))
+
+        async def run():
+            client = make_client(handler, max_concurrency=1)
+            for _ in range(3):
+                stream = await client.stream("hello")
+                async for _ in stream:
+                    break
+                await stream.aclose()
+            return client
+
+        client = asyncio.run(run())
+        assert not client._semaphore.locked()
+
+    def test_retries_before_first_byte_then_fails(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503)
+
+        client = make_client(handler, max_retries=1, backoff=0)
+        with pytest.raises(SuperwiseError) as error:
+            asyncio.run(client.stream("hello"))
+
+        assert len(calls) == 2
+        assert error.value.status_code == 503
+        assert not client._semaphore.locked()
+
+    def test_only_connection_errors_are_retried(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                raise httpx.ConnectError("refused", request=request)
+            raise httpx.ReadTimeout("slow answer", request=request)
+
+        client = make_client(handler, max_retries=3, backoff=0)
+        with pytest.raises(SuperwiseError, match="ReadTimeout"):
+            asyncio.run(client.ask("hello"))
+
+        # The read timed out after the prompt was sent, so it is not sent again
+        assert len(calls) == 2
+
+    def test_retry_after_is_honored(self):
+        calls = []
+
+        def handler(request):
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                return httpx.Response(429, headers={"Retry-After": "0.2"})
+            return httpx.Response(200, json={"output": "ok"})
+
+        client = make_client(handler, max_retries=1, backoff=0)
+        assert asyncio.run(client.ask("hello")) == {"output": "ok"}
+        assert calls[1] - calls[0] >= 0.2
+
+    def test_long_retry_after_is_returned_to_the_caller(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503, headers={"Retry-After": "3600"})
+
+        client = make_client(handler, max_retries=2, backoff=0)
+        with pytest.raises(SuperwiseError) as error:
+            asyncio.run(client.ask("hello"))
+
+        assert len(calls) == 1
+        assert error.value.status_code == 503
@@ -0,0 +1,75 @@
+# TestGenie User Account Tests
+# Run with: python -m pytest tests/unit/test_users.py
+
+import asyncio
+
+import pytest
+
+import auth
+from auth import (
+    check_password,
+    get_password_hash,
+    password_needs_rehash,
+    verify_password,
+)
+from crud import create_user, get_user_by_email, update_user_password_hash
+
+
+@pytest.fixture(autouse=True)
+def fast_hashing(monkeypatch):
+    """Cheapest bcrypt cost, to keep the tests quick"""
+    monkeypatch.setattr(auth, "BCRYPT_ROUNDS", 4)
+
+
+@pytest.mark.unit
+class TestPasswords:
+    """bcrypt hashing, parameter upgrades and the hashing pool"""
+
+    def test_hash_and_verify(self):
+        hashed = get_password_hash("correct horse")
+
+        assert hashed.startswith("$2b$04$")
+        assert verify_password("correct horse", hashed)
+        assert not verify_password("wrong horse", hashed)
+        assert not verify_password("correct horse", "not a bcrypt hash")
+        # bcrypt ignores bytes past the 72nd instead of failing
+        long_password = "x" * 100
+        assert verify_password(long_password, get_password_hash(long_password))
+
+    def test_hashes_with_other_rounds_need_rehash(self, monkeypatch):
+        old_hash = get_password_hash("secret")
+        assert not password_needs_rehash(old_hash)
+
+        monkeypatch.setattr(auth, "BCRYPT_ROUNDS", 5)
+        assert password_needs_rehash(old_hash)
+        assert not password_needs_rehash(get_password_hash("secret"))
+
+    def test_check_password_in_the_pool(self):
+        hashed = get_password_hash("secret")
+
+        async def check():
+            return await asyncio.gather(
+                check_password("secret", hashed),
+                check_password("nope", hashed),
+                check_password("secret", None),
+            )
+
+        assert asyncio.run(check()) == [True, False, False]
+
+
+@pytest.mark.unit
+class TestUserStore:
+    """Users table lookups"""
+
+    def test_emails_are_matched_without_case(self, db_session):
+        user = create_user(db_session, " Ada@Example.com ", "Ada", "hash", 7)
+
+        assert user.id == 7 and user.email == "ada@example.com"
+        assert get_user_by_email(db_session, "ADA@example.COM").id == 7
+        assert get_user_by_email(db_session, "bob@example.com") is None
+
+        update_user_password_hash(db_session, 7, "new hash")
+        db_session.expire_all()
+        assert get_user_by_email(db_session, "ada@example.com").hashed_password == (
+            "new hash"
+        )